@@ -17,6 +17,8 @@
 
 import os
 import math
+import queue
+import threading
 from enum import Enum
 import numpy as np
 import pandas as pd
@@ -58,12 +60,19 @@ class H5Dataset():
     def _bin_count(self, hdf_data_dir, file_prefix, num_of_parts):
         size = 0
         for part in range(num_of_parts):
-            _y = pd.read_hdf(os.path.join(hdf_data_dir,
-                                          file_prefix + '_output_part_' + str(
-                                              part) + '.h5'))
-            size += _y.shape[0]
+            size += self._hdf_rows(os.path.join(hdf_data_dir,
+                                               file_prefix + '_output_part_' + str(part) + '.h5'))
         return size
 
+    @staticmethod
+    def _hdf_rows(hdf_file):
+        """
+        number of rows from the hdf metadata, without reading the data
+        """
+        with pd.HDFStore(hdf_file, mode='r') as store:
+            storer = store.get_storer(store.keys()[0])
+            return int(storer.nrows if storer.is_table else storer.shape[0])
+
     def _iterate_hdf_files_(self, num_of_parts=None,
                             shuffle_block=False):
         """
@@ -88,61 +97,78 @@ class H5Dataset():
                                  self._file_prefix + '_output_part_' + str(
                                      p) + '.h5'), i + 1 == len(parts)
 
-    def _generator(self, X, y, batch_size, shuffle=True):
+    def _read_chunks(self, hdf_in, hdf_out, chunk_size, shuffle=False):
         """
-        should be accessed only in private
-        :param X:
-        :param y:
-        :param batch_size:
-        :param shuffle:
-        :return:
+        read one part chunk by chunk, and convert each chunk to ids, weights and labels once.
+        :param hdf_in:
+        :param hdf_out:
+        :param chunk_size: rows of each chunk, also the shuffle window
+        :param shuffle: shuffle the order of chunks, and the rows within each chunk
+        :return: ids(int32), weights(float32), labels(float32) of each chunk
         """
-        number_of_batches = np.ceil(1. * X.shape[0] / batch_size)
-        counter = 0
-        finished = False
-        sample_index = np.arange(X.shape[0])
-        if shuffle:
-            for _ in range(int(shuffle)):
-                np.random.shuffle(sample_index)
-        assert X.shape[0] > 0
-        while True:
-            batch_index = sample_index[
-                batch_size * counter: batch_size * (counter + 1)]
-            X_batch = X[batch_index]
-            y_batch = y[batch_index]
-            counter += 1
-            yield X_batch, y_batch, finished
-            if counter == number_of_batches:
-                counter = 0
-                finished = True
+        with pd.HDFStore(hdf_in, mode='r') as store_in, pd.HDFStore(hdf_out, mode='r') as store_out:
+            key_in, key_out = store_in.keys()[0], store_out.keys()[0]
+            starts = np.arange(0, self._hdf_rows(hdf_out), chunk_size)
+            if shuffle:
+                np.random.shuffle(starts)
+            for start in starts:
+                X = store_in.select(key_in, start=start, stop=start + chunk_size).values
+                y = store_out.select(key_out, start=start, stop=start + chunk_size).values
+                if shuffle:
+                    sample_index = np.random.permutation(X.shape[0])
+                    X = X[sample_index]
+                    y = y[sample_index]
+                yield np.ascontiguousarray(X[:, 0:self.input_length], dtype=np.int32), \
+                    np.ascontiguousarray(X[:, self.input_length:], dtype=np.float32), \
+                    np.ascontiguousarray(y, dtype=np.float32)
 
     def batch_generator(self, batch_size=1000,
-                        random_sample=False, shuffle_block=False):
+                        random_sample=False, shuffle_block=False, chunk_batches=100):
         """
-        :param train_mode: True or false,false is eval_mode,
+        read the hdf files on a background thread, with two chunks buffered,
+        and yield the batches as views of the chunks.
         :param batch_size
-        :param num_of_parts: number of files
-        :param random_sample: if True, will shuffle
+        :param random_sample: if True, will shuffle within a chunk
         :param shuffle_block: shuffle file blocks at every round
+        :param chunk_batches: number of batches in a chunk
         :return:
         """
-
-        for hdf_in, hdf_out, _ in self._iterate_hdf_files_(self._num_of_parts,
-                                                           shuffle_block):
-            start = stop = None
-            X_all = pd.read_hdf(hdf_in, start=start, stop=stop).values
-            y_all = pd.read_hdf(hdf_out, start=start, stop=stop).values
-            data_gen = self._generator(X_all, y_all, batch_size,
-                                       shuffle=random_sample)
-            finished = False
-
-            while not finished:
-                X, y, finished = data_gen.__next__()
-                X_id = X[:, 0:self.input_length]
-                X_va = X[:, self.input_length:]
-                yield np.array(X_id.astype(dtype=np.int32)), np.array(
-                    X_va.astype(dtype=np.float32)), np.array(
-                        y.astype(dtype=np.float32))
+        chunks = queue.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def _put(item):
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _load():
+            try:
+                for hdf_in, hdf_out, _ in self._iterate_hdf_files_(self._num_of_parts,
+                                                                   shuffle_block):
+                    for chunk in self._read_chunks(hdf_in, hdf_out, batch_size * chunk_batches,
+                                                   shuffle=random_sample):
+                        if not _put(chunk):
+                            return
+            except Exception as e:  # pylint: disable=broad-except
+                _put(e)
+
+        loader = threading.Thread(target=_load, daemon=True)
+        loader.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if isinstance(chunk, Exception):
+                    raise chunk
+                ids, weights, labels = chunk
+                for start in range(0, labels.shape[0], batch_size):
+                    yield ids[start:start + batch_size], weights[start:start + batch_size], \
+                        labels[start:start + batch_size]
+        finally:
+            stop.set()
 
 
 def _get_h5_dataset(data_dir, train_mode=True, epochs=1, batch_size=1000):
@@ -22,6 +22,8 @@ data_cfg = edict({
     'num_consumer': 4,
     'get_npy': 1,
     'get_mindrecord': 1,
+    'num_workers': 8,
+    'cache_path': "/dev/data/Music_Tagger_Data/cache/",
     'audio_path': "/dev/data/Music_Tagger_Data/fea/",
     'npy_path': "/dev/data/Music_Tagger_Data/fea/",
     'info_path': "/dev/data/Music_Tagger_Data/fea/",
@@ -16,6 +16,8 @@
 
 import os
 import argparse
+import hashlib
+from multiprocessing import Pool
 import pandas as pd
 import numpy as np
 import librosa
@@ -24,7 +26,7 @@ from mindspore import context
 from src.config import data_cfg as cfg
 
 
-def compute_melgram(audio_path, save_path='', filename='', save_npy=True):
+def compute_melgram(audio_path, save_path='', filename='', save_npy=True, cache_path=''):
     # mel-spectrogram parameters
     SR = 12000
     N_FFT = 512
@@ -32,20 +34,36 @@ def compute_melgram(audio_path, save_path='', filename='', save_npy=True):
     HOP_LEN = 256
     DURA = 29.12  # to make it 1366 frame..
 
-    src, sr = librosa.load(audio_path, sr=SR)  # whole signal
-    n_sample = src.shape[0]
-    n_sample_fit = int(DURA * SR)
-
-    if n_sample < n_sample_fit:  # if too short
-        src = np.hstack((src, np.zeros((int(DURA * SR) - n_sample, ))))
-    elif n_sample > n_sample_fit:  # if too long
-        src = src[(n_sample - n_sample_fit) // 2:(n_sample + n_sample_fit) //
-                  2]
-    logam = librosa.core.amplitude_to_db
-    melgram = librosa.feature.melspectrogram
-    ret = logam(
-        melgram(y=src, sr=SR, hop_length=HOP_LEN, n_fft=N_FFT, n_mels=N_MELS))
-    ret = ret[np.newaxis, np.newaxis, :]
+    cache_file = ''
+    if cache_path:
+        # keyed by the content of the audio and the parameters, so renamed or
+        # moved tracks are not decoded again
+        sha1 = hashlib.sha1('{},{},{},{},{}'.format(SR, N_FFT, N_MELS, HOP_LEN, DURA).encode('utf-8'))
+        with open(audio_path, 'rb') as f:
+            sha1.update(f.read())
+        cache_file = os.path.join(cache_path, sha1.hexdigest() + '.npy')
+
+    if cache_file and os.path.exists(cache_file):
+        ret = np.load(cache_file)
+    else:
+        src, sr = librosa.load(audio_path, sr=SR)  # whole signal
+        n_sample = src.shape[0]
+        n_sample_fit = int(DURA * SR)
+
+        if n_sample < n_sample_fit:  # if too short
+            src = np.hstack((src, np.zeros((int(DURA * SR) - n_sample, ))))
+        elif n_sample > n_sample_fit:  # if too long
+            src = src[(n_sample - n_sample_fit) // 2:(n_sample + n_sample_fit) //
+                      2]
+        logam = librosa.core.amplitude_to_db
+        melgram = librosa.feature.melspectrogram
+        ret = logam(
+            melgram(y=src, sr=SR, hop_length=HOP_LEN, n_fft=N_FFT, n_mels=N_MELS))
+        ret = ret[np.newaxis, np.newaxis, :].astype(np.float32)
+        if cache_file:
+            tmp_file = '{}.{}.tmp.npy'.format(cache_file[:-4], os.getpid())
+            np.save(tmp_file, ret)
+            os.replace(tmp_file, cache_file)
     if save_npy:
 
         save_path = save_path + filename[:-4] + '.npy'
@@ -53,6 +71,11 @@ def compute_melgram(audio_path, save_path='', filename='', save_npy=True):
     return ret
 
 
+def compute_melgram_task(task):
+    """compute_melgram in the worker process, the melgram is not sent back"""
+    compute_melgram(*task)
+
+
 def get_data(features_data, labels_data):
     data_list = []
     for i, (label, feature) in enumerate(zip(labels_data, features_data)):
@@ -171,14 +194,26 @@ if __name__ == "__main__":
 
     if cfg.get_npy:
         GetLabel(cfg.info_path, cfg.info_name)
+        if cfg.cache_path and not os.path.isdir(cfg.cache_path):
+            os.makedirs(cfg.cache_path)
         dirname = os.listdir(cfg.audio_path)
+        tasks = []
         for i in dirname:
+            # the cache may be a folder of audio_path, it is not a genre
+            if cfg.cache_path and os.path.samefile(os.path.join(cfg.audio_path, i), cfg.cache_path):
+                continue
             filename = os.listdir("{}/{}".format(cfg.audio_path, i))
             if not os.path.isdir("{}/{}".format(cfg.npy_path, i)):
                 os.mkdir("{}/{}".format(cfg.npy_path, i))
             for j in filename:
-                compute_melgram("{}/{}/{}".format(cfg.audio_path, i, j),
-                                "{}/{}/".format(cfg.npy_path, i), j)
+                tasks.append(("{}/{}/{}".format(cfg.audio_path, i, j),
+                              "{}/{}/".format(cfg.npy_path, i), j, True,
+                              cfg.cache_path))
+        pool = Pool(cfg.num_workers)
+        for _ in pool.imap_unordered(compute_melgram_task, tasks, chunksize=4):
+            pass
+        pool.close()
+        pool.join()
 
     if cfg.get_mindrecord:
         if args.device_id is not None:
@@ -14,7 +14,6 @@
 # ============================================================================
 """Preprocess dataset."""
 import random
-import threading
 import copy
 
 import numpy as np
@@ -132,22 +131,30 @@ def pil_image_reshape(interp):
     return reshape_type[interp]
 
 
-def _preprocess_true_boxes(true_boxes, anchors, in_shape, num_classes, max_boxes, label_smooth,
-                           label_smooth_factor=0.1, iou_threshold=0.213):
-    """
-    Introduction
-    ------------
-        对训练数据的ground truth box进行预处理
-    Parameters
-    ----------
-        true_boxes: ground truth box 形状为[boxes, 5], x_min, y_min, x_max, y_max, class_id
+def batch_preprocess_true_boxes(annos, anchors, in_shape, num_classes, max_boxes, label_smooth,
+                                label_smooth_factor=0.1, iou_threshold=0.213):
+    """Preprocess annotation boxes of a batch of images with the same input shape.
+
+    The best anchors and the anchors with iou over `iou_threshold` of all the boxes
+    in the batch are found at once and scattered into the batch targets, a later
+    assignment overwrites the earlier one in the same cell, as assigning box by box.
     """
     anchors = np.array(anchors)
     num_layers = anchors.shape[0] // 3
     anchor_mask = [[6, 7, 8], [3, 4, 5], [0, 1, 2]]
-    true_boxes = np.array(true_boxes, dtype='float32')
-    # input_shape = np.array([in_shape, in_shape], dtype='int32')
     input_shape = np.array(in_shape, dtype='int32')
+    batch_size = len(annos)
+
+    grid_shapes = [input_shape // 32, input_shape // 16, input_shape // 8]
+    # grid_shape [h, w]
+    y_true = [np.zeros((batch_size, grid_shapes[l][0], grid_shapes[l][1], len(anchor_mask[l]),
+                        5 + num_classes), dtype='float32') for l in range(num_layers)]
+    # y_true [batch, gridy, gridx]
+    pad_gt_boxes = [np.zeros(shape=[batch_size, max_boxes, 4], dtype=np.float32) for _ in range(num_layers)]
+
+    true_boxes = [np.array(anno, dtype='float32').reshape(-1, 5) for anno in annos]
+    image_index = np.concatenate([np.full(len(boxes), b) for b, boxes in enumerate(true_boxes)])
+    true_boxes = np.concatenate(true_boxes)
     boxes_xy = (true_boxes[..., 0:2] + true_boxes[..., 2:4]) // 2.
     # trans to box center point
     boxes_wh = true_boxes[..., 2:4] - true_boxes[..., 0:2]
@@ -156,24 +163,16 @@ def _preprocess_true_boxes(true_boxes, anchors, in_shape, num_classes, max_boxes
     true_boxes[..., 2:4] = boxes_wh / input_shape[::-1]
     # true_boxes = [xywh]
 
-    grid_shapes = [input_shape // 32, input_shape // 16, input_shape // 8]
-    # grid_shape [h, w]
-    y_true = [np.zeros((grid_shapes[l][0], grid_shapes[l][1], len(anchor_mask[l]),
-                        5 + num_classes), dtype='float32') for l in range(num_layers)]
-    # y_true [gridy, gridx]
-    # 这里扩充维度是为了后面应用广播计算每个图中所有box的anchor互相之间的iou
-    anchors = np.expand_dims(anchors, 0)
-    anchors_max = anchors / 2.
-    anchors_min = -anchors_max
     # 因为之前对box做了padding, 因此需要去除全0行
     valid_mask = boxes_wh[..., 0] > 0
-
+    true_boxes = true_boxes[valid_mask]
+    image_index = image_index[valid_mask]
     wh = boxes_wh[valid_mask]
-    if len(wh) != 0:
-        # 为了应用广播扩充维度
+    if wh.size > 0:
+        anchors = np.expand_dims(anchors, 0)
+        anchors_max = anchors / 2.
+        anchors_min = -anchors_max
         wh = np.expand_dims(wh, -2)
-        # wh 的shape为[box_num, 1, 2]
-        # move to original point to compare, and choose the best layer-anchor to set
         boxes_max = wh / 2.
         boxes_min = -boxes_max
 
@@ -185,89 +184,69 @@ def _preprocess_true_boxes(true_boxes, anchors, in_shape, num_classes, max_boxes
         anchor_area = anchors[..., 0] * anchors[..., 1]
         iou = intersect_area / (box_area + anchor_area - intersect_area)
 
-        # 找出和ground truth box的iou最大的anchor box,
-        # 然后将对应不同比例的负责该ground turth box 的位置置为ground truth box坐标
+        # 找出和ground truth box的iou最大的anchor box, 以及iou大于阈值的anchor box
         best_anchor = np.argmax(iou, axis=-1)
-        for t, n in enumerate(best_anchor):
-            for l in range(num_layers):
-                if n in anchor_mask[l]:
-                    i = np.floor(true_boxes[t, 0] * grid_shapes[l][1]).astype('int32')  # grid_y
-                    j = np.floor(true_boxes[t, 1] * grid_shapes[l][0]).astype('int32')  # grid_x
-
-                    k = anchor_mask[l].index(n)
-                    c = true_boxes[t, 4].astype('int32')
-                    y_true[l][j, i, k, 0:4] = true_boxes[t, 0:4]
-                    y_true[l][j, i, k, 4] = 1.
-
-                    # lable-smooth
-                    if label_smooth:
-                        sigma = label_smooth_factor / (num_classes - 1)
-                        y_true[l][j, i, k, 5:] = sigma
-                        y_true[l][j, i, k, 5 + c] = 1 - label_smooth_factor
-                    else:
-                        y_true[l][j, i, k, 5 + c] = 1.
-
-        IT_flag = True
-        if IT_flag == True:
-            threshold_anchor = (iou > iou_threshold)
-            # print('threshold_anchor\n', threshold_anchor.shape, threshold_anchor)
-            # for t, n in enumerate(best_anchor):
-            for t in range(threshold_anchor.shape[0]):
-                for n in range(threshold_anchor.shape[1]):
-                    if threshold_anchor[t][n] == False:
-                        continue
-                    for l in range(num_layers):
-                        if n in anchor_mask[l]:
-                            i = np.floor(true_boxes[t, 0] * grid_shapes[l][1]).astype('int32')  # grid_y
-                            j = np.floor(true_boxes[t, 1] * grid_shapes[l][0]).astype('int32')  # grid_x
-
-                            k = anchor_mask[l].index(n)
-                            c = true_boxes[t, 4].astype('int32')
-                            y_true[l][j, i, k, 0:4] = true_boxes[t, 0:4]
-                            y_true[l][j, i, k, 4] = 1.
-
-                            # lable-smooth
-                            if label_smooth:
-                                sigma = label_smooth_factor / (num_classes - 1)
-                                y_true[l][j, i, k, 5:] = sigma
-                                y_true[l][j, i, k, 5 + c] = 1 - label_smooth_factor
-                            else:
-                                y_true[l][j, i, k, 5 + c] = 1.
+        threshold_box, threshold_anchor = np.nonzero(iou > iou_threshold)
+        box_ids = np.concatenate([np.arange(len(best_anchor)), threshold_box])
+        anchor_ids = np.concatenate([best_anchor, threshold_anchor])
+        _scatter_true_boxes(y_true, true_boxes, image_index, box_ids, anchor_ids,
+                            anchor_mask, grid_shapes, label_smooth, label_smooth_factor)
 
     # pad_gt_boxes for avoiding dynamic shape
-    pad_gt_box0 = np.zeros(shape=[max_boxes, 4], dtype=np.float32)
-    pad_gt_box1 = np.zeros(shape=[max_boxes, 4], dtype=np.float32)
-    pad_gt_box2 = np.zeros(shape=[max_boxes, 4], dtype=np.float32)
-
-    mask0 = np.reshape(y_true[0][..., 4:5], [-1])
-    gt_box0 = np.reshape(y_true[0][..., 0:4], [-1, 4])
-    # gt_box [boxes, [x,y,w,h]]
-    gt_box0 = gt_box0[mask0 == 1]
-    # gt_box0: get all boxes which have object
-    if gt_box0.shape[0] < max_boxes:
-        pad_gt_box0[:gt_box0.shape[0]] = gt_box0
-    else:
-        pad_gt_box0 = gt_box0[:max_boxes]
-    # gt_box0.shape[0]: total number of boxes in gt_box0
-    # top N of pad_gt_box0 is real box, and after are pad by zero
-
-    mask1 = np.reshape(y_true[1][..., 4:5], [-1])
-    gt_box1 = np.reshape(y_true[1][..., 0:4], [-1, 4])
-    gt_box1 = gt_box1[mask1 == 1]
-    if gt_box1.shape[0] < max_boxes:
-        pad_gt_box1[:gt_box1.shape[0]] = gt_box1
-    else:
-        pad_gt_box1 = gt_box1[:max_boxes]
+    for y_true_l, pad_gt_box in zip(y_true, pad_gt_boxes):
+        y_true_l = y_true_l.reshape(batch_size, -1, 5 + num_classes)
+        # gt_box: get all boxes which have object, in the order of grid cells
+        batch_idx, cell_idx = np.nonzero(y_true_l[..., 4] == 1)
+        rank = np.arange(len(batch_idx)) - np.searchsorted(batch_idx, batch_idx)
+        keep = rank < max_boxes
+        # top N of pad_gt_box is real box, and after are pad by zero
+        pad_gt_box[batch_idx[keep], rank[keep]] = y_true_l[batch_idx[keep], cell_idx[keep], 0:4]
+
+    return y_true[0], y_true[1], y_true[2], pad_gt_boxes[0], pad_gt_boxes[1], pad_gt_boxes[2]
+
+
+def _scatter_true_boxes(y_true, true_boxes, image_index, box_ids, anchor_ids, anchor_mask, grid_shapes,
+                        label_smooth, label_smooth_factor):
+    """Write the (box, anchor) assignments into y_true, the last assignment of a cell wins."""
+    num_classes = y_true[0].shape[-1] - 5
+    for l, mask in enumerate(anchor_mask):
+        in_layer = np.isin(anchor_ids, mask)
+        t = box_ids[in_layer]
+        k = np.searchsorted(mask, anchor_ids[in_layer])
+        i = np.floor(true_boxes[t, 0].astype('float64') * grid_shapes[l][1]).astype('int32')  # grid_y
+        j = np.floor(true_boxes[t, 1].astype('float64') * grid_shapes[l][0]).astype('int32')  # grid_x
+        c = true_boxes[t, 4].astype('int32')
+
+        y_true_l = y_true[l].reshape(-1, 5 + num_classes)
+        cell = np.ravel_multi_index((image_index[t], j, i, k), y_true[l].shape[:4])
+        # index of the last assignment of each cell
+        _, last = np.unique(cell[::-1], return_index=True)
+        last = len(cell) - 1 - last
+        y_true_l[cell[last], 0:4] = true_boxes[t[last], 0:4]
+        y_true_l[cell[last], 4] = 1.
+
+        # lable-smooth
+        if label_smooth:
+            sigma = label_smooth_factor / (num_classes - 1)
+            y_true_l[cell[last], 5:] = sigma
+            y_true_l[cell[last], 5 + c[last]] = 1 - label_smooth_factor
+        else:
+            y_true_l[cell, 5 + c] = 1.
 
-    mask2 = np.reshape(y_true[2][..., 4:5], [-1])
-    gt_box2 = np.reshape(y_true[2][..., 0:4], [-1, 4])
 
-    gt_box2 = gt_box2[mask2 == 1]
-    if gt_box2.shape[0] < max_boxes:
-        pad_gt_box2[:gt_box2.shape[0]] = gt_box2
-    else:
-        pad_gt_box2 = gt_box2[:max_boxes]
-    return y_true[0], y_true[1], y_true[2], pad_gt_box0, pad_gt_box1, pad_gt_box2
+def _preprocess_true_boxes(true_boxes, anchors, in_shape, num_classes, max_boxes, label_smooth,
+                           label_smooth_factor=0.1, iou_threshold=0.213):
+    """
+    Introduction
+    ------------
+        对训练数据的ground truth box进行预处理
+    Parameters
+    ----------
+        true_boxes: ground truth box 形状为[boxes, 5], x_min, y_min, x_max, y_max, class_id
+    """
+    outputs = batch_preprocess_true_boxes([true_boxes], anchors, in_shape, num_classes, max_boxes, label_smooth,
+                                          label_smooth_factor=label_smooth_factor, iou_threshold=iou_threshold)
+    return tuple(output[0] for output in outputs)
 
 
 def _reshape_data(image, image_size):
@@ -536,13 +515,7 @@ class MultiScaleTrans:
         seed_key = self.seed_list[(epoch_num * self.resize_count_num + size_idx) % self.seed_num]
         ret_imgs = []
         ret_annos = []
-
-        bbox1 = []
-        bbox2 = []
-        bbox3 = []
-        gt1 = []
-        gt2 = []
-        gt3 = []
+        true_boxes = []
 
         if self.size_dict.get(seed_key, None) is None:
             random.seed(seed_key)
@@ -554,91 +527,23 @@ class MultiScaleTrans:
         for img, anno in zip(imgs, annos):
             img, anno = preprocess_fn(img, anno, self.config, input_size, self.device_num)
             ret_imgs.append(img.transpose(2, 0, 1).copy())
-            bbox_true_1, bbox_true_2, bbox_true_3, gt_box1, gt_box2, gt_box3 = \
-                _preprocess_true_boxes(true_boxes=anno, anchors=self.anchor_scales, in_shape=img.shape[0:2],
-                                       num_classes=self.num_classes, max_boxes=self.max_box,
-                                       label_smooth=self.label_smooth, label_smooth_factor=self.label_smooth_factor)
-            bbox1.append(bbox_true_1)
-            bbox2.append(bbox_true_2)
-            bbox3.append(bbox_true_3)
-            gt1.append(gt_box1)
-            gt2.append(gt_box2)
-            gt3.append(gt_box3)
+            true_boxes.append(anno)
             ret_annos.append(0)
-        return np.array(ret_imgs), np.array(ret_annos), np.array(bbox1), np.array(bbox2), np.array(bbox3), \
-               np.array(gt1), np.array(gt2), np.array(gt3)
-
-
-def thread_batch_preprocess_true_box(annos, config, input_shape, result_index, batch_bbox_true_1, batch_bbox_true_2,
-                                     batch_bbox_true_3, batch_gt_box1, batch_gt_box2, batch_gt_box3):
-    """Preprocess true box for multi-thread."""
-    i = 0
-    for anno in annos:
-        bbox_true_1, bbox_true_2, bbox_true_3, gt_box1, gt_box2, gt_box3 = \
-            _preprocess_true_boxes(true_boxes=anno, anchors=config.anchor_scales, in_shape=input_shape,
-                                   num_classes=config.num_classes, max_boxes=config.max_box,
-                                   label_smooth=config.label_smooth, label_smooth_factor=config.label_smooth_factor)
-        batch_bbox_true_1[result_index + i] = bbox_true_1
-        batch_bbox_true_2[result_index + i] = bbox_true_2
-        batch_bbox_true_3[result_index + i] = bbox_true_3
-        batch_gt_box1[result_index + i] = gt_box1
-        batch_gt_box2[result_index + i] = gt_box2
-        batch_gt_box3[result_index + i] = gt_box3
-        i = i + 1
+        bbox1, bbox2, bbox3, gt1, gt2, gt3 = \
+            batch_preprocess_true_boxes(annos=true_boxes, anchors=self.anchor_scales, in_shape=img.shape[0:2],
+                                        num_classes=self.num_classes, max_boxes=self.max_box,
+                                        label_smooth=self.label_smooth, label_smooth_factor=self.label_smooth_factor)
+        return np.array(ret_imgs), np.array(ret_annos), bbox1, bbox2, bbox3, gt1, gt2, gt3
 
 
 def batch_preprocess_true_box(annos, config, input_shape):
-    """Preprocess true box with multi-thread."""
-    batch_bbox_true_1 = []
-    batch_bbox_true_2 = []
-    batch_bbox_true_3 = []
-    batch_gt_box1 = []
-    batch_gt_box2 = []
-    batch_gt_box3 = []
-    threads = []
-
-    step = 4
-    for index in range(0, len(annos), step):
-        for _ in range(step):
-            batch_bbox_true_1.append(None)
-            batch_bbox_true_2.append(None)
-            batch_bbox_true_3.append(None)
-            batch_gt_box1.append(None)
-            batch_gt_box2.append(None)
-            batch_gt_box3.append(None)
-        step_anno = annos[index: index + step]
-        t = threading.Thread(target=thread_batch_preprocess_true_box,
-                             args=(step_anno, config, input_shape, index, batch_bbox_true_1, batch_bbox_true_2,
-                                   batch_bbox_true_3, batch_gt_box1, batch_gt_box2, batch_gt_box3))
-        t.start()
-        threads.append(t)
-
-    for t in threads:
-        t.join()
-
-    return np.array(batch_bbox_true_1), np.array(batch_bbox_true_2), np.array(batch_bbox_true_3), \
-           np.array(batch_gt_box1), np.array(batch_gt_box2), np.array(batch_gt_box3)
+    """Preprocess true boxes of a batch."""
+    return batch_preprocess_true_boxes(annos=annos, anchors=config.anchor_scales, in_shape=input_shape,
+                                       num_classes=config.num_classes, max_boxes=config.max_box,
+                                       label_smooth=config.label_smooth,
+                                       label_smooth_factor=config.label_smooth_factor)
 
 
 def batch_preprocess_true_box_single(annos, config, input_shape):
     """Preprocess true boxes."""
-    batch_bbox_true_1 = []
-    batch_bbox_true_2 = []
-    batch_bbox_true_3 = []
-    batch_gt_box1 = []
-    batch_gt_box2 = []
-    batch_gt_box3 = []
-    for anno in annos:
-        bbox_true_1, bbox_true_2, bbox_true_3, gt_box1, gt_box2, gt_box3 = \
-            _preprocess_true_boxes(true_boxes=anno, anchors=config.anchor_scales, in_shape=input_shape,
-                                   num_classes=config.num_classes, max_boxes=config.max_box,
-                                   label_smooth=config.label_smooth, label_smooth_factor=config.label_smooth_factor)
-        batch_bbox_true_1.append(bbox_true_1)
-        batch_bbox_true_2.append(bbox_true_2)
-        batch_bbox_true_3.append(bbox_true_3)
-        batch_gt_box1.append(gt_box1)
-        batch_gt_box2.append(gt_box2)
-        batch_gt_box3.append(gt_box3)
-
-    return np.array(batch_bbox_true_1), np.array(batch_bbox_true_2), np.array(batch_bbox_true_3), \
-           np.array(batch_gt_box1), np.array(batch_gt_box2), np.array(batch_gt_box3)
+    return batch_preprocess_true_box(annos, config, input_shape)
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+from scipy.fftpack import dct
+from python_speech_features.base import get_filterbanks
+from python_speech_features.sigproc import round_half_up
+
+
+def file_digest(path):
+    """sha1 of the file content."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class FeatureCache(object):
+    """Content addressed cache of feature arrays.
+
+    An array is keyed by the digests of its source files and the extraction
+    parameters, and saved as a .npy which is loaded memory-mapped.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(digests, **params):
+        sha1 = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8'))
+        for digest in digests:
+            sha1.update(digest.encode('utf-8'))
+        return sha1.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, '{}.npy'.format(key))
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def save(self, key, array):
+        path = self.path(key)
+        tmp_path = '{}.{}.tmp.npy'.format(path[:-4], os.getpid())
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode='r')
+
+
+def batch_mfcc(signals, samplerate, winlen, winstep, numcep, nfilt, nfft,
+               lowfreq=0, highfreq=None, preemph=0.97, ceplifter=22):
+    """python_speech_features.mfcc of a batch of signals with the same length.
+
+    :param signals: array of (batch, samples)
+    :return: array of (batch, frames, numcep)
+    """
+    signals = np.asarray(signals, dtype=np.float64)
+    highfreq = highfreq or samplerate / 2
+    signals = np.concatenate([signals[:, :1], signals[:, 1:] - preemph * signals[:, :-1]], axis=1)
+
+    slen = signals.shape[1]
+    frame_len = int(round_half_up(winlen * samplerate))
+    frame_step = int(round_half_up(winstep * samplerate))
+    if slen <= frame_len:
+        numframes = 1
+    else:
+        numframes = 1 + int(math.ceil((1.0 * slen - frame_len) / frame_step))
+    padlen = int((numframes - 1) * frame_step + frame_len)
+    signals = np.pad(signals, [(0, 0), (0, padlen - slen)], 'constant')
+    indices = np.arange(frame_len)[None, :] + np.arange(0, numframes * frame_step, frame_step)[:, None]
+    frames = signals[:, indices]
+
+    pspec = 1.0 / nfft * np.square(np.absolute(np.fft.rfft(frames, nfft)))
+    energy = np.sum(pspec, -1)
+    energy = np.where(energy == 0, np.finfo(float).eps, energy)
+    feat = np.dot(pspec, get_filterbanks(nfilt, nfft, samplerate, lowfreq, highfreq).T)
+    feat = np.where(feat == 0, np.finfo(float).eps, feat)
+
+    feat = dct(np.log(feat), type=2, axis=-1, norm='ortho')[..., :numcep]
+    if ceplifter > 0:
+        feat *= 1 + (ceplifter / 2.) * np.sin(np.pi * np.arange(numcep) / ceplifter)
+    feat[..., 0] = np.log(energy)
+    return feat
+
+
+def mfcc_params(args):
+    """mfcc parameters of the data config"""
+    return {
+        'samplerate': args.sample_rate,
+        'winlen': args.window_size_ms / 1000,
+        'winstep': args.window_stride_ms / 1000,
+        'numcep': args.dct_coefficient_count,
+        'nfilt': 40, 'nfft': 1024, 'lowfreq': 20, 'highfreq': 7000,
+    }
+
+
+class OnlineAugment(object):
+    """Mix background noise and time shift into a batch of clean wavs, then compute mfcc.
+
+    Each sample gets a random time shift in [-time_shift, time_shift), and with
+    `background_frequency` a random clip of a random background noise, scaled by
+    a volume in [0, background_volume).
+    """
+
+    def __init__(self, background_data, desired_samples, time_shift, background_frequency,
+                 background_volume, feature_params):
+        self.desired_samples = desired_samples
+        self.time_shift = time_shift
+        self.background_frequency = background_frequency
+        self.background_volume = background_volume
+        self.feature_params = feature_params
+        # concat the noises to gather clips of all samples at once
+        background_data = [np.asarray(noise, dtype=np.float32) for noise in background_data
+                           if len(noise) > desired_samples]
+        self.background = np.concatenate(background_data) if background_data else None
+        self.background_lens = np.array([len(noise) for noise in background_data])
+        self.background_starts = np.cumsum(self.background_lens) - self.background_lens
+
+    @classmethod
+    def from_dir(cls, feat_dir, args, desired_samples):
+        """build with the background noises saved by download_process_data.py and the data config"""
+        background = np.load(os.path.join(feat_dir, 'background_noise.npz'))
+        background_data = np.split(background['data'], np.cumsum(background['lens'])[:-1])
+        return cls(background_data, desired_samples, int((args.time_shift_ms * args.sample_rate) / 1000),
+                   args.background_frequency, args.background_volume, mfcc_params(args))
+
+    def __call__(self, wavs):
+        wavs = np.asarray(wavs, dtype=np.float32)
+        batch_size, samples = wavs.shape
+
+        if self.time_shift > 0:
+            shift = np.random.randint(-self.time_shift, self.time_shift, batch_size)
+            src = np.arange(samples)[None, :] - shift[:, None]
+            valid = (src >= 0) & (src < samples)
+            wavs = np.where(valid, np.take_along_axis(wavs, np.clip(src, 0, samples - 1), axis=1), 0.)
+
+        if self.background is not None:
+            noise_index = np.random.randint(len(self.background_lens), size=batch_size)
+            offset = (np.random.rand(batch_size) *
+                      (self.background_lens[noise_index] - samples)).astype(np.int64)
+            clip_index = (self.background_starts[noise_index] + offset)[:, None] + np.arange(samples)[None, :]
+            volume = np.where(np.random.rand(batch_size) < self.background_frequency,
+                              np.random.uniform(0, self.background_volume, batch_size), 0.)
+            wavs = np.clip(wavs + self.background[clip_index] * volume[:, None], -1.0, 1.0)
+
+        return batch_mfcc(wavs, **self.feature_params)
@@ -32,6 +32,14 @@ def data_config(parser):
     parser.add_argument('--window_stride_ms', type=float, default=20.0, help='How long each spectrogram timeslice is')
     parser.add_argument('--dct_coefficient_count', type=int, default=20,
                         help='How many bins to use for the MFCC fingerprint')
+    parser.add_argument('--num_workers', type=int, default=8, help='Number of processes to extract the features')
+    parser.add_argument('--feat_dtype', type=str, default='float32', choices=['float16', 'float32'],
+                        help='dtype to save the features and wavs')
+    parser.add_argument('--online_augment', type=int, default=0,
+                        help='Save the clean training wavs, and mix the background noise and time shift into '
+                             'each batch while training')
+    parser.add_argument('--cache_dir', type=str, default='',
+                        help='Where to cache the extracted features, feat_dir/cache if empty')
 
 
 def train_config(parser):
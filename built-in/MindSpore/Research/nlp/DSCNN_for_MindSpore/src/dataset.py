@@ -6,7 +6,7 @@ import mindspore.dataset as de
 class npyDataset(object):
     def __init__(self, data_dir, data_type, h, w):
         super(npyDataset, self).__init__()
-        self.data = np.load(os.path.join(data_dir, '{}_data.npy'.format(data_type)))
+        self.data = np.load(os.path.join(data_dir, '{}_data.npy'.format(data_type)), mmap_mode='r')
         self.data = np.reshape(self.data, (-1, 1, h, w))
         self.label = np.load(os.path.join(data_dir, '{}_label.npy'.format(data_type)))
 
@@ -20,11 +20,39 @@ class npyDataset(object):
         return data.astype(np.float32), label.astype(np.int32)
 
 
-def audio_dataset(data_dir, data_type, h, w, batch_size):
+class OnlineAugmentDataset(object):
+    """Batches of the clean wavs, augmented and turned into features when loaded."""
+    def __init__(self, data_dir, data_type, h, w, batch_size, augment, shuffle=True):
+        super(OnlineAugmentDataset, self).__init__()
+        self.wav = np.load(os.path.join(data_dir, '{}_wav.npy'.format(data_type)), mmap_mode='r')
+        self.label = np.load(os.path.join(data_dir, '{}_label.npy'.format(data_type)))
+        self.h, self.w = h, w
+        self.batch_size = batch_size
+        self.augment = augment
+        self.shuffle = shuffle
+        self.order = np.arange(len(self.label))
+
+    def __len__(self):
+        return (len(self.label) + self.batch_size - 1) // self.batch_size
+
+    def __getitem__(self, item):
+        if item == 0 and self.shuffle:
+            np.random.shuffle(self.order)
+        # sorted indices read the memmap sequentially
+        index = np.sort(self.order[item * self.batch_size: (item + 1) * self.batch_size])
+        data = self.augment(self.wav[index])
+        return np.reshape(data, (-1, 1, self.h, self.w)).astype(np.float32), self.label[index].astype(np.int32)
+
+
+def audio_dataset(data_dir, data_type, h, w, batch_size, augment=None):
     if 'testing' in data_dir:
         shuffle = False
     else:
         shuffle = True
+    if augment is not None:
+        # batched by the dataset itself, so that a whole batch is augmented at once
+        dataset = OnlineAugmentDataset(data_dir, data_type, h, w, batch_size, augment, shuffle=shuffle)
+        return de.GeneratorDataset(dataset, ["feats", "labels"], shuffle=False)
     dataset = npyDataset(data_dir, data_type, h, w)
     de_dataset = de.GeneratorDataset(dataset, ["feats", "labels"], shuffle=shuffle)
     de_dataset = de_dataset.batch(batch_size, drop_remainder=False)
@@ -3,9 +3,11 @@ import math
 import os.path
 import random
 import re
+import shutil
 import sys
 import tarfile
 from glob import glob
+from multiprocessing import Pool
 from six.moves import urllib
 import argparse
 
@@ -17,6 +19,7 @@ from tqdm import tqdm
 import logging
 from src.config import train_config, prepare_model_settings
 from src.utils import prepare_words_list
+from src.audio_features import FeatureCache, file_digest, mfcc_params
 
 FLAGS = None
 MAX_NUM_WAVS_PER_CLASS = 2 ** 27 - 1  # ~134M
@@ -44,6 +47,39 @@ def which_set(filename, validation_percentage, testing_percentage):
         result = 'training'
     return result
 
+
+def prepare_single_sample(task):
+    wav_filename, foreground_volume, time_shift_padding, time_shift_offset, desired_samples, \
+        background_data, background_volume, feature_params = task
+    wav_data, _ = sf.read(wav_filename)
+    if len(wav_data) < desired_samples:
+        wav_data = np.pad(wav_data, [0, desired_samples - len(wav_data)], 'constant')
+    scaled_foreground = wav_data * foreground_volume
+    padded_foreground = np.pad(scaled_foreground, time_shift_padding, 'constant')
+    sliced_foreground = padded_foreground[time_shift_offset: time_shift_offset + desired_samples]
+    background_add = background_data[0] * background_volume + sliced_foreground
+    background_clamp = np.clip(background_add, -1.0, 1.0)
+    feature = mfcc(background_clamp, **feature_params).flatten()
+    return feature
+
+
+def load_clean_wav(task):
+    wav_filename, foreground_volume, desired_samples = task
+    wav_data, _ = sf.read(wav_filename)
+    if len(wav_data) < desired_samples:
+        wav_data = np.pad(wav_data, [0, desired_samples - len(wav_data)], 'constant')
+    return wav_data[:desired_samples] * foreground_volume
+
+
+def link_or_copy(src, dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
 class AudioProcessor(object):
     """Handles loading, partitioning, and preparing audio training data."""
 
@@ -164,38 +200,28 @@ class AudioProcessor(object):
             if not self.background_data:
                 raise Exception('No background wav files were found in ' + search_path)
 
-    def prepare_single_sample(self, wav_filename, foreground_volume, time_shift_padding, time_shift_offset,
-                              desired_samples, background_data, background_volume):
-        wav_data, _ = sf.read(wav_filename)
-        if len(wav_data) < desired_samples:
-            wav_data = np.pad(wav_data, [0, desired_samples - len(wav_data)], 'constant')
-        scaled_foreground = wav_data * foreground_volume
-        padded_foreground = np.pad(scaled_foreground, time_shift_padding, 'constant')
-        sliced_foreground = padded_foreground[time_shift_offset: time_shift_offset + desired_samples]
-        background_add = background_data[0] * background_volume + sliced_foreground
-        background_clamp = np.clip(background_add, -1.0, 1.0)
-        # feature = mfcc(background_clamp, samplerate=FLAGS.sample_rate, winlen=0.03, winstep=0.01, numcep=40, nfilt=40).flatten()
-        feature = mfcc(background_clamp, samplerate=FLAGS.sample_rate, winlen=FLAGS.window_size_ms / 1000,
-                       winstep=FLAGS.window_stride_ms / 1000,
-                       numcep=FLAGS.dct_coefficient_count, nfilt=40, nfft=1024, lowfreq=20, highfreq=7000).flatten()
-        return feature
-
     def prepare_data(self, model_settings):
+        if not os.path.exists(FLAGS.feat_dir):
+            os.makedirs(FLAGS.feat_dir, exist_ok=True)
+        if FLAGS.online_augment:
+            self.prepare_online_data(model_settings)
+            return
         # Pick one of the partitions to choose samples from.
         time_shift = int((FLAGS.time_shift_ms * FLAGS.sample_rate) / 1000)
         background_frequency = FLAGS.background_frequency
         background_volume_range = FLAGS.background_volume
         desired_samples = model_settings['desired_samples']
-        if not os.path.exists(FLAGS.feat_dir):
-            os.makedirs(FLAGS.feat_dir, exist_ok=True)
+        feature_params = mfcc_params(FLAGS)
+        pool = Pool(FLAGS.num_workers)
         for mode in ['training', 'validation', 'testing']:
             candidates = self.data_index[mode]
             sample_count = len(candidates)
             # Data and labels will be populated and returned.
-            data = np.zeros((sample_count, model_settings['fingerprint_size']))
+            data = np.zeros((sample_count, model_settings['fingerprint_size']), dtype=FLAGS.feat_dtype)
             labels = np.zeros(sample_count)
             use_background = self.background_data and (mode == 'training')
-            for i in tqdm(range(sample_count)):
+            tasks = []
+            for i in range(sample_count):
                 # Pick which audio sample to use.
                 sample_index = i
                 sample = candidates[sample_index]
@@ -229,13 +255,67 @@ class AudioProcessor(object):
                     foreground_volume = 0
                 else:
                     foreground_volume = 1
-                data[i, :] = self.prepare_single_sample(sample['file'], foreground_volume, time_shift_padding,
-                                                        time_shift_offset, desired_samples,
-                                                        background_reshaped, background_volume)
+                # only the first row of the background is mixed in
+                tasks.append((sample['file'], foreground_volume, time_shift_padding, time_shift_offset,
+                              desired_samples, background_reshaped[:1], background_volume, feature_params))
                 label_index = self.word_to_index[sample['label']]
                 labels[i] = label_index
+            features = pool.imap(prepare_single_sample, tasks, chunksize=64)
+            for i, feature in enumerate(tqdm(features, total=sample_count)):
+                data[i, :] = feature
             np.save(os.path.join(FLAGS.feat_dir, '{}_data.npy'.format(mode)), data)
             np.save(os.path.join(FLAGS.feat_dir, '{}_label.npy'.format(mode)), labels)
+        pool.close()
+        pool.join()
+
+    def prepare_online_data(self, model_settings):
+        """
+        Save the clean wavs of the training set, which are augmented per batch while training,
+        and the clean features of the validation and testing sets. Both are kept in a content
+        addressed cache, and not extracted again for the same wavs and parameters.
+        """
+        desired_samples = model_settings['desired_samples']
+        feature_params = mfcc_params(FLAGS)
+        cache = FeatureCache(FLAGS.cache_dir or os.path.join(FLAGS.feat_dir, 'cache'))
+        pool = Pool(FLAGS.num_workers)
+        for mode in ['training', 'validation', 'testing']:
+            candidates = self.data_index[mode]
+            sample_count = len(candidates)
+            files = [sample['file'] for sample in candidates]
+            volumes = [0 if sample['label'] == SILENCE_LABEL else 1 for sample in candidates]
+            labels = np.array([self.word_to_index[sample['label']] for sample in candidates], dtype=np.float64)
+            digests = ['{}:{}'.format(digest, volume)
+                       for digest, volume in zip(pool.map(file_digest, files, chunksize=64), volumes)]
+
+            if mode == 'training':
+                name = '{}_wav.npy'.format(mode)
+                key = cache.key(digests, kind='wav', desired_samples=desired_samples, dtype=FLAGS.feat_dtype)
+                if cache.load(key) is None:
+                    data = np.zeros((sample_count, desired_samples), dtype=FLAGS.feat_dtype)
+                    tasks = [(f, volume, desired_samples) for f, volume in zip(files, volumes)]
+                    for i, wav in enumerate(tqdm(pool.imap(load_clean_wav, tasks, chunksize=64), total=sample_count)):
+                        data[i, :] = wav
+                    cache.save(key, data)
+            else:
+                name = '{}_data.npy'.format(mode)
+                key = cache.key(digests, kind='mfcc', dtype=FLAGS.feat_dtype, **feature_params)
+                if cache.load(key) is None:
+                    data = np.zeros((sample_count, model_settings['fingerprint_size']), dtype=FLAGS.feat_dtype)
+                    tasks = [(f, volume, [[0, 0]], 0, desired_samples, np.zeros(1), 0, feature_params)
+                             for f, volume in zip(files, volumes)]
+                    features = pool.imap(prepare_single_sample, tasks, chunksize=64)
+                    for i, feature in enumerate(tqdm(features, total=sample_count)):
+                        data[i, :] = feature
+                    cache.save(key, data)
+            link_or_copy(cache.path(key), os.path.join(FLAGS.feat_dir, name))
+            np.save(os.path.join(FLAGS.feat_dir, '{}_label.npy'.format(mode)), labels)
+        pool.close()
+        pool.join()
+
+        background_data = [np.asarray(noise, dtype=np.float32) for noise in self.background_data]
+        np.savez(os.path.join(FLAGS.feat_dir, 'background_noise.npz'),
+                 data=np.concatenate(background_data) if background_data else np.zeros(0, dtype=np.float32),
+                 lens=np.array([len(noise) for noise in background_data], dtype=np.int64))
 
 
 if __name__ == '__main__':
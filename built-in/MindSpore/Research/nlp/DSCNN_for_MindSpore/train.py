@@ -13,6 +13,7 @@ from mindspore.train.serialization import load_checkpoint
 from src.config import train_config
 from src.log import get_logger
 from src.dataset import audio_dataset
+from src.audio_features import OnlineAugment
 from src.ds_cnn import ds_cnn
 from src.loss import CrossEntropy
 from src.lr_scheduler import MultiStepLR, CosineAnnealingLR
@@ -77,8 +78,11 @@ def train():
     args.logger = get_logger(args.outputs_dir)
 
     # Dataloader: train, val
+    augment = None
+    if args.online_augment:
+        augment = OnlineAugment.from_dir(args.feat_dir, args, model_settings['desired_samples'])
     train_dataset = audio_dataset(args.feat_dir, 'training', model_settings['spectrogram_length'],
-                                    model_settings['dct_coefficient_count'], args.per_batch_size)
+                                    model_settings['dct_coefficient_count'], args.per_batch_size, augment)
     args.steps_per_epoch = train_dataset.get_dataset_size()
     val_dataset = audio_dataset(args.feat_dir, 'validation', model_settings['spectrogram_length'],
                               model_settings['dct_coefficient_count'], args.per_batch_size)
@@ -18,7 +18,9 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import multiprocessing
 import random
+import time
 
 from absl import app
 from absl import flags
@@ -70,6 +72,19 @@ flags.DEFINE_float(
     "Probability of creating sequences which are shorter than the "
     "maximum length.")
 
+flags.DEFINE_integer(
+    "num_workers", 0,
+    "If > 0, streaming mode: each input file is a shard, processed by one of "
+    "`num_workers` processes into its own output file "
+    "`output_file-<shard>-of-<shards>`, with the random seed "
+    "`random_seed + shard`. Only one shard at a time is in the memory of a "
+    "worker, random next sentences are taken from the same shard.")
+
+flags.DEFINE_integer(
+    "shuffle_buffer_size", 10000,
+    "Streaming mode shuffles the instances of a shard within a buffer of "
+    "this size.")
+
 
 class TrainingInstance(object):
   """A single training instance (sentence pair)."""
@@ -172,6 +187,7 @@ def write_instance_to_example_files(instances, tokenizer, max_seq_length,
     writer.close()
 
   logging.info("Wrote %d total instances", total_written)
+  return total_written
 
 
 def create_int_feature(values):
@@ -235,6 +251,108 @@ def create_training_instances(input_files,
   return instances
 
 
+def read_documents(input_file, tokenizer):
+  """Reads the documents of one input file, see `create_training_instances`."""
+  all_documents = [[]]
+  with tf.io.gfile.GFile(input_file, "rb") as reader:
+    while True:
+      line = tokenization.convert_to_unicode(reader.readline())
+      if not line:
+        break
+      line = line.strip()
+
+      # Empty lines are used as document delimiters
+      if not line:
+        all_documents.append([])
+      tokens = tokenizer.tokenize(line)
+      if tokens:
+        all_documents[-1].append(tokens)
+
+  # Remove empty documents
+  return [x for x in all_documents if x]
+
+
+def shuffle_instances(instances, buffer_size, rng):
+  """Shuffles a stream of instances within a buffer of `buffer_size`."""
+  buffer = []
+  for instance in instances:
+    if len(buffer) < buffer_size:
+      buffer.append(instance)
+      continue
+    index = rng.randint(0, buffer_size - 1)
+    yield buffer[index]
+    buffer[index] = instance
+  rng.shuffle(buffer)
+  for instance in buffer:
+    yield instance
+
+
+_shard_config = {}
+
+
+def _init_shard_worker(config):
+  _shard_config.update(config)
+  _shard_config["tokenizer"] = tokenization.FullTokenizer(
+      vocab_file=config["vocab_file"], do_lower_case=config["do_lower_case"])
+
+
+def create_shard(shard):
+  """Writes the `TrainingInstance`s of one input file to its output file."""
+  shard_index, input_file, output_file = shard
+  config = _shard_config
+  tokenizer = config["tokenizer"]
+  start = time.time()
+
+  rng = random.Random(config["random_seed"] + shard_index)
+  all_documents = read_documents(input_file, tokenizer)
+  rng.shuffle(all_documents)
+
+  vocab_words = list(tokenizer.vocab.keys())
+
+  def _instances():
+    for _ in range(config["dupe_factor"]):
+      for document_index in range(len(all_documents)):
+        for instance in create_instances_from_document(
+            all_documents, document_index, config["max_seq_length"],
+            config["short_seq_prob"], config["masked_lm_prob"],
+            config["max_predictions_per_seq"], vocab_words, rng,
+            config["do_whole_word_mask"]):
+          yield instance
+
+  instances = shuffle_instances(_instances(), config["shuffle_buffer_size"],
+                                rng)
+  total_written = write_instance_to_example_files(
+      instances, tokenizer, config["max_seq_length"],
+      config["max_predictions_per_seq"], [output_file],
+      config["gzip_compress"])
+  return output_file, total_written, time.time() - start
+
+
+def create_shards(input_files, output_prefix, num_workers, config):
+  """Streaming mode, one output file per input file by a pool of workers."""
+  num_shards = len(input_files)
+  shards = [(shard_index, input_file,
+             "%s-%05d-of-%05d" % (output_prefix, shard_index, num_shards))
+            for shard_index, input_file in enumerate(input_files)]
+
+  start = time.time()
+  total_written = 0
+  pool = multiprocessing.Pool(num_workers, _init_shard_worker, (config,))
+  for output_file, num_written, seconds in pool.imap_unordered(
+      create_shard, shards):
+    total_written += num_written
+    logging.info("Wrote %d instances to %s in %.1fs, %.1f instances/s",
+                 num_written, output_file, seconds,
+                 num_written / max(seconds, 1e-6))
+  pool.close()
+  pool.join()
+
+  seconds = time.time() - start
+  logging.info("Wrote %d total instances of %d shards in %.1fs, "
+               "%.1f instances/s", total_written, num_shards, seconds,
+               total_written / max(seconds, 1e-6))
+
+
 def create_instances_from_document(
     all_documents, document_index, max_seq_length, short_seq_prob,
     masked_lm_prob, max_predictions_per_seq, vocab_words, rng,
@@ -463,6 +581,24 @@ def main(_):
   for input_file in input_files:
     logging.info("  %s", input_file)
 
+  if FLAGS.num_workers > 0:
+    config = {
+        "vocab_file": FLAGS.vocab_file,
+        "do_lower_case": FLAGS.do_lower_case,
+        "do_whole_word_mask": FLAGS.do_whole_word_mask,
+        "gzip_compress": FLAGS.gzip_compress,
+        "max_seq_length": FLAGS.max_seq_length,
+        "dupe_factor": FLAGS.dupe_factor,
+        "short_seq_prob": FLAGS.short_seq_prob,
+        "masked_lm_prob": FLAGS.masked_lm_prob,
+        "max_predictions_per_seq": FLAGS.max_predictions_per_seq,
+        "random_seed": FLAGS.random_seed,
+        "shuffle_buffer_size": FLAGS.shuffle_buffer_size,
+    }
+    create_shards(input_files, FLAGS.output_file.split(",")[0],
+                  FLAGS.num_workers, config)
+    return
+
   rng = random.Random(FLAGS.random_seed)
   instances = create_training_instances(
       input_files, tokenizer, FLAGS.max_seq_length, FLAGS.dupe_factor,
@@ -0,0 +1,152 @@
+# -*- coding:utf-8 -*-
+"""Benchmark the CPU time of a CARS generation evaluated per individual and with shared batches.
+
+The valid set is images of 32x32 decoded from PNG and padded and cropped in each
+load, and the super network is a small conv net of mixed ops weighted by alpha,
+trained for a few steps so that the individuals differ. The per individual loop
+is the previous `search_infer_step` of each individual.
+
+Usage:
+    python3 ./cars_population_perf.py [--population 8] [--images 1024] [--batch_size 128] [--subset 256]
+        [--confidence 2] [--channels 8]
+"""
+import argparse
+import io
+import time
+import numpy as np
+import torch
+import torch.utils.data as torch_data
+from PIL import Image
+from vega.algorithms.nas.cars.population_evaluator import PopulationEvaluator, subset_loader
+
+
+class PngDataset(torch_data.Dataset):
+    """PNG images of 10 classes, decoded, padded and cropped in each load."""
+
+    def __init__(self, size, seed=0):
+        rng = np.random.RandomState(seed)
+        self.targets = rng.randint(0, 10, size).tolist()
+        self.images = []
+        for target in self.targets:
+            image = (rng.rand(32, 32, 3) * 64 + target * 19).astype(np.uint8)
+            buffer = io.BytesIO()
+            Image.fromarray(image).save(buffer, format='PNG')
+            self.images.append(buffer.getvalue())
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, index):
+        image = np.asarray(Image.open(io.BytesIO(self.images[index])).convert('RGB'), dtype=np.float32)
+        image = np.pad(image, ((4, 4), (4, 4), (0, 0)), mode='reflect')[4:36, 4:36]
+        image = (image / 255. - 0.5) / 0.25
+        return torch.from_numpy(image.transpose(2, 0, 1).copy()), self.targets[index]
+
+
+class MixedNet(torch.nn.Module):
+    """Conv net of 3 mixed layers, each the sum of 4 ops weighted by 4 values of alpha."""
+
+    def __init__(self, channels=16):
+        super(MixedNet, self).__init__()
+        self.stem = torch.nn.Conv2d(3, channels, 3, padding=1)
+        self.layers = torch.nn.ModuleList([torch.nn.ModuleList([
+            torch.nn.Conv2d(channels, channels, 3, padding=1),
+            torch.nn.Conv2d(channels, channels, 5, padding=2),
+            torch.nn.Conv2d(channels, channels, 1),
+            torch.nn.AvgPool2d(3, stride=1, padding=1),
+        ]) for _ in range(3)])
+        self.classifier = torch.nn.Linear(channels, 10)
+
+    def forward(self, input, alpha):
+        x = self.stem(input)
+        for i, ops in enumerate(self.layers):
+            x = torch.relu(sum(weight * op(x) for weight, op in zip(alpha[4 * i:4 * i + 4], ops)))
+        return self.classifier(x.mean(dim=(2, 3)))
+
+
+class TopOne(object):
+    """Top-1 accuracy."""
+
+    def __init__(self):
+        self.correct = 0
+        self.total = 0
+
+    def __call__(self, output, target):
+        self.correct += (output.argmax(dim=1) == target).sum().item()
+        self.total += target.size(0)
+
+    @property
+    def accuracy(self):
+        return self.correct / self.total
+
+
+def per_individual(model, loader, alphas):
+    """Accuracy of each individual on its own pass of the loader."""
+    results = []
+    model.eval()
+    with torch.no_grad():
+        for alpha in alphas:
+            metrics = TopOne()
+            for input, target in loader:
+                metrics(model(input, torch.from_numpy(alpha)), target)
+            results.append(metrics.accuracy)
+    return results
+
+
+def pretrain(model, dataset, steps, batch_size=64):
+    """Train the super network with a random alpha in each step."""
+    optimizer = torch.optim.Adam(model.parameters(), lr=3e-3)
+    loader = torch_data.DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    model.train()
+    step = 0
+    while step < steps:
+        for input, target in loader:
+            optimizer.zero_grad()
+            loss = torch.nn.functional.cross_entropy(model(input, torch.rand(12)), target)
+            loss.backward()
+            optimizer.step()
+            step += 1
+            if step == steps:
+                break
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="CARS population evaluation benchmark.")
+    parser.add_argument('--population', type=int, default=8)
+    parser.add_argument('--images', type=int, default=1024)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--subset', type=int, default=256)
+    parser.add_argument('--confidence', type=float, default=2.)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--channels', type=int, default=8)
+    parser.add_argument('--train_steps', type=int, default=100)
+    args = parser.parse_args()
+    torch.manual_seed(0)
+    model = MixedNet(args.channels)
+    dataset = PngDataset(args.images)
+    pretrain(model, dataset, args.train_steps)
+    loader = torch_data.DataLoader(dataset, batch_size=args.batch_size, num_workers=args.workers)
+    alphas = np.random.RandomState(1).rand(args.population, 12).astype(np.float32)
+    load_seconds, _ = _timed(lambda: [batch for batch in loader])
+    print("generation of {} individuals, {} images, {:.3f}s to load the images once".format(
+        args.population, args.images, load_seconds))
+    seconds, expected = _timed(lambda: per_individual(model, loader, alphas))
+    print("{:>16} {:>12} {:>16} {:>10}".format("method", "seconds", "max_fitness_diff", "samples"))
+    print("{:>16} {:>12.3f} {:>16} {:>10}".format("per_individual", seconds, "-", args.images * args.population))
+    rows = [
+        ("shared_batch", loader, 0.),
+        ("shared_prune", loader, args.confidence),
+        ("subset", subset_loader(loader, args.subset), 0.),
+    ]
+    for name, rows_loader, confidence in rows:
+        evaluator = PopulationEvaluator(model, rows_loader, TopOne, keep=args.population // 2,
+                                        prune_confidence=confidence, min_samples=args.batch_size)
+        seconds, (metrics, samples) = _timed(lambda: evaluator.evaluate(alphas))
+        diff = np.max(np.abs(np.array([m.accuracy for m in metrics]) - expected))
+        print("{:>16} {:>12.3f} {:>16.6f} {:>10}".format(name, seconds, diff, samples.sum()))
@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+"""Benchmark the epoch wall time with synchronous and asynchronous checkpoints.
+
+A CPU MLP is trained for a few epochs and checkpointed after each epoch by the
+`ModelCheckpoint` callback of the trainer, with the model pickle, the optimizer
+and the lr scheduler, once writing on the training thread and once on the
+background writer of `vega.core.trainer.checkpoint_engine.CheckpointEngine`.
+
+Usage:
+    python3 ./checkpoint_perf.py [--width 2048] [--depth 8] [--epochs 5] [--steps 20] [--keep 0]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+os.environ['BACKEND_TYPE'] = 'PYTORCH'
+import torch  # noqa: E402
+from vega.core.trainer.callbacks import ModelCheckpoint  # noqa: E402
+
+
+class BenchConfig(object):
+    """Checkpoint options of the trainer config."""
+
+    def __init__(self, async_checkpoint, keep_checkpoints):
+        self.async_checkpoint = async_checkpoint
+        self.keep_checkpoints = keep_checkpoints
+
+
+class BenchTrainer(object):
+    """The trainer attributes used by ModelCheckpoint, with an MLP trained by Adam."""
+
+    def __init__(self, folder, args, async_write):
+        self.folder = folder
+        self.config = BenchConfig(async_write, args.keep)
+        self.model = torch.nn.Sequential(*[torch.nn.Linear(args.width, args.width) for _ in range(args.depth)])
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=1e-3)
+        self.lr_scheduler = torch.optim.lr_scheduler.StepLR(self.optimizer, step_size=10)
+        self.checkpoint_file_name = 'checkpoint.pth'
+        self.model_pickle_file_name = 'model.pkl'
+        self.weights_file = os.path.join(folder, 'model_0.pth')
+
+    def get_local_worker_path(self):
+        return self.folder
+
+    def train_step(self, x):
+        self.optimizer.zero_grad()
+        loss = (self.model(x) - x).pow(2).mean()
+        loss.backward()
+        self.optimizer.step()
+
+
+def run(async_write, args):
+    """Mean and max epoch seconds, the seconds of after_train which flushes the writes, and engine stats."""
+    folder = tempfile.mkdtemp()
+    trainer = BenchTrainer(folder, args, async_write)
+    x = torch.from_numpy(np.random.RandomState(1).randn(args.batch_size, args.width).astype(np.float32))
+    callback = ModelCheckpoint()
+    callback.set_trainer(trainer)
+    callback.set_params({'is_chief': True})
+    logs = {'summary_perfs': {'best_valid_perfs_changed': True}}
+    epoch_times = []
+    try:
+        callback.before_train()
+        for epoch in range(args.epochs):
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                trainer.train_step(x)
+            trainer.lr_scheduler.step()
+            callback.after_epoch(epoch, logs)
+            epoch_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        callback.after_train()
+        flush = time.perf_counter() - start
+    finally:
+        shutil.rmtree(folder)
+    return np.mean(epoch_times), np.max(epoch_times), flush, callback.engine.stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ModelCheckpoint benchmark.")
+    parser.add_argument('--width', type=int, default=2048)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--batch_size', type=int, default=64)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--keep', type=int, default=0)
+    args = parser.parse_args()
+    print("model: torch MLP, {} x {} x {}".format(args.depth, args.width, args.width))
+    print("{:>6} {:>14} {:>13} {:>10} {:>12} {:>10}".format(
+        "mode", "mean_epoch(s)", "max_epoch(s)", "flush(s)", "blocked(s)", "write(s)"))
+    for async_write in (False, True):
+        mean, worst, flush, stats = run(async_write, args)
+        print("{:>6} {:>14.4f} {:>13.4f} {:>10.4f} {:>12.4f} {:>10.4f}".format(
+            "async" if async_write else "sync", mean, worst, flush, stats['blocked_time'], stats['write_time']))
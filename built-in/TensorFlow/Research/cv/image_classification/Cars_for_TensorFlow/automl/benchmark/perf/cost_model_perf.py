@@ -0,0 +1,89 @@
+# -*- coding:utf-8 -*-
+"""Benchmark the candidates per second of the model size of CARS individuals.
+
+The candidates are random genotypes of the CARS child network of cifar10. The
+current path instantiates each network for its parameters, or runs thop for its
+FLOPs, and the cost model computes both from the desc with a new table, or with
+the table saved by a previous run.
+
+Usage:
+    python3 ./cost_model_perf.py [--candidates 200] [--init_channels 16]
+"""
+import argparse
+import copy
+import os
+import random
+import tempfile
+import time
+import torch
+from vega.core.common import Config
+from vega.core.metrics import CostModel, calc_model_flops_params
+from vega.search_space.networks.pytorch import CARSDartsNetwork, DartsNetwork
+from vega.algorithms.nas.cars.utils import eval_model_parameters
+
+OPS = ['max_pool_3x3', 'avg_pool_3x3', 'skip_connect', 'sep_conv_3x3', 'sep_conv_5x5', 'dil_conv_3x3', 'dil_conv_5x5']
+
+
+def child_desc(rng, init_channels):
+    """Desc of a random child network of the CARS super network."""
+    desc = {'name': 'CARSDartsNetwork', 'input_size': 32, 'init_channels': init_channels, 'num_classes': 10,
+            'auxiliary': False, 'search': False,
+            'network': ['PreOneStem', 'normal', 'normal', 'reduce', 'normal', 'normal', 'reduce', 'normal', 'normal']}
+    for name in ('normal', 'reduce'):
+        genotype = [[rng.choice(OPS), node, index] for node in range(2, 6) for index in rng.sample(range(node), 2)]
+        desc[name] = {'type': 'block', 'name': 'Cell', 'steps': 4, 'reduction': name == 'reduce',
+                      'genotype': genotype, 'concat': [2, 3, 4, 5]}
+    return desc
+
+
+def network_params(desc):
+    """Parameters in million of an instantiated network, the current path of CARS."""
+    return None, eval_model_parameters(CARSDartsNetwork(Config(copy.deepcopy(desc))))
+
+
+def network_flops(desc):
+    """FLOPs and parameters in million of an instantiated network with thop, the forward takes no alpha."""
+    model = DartsNetwork(Config(copy.deepcopy(desc)))
+    flops, params = calc_model_flops_params(model, torch.zeros(1, 3, 32, 32))
+    return flops * 1e-6, params * 1e-6
+
+
+def cost_model_cost(cost_model, desc):
+    """FLOPs and parameters in million from the desc."""
+    flops, params = cost_model.estimate(desc)
+    return flops * 1e-6, params * 1e-6
+
+
+def _timed(func, descs):
+    start = time.perf_counter()
+    results = [func(desc) for desc in descs]
+    return len(descs) / (time.perf_counter() - start), results
+
+
+def _report(name, func, descs, expected):
+    speed, results = _timed(func, descs)
+    flops_diff = "-" if results[0][0] is None else \
+        "{:.6f}".format(max(abs(result[0] - exp[0]) for result, exp in zip(results, expected)))
+    params_diff = "{:.6f}".format(max(abs(result[1] - exp[1]) for result, exp in zip(results, expected)))
+    print("{:>16} {:>14.1f} {:>16} {:>16}".format(name, speed, flops_diff, params_diff))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cost model benchmark.")
+    parser.add_argument('--candidates', type=int, default=200)
+    parser.add_argument('--init_channels', type=int, default=16)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    descs = [child_desc(rng, args.init_channels) for _ in range(args.candidates)]
+    table_file = os.path.join(tempfile.mkdtemp(), 'cost_table.json')
+    print("{} candidates of {} init channels".format(args.candidates, args.init_channels))
+    print("{:>16} {:>14} {:>16} {:>16}".format("method", "candidates/s", "max_mflops_diff", "max_mparams_diff"))
+    speed, expected = _timed(network_flops, descs)
+    print("{:>16} {:>14.1f} {:>16} {:>16}".format("thop", speed, "-", "-"))
+    _report("instantiate", network_params, descs, expected)
+    cold = CostModel(table_file)
+    _report("cost_model_cold", lambda desc: cost_model_cost(cold, desc), descs, expected)
+    cold.save()
+    warm = CostModel(table_file)
+    _report("cost_model_warm", lambda desc: cost_model_cost(warm, desc), descs, expected)
+    print("table of {} blocks, {} hits and {} misses when cold".format(len(warm.table), cold.hits, cold.misses))
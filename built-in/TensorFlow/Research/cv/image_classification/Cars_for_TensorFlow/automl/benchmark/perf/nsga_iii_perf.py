@@ -0,0 +1,94 @@
+# -*- coding:utf-8 -*-
+"""Benchmark NSGA-III non-dominated sorting and reference point association.
+
+Compare the vectorized functions of `vega.core.report.nsga_iii` with the
+previous pairwise loops, the loops are skipped above `--loop_max` points.
+
+Usage:
+    python3 ./nsga_iii_perf.py [--sizes 1000 10000 50000] [--nobj 3] [--loop_max 2000]
+"""
+import argparse
+import time
+import numpy as np
+from vega.core.report.nsga_iii import Dominates, NonDominatedSorting, AssociateToReferencePoint, \
+    GenerateReferencePoint
+
+
+def loop_non_dominated_sorting(pop):
+    """Pairwise loop non-dominated sorting, the previous implementation."""
+    _, npop = pop.shape
+    dominated_count = np.zeros(npop)
+    dominated_set = [[] for _ in range(npop)]
+    fronts = [[]]
+    for i in range(npop):
+        for j in range(i + 1, npop):
+            if Dominates(pop[:, i], pop[:, j]):
+                dominated_set[i].append(j)
+                dominated_count[j] += 1
+            if Dominates(pop[:, j], pop[:, i]):
+                dominated_set[j].append(i)
+                dominated_count[i] += 1
+        if dominated_count[i] == 0:
+            fronts[0].append(i)
+    k = 0
+    while True:
+        next_front = []
+        for i in fronts[k]:
+            for j in dominated_set[i]:
+                dominated_count[j] -= 1
+                if dominated_count[j] == 0:
+                    next_front.append(j)
+        if not next_front:
+            break
+        fronts.append(next_front)
+        k += 1
+    return fronts
+
+
+def loop_associate_to_reference_point(pop_norm):
+    """Per point and per reference point loop association, the previous implementation."""
+    nzr = 10
+    _, npop = pop_norm.shape
+    zr = GenerateReferencePoint(pop_norm.shape[0], nzr)
+    rho = np.zeros(nzr)
+    d = np.zeros((npop, nzr))
+    pop_ref = np.zeros(npop)
+    pop_dis = np.zeros(npop)
+    for i in range(npop):
+        for j in range(nzr):
+            w = zr[:, j] / np.linalg.norm(zr[:, j]).reshape(-1, 1)
+            z = pop_norm[:, i].reshape(-1, 1)
+            d[i, j] = np.linalg.norm(z - w.transpose() * z * w)
+        pop_ref[i] = np.argmin(d[i])
+        pop_dis[i] = np.min(d[i])
+        rho[int(pop_ref[i])] += 1
+    return rho, pop_ref, pop_dis
+
+
+def _timeit(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="NSGA-III benchmark.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--nobj', type=int, default=3)
+    parser.add_argument('--loop_max', type=int, default=2000)
+    args = parser.parse_args()
+    rng = np.random.RandomState(0)
+    print("{:>8} {:>14} {:>14} {:>14} {:>14} {:>7}".format(
+        "points", "sort_loop(s)", "sort_vec(s)", "assoc_loop(s)", "assoc_vec(s)", "same"))
+    for size in args.sizes:
+        pop = rng.rand(args.nobj, size)
+        sort_vec, fronts = _timeit(NonDominatedSorting, pop)
+        assoc_vec, assoc = _timeit(AssociateToReferencePoint, pop)
+        sort_loop = assoc_loop = same = "-"
+        if size <= args.loop_max:
+            sort_loop, loop_fronts = _timeit(loop_non_dominated_sorting, pop)
+            assoc_loop, loop_assoc = _timeit(loop_associate_to_reference_point, pop)
+            same = fronts == loop_fronts and all(np.allclose(x, y) for x, y in zip(assoc, loop_assoc))
+            sort_loop, assoc_loop = "{:.4f}".format(sort_loop), "{:.4f}".format(assoc_loop)
+        print("{:>8} {:>14} {:>14.4f} {:>14} {:>14.4f} {:>7}".format(
+            size, sort_loop, sort_vec, assoc_loop, assoc_vec, str(same)))
@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+"""Benchmark propose and add_score of the ASHA sieve board at scale.
+
+Usage:
+    python3 ./sieve_board_perf.py [config counts, default 1000 10000 100000]
+"""
+import sys
+import math
+import random
+import time
+from vega.algorithms.hpo.common import SieveBoard
+from vega.algorithms.hpo.common.status_type import StatusType
+
+
+def run_asha_board(config_count, eta=3, rungs=4):
+    """Drive a board with the ASHA propose/add_score pattern, return seconds per propose."""
+    board = SieveBoard(eta)
+    for config_id in range(config_count):
+        board.add(0, config_id, StatusType.WAITTING)
+    proposes = 0
+    start = time.perf_counter()
+    while True:
+        proposed = None
+        for rung_id in reversed(range(rungs - 1)):
+            config_id = board.promotable_config_id(rung_id)
+            if config_id is not None:
+                board.change_status(rung_id, config_id, StatusType.PORMOTED)
+                board.change_status(rung_id + 1, config_id, StatusType.RUNNING)
+                proposed = (rung_id + 1, config_id)
+                break
+        if proposed is None:
+            config_id = board.min_waiting_config_id(0)
+            if config_id is None:
+                break
+            board.change_status(0, config_id, StatusType.RUNNING)
+            proposed = (0, config_id)
+        proposes += 1
+        board.add_score(proposed[0], proposed[1], random.random())
+    return (time.perf_counter() - start) / proposes
+
+
+if __name__ == '__main__':
+    counts = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+    random.seed(0)
+    print("{:>10} {:>16} {:>20}".format("configs", "us/propose", "us/propose/log2(n)"))
+    for count in counts:
+        cost = run_asha_board(count) * 1e6
+        print("{:>10} {:>16.2f} {:>20.3f}".format(count, cost, cost / math.log2(count)))
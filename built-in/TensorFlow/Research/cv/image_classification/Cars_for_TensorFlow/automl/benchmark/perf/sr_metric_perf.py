@@ -0,0 +1,58 @@
+# -*- coding:utf-8 -*-
+"""Benchmark the CPU throughput of the SR metrics on batches of 64x3x256x256.
+
+Compare the batched tensor PSNR/SSIM of `vega.core.metrics.pytorch.sr_metric`
+with the previous cv2 SSIM of the images one by one in float64.
+
+Usage:
+    python3 ./sr_metric_perf.py [--batch_size 64] [--size 256] [--batches 3] [--threads 0]
+"""
+import argparse
+import time
+import numpy as np
+import torch
+from vega.core.metrics.pytorch.sr_metric import compute_sr_metric, tensor_to_np_images, crop_np_border, \
+    bgr_to_y, calculate_ssim
+
+
+def cv2_ssim(img_sr, img_hr, to_y=True, scale=2):
+    """SSIM of the images one by one with cv2 in float64, the previous implementation."""
+    img_sr_np = crop_np_border(tensor_to_np_images(img_sr * 255.0), scale)
+    img_hr_np = crop_np_border(tensor_to_np_images(img_hr * 255.0), scale)
+    if to_y:
+        img_sr_np = bgr_to_y(img_sr_np)
+        img_hr_np = bgr_to_y(img_hr_np)
+    return np.mean([calculate_ssim(sr, hr) for sr, hr in zip(img_sr_np, img_hr_np)])
+
+
+def _throughput(func, batches):
+    start = time.perf_counter()
+    results = [func(sr, hr) for sr, hr in batches]
+    seconds = time.perf_counter() - start
+    return sum(len(sr) for sr, _ in batches) / seconds, np.mean(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SR metric benchmark.")
+    parser.add_argument('--batch_size', type=int, default=64)
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=0, help="torch threads, 0 keeps the default")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    batches = []
+    for _ in range(args.batches):
+        hr = torch.rand(args.batch_size, 3, args.size, args.size)
+        batches.append(((hr + 0.05 * torch.randn_like(hr)).clamp(0, 1), hr))
+    print("{:>10} {:>6} {:>12} {:>10}".format("method", "y", "images/s", "value"))
+    for to_y in (True, False):
+        rows = [
+            ("ssim_cv2", lambda sr, hr: cv2_ssim(sr, hr, to_y)),
+            ("ssim", lambda sr, hr: compute_sr_metric(sr, hr, 'ssim', to_y)),
+            ("psnr", lambda sr, hr: compute_sr_metric(sr, hr, 'psnr', to_y)),
+        ]
+        for name, func in rows:
+            throughput, value = _throughput(func, batches)
+            print("{:>10} {:>6} {:>12.1f} {:>10.6f}".format(name, str(to_y), throughput, value))
@@ -0,0 +1,171 @@
+# -*- coding:utf-8 -*-
+"""Test background writes and crash consistency of `vega.core.trainer.checkpoint_engine` and ModelCheckpoint."""
+import multiprocessing
+import os
+import pickle
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+import numpy as np
+from vega.core.trainer.callbacks import ModelCheckpoint
+from vega.core.trainer.checkpoint_engine import CheckpointEngine, snapshot, history_path
+
+
+def _pickle_save(obj, f):
+    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _state(value):
+    return {'epoch': int(value), 'weight': OrderedDict([('w', np.full((64, 64), value)), ('b', np.zeros(64))])}
+
+
+def _save_and_hang(path, started):
+    """Write a checkpoint, then start a second one which hangs in the middle of the file."""
+    def save_fn(obj, f):
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        if obj['epoch'] == 1:
+            f.write(data[:len(data) // 2])
+            f.flush()
+            started.set()
+            time.sleep(60)
+        f.write(data)
+
+    engine = CheckpointEngine(save_fn=save_fn)
+    engine.save(_state(0.), path)
+    engine.wait()
+    engine.save(_state(1.), path)
+    time.sleep(60)
+
+
+class _Model(object):
+    """Model of one weight with a torch like state_dict."""
+
+    def __init__(self, width):
+        self.w = np.zeros((width, width))
+
+    def state_dict(self):
+        return OrderedDict([('w', self.w)])
+
+
+class _Stateless(object):
+
+    def state_dict(self):
+        return {}
+
+
+class _Trainer(object):
+    """The trainer attributes used by ModelCheckpoint."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.config = type('Config', (object,), {'async_checkpoint': True, 'keep_checkpoints': 0})
+        self.model = _Model(4)
+        self.optimizer = _Stateless()
+        self.lr_scheduler = _Stateless()
+        self.checkpoint_file_name = 'checkpoint.pth'
+        self.model_pickle_file_name = 'model.pkl'
+
+    def get_local_worker_path(self):
+        return self.folder
+
+
+class TestCheckpointEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'checkpoint.pth')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_snapshot_reuses_buffer(self):
+        state = _state(1.)
+        first = snapshot(state)
+        state['weight']['w'] += 1.
+        second = snapshot(state, first)
+        self.assertIs(second['weight']['w'], first['weight']['w'])
+        self.assertIsInstance(second['weight'], OrderedDict)
+        np.testing.assert_array_equal(second['weight']['w'], state['weight']['w'])
+        self.assertIsNot(second['weight']['w'], state['weight']['w'])
+
+    def test_async_save(self):
+        engine = CheckpointEngine(save_fn=_pickle_save)
+        state = _state(0.)
+        for epoch in range(5):
+            state['epoch'] = epoch
+            state['weight']['w'][:] = epoch
+            engine.save(state, self.path, blobs={self.path + '.pkl': str(epoch).encode()})
+        # the training goes on while the checkpoints are written
+        state['weight']['w'][:] = -1.
+        engine.close()
+        ckpt = _load(self.path)
+        self.assertEqual(ckpt['epoch'], 4)
+        np.testing.assert_array_equal(ckpt['weight']['w'], np.full((64, 64), 4.))
+        with open(self.path + '.pkl', 'rb') as f:
+            self.assertEqual(f.read(), b'4')
+        self.assertEqual(engine.stats['saves'], 5)
+        self.assertEqual(sorted(os.listdir(self.dir)), ['checkpoint.pth', 'checkpoint.pth.pkl'])
+
+    def test_keep_last_checkpoints(self):
+        engine = CheckpointEngine(async_write=False, keep=2, save_fn=_pickle_save)
+        for epoch in range(4):
+            engine.save(_state(epoch), self.path, tag=epoch)
+        engine.close()
+        self.assertEqual(sorted(os.listdir(self.dir)), ['checkpoint.pth', 'checkpoint_2.pth', 'checkpoint_3.pth'])
+        self.assertEqual(_load(history_path(self.path, 2))['epoch'], 2)
+        self.assertEqual(_load(self.path)['epoch'], 3)
+
+    def test_error_is_raised(self):
+        def save_fn(obj, f):
+            raise IOError('disk full')
+
+        engine = CheckpointEngine(save_fn=save_fn)
+        engine.save(_state(0.), self.path)
+        with self.assertRaises(IOError):
+            engine.wait()
+        self.assertFalse(os.listdir(self.dir))
+        engine.close()
+
+    def test_kill_writer_mid_save(self):
+        started = multiprocessing.Event()
+        process = multiprocessing.Process(target=_save_and_hang, args=(self.path, started))
+        process.start()
+        self.assertTrue(started.wait(30))
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+        # the killed save left its temp file, the checkpoint is still the previous one
+        ckpt = _load(self.path)
+        self.assertEqual(ckpt['epoch'], 0)
+        np.testing.assert_array_equal(ckpt['weight']['w'], np.zeros((64, 64)))
+        self.assertEqual(len(os.listdir(self.dir)), 2)
+
+    def test_model_pickled_once(self):
+        trainer = _Trainer(self.dir)
+        callback = ModelCheckpoint()
+        callback.set_trainer(trainer)
+        callback.set_params({'is_chief': True})
+        callback.before_train()
+        logs = {'summary_perfs': {'best_valid_perfs_changed': True}}
+        callback.after_epoch(0, logs)
+        trainer.model.w += 1.
+        callback.after_epoch(1, logs)
+        callback.engine.wait()
+        # the weights of the pickle are those of the first checkpoint
+        np.testing.assert_array_equal(_load(trainer.model_path).w, np.zeros((4, 4)))
+        trainer.model = _Model(8)
+        callback.after_epoch(2, logs)
+        callback.engine.close()
+        self.assertEqual(_load(trainer.model_path).w.shape, (8, 8))
+        self.assertEqual(callback.engine.stats['saves'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
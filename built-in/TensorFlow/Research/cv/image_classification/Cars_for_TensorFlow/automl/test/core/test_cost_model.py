@@ -0,0 +1,114 @@
+# -*- coding:utf-8 -*-
+"""Test the analytic FLOPs and parameters of `vega.core.metrics.cost_model` against thop."""
+import copy
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import torch
+from thop.vision.basic_hooks import count_convNd
+from vega.core.metrics import CostModel, calc_model_flops_params
+from vega.search_space.networks import NetworkDesc
+from vega.search_space.networks.pytorch.customs.mtm_sr import MeanShift
+
+DARTS_OPS = ['none', 'max_pool_3x3', 'avg_pool_3x3', 'skip_connect',
+             'sep_conv_3x3', 'sep_conv_5x5', 'dil_conv_3x3', 'dil_conv_5x5']
+
+
+def _darts_desc():
+    path = os.path.join(os.path.dirname(__file__), '../../vega/algorithms/nas/darts_cnn/darts_cifar10.json')
+    with open(path) as f:
+        return json.load(f)
+
+
+def _random_genotype(rng):
+    return [[rng.choice(DARTS_OPS[1:]), node, rng.randrange(node)] for node in range(2, 6) for _ in range(2)]
+
+
+def _resnet_desc(depth, doublechannel, downsample, base_channel=16):
+    out_channel = base_channel * 2 ** sum(doublechannel) * (1 if depth < 50 else 4)
+    return {'modules': ['backbone', 'head'],
+            'backbone': {'name': 'ResNetVariant', 'base_depth': depth, 'base_channel': base_channel,
+                         'doublechannel': doublechannel, 'downsample': downsample},
+            'head': {'name': 'LinearClassificationHead', 'base_channel': out_channel, 'num_classes': 10}}
+
+
+def _sr_desc(blocks):
+    return {'modules': ['custom'],
+            'custom': {'name': 'MtMSR', 'in_channel': 3, 'out_channel': 3, 'upscale': 2,
+                       'rgb_mean': [0.4040, 0.4371, 0.4488], 'blocks': blocks}}
+
+
+class TestCostModel(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertSameCost(self, desc, input_shape, cost_model=None, custom_hooks=None):
+        model = NetworkDesc(copy.deepcopy(desc)).to_model()
+        flops, params = calc_model_flops_params(model, torch.zeros((1,) + input_shape), custom_hooks)
+        self.assertEqual(sum(p.numel() for p in model.parameters()), params)
+        self.assertEqual((cost_model or CostModel()).estimate(desc, input_shape), (flops, params))
+
+    def test_darts(self):
+        desc = _darts_desc()
+        self.assertSameCost(desc, (3, 32, 32))
+        desc['super_network']['auxiliary'] = False
+        desc['super_network']['network'][0] = 'PreTwoStem'
+        self.assertSameCost(desc, (3, 64, 64))
+        rng = random.Random(0)
+        cost_model = CostModel()
+        for _ in range(3):
+            desc['super_network']['normal']['genotype'] = _random_genotype(rng)
+            desc['super_network']['reduce']['genotype'] = _random_genotype(rng)
+            self.assertSameCost(desc, (3, 64, 64), cost_model)
+
+    # the alphas of the super network are created on the gpu
+    @mock.patch.object(torch.Tensor, 'cuda', lambda tensor, *args, **kwargs: tensor)
+    def test_search_super_network(self):
+        desc = _darts_desc()
+        super_network = desc['super_network']
+        super_network.update({'search': True, 'auxiliary': False, 'init_channels': 8})
+        super_network['network'] = super_network['network'][:3] + ['reduce', 'normal']
+        for name in ('normal', 'reduce'):
+            super_network[name]['genotype'] = [[DARTS_OPS, node, index] for node in range(2, 6)
+                                               for index in range(node)]
+        self.assertSameCost(desc, (3, 32, 32))
+
+    def test_resnet_variant(self):
+        self.assertSameCost(_resnet_desc(18, [0, 1, 0, 1], [0, 1, 0, 1]), (3, 32, 32))
+        self.assertSameCost(_resnet_desc(50, [0, 0, 1, 1], [1, 0, 1, 0]), (3, 32, 32))
+
+    def test_mtm_sr(self):
+        desc = _sr_desc(['res3', ['res2', 'res3'], 'res2', ['res3', 'res3', 'res2']])
+        self.assertSameCost(desc, (3, 24, 32), custom_hooks={MeanShift: count_convNd})
+        with self.assertRaises(ValueError):
+            CostModel().estimate(desc)
+        with self.assertRaises(KeyError):
+            CostModel().estimate({'name': 'Unknown'})
+
+    def test_table(self):
+        table_file = os.path.join(self.dir, 'cost_table.json')
+        desc = _resnet_desc(18, [0, 0, 1, 0], [0, 0, 1, 0])
+        cost_model = CostModel(table_file)
+        cost = cost_model.estimate(desc)
+        # the two first blocks have the same type and shapes
+        self.assertEqual((cost_model.misses, cost_model.hits), (4, 1))
+        other = CostModel(table_file)
+        other.estimate(_resnet_desc(18, [1, 1], [1, 1]))
+        cost_model.save()
+        other.save()
+        merged = CostModel(table_file)
+        self.assertEqual(set(merged.table), set(cost_model.table) | set(other.table))
+        self.assertEqual(merged.estimate(desc), cost)
+        self.assertEqual(merged.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# -*- coding:utf-8 -*-
+"""Test the analytic parameters of `vega.core.metrics.cost_model` against the tensorflow CARS network."""
+import copy
+import json
+import os
+import random
+import unittest
+import vega
+
+vega.set_backend('tensorflow')
+if vega.is_tf_backend():
+    from vega.core.common import Config
+    from vega.core.metrics import CostModel
+    from vega.algorithms.nas.cars.utils import eval_model_parameters
+    from vega.search_space.networks.tensorflow import CARSDartsNetwork
+
+# tensorflow does not build the dilated convs with stride 2 of a reduce cell
+NORMAL_OPS = ['max_pool_3x3', 'avg_pool_3x3', 'skip_connect', 'sep_conv_3x3', 'sep_conv_5x5',
+              'dil_conv_3x3', 'dil_conv_5x5']
+REDUCE_OPS = NORMAL_OPS[:5]
+
+
+def _random_genotype(rng, ops):
+    return [[rng.choice(ops), node, rng.randrange(node)] for node in range(2, 6) for _ in range(2)]
+
+
+@unittest.skipUnless(vega.is_tf_backend(), "tensorflow backend")
+class TestCostModelTF(unittest.TestCase):
+
+    def test_cars_children(self):
+        path = os.path.join(os.path.dirname(__file__), '../../vega/algorithms/nas/darts_cnn/darts_cifar10.json')
+        with open(path) as f:
+            desc = json.load(f)['super_network']
+        # the variables of the tensorflow auxiliary head are not named auxiliary, so it is removed from the net
+        desc.update({'search': False, 'auxiliary': False})
+        rng = random.Random(0)
+        cost_model = CostModel()
+        for _ in range(4):
+            desc['normal']['genotype'] = _random_genotype(rng, NORMAL_OPS)
+            desc['reduce']['genotype'] = _random_genotype(rng, REDUCE_OPS)
+            params = eval_model_parameters(CARSDartsNetwork(Config(copy.deepcopy(desc))))
+            self.assertAlmostEqual(cost_model.estimate(desc)[1] / 1e6, params, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# -*- coding:utf-8 -*-
+"""Test event-driven task completion of `vega.core.scheduler.distribution`."""
+import time
+import unittest
+from vega.core.scheduler.distribution import LocalDistributor, TaskDoneEvent
+
+
+def _job():
+    time.sleep(0.2)
+    return 1
+
+
+class TestDistribution(unittest.TestCase):
+
+    def test_task_done_event(self):
+        event = TaskDoneEvent()
+        self.assertEqual(event.wait(timeout=0.01), False)
+        event.notify("step::1")
+        self.assertEqual(event.wait(timeout=0.01), True)
+        self.assertIsNotNone(event.pop_done_time("step::1"))
+        self.assertIsNone(event.pop_done_time("step::1"))
+
+    def test_local_distributor_wakeup(self):
+        distributor = LocalDistributor(1)
+        distributor.distribute(pid="step::1", func=_job, kwargs={})
+        start = time.time()
+        self.assertEqual(distributor.task_done.wait(timeout=10), True)
+        self.assertLess(time.time() - start, 5)
+        distributor.join()
+        self.assertEqual(distributor.process_result_get(), "step::1")
+        distributor.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
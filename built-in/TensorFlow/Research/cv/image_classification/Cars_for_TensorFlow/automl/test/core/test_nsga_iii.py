@@ -0,0 +1,32 @@
+# -*- coding:utf-8 -*-
+"""Test vectorized non-dominated sorting of `vega.core.report.nsga_iii`."""
+import unittest
+import numpy as np
+from vega.core.report.nsga_iii import Dominates, NonDominatedSorting, SortAndSelectPopulation
+
+
+class TestNsgaIII(unittest.TestCase):
+
+    def test_non_dominated_sorting(self):
+        rng = np.random.RandomState(1)
+        pop = rng.randint(0, 5, size=(3, 200)).astype(np.float64)
+        fronts = NonDominatedSorting(pop)
+        self.assertEqual(sorted(sum(fronts, [])), list(range(200)))
+        rank = {idx: k for k, front in enumerate(fronts) for idx in front}
+        for i in range(200):
+            for j in range(200):
+                if Dominates(pop[:, i], pop[:, j]):
+                    self.assertLess(rank[i], rank[j])
+        for k in range(1, len(fronts)):
+            for j in fronts[k]:
+                self.assertTrue(any(Dominates(pop[:, i], pop[:, j]) for i in fronts[k - 1]))
+
+    def test_sort_and_select(self):
+        pop = np.array([[1., 2., 3., 4., 2., 3.], [4., 3., 2., 1., 4., 3.]])
+        _, newpop, selected = SortAndSelectPopulation(pop, 4)
+        self.assertEqual(newpop.shape, (2, 4))
+        self.assertEqual(sorted(selected.tolist()), [0, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding:utf-8 -*-
+"""Test step index and incremental pareto front of `vega.core.report.Report`."""
+import unittest
+import numpy as np
+import pareto
+from vega.core.report import Report, ReportRecord
+
+
+def _record(step_name, worker_id, x=None, y=None):
+    record = ReportRecord(step_name, worker_id)
+    if x is not None:
+        record.objective_keys = ['x', 'y']
+        record.performance = {'x': x, 'y': y}
+    return record
+
+
+class TestReport(unittest.TestCase):
+
+    def test_step_records(self):
+        report = Report()
+        for worker_id in range(6):
+            report.add(_record('test_index_a' if worker_id % 2 else 'test_index_b', worker_id))
+        self.assertEqual([r.worker_id for r in report.get_step_records('test_index_a')], [1, 3, 5])
+        records = report.get_step_records(['test_index_b', 'test_index_a'])
+        self.assertEqual([r.worker_id for r in records], list(range(6)))
+
+    def test_add_snapshot(self):
+        report = Report()
+        record = _record('test_snapshot', 0, 1., 1.)
+        report.add(record)
+        record.performance = {'x': 2., 'y': 2.}
+        self.assertEqual(report.get_step_records('test_snapshot')[0].rewards, [1., 1.])
+        report.add(record)
+        self.assertEqual(len(report.get_step_records('test_snapshot')), 1)
+        self.assertEqual(report.pareto_front('test_snapshot')[0], [[2., 2.]])
+
+    def test_incremental_pareto_front(self):
+        report = Report()
+        rng = np.random.RandomState(2)
+        fitness = []
+        for worker_id in range(100):
+            x, y = float(rng.randint(0, 10)), float(rng.rand())
+            report.add(_record('test_pareto', worker_id, x, y))
+            fitness.append([x, y])
+            outs = pareto.eps_sort(np.array(fitness), maximize_all=True, attribution=True)
+            expected = np.array(outs)[:, :-2].tolist(), np.array(outs)[:, -1].astype(np.int32).tolist()
+            self.assertEqual(report.pareto_front('test_pareto'), expected)
+        records = report.get_pareto_front_records('test_pareto')
+        self.assertEqual([r.rewards for r in records], expected[0])
+
+    def test_broadcast_then_update(self):
+        report = Report()
+        rng = np.random.RandomState(3)
+        for worker_id in range(50):
+            report.add(_record('test_broadcast', worker_id))
+        self.assertEqual(report.pareto_front('test_broadcast'), (None, None))
+        cache = report._pareto_fronts['test_broadcast']
+        rewards = {}
+        for worker_id in rng.permutation(50).tolist():
+            x, y = float(rng.randint(0, 10)), float(rng.rand())
+            report.add(_record('test_broadcast', worker_id, x, y))
+            rewards[worker_id] = [x, y]
+            fitness = np.array([rewards[i] for i in sorted(rewards)])
+            outs = pareto.eps_sort(fitness, maximize_all=True, attribution=True)
+            expected = sorted(np.array(outs)[:, :-2].tolist())
+            front, _ = report.pareto_front('test_broadcast')
+            self.assertEqual(sorted(front), expected)
+            records = report.get_pareto_front_records('test_broadcast')
+            self.assertEqual([r.rewards for r in records], front)
+            self.assertIs(report._pareto_fronts['test_broadcast'], cache)
+        # the same performance again keeps the cache, a changed one rebuilds it
+        report.add(_record('test_broadcast', 0, *rewards[0]))
+        self.assertIs(report._pareto_fronts['test_broadcast'], cache)
+        report.add(_record('test_broadcast', 0, 100., 100.))
+        self.assertEqual(report.pareto_front('test_broadcast')[0], [[100., 100.]])
+        self.assertIsNot(report._pareto_fronts['test_broadcast'], cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding:utf-8 -*-
+"""Test binary encoding and batch access of `vega.core.report.share_memory`."""
+import unittest
+from vega.core.common import Config
+from vega.core.common.consts import ClusterMode
+from vega.core.common.general import General
+from vega.core.report.share_memory import (ClusterShareMemory, LocalShareMemory, ShareMemoryClient, dumps, loads,
+                                           share_memory_stats)
+
+
+class TestShareMemory(unittest.TestCase):
+
+    def test_dumps_loads(self):
+        record = {'step_name': 'nas', 'worker_id': 1, 'desc': {'modules': ['backbone']},
+                  'performance': {'accuracy': 0.9}, 'rewards': [0.9]}
+        self.assertIsInstance(dumps(record), bytes)
+        self.assertEqual(loads(dumps(record)), record)
+        self.assertEqual(loads(str(record)), record)
+        self.assertIsNone(loads(None))
+
+    def test_local_many(self):
+        share_memory_stats.reset()
+        LocalShareMemory.put_many({'test_many.1': {'worker_id': 1}, 'test_many.2': {'worker_id': 2}})
+        values = LocalShareMemory.get_many(['test_many.2', 'test_many.1', 'test_many.3'])
+        self.assertEqual(values, [{'worker_id': 2}, {'worker_id': 1}, None])
+        summary = share_memory_stats.summary()
+        self.assertEqual(summary['put']['messages'], 1)
+        self.assertEqual(summary['put']['records'], 2)
+        self.assertEqual(summary['get']['records'], 3)
+
+    def test_cluster_many(self):
+        from dask.distributed import LocalCluster
+        cluster = LocalCluster(n_workers=0, processes=False, dashboard_address=None)
+        env, cluster_mode = General.env, General.cluster_mode
+        General.env = Config(init_method=cluster.scheduler_address)
+        General.cluster_mode = ClusterMode.LocalCluster
+        try:
+            share_memory_stats.reset()
+            records = {'test_many.{}'.format(index): {'worker_id': index} for index in range(20)}
+            ClusterShareMemory.put_many(records)
+            names = list(records) + ['test_many.missing']
+            self.assertEqual(ClusterShareMemory.get_many(names), list(records.values()) + [None])
+            self.assertEqual(ClusterShareMemory('test_many.3').get(), {'worker_id': 3})
+            summary = share_memory_stats.summary()
+            self.assertEqual(summary['put']['messages'], 1)
+            self.assertEqual(summary['put']['records'], 20)
+            self.assertEqual(summary['get']['records'], 22)
+        finally:
+            ShareMemoryClient().close()
+            General.env, General.cluster_mode = env, cluster_mode
+            cluster.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
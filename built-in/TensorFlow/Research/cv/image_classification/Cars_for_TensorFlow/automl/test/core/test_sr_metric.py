@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+"""Test the batched tensor PSNR/SSIM of `vega.core.metrics.pytorch.sr_metric` against the cv2 path."""
+import unittest
+import numpy as np
+import torch
+from vega.core.metrics.pytorch.sr_metric import SRMetric, compute_sr_metric, tensor_to_np_images, \
+    crop_np_border, bgr_to_y, calculate_ssim, preprocess, calculate_psnr
+
+
+def cv2_ssim(img_sr, img_hr, to_y=True, scale=2):
+    """SSIM of the images one by one with cv2 in float64, the previous implementation."""
+    img_sr_np = crop_np_border(tensor_to_np_images(img_sr * 255.0), scale)
+    img_hr_np = crop_np_border(tensor_to_np_images(img_hr * 255.0), scale)
+    if to_y:
+        img_sr_np = bgr_to_y(img_sr_np)
+        img_hr_np = bgr_to_y(img_hr_np)
+    return np.mean([calculate_ssim(sr, hr) for sr, hr in zip(img_sr_np, img_hr_np)])
+
+
+def loop_psnr(img_sr, img_hr, to_y=True, scale=2):
+    """PSNR of the batch, the previous implementation."""
+    sr, hr = preprocess(img_sr * 255.0, to_y, scale), preprocess(img_hr * 255.0, to_y, scale)
+    return calculate_psnr(sr, hr)
+
+
+def _images(batch_size, size=48, channels=3, seed=0):
+    """hr images with smooth and flat regions, sr images of hr with noise."""
+    rng = np.random.RandomState(seed)
+    grid = np.linspace(0, 4 * np.pi, size)
+    hr = np.sin(grid[None, None, :, None] + rng.rand(batch_size, channels, 1, 1) * 3) * \
+        np.cos(grid[None, None, None, :]) * 0.4 + 0.5
+    hr[:, :, :size // 4] = 0.8
+    sr = np.clip(hr + rng.randn(*hr.shape) * 0.05, 0, 1)
+    return torch.tensor(sr, dtype=torch.float32), torch.tensor(hr, dtype=torch.float32)
+
+
+class TestSRMetric(unittest.TestCase):
+
+    def test_ssim_parity(self):
+        sr, hr = _images(4)
+        for to_y in (True, False):
+            for scale in (0, 2, 4):
+                expected = cv2_ssim(sr, hr, to_y, scale)
+                result = compute_sr_metric(sr, hr, 'ssim', to_y, scale)
+                self.assertAlmostEqual(result, expected, delta=1e-4)
+        self.assertAlmostEqual(compute_sr_metric(hr, hr, 'ssim'), 1., delta=1e-4)
+
+    def test_psnr_parity(self):
+        sr, hr = _images(4)
+        for to_y in (True, False):
+            for scale in (0, 2):
+                expected = loop_psnr(sr, hr, to_y, scale)
+                result = compute_sr_metric(sr, hr, 'psnr', to_y, scale)
+                self.assertAlmostEqual(result, expected, delta=1e-4)
+
+    def test_frames(self):
+        sr, hr = _images(6)
+        sr, hr = sr.view(2, 3, 3, 48, 48).permute(0, 2, 3, 4, 1), hr.view(2, 3, 3, 48, 48).permute(0, 2, 3, 4, 1)
+        for method, reference in (('ssim', cv2_ssim), ('psnr', loop_psnr)):
+            expected = np.mean([reference(sr[..., i].contiguous(), hr[..., i].contiguous()) for i in range(3)])
+            self.assertAlmostEqual(compute_sr_metric(sr, hr, method), expected, delta=1e-4)
+
+    def test_running_mean(self):
+        metric = SRMetric(method='ssim')
+        sr, hr = _images(6)
+        for begin, end in ((0, 2), (2, 6)):
+            metric(sr[begin:end], hr[begin:end])
+        self.assertAlmostEqual(metric.summary(), cv2_ssim(sr, hr), delta=1e-4)
+        metric.reset()
+        self.assertEqual(metric.summary(), 0.)
+
+
+if __name__ == "__main__":
+    unittest.main()
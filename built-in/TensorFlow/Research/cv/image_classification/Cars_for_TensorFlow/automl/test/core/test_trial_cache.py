@@ -0,0 +1,171 @@
+# -*- coding:utf-8 -*-
+"""Test the trial cache callback of `vega.core.trainer` with a toy random search."""
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+import torch
+from vega.core.trainer.trial_cache import TrialCache, copy_matching_weights
+from vega.core.trainer.callbacks.trial_cache_callback import TrialCacheCallback
+from vega.search_space.networks import NetworkDesc
+
+
+def _desc(depth, width):
+    return {'modules': ['backbone'], 'backbone': {'type': 'ToyNet', 'depth': depth, 'width': width}}
+
+
+def _model(desc):
+    width = desc['backbone']['width']
+    return torch.nn.Sequential(*[torch.nn.Linear(width, width) for _ in range(desc['backbone']['depth'])])
+
+
+class ToyConfig(object):
+    """Trainer config of the toy search."""
+
+    def __init__(self, **kwargs):
+        self.trial_cache = True
+        self.trial_cache_warm_start = True
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class ToyTrainer(object):
+    """Trainer with the attributes used by TrialCacheCallback and ModelCheckpoint."""
+
+    def __init__(self, folder, worker_id, config, desc):
+        self.folder = folder
+        self.worker_id = worker_id
+        self.config = config
+        self.model_desc = desc
+        self.hps = None
+        self.model = _model(desc)
+        self.optimizer = torch.optim.SGD(self.model.parameters(), lr=0.1)
+        self.lr_scheduler = torch.optim.lr_scheduler.StepLR(self.optimizer, 1)
+        self.performance = None
+        self.epochs = 10
+        self.local_output_path = folder
+        self.checkpoint_file_name = 'checkpoint.pth'
+        self.model_pickle_file_name = 'model.pkl'
+        self.checkpoint_file = None
+        self.model_path = None
+        os.makedirs(self.get_local_worker_path())
+        self.weights_file = os.path.join(self.get_local_worker_path(), 'model_{}.pth'.format(worker_id))
+
+    def get_local_worker_path(self):
+        """Path of the outputs of the worker."""
+        return os.path.join(self.folder, str(self.worker_id))
+
+
+class ToySearch(object):
+    """Random search which runs each trial through TrialCacheCallback."""
+
+    def __init__(self, folder, config, train_seconds=1800.):
+        self.folder = folder
+        self.config = config
+        self.train_seconds = train_seconds
+        self.trained = 0
+        self.workers = 0
+
+    def run(self, desc):
+        """Trainer of the trial, the epochs are only run when the cache misses."""
+        self.workers += 1
+        trainer = ToyTrainer(self.folder, '{}_{}'.format(id(self), self.workers), self.config, desc)
+        callback = TrialCacheCallback()
+        callback.set_trainer(trainer)
+        callback.set_params({'is_chief': True})
+        callback.before_train()
+        if trainer.epochs:
+            # the training is random, a hit is the same only if it comes from the cache
+            self.trained += 1
+            callback.start_time -= self.train_seconds
+            trainer.performance = {'accuracy': random.random(),
+                                   'kparams': sum(p.numel() for p in trainer.model.parameters()) * 1e-3}
+        # the weights file is written by ModelCheckpoint.after_train
+        torch.save(trainer.model.state_dict(), trainer.weights_file)
+        callback.after_train()
+        return trainer
+
+
+class TestTrialCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = TrialCache(os.path.join(self.dir, 'trial_cache.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_random_search_with_duplicates(self):
+        rng = random.Random(0)
+        space = [_desc(depth, width) for depth in (1, 2, 3) for width in (4, 8)]
+        samples = [rng.choice(space) for _ in range(20)] + space
+        search = ToySearch(self.dir, ToyConfig(epochs=10, lr=0.1, weights_file='a.pth'))
+        results = {}
+        for desc in samples:
+            trainer = search.run(desc)
+            key = NetworkDesc.get_md5(desc)
+            results.setdefault(key, trainer.performance)
+            self.assertEqual(trainer.performance, results[key])
+        unique = len(results)
+        self.assertEqual(search.trained, unique)
+        stats = self.cache.stats()
+        self.assertEqual(stats['trials'], unique)
+        self.assertEqual(stats['misses'], unique)
+        self.assertEqual(stats['hits'], len(samples) - unique)
+        self.assertAlmostEqual(stats['hit_rate'], (len(samples) - unique) / len(samples))
+        self.assertAlmostEqual(stats['saved_gpu_hours'], (len(samples) - unique) * 0.5, places=3)
+        # another config, or only another weights path, of the same trials
+        other = ToySearch(self.dir, ToyConfig(epochs=20, lr=0.1))
+        other.run(space[0])
+        self.assertEqual(other.trained, 1)
+        same = ToySearch(self.dir, ToyConfig(epochs=10, lr=0.1, weights_file='b.pth'))
+        same.run(space[0])
+        self.assertEqual(same.trained, 0)
+
+    def test_hit_saves_checkpoint(self):
+        search = ToySearch(self.dir, ToyConfig(epochs=10))
+        trained = search.run(_desc(2, 8))
+        trainer = search.run(_desc(2, 8))
+        self.assertEqual(trainer.epochs, 0)
+        self.assertEqual(trainer.performance, trained.performance)
+        expected = trained.model.state_dict()
+        ckpt = torch.load(trainer.checkpoint_file)
+        with open(trainer.model_path, 'rb') as f:
+            model = pickle.load(f)
+        for name, value in expected.items():
+            self.assertTrue(torch.equal(trainer.model.state_dict()[name], value))
+            self.assertTrue(torch.equal(ckpt['weight'][name], value))
+            self.assertTrue(torch.equal(model.state_dict()[name], value))
+        self.assertEqual(os.path.dirname(trainer.checkpoint_file), trainer.get_local_worker_path())
+        self.assertEqual(self.cache.closest(_desc(2, 8))['weights_file'], trained.weights_file)
+
+    def test_warm_start(self):
+        search = ToySearch(self.dir, ToyConfig(epochs=10))
+        search.run(_desc(2, 8))
+        search.run(_desc(1, 4))
+        parent = torch.load(self.cache.closest(_desc(2, 8))['weights_file'])
+        model = _model(_desc(3, 8))
+        self.assertEqual(self.cache.closest(_desc(3, 8))['desc'], _desc(2, 8))
+        self.assertEqual(copy_matching_weights(model, parent), 4)
+        self.assertNotIn('2.weight', parent)
+        trainer = search.run(_desc(3, 8))
+        self.assertEqual(trainer.epochs, 10)
+        state = trainer.model.state_dict()
+        for name in parent:
+            self.assertTrue(torch.equal(state[name], parent[name]))
+        self.assertEqual(self.cache.stats()['warm_starts'], 1)
+        no_warm_start = ToySearch(self.dir, ToyConfig(epochs=10, trial_cache_warm_start=False))
+        trainer = no_warm_start.run(_desc(3, 8))
+        self.assertFalse(torch.equal(trainer.model.state_dict()['0.weight'], parent['0.weight']))
+        self.assertEqual(self.cache.stats()['warm_starts'], 1)
+
+    def test_connections_share_counters(self):
+        TrialCache(self.cache.path).count('hits', 2)
+        self.cache.count('hits')
+        self.assertEqual(self.cache.stats()['hits'], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
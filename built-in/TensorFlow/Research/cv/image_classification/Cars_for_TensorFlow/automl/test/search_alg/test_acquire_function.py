@@ -0,0 +1,38 @@
+# -*- coding:utf-8 -*-
+"""Test batch acquisition of `vega.algorithms.hpo.common.tuner.acquire_function`."""
+import unittest
+import numpy as np
+from vega.algorithms.hpo.common.tuner.acquire_function import expected_improvement_values, local_penalization
+
+
+class TestAcquireFunction(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        self.feature = rng.rand(2000, 2)
+        # one narrow peak at (0.5, 0.5), the std is the same everywhere as a model fit on few points
+        label = np.exp(-((self.feature - 0.5) ** 2).sum(axis=1) / 0.02)
+        self.predictions = np.column_stack((label, np.full(2000, 0.5)))
+
+    def test_first_is_max_expected_improvement(self):
+        e_i = expected_improvement_values(self.predictions, None)
+        indexes = local_penalization(self.feature, self.predictions, None, 8)
+        self.assertEqual(indexes[0], int(np.argmax(e_i)))
+
+    def test_diverse_batch(self):
+        indexes = local_penalization(self.feature, self.predictions, None, 8)
+        self.assertEqual(len(set(indexes)), 8)
+        chosen = self.feature[indexes]
+        dist = np.sqrt(((chosen[:, None, :] - chosen[None, :, :]) ** 2).sum(axis=2))
+        greedy = self.feature[np.argsort(-expected_improvement_values(self.predictions, None))[:8]]
+        greedy_dist = np.sqrt(((greedy[:, None, :] - greedy[None, :, :]) ** 2).sum(axis=2))
+        self.assertGreater(dist[np.triu_indices(8, 1)].min(), greedy_dist[np.triu_indices(8, 1)].min())
+
+    def test_random_predictions(self):
+        predictions = np.random.rand(10, 1)
+        indexes = local_penalization(self.feature[:10], predictions, None, 20)
+        self.assertEqual(indexes, np.argsort(-predictions[:, 0]).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# -*- coding:utf-8 -*-
+"""Test the shared batch evaluation of `vega.algorithms.nas.cars.population_evaluator`."""
+import random
+import unittest
+import numpy as np
+import torch
+import torch.utils.data as torch_data
+from vega.algorithms.nas.cars.nsga3 import CARS_NSGA
+from vega.algorithms.nas.cars.population_evaluator import PopulationEvaluator, stratified_indices, subset_loader
+from vega.core.report.nsga_iii import SortAndSelectPopulation
+
+
+class CountingDataset(torch_data.Dataset):
+    """Random features of 4 classes, counts the loaded items."""
+
+    def __init__(self, size=512, seed=0):
+        rng = np.random.RandomState(seed)
+        self.targets = rng.randint(0, 4, size).tolist()
+        self.data = torch.tensor(rng.randn(size, 8), dtype=torch.float32)
+        self.data[:, :4] += 2 * torch.nn.functional.one_hot(torch.tensor(self.targets), 4).float()
+        self.loads = 0
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __getitem__(self, index):
+        self.loads += 1
+        return self.data[index], self.targets[index]
+
+
+class SuperNet(torch.nn.Module):
+    """Mixture of linear ops weighted by alpha."""
+
+    def __init__(self):
+        super(SuperNet, self).__init__()
+        torch.manual_seed(0)
+        self.ops = torch.nn.ModuleList([torch.nn.Linear(8, 4) for _ in range(3)])
+        self.ops[0].weight.data = torch.eye(4, 8) * 2
+
+    def forward(self, input, alpha):
+        return sum(weight * op(input) for weight, op in zip(alpha, self.ops))
+
+
+class TopOne(object):
+    """Top-1 accuracy with the results of vega Metrics."""
+
+    objectives = {'accuracy': 'MAX'}
+
+    def __init__(self):
+        self.correct = 0
+        self.total = 0
+
+    def __call__(self, output, target):
+        self.correct += (output.argmax(dim=1) == target).sum().item()
+        self.total += target.size(0)
+
+    @property
+    def results(self):
+        return {'accuracy': self.correct / self.total}
+
+
+def per_individual(model, loader, alphas):
+    """Accuracy of each individual on its own pass of the loader, the previous implementation."""
+    results = []
+    model.eval()
+    with torch.no_grad():
+        for alpha in alphas:
+            metrics = TopOne()
+            for input, target in loader:
+                metrics(model(input, torch.from_numpy(alpha)), target)
+            results.append(metrics.results['accuracy'])
+    return results
+
+
+def selected(nsga_method, accuracy, sizes, keep, seeds=300):
+    """Individuals which the selection of CarsAlgorithm keeps with any of the seeds."""
+    result = set()
+    for seed in range(seeds):
+        random.seed(seed)
+        np.random.seed(seed)
+        if nsga_method == 'nsga3':
+            _, _, kept = SortAndSelectPopulation(np.vstack((1 / accuracy, sizes)), keep)
+        else:
+            kept = CARS_NSGA(accuracy, [sizes], keep)
+        result.update(kept.tolist())
+    return result
+
+
+class TestPopulationEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = CountingDataset()
+        self.loader = torch_data.DataLoader(self.dataset, batch_size=32)
+        self.model = SuperNet()
+        rng = np.random.RandomState(1)
+        self.alphas = rng.rand(8, 3).astype(np.float32)
+        self.alphas[:4, 0] += 2
+
+    def test_identical_fitness(self):
+        expected = per_individual(self.model, self.loader, self.alphas)
+        self.dataset.loads = 0
+        metrics, samples = PopulationEvaluator(self.model, self.loader, TopOne).evaluate(self.alphas)
+        self.assertEqual([m.results['accuracy'] for m in metrics], expected)
+        self.assertEqual(samples.tolist(), [len(self.dataset)] * 8)
+        self.assertEqual(self.dataset.loads, len(self.dataset))
+
+    def test_prune_dominated(self):
+        full, _ = PopulationEvaluator(self.model, self.loader, TopOne).evaluate(self.alphas)
+        accuracy = np.array([m.results['accuracy'] for m in full])
+        evaluator = PopulationEvaluator(self.model, self.loader, TopOne, keep=2, prune_confidence=3., min_samples=64)
+        metrics, samples = evaluator.evaluate(self.alphas, sizes=np.ones(8))
+        self.assertTrue((samples < len(self.dataset)).any())
+        # the best individuals are evaluated on the whole set with the same results
+        for i in np.argsort(-accuracy)[:2]:
+            self.assertEqual(samples[i], len(self.dataset))
+            self.assertEqual(metrics[i].results['accuracy'], accuracy[i])
+        # the smallest model is dominated by none
+        sizes = np.arange(8, 0, -1)
+        _, samples = evaluator.evaluate(self.alphas, sizes=sizes)
+        self.assertEqual(samples[7], len(self.dataset))
+
+    def test_prune_not_selected(self):
+        accuracy = np.array([.9, .85, .5, .4])
+        sizes = np.array([1, 1, 10, .5])
+        samples = np.full(4, 10000)
+        for nsga_method, pruned in (('nsga3', [2]), ('cars_nsga', [])):
+            evaluator = PopulationEvaluator(self.model, self.loader, TopOne, keep=2, prune_confidence=3.,
+                                            nsga_method=nsga_method)
+            dominated = evaluator._dominated(accuracy * samples, samples, sizes, np.ones(4, dtype=bool))
+            self.assertEqual(np.where(dominated)[0].tolist(), pruned)
+            self.assertFalse(set(pruned) & selected(nsga_method, accuracy, sizes, 2))
+
+    def test_prune_selection(self):
+        full, _ = PopulationEvaluator(self.model, self.loader, TopOne).evaluate(self.alphas)
+        accuracy = np.array([m.results['accuracy'] for m in full])
+        sizes = np.random.RandomState(2).rand(8) + 1
+        for nsga_method in ('nsga3', 'cars_nsga'):
+            evaluator = PopulationEvaluator(self.model, self.loader, TopOne, keep=2, prune_confidence=3.,
+                                            min_samples=64, nsga_method=nsga_method)
+            _, samples = evaluator.evaluate(self.alphas, sizes=sizes)
+            pruned = set(np.where(samples < len(self.dataset))[0].tolist())
+            self.assertTrue(pruned)
+            self.assertFalse(pruned & selected(nsga_method, accuracy, sizes, 2))
+
+    def test_stratified_subset(self):
+        labels = np.array([0] * 700 + [1] * 200 + [2] * 100)
+        indices = stratified_indices(labels, 100)
+        self.assertEqual(np.bincount(labels[indices]).tolist(), [70, 20, 10])
+        self.assertEqual(indices.tolist(), stratified_indices(labels, 100).tolist())
+        self.assertEqual(len(stratified_indices(labels, 101)), 101)
+        sampler = torch_data.SubsetRandomSampler(list(range(256)))
+        loader = subset_loader(torch_data.DataLoader(self.dataset, batch_size=32, sampler=sampler), 64)
+        self.assertEqual(len(loader.dataset), 64)
+        self.assertTrue(max(loader.dataset.indices) < 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+"""Test the columnar sieve board of SHA family algorithms."""
+import unittest
+from vega.algorithms.hpo.common import SieveBoard
+from vega.algorithms.hpo.common.status_type import StatusType
+
+
+class TestSieveBoard(unittest.TestCase):
+    """Test SieveBoard."""
+
+    def test_waiting_and_count(self):
+        """Test min waiting config id and status counters."""
+        board = SieveBoard(eta=3, capacity=2)
+        for config_id in range(5):
+            board.add(0, config_id, StatusType.WAITTING)
+        self.assertEqual(len(board), 5)
+        self.assertEqual(board.min_waiting_config_id(0), 0)
+        board.change_status(0, 0, StatusType.RUNNING)
+        self.assertEqual(board.min_waiting_config_id(0), 1)
+        self.assertEqual(board.count([StatusType.WAITTING, StatusType.RUNNING]), 5)
+        board.add_score(0, 0, 0.5)
+        self.assertEqual(board.count([StatusType.WAITTING, StatusType.RUNNING], 0), 4)
+        self.assertEqual(board.get_score(0, 0), 0.5)
+        self.assertIsNone(board.get_score(0, 1))
+
+    def test_promotable(self):
+        """Test the top `done // eta` configs are promoted in board order."""
+        board = SieveBoard(eta=3)
+        scores = [0.1, 0.9, 0.5, 0.8, 0.2, 0.7]
+        for config_id, score in enumerate(scores):
+            board.add(0, config_id, StatusType.RUNNING)
+        for config_id, score in enumerate(scores[:2]):
+            board.add_score(0, config_id, score)
+        self.assertIsNone(board.promotable_config_id(0))
+        board.add_score(0, 2, scores[2])
+        self.assertEqual(board.promotable_config_id(0), 1)
+        board.change_status(0, 1, StatusType.PORMOTED)
+        board.change_status(1, 1, StatusType.RUNNING)
+        self.assertIsNone(board.promotable_config_id(0))
+        for config_id in range(3, 6):
+            board.add_score(0, config_id, scores[config_id])
+        self.assertEqual(board.promotable_config_id(0), 3)
+        self.assertTrue(board.is_promotable(0, 3))
+        self.assertFalse(board.is_promotable(0, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
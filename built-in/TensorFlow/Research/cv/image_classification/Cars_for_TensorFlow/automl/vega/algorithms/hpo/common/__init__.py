@@ -6,3 +6,4 @@ from .boss import BOSS
 from .hyperband import HyperBand
 from .random_search import RandomSearch
 from .random_pareto import RandomPareto
+from .sieve_board import SieveBoard
@@ -118,9 +118,7 @@ class ASHA(ShaBase):
         :param float score: Description of parameter `score`.
 
         """
-        self.sieve_board.loc[(
-            self.sieve_board['config_id'] == config_id) & (
-            self.sieve_board['rung_id'] == rung_id), ['status', 'score']] = [StatusType.FINISHED, score]
+        self.sieve_board.add_score(rung_id, config_id, score)
 
         if rung_id > 0 and config_id not in self.best_score_dict[rung_id]:
             self.best_score_dict[rung_id][config_id] = -1 * float('inf')
@@ -128,9 +126,8 @@ class ASHA(ShaBase):
         if score > self.best_score_dict[rung_id][config_id]:
             self.best_score_dict[rung_id][config_id] = score
         # the last config is best k score, propose a new config for next rung
-        if rung_id == 0 and config_id == self.sieve_board['config_id'].max():
-            top_k = self._get_top_k_config_ids(rung_id)
-            if top_k and config_id in top_k:
+        if rung_id == 0 and config_id == self.sieve_board.max_config_id():
+            if self.sieve_board.is_promotable(rung_id, config_id):
                 return
         self.is_completed = self._check_completed()
         return
@@ -147,12 +144,11 @@ class ASHA(ShaBase):
         """
         # Check to see if there is a promotable config
         for rung_id in reversed(range(0, self.s_max - self.sr)):
-            candidate_ids = self._get_top_k_config_ids(rung_id)
-            if candidate_ids is not None:
+            promote_config_id = self.sieve_board.promotable_config_id(rung_id)
+            if promote_config_id is not None:
                 promote_rung_id = rung_id + 1
                 s_epoch = self.single_epoch * math.pow(self.eta,
                                                        (promote_rung_id + self.sr))
-                promote_config_id = candidate_ids[0]
                 results = {
                     'config_id': promote_config_id,
                     'rung_id': promote_rung_id,
@@ -170,12 +166,9 @@ class ASHA(ShaBase):
 
         # Draw random configuration θ from bottom rung.
         bottom_rung = 0
-        _key = (self.sieve_board['rung_id'] == bottom_rung) & \
-               (self.sieve_board['status'] == StatusType.WAITTING)
-        rung_df = self.sieve_board.loc[_key]
-        if rung_df.empty:
+        next_config_id = self.sieve_board.min_waiting_config_id(bottom_rung)
+        if next_config_id is None:
             return None
-        next_config_id = rung_df['config_id'].min(skipna=True)
         results = {
             'config_id': next_config_id,
             'rung_id': bottom_rung,
@@ -187,78 +180,3 @@ class ASHA(ShaBase):
                             status=StatusType.RUNNING)
         self.total_propose = self.total_propose + 1
         return results
-
-    def _add_to_board(self, one_dict):
-        """Add the new record into board.
-
-        :param dict one_dict: Description of parameter `one_dict`.
-
-        """
-        # TODO pandas use contact replace append function
-        self.sieve_board = self.sieve_board.append(one_dict, ignore_index=True)
-
-    def _change_status(self, rung_id, config_id, status):
-        """Change the status of each config.
-
-        :param int rung_id: Description of parameter `rung_id`.
-        :param int config_id: Description of parameter `config_id`.
-        :param type status: Description of parameter `status`.
-        :type enum: StatusType
-
-        """
-        _key = (self.sieve_board['config_id'] == config_id) & \
-               (self.sieve_board['rung_id'] == rung_id)
-        change_df = self.sieve_board.loc[_key]
-        if change_df.empty:
-            tmp_row_data = {'rung_id': rung_id,
-                            'config_id': config_id,
-                            'status': status}
-            self._add_to_board(tmp_row_data)
-        else:
-            self.sieve_board.loc[_key, ['status']] = [status]
-
-    def _check_completed(self):
-        """Check task is completed.
-
-        :return: if the search algorithm is finished.
-        :rtype: bool.
-
-        """
-        current_rung_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin(
-                [StatusType.WAITTING, StatusType.RUNNING])
-        ]
-        if current_rung_df.empty:
-            return True
-        else:
-            return False
-
-    def _get_top_k_config_ids(self, rung_id):
-        """Get top k configs.
-
-        :param int rung_id: Description of parameter `rung_id`.
-        :return: a list of top k config id.
-        :rtype: list or None.
-
-        """
-        _key = (self.sieve_board['rung_id'] == rung_id) & \
-               (self.sieve_board['status'].isin(
-                   [StatusType.FINISHED, StatusType.PORMOTED]))
-        rung_df = self.sieve_board.loc[_key]
-        if rung_df.empty:
-            return None
-        else:
-            k = int(len(rung_df.index) / self.eta)
-            if k <= 0:
-                return None
-            a = self.best_score_dict[rung_id]
-            new_a = dict(sorted(a.items(), key=operator.itemgetter(1),
-                                reverse=True)[:k])
-            candidate_ids = new_a.keys()
-            candidate_df = rung_df.loc[
-                (self.sieve_board['status'] == StatusType.FINISHED) & (
-                    self.sieve_board['config_id'].isin(candidate_ids))]
-            if candidate_df.empty:
-                return None
-            else:
-                return candidate_df['config_id'].tolist()
@@ -81,17 +81,11 @@ class BO(ShaBase):
         :param float score: Description of parameter `score`.
 
         """
-        self.sieve_board.loc[
-            (self.sieve_board['config_id'] == config_id),
-            ['status', 'score']
-        ] = [StatusType.FINISHED, score]
-
         if score > self.best_score:
             self.best_config_id = config_id
             self.best_score = score
         rung_id = 0
-        self.sieve_board.loc[(self.sieve_board['config_id'] == config_id) & (
-            self.sieve_board['rung_id'] == rung_id), ['status', 'score']] = [StatusType.FINISHED, score]
+        self.sieve_board.add_score(rung_id, config_id, score)
 
         if config_id not in self.best_score_dict:
             self.best_score_dict[config_id] = -1 * float('inf')
@@ -102,16 +96,11 @@ class BO(ShaBase):
         if config_id in self.all_config_dict:
             # add this (config, score) pair into HP
             x = self.all_config_dict[config_id]
-            score_df = self.sieve_board[self.sieve_board['config_id'] == config_id]
-            score_df = score_df[score_df['rung_id'] == rung_id]
-            if not score_df.empty:
-                y = float(score_df['score'])
+            y = self.sieve_board.get_score(rung_id, config_id)
+            if y is not None:
                 self.hp.add(x, y)
 
-        current_waiting_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin([StatusType.WAITTING])
-        ]
-        if current_waiting_df.empty and self.total_propose < self.config_count:
+        if self.sieve_board.count([StatusType.WAITTING]) == 0 and self.total_propose < self.config_count:
             # get a new propose from HP
             configs = self.hp.propose()
             config_id = len(self.all_config_dict)
@@ -136,11 +125,9 @@ class BO(ShaBase):
                        'epoch': int}
 
         """
-        rung_df = self.sieve_board.loc[(self.sieve_board['rung_id'] == 0) & (
-            self.sieve_board['status'] == StatusType.WAITTING)]
-        if rung_df.empty:
+        next_config_id = self.sieve_board.min_waiting_config_id(0)
+        if next_config_id is None:
             return None
-        next_config_id = rung_df['config_id'].min(skipna=True)
         results = {
             'config_id': next_config_id,
             'configs': self.all_config_dict[next_config_id],
@@ -152,37 +139,6 @@ class BO(ShaBase):
         self.total_propose = self.total_propose + 1
         return results
 
-    def _add_to_board(self, one_dict):
-        """Add the new record into board.
-
-        :param dict one_dict: Description of parameter `one_dict`.
-
-        """
-        # TODO pandas use contact replace append function
-        self.sieve_board = self.sieve_board.append(one_dict, ignore_index=True)
-
-    def _change_status(self, rung_id, config_id, status):
-        """Change the status of each config.
-
-        :param int rung_id: Description of parameter `rung_id`.
-        :param int config_id: Description of parameter `config_id`.
-        :param type status: Description of parameter `status`.
-        :type enum: StatusType
-
-        """
-        change_df = self.sieve_board.loc[(
-            self.sieve_board['config_id'] == config_id) & (
-            self.sieve_board['rung_id'] == rung_id)]
-        if change_df.empty:
-            tmp_row_data = {'rung_id': rung_id,
-                            'config_id': config_id,
-                            'status': status}
-            self._add_to_board(tmp_row_data)
-        else:
-            self.sieve_board.loc[(
-                self.sieve_board['config_id'] == config_id) & (
-                self.sieve_board['rung_id'] == rung_id), ['status']] = [status]
-
     def _check_completed(self):
         """Check task is completed.
 
@@ -190,11 +146,4 @@ class BO(ShaBase):
         :rtype: bool.
 
         """
-        current_rung_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin(
-                [StatusType.WAITTING, StatusType.RUNNING])
-        ]
-        if current_rung_df.empty and self.total_propose >= self.config_count:
-            return True
-        else:
-            return False
+        return super()._check_completed() and self.total_propose >= self.config_count
@@ -186,12 +186,9 @@ class BOHB(ShaBase):
                 continue
             for i in sha.all_config_dict:
                 x = sha.all_config_dict[i]
-                score_df = sha.sieve_board[sha.sieve_board['config_id'] == i]
-                score_df = score_df[score_df['rung_id'] == current_rung_id]
-                if score_df.empty:
+                y = sha.sieve_board.get_score(current_rung_id, i)
+                if y is None:
                     continue
-                else:
-                    y = float(score_df['score'])
                 self.hp.add(x, y)
         return self.hp
 
@@ -177,13 +177,11 @@ class BOSS(ShaBase):
                     rung_list.append(i)
             for i in ssa.all_config_dict:
                 x = ssa.all_config_dict[i]
-                score_df = ssa.sieve_board[ssa.sieve_board['config_id'] == i]
-                for k in rung_list:
-                    score_df = score_df[score_df['rung_id'] == k]
-                    if score_df.empty:
+                # only the first matched rung is used as the budget of the next iter
+                for k in rung_list[:1]:
+                    y = ssa.sieve_board.get_score(k, i)
+                    if y is None:
                         continue
-                    else:
-                        y = float(score_df['score'])
                     self.hp.add(x, y)
         return self.hp
 
@@ -122,6 +122,29 @@ class RandomPareto(ShaBase):
         self.total_propose = self.total_propose + 1
         return results
 
+    def _add_to_board(self, one_dict):
+        """Add a dict into the multi-object board.
+
+        :param one_dict: config dict like
+        :type one_dict: dict, eg.{'rung_id': 0, 'config_id': i, 'status': StatusType.WAITTING}
+
+        """
+        self.sieve_board = pd.concat([self.sieve_board, pd.DataFrame([one_dict])], ignore_index=True)
+
+    def _change_status(self, rung_id, config_id, status):
+        """Change status in the multi-object board by config id and rung id.
+
+        :param int rung_id: current rung need to update
+        :param int config_id: current config id need to update
+        :param enum status: status from StatusType
+
+        """
+        _key = (self.sieve_board['config_id'] == config_id) & (self.sieve_board['rung_id'] == rung_id)
+        if self.sieve_board.loc[_key].empty:
+            self._add_to_board({'rung_id': rung_id, 'config_id': config_id, 'status': status})
+        else:
+            self.sieve_board.loc[_key, ['status']] = [status]
+
     def _check_completed(self):
         """All sha task completed.
 
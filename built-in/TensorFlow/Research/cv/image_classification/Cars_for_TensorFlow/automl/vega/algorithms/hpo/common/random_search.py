@@ -65,10 +65,7 @@ class RandomSearch(ShaBase):
         :param config_id: config id in broad data frame
         :param score: the best score need to set
         """
-        self.sieve_board.loc[
-            (self.sieve_board['config_id'] == config_id),
-            ['status', 'score']
-        ] = [StatusType.FINISHED, score]
+        self.sieve_board.add_score(0, config_id, score)
 
         if score > self.best_score:
             self.best_config_id = config_id
@@ -82,10 +79,9 @@ class RandomSearch(ShaBase):
 
         :return: dict
         """
-        rung_df = self.sieve_board.loc[(self.sieve_board['status'] == StatusType.WAITTING)]
-        if rung_df.empty:
+        next_config_id = self.sieve_board.min_waiting_config_id(0)
+        if next_config_id is None:
             return None
-        next_config_id = rung_df['config_id'].min(skipna=True)
         results = {
             'config_id': int(next_config_id),
             'configs': self.config_list[int(next_config_id)],
@@ -96,17 +92,3 @@ class RandomSearch(ShaBase):
                             status=StatusType.RUNNING)
         self.total_propose = self.total_propose + 1
         return results
-
-    def _check_completed(self):
-        """Check all sha task completed.
-
-        :return: True/False
-        """
-        current_rung_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin(
-                [StatusType.WAITTING, StatusType.RUNNING])
-        ]
-        if current_rung_df.empty:
-            return True
-        else:
-            return False
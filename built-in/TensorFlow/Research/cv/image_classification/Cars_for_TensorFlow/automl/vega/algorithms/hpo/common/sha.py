@@ -84,10 +84,7 @@ class SHA(ShaBase):
         :param float score: score from evaluation function of this config
 
         """
-        self.sieve_board.loc[
-            (self.sieve_board['config_id'] == config_id) & (self.sieve_board['rung_id'] == rung_id),
-            ['status', 'score']
-        ] = [StatusType.FINISHED, score]
+        self.sieve_board.add_score(rung_id, config_id, score)
 
         if score > self.best_score_dict[rung_id][config_id]:
             self.best_score_dict[rung_id][config_id] = score
@@ -108,11 +105,9 @@ class SHA(ShaBase):
                        'epoch': int}
 
         """
-        rung_df = self.sieve_board.loc[
-            (self.sieve_board['rung_id'] == self.rung_id) & (self.sieve_board['status'] == StatusType.WAITTING)]
-        if rung_df.empty:
+        next_config_id = self.sieve_board.min_waiting_config_id(self.rung_id)
+        if next_config_id is None:
             return None
-        next_config_id = rung_df['config_id'].min(skipna=True)
         results = {
             'config_id': next_config_id,
             'rung_id': self.rung_id,
@@ -207,21 +202,3 @@ class SHA(ShaBase):
                             'status': StatusType.WAITTING}
             self._add_to_board(tmp_row_data)
         return True
-
-    def _check_completed(self):
-        """Check task is completed.
-
-        all rows in board is not RUNNTIN or WATTING, this task is completed
-
-        :return: if the search algorithm is finished.
-        :rtype: bool.
-
-        """
-        current_rung_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin(
-                [StatusType.WAITTING, StatusType.RUNNING])
-        ]
-        if current_rung_df.empty:
-            return True
-        else:
-            return False
@@ -10,8 +10,8 @@
 
 """ShaBase class."""
 import numpy as np
-import pandas as pd
 from .status_type import StatusType
+from .sieve_board import SieveBoard
 
 
 class ShaBase(object):
@@ -41,8 +41,7 @@ class ShaBase(object):
         self.hyperparameter_list = self.get_hyperparameter_space(
             config_count)
 
-        self.sieve_board = pd.DataFrame(
-            columns=['rung_id', 'config_id', 'status', 'score'])
+        self.sieve_board = SieveBoard(eta)
         self.config_dict = {}
         self.best_score_dict = {}
         self.all_config_dict = {}
@@ -91,13 +90,7 @@ class ShaBase(object):
         :return: if this rung finished.
         :rtype: bool.
         """
-        current_rung_df = self.sieve_board.loc[(
-            self.sieve_board['rung_id'] == self.rung_id) & (
-            self.sieve_board['status'].isin([StatusType.WAITTING, StatusType.RUNNING]))]
-        if current_rung_df.empty:
-            return True
-        else:
-            return False
+        return self.sieve_board.count([StatusType.WAITTING, StatusType.RUNNING], self.rung_id) == 0
 
     def _add_to_board(self, one_dict):
         """Add a dict into board.
@@ -106,7 +99,7 @@ class ShaBase(object):
         :type one_dict: dict, eg.{'rung_id': 0, 'config_id': i, 'status': StatusType.WAITTING}
 
         """
-        self.sieve_board = self.sieve_board.append(one_dict, ignore_index=True)
+        self.sieve_board.add(one_dict['rung_id'], one_dict['config_id'], one_dict['status'])
 
     def _change_status(self, rung_id, config_id, status):
         """Change status in board by config id and rung id.
@@ -116,14 +109,12 @@ class ShaBase(object):
         :param enum status: status from StatusType
 
         """
-        change_df = self.sieve_board.loc[
-            (self.sieve_board['config_id'] == config_id) & (
-                self.sieve_board['rung_id'] == rung_id)]
-        if change_df.empty:
-            tmp_row_data = {'rung_id': rung_id,
-                            'config_id': config_id,
-                            'status': status}
-            self._add_to_board(tmp_row_data)
-        else:
-            self.sieve_board.loc[(self.sieve_board['config_id'] == config_id) & (
-                self.sieve_board['rung_id'] == rung_id), ['status']] = [status]
+        self.sieve_board.change_status(rung_id, config_id, status)
+
+    def _check_completed(self):
+        """Check task is completed, all rows in board are not WAITTING or RUNNING.
+
+        :return: if the search algorithm is finished.
+        :rtype: bool.
+        """
+        return self.sieve_board.count([StatusType.WAITTING, StatusType.RUNNING]) == 0
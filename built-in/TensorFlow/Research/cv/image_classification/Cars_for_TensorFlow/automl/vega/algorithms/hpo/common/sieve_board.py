@@ -0,0 +1,283 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""Columnar sieve board shared by the SHA family algorithms.
+
+Each (rung_id, config_id) pair is a row of preallocated NumPy columns, rows
+are found by a dict index. Status counters, a heap of waiting config ids per
+rung and per-rung score heaps holding the top `done // eta` configs keep
+`propose` and `add_score` in O(log n) instead of scanning the whole board.
+Equal scores are ranked by board order.
+"""
+import heapq
+import numpy as np
+import pandas as pd
+from .status_type import StatusType
+
+_DONE = (StatusType.FINISHED, StatusType.PORMOTED)
+
+
+class _RungHeaps(object):
+    """Heaps of one rung, entries of `top` and `rest` are (key1, key2, row, version)."""
+
+    def __init__(self):
+        """Init empty heaps."""
+        self.waiting = []
+        self.top = []
+        self.rest = []
+        self.promotable = []
+        self.top_size = 0
+
+
+class SieveBoard(object):
+    """A preallocated columnar board of (rung_id, config_id, status, score) rows.
+
+    :param int eta: rung base `eta`, top `done // eta` configs of a rung are promotable.
+    :param int capacity: rows to preallocate, doubled when full.
+    """
+
+    def __init__(self, eta=3, capacity=1024):
+        """Init columns, index and heaps."""
+        self.eta = eta
+        self._size = 0
+        self._rung_id = np.zeros(capacity, dtype=np.int32)
+        self._config_id = np.zeros(capacity, dtype=np.int64)
+        self._status = np.zeros(capacity, dtype=np.int8)
+        self._score = np.full(capacity, np.nan, dtype=np.float64)
+        self._best = np.full(capacity, -np.inf, dtype=np.float64)
+        self._version = np.zeros(capacity, dtype=np.int64)
+        self._in_top = np.zeros(capacity, dtype=np.bool_)
+        self._index = {}
+        self._config_rungs = {}
+        self._counts = {}
+        self._rungs = {}
+        self._max_config_id = None
+
+    def __len__(self):
+        """Return the row count."""
+        return self._size
+
+    def _grow(self):
+        """Double the capacity of all columns."""
+        capacity = len(self._rung_id)
+        for name, fill in (('_rung_id', 0), ('_config_id', 0), ('_status', 0), ('_score', np.nan),
+                           ('_best', -np.inf), ('_version', 0), ('_in_top', False)):
+            column = getattr(self, name)
+            extra = np.full(capacity, fill, dtype=column.dtype)
+            setattr(self, name, np.concatenate([column, extra]))
+
+    def _rung(self, rung_id):
+        if rung_id not in self._rungs:
+            self._rungs[rung_id] = _RungHeaps()
+        return self._rungs[rung_id]
+
+    def _count_status(self, rung_id, status, delta):
+        key = (rung_id, status)
+        self._counts[key] = self._counts.get(key, 0) + delta
+        self._counts[(None, status)] = self._counts.get((None, status), 0) + delta
+
+    def _set_status(self, row, status):
+        rung_id = int(self._rung_id[row])
+        old_status = StatusType(self._status[row]) if self._status[row] else None
+        if old_status is not None:
+            self._count_status(rung_id, old_status, -1)
+        self._count_status(rung_id, status, 1)
+        self._status[row] = status.value
+        rung = self._rung(rung_id)
+        if status == StatusType.WAITTING:
+            heapq.heappush(rung.waiting, (int(self._config_id[row]), row))
+        elif status == StatusType.FINISHED and self._in_top[row]:
+            heapq.heappush(rung.promotable, row)
+
+    def add(self, rung_id, config_id, status=StatusType.WAITTING):
+        """Add a new row into board.
+
+        :param int rung_id: rung id of the new row.
+        :param int config_id: config id of the new row.
+        :param status: status of the new row.
+        :type status: StatusType
+        :return: the row number.
+        :rtype: int
+
+        """
+        if self._size == len(self._rung_id):
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._rung_id[row] = rung_id
+        self._config_id[row] = config_id
+        self._index[(rung_id, config_id)] = row
+        self._config_rungs.setdefault(config_id, []).append(rung_id)
+        if self._max_config_id is None or config_id > self._max_config_id:
+            self._max_config_id = config_id
+        self._set_status(row, status)
+        return row
+
+    def exists(self, rung_id, config_id):
+        """Check if the (rung_id, config_id) row is in board."""
+        return (rung_id, config_id) in self._index
+
+    def change_status(self, rung_id, config_id, status):
+        """Change status of a row, add the row if it is not in board.
+
+        :param int rung_id: rung id of the row.
+        :param int config_id: config id of the row.
+        :param status: the new status.
+        :type status: StatusType
+
+        """
+        row = self._index.get((rung_id, config_id))
+        if row is None:
+            self.add(rung_id, config_id, status)
+        else:
+            self._set_status(row, status)
+
+    def add_score(self, rung_id, config_id, score):
+        """Set score of a row and mark it FINISHED, add the row if it is not in board.
+
+        :param int rung_id: rung id of the row.
+        :param int config_id: config id of the row.
+        :param float score: score of the config in this rung.
+
+        """
+        row = self._index.get((rung_id, config_id))
+        was_done = row is not None and StatusType(self._status[row]) in _DONE
+        if row is None:
+            row = self.add(rung_id, config_id, StatusType.FINISHED)
+        else:
+            self._set_status(row, StatusType.FINISHED)
+        self._score[row] = score
+        if not was_done or score > self._best[row]:
+            self._rank(row, score)
+
+    def get_status(self, rung_id, config_id):
+        """Get status of a row, None if the row is not in board."""
+        row = self._index.get((rung_id, config_id))
+        if row is None:
+            return None
+        return StatusType(self._status[row])
+
+    def get_score(self, rung_id, config_id):
+        """Get score of a row, None if the row is not in board or not scored."""
+        row = self._index.get((rung_id, config_id))
+        if row is None or np.isnan(self._score[row]):
+            return None
+        return float(self._score[row])
+
+    def get_rung_ids(self, config_id):
+        """Get all rung ids of a config, in the order added into board."""
+        return self._config_rungs.get(config_id, [])
+
+    def count(self, statuses, rung_id=None):
+        """Count rows with any of `statuses`, in one rung or in the whole board.
+
+        :param list statuses: list of StatusType.
+        :param rung_id: rung id, None means all rungs.
+        :type rung_id: int or None
+        :rtype: int
+
+        """
+        return sum(self._counts.get((rung_id, status), 0) for status in statuses)
+
+    def max_config_id(self):
+        """Return the max config id in board, None if board is empty."""
+        return self._max_config_id
+
+    def min_waiting_config_id(self, rung_id):
+        """Return the min config id with WAITTING status in a rung, None if no one is waiting."""
+        if rung_id not in self._rungs:
+            return None
+        waiting = self._rungs[rung_id].waiting
+        while waiting and self._status[waiting[0][1]] != StatusType.WAITTING.value:
+            heapq.heappop(waiting)
+        if not waiting:
+            return None
+        return waiting[0][0]
+
+    def promotable_config_id(self, rung_id):
+        """Return the first FINISHED config in top `done // eta` configs of a rung.
+
+        The first one is the one added into board first, None if no config is promotable.
+        """
+        if rung_id not in self._rungs:
+            return None
+        promotable = self._rungs[rung_id].promotable
+        while promotable and not self._is_promotable_row(promotable[0]):
+            heapq.heappop(promotable)
+        if not promotable:
+            return None
+        return int(self._config_id[promotable[0]])
+
+    def is_promotable(self, rung_id, config_id):
+        """Check if a config is FINISHED and in top `done // eta` configs of a rung."""
+        row = self._index.get((rung_id, config_id))
+        return row is not None and self._is_promotable_row(row)
+
+    def _is_promotable_row(self, row):
+        return bool(self._in_top[row]) and self._status[row] == StatusType.FINISHED.value
+
+    def _push(self, heap, row, top):
+        self._version[row] += 1
+        score = self._best[row]
+        if top:
+            heapq.heappush(heap, (score, -row, row, int(self._version[row])))
+        else:
+            heapq.heappush(heap, (-score, row, row, int(self._version[row])))
+
+    def _peek(self, heap):
+        while heap and heap[0][3] != self._version[heap[0][2]]:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _move_to_top(self, rung, row):
+        self._in_top[row] = True
+        rung.top_size += 1
+        self._push(rung.top, row, top=True)
+        if self._status[row] == StatusType.FINISHED.value:
+            heapq.heappush(rung.promotable, row)
+
+    def _move_to_rest(self, rung, row):
+        self._in_top[row] = False
+        rung.top_size -= 1
+        self._push(rung.rest, row, top=False)
+
+    def _rank(self, row, score):
+        """Put a scored row into the score heaps of its rung and rebalance the top set."""
+        rung_id = int(self._rung_id[row])
+        rung = self._rung(rung_id)
+        if self._in_top[row]:
+            self._in_top[row] = False
+            rung.top_size -= 1
+        self._best[row] = score
+        self._push(rung.rest, row, top=False)
+        k = self.count(_DONE, rung_id) // self.eta
+        while True:
+            best_rest = self._peek(rung.rest)
+            if best_rest is None:
+                break
+            if rung.top_size < k:
+                heapq.heappop(rung.rest)
+                self._move_to_top(rung, best_rest)
+                continue
+            worst_top = self._peek(rung.top)
+            if worst_top is None or (self._best[best_rest], -best_rest) <= (self._best[worst_top], -worst_top):
+                break
+            heapq.heappop(rung.rest)
+            heapq.heappop(rung.top)
+            self._move_to_rest(rung, worst_top)
+            self._move_to_top(rung, best_rest)
+
+    def to_dataframe(self):
+        """Export board as a pandas DataFrame with columns rung_id, config_id, status and score."""
+        size = self._size
+        return pd.DataFrame({'rung_id': self._rung_id[:size],
+                             'config_id': self._config_id[:size],
+                             'status': [StatusType(status) for status in self._status[:size]],
+                             'score': self._score[:size]})
@@ -96,8 +96,7 @@ class SSA(ShaBase):
         :param float score: score from evaluation function of this config
 
         """
-        self.sieve_board.loc[(self.sieve_board['config_id'] == config_id) & (self.sieve_board['rung_id'] == rung_id),
-                             ['status', 'score']] = [StatusType.FINISHED, score]
+        self.sieve_board.add_score(rung_id, config_id, score)
         if score > self.best_score_dict[rung_id][config_id]:
             self.best_score_dict[rung_id][config_id] = score
         if self._check_rung_finished():
@@ -116,11 +115,9 @@ class SSA(ShaBase):
                        'epoch': int}
 
         """
-        rung_df = self.sieve_board.loc[(self.sieve_board['rung_id'] == self.rung_id) & (
-            self.sieve_board['status'] == StatusType.WAITTING)]
-        if rung_df.empty:
+        next_config_id = self.sieve_board.min_waiting_config_id(self.rung_id)
+        if next_config_id is None:
             return None
-        next_config_id = rung_df['config_id'].min(skipna=True)
         results = {
             'config_id': next_config_id,
             'rung_id': self.rung_id,
@@ -168,20 +165,20 @@ class SSA(ShaBase):
         """
         leader_idx = max(
             self.best_score_dict[self.rung_id].items(), key=operator.itemgetter(1))[0]
-        leader_score_df = self.sieve_board.loc[self.sieve_board['config_id'] == leader_idx]
         score_list = []
         for idx in range(self.config_count):
             current_id = idx + self.start_id
             if current_id == leader_idx:
                 continue
-            score_df = self.sieve_board.loc[self.sieve_board['config_id'] == current_id]
-            rung_max = score_df['rung_id'].max(skipna=True)
+            rung_max = max(self.sieve_board.get_rung_ids(current_id), default=0)
             current_score = 0
             leader_score = 0
             while (rung_max > 0):
-                current_score = score_df[score_df['rung_id'] == rung_max]
-                leader_score = leader_score_df[leader_score_df['rung_id'] == rung_max]
-                if current_score.empty or leader_score.empty:
+                current_score = self.sieve_board.get_score(rung_max, current_id)
+                leader_score = self.sieve_board.get_score(rung_max, leader_idx)
+                if current_score is None or leader_score is None:
+                    current_score = 0
+                    leader_score = 0
                     rung_max = rung_max - 1
                 else:
                     break
@@ -241,21 +238,3 @@ class SSA(ShaBase):
                             'status': StatusType.WAITTING}
             self._add_to_board(tmp_row_data)
         return True
-
-    def _check_completed(self):
-        """Check task is completed.
-
-        all rows in board is not RUNNTIN or WATTING, this task is completed
-
-        :return: if the search algorithm is finished.
-        :rtype: bool.
-
-        """
-        current_rung_df = self.sieve_board.loc[
-            self.sieve_board['status'].isin(
-                [StatusType.WAITTING, StatusType.RUNNING])
-        ]
-        if current_rung_df.empty:
-            return True
-        else:
-            return False
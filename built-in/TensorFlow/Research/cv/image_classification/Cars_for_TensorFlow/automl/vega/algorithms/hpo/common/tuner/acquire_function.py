@@ -25,22 +25,85 @@ def expected_improvement(predictions, best_score):
     """
     if predictions.shape[1] == 1:
         return np.argmax(predictions)
+    e_i = expected_improvement_values(predictions, best_score).round(3)
+
+    rnd = np.random.RandomState(np.random.randint(10000)).rand(len(e_i))
+    ind = np.lexsort((rnd.flatten(), e_i.flatten()))
+    return ind[-1]
+
+
+def expected_improvement_values(predictions, best_score):
+    """Get the Expected Improvement of all predictions.
+
+    :param predictions: array of (label, std) with shape (n, 2).
+    :param best_score: best score, max label is used if it's None.
+    :return: array with shape (n,)
+    """
     p_cdf = norm.cdf
     n_pdf = norm.pdf
 
-    label, std = predictions.T
+    label, std = predictions.T.astype(np.float64)
     if best_score is None:
         best_score = np.max(label)
 
     if np.any(std == 0.0):
         std[std == 0.0] = np.inf
     z_std = (label - best_score) / std
-    e_i = std * (z_std * p_cdf(z_std) + n_pdf(z_std))
-    e_i = e_i.round(3)
+    return std * (z_std * p_cdf(z_std) + n_pdf(z_std))
 
-    rnd = np.random.RandomState(np.random.randint(10000)).rand(len(e_i))
-    ind = np.lexsort((rnd.flatten(), e_i.flatten()))
-    return ind[-1]
+
+def lipschitz_constant(feature, label, max_samples=500):
+    """Estimate the Lipschitz constant of the predicted label by the max slope between sampled points.
+
+    :param feature: normalized features with shape (n, d).
+    :param label: predicted labels with shape (n,).
+    :param int max_samples: max number of points used to estimate.
+    :return: float
+    """
+    feature, label = feature[:max_samples], label[:max_samples]
+    dist = np.sqrt(((feature[:, None, :] - feature[None, :, :]) ** 2).sum(axis=2))
+    diff = np.abs(label[:, None] - label[None, :])
+    mask = dist > 1e-12
+    if not np.any(mask):
+        return 10.
+    lipschitz = np.max(diff[mask] / dist[mask])
+    return lipschitz if lipschitz > 1e-7 else 10.
+
+
+def local_penalization(feature, predictions, best_score, num):
+    """Choose a batch of points by Local Penalization.
+
+    Batch Bayesian Optimization via Local Penalization, AISTATS 2016.
+    The expected improvement of the candidates is computed once, after choosing
+    one point, the acquisition around it is multiplied by the probability that
+    the candidate is out of the ball which can not contain the maximum.
+
+    :param feature: candidates with shape (n, d).
+    :param predictions: array of (label, std) with shape (n, 2), or random scores with shape (n, 1).
+    :param best_score: best score, max label is used if it's None.
+    :param int num: number of points to choose.
+    :return: list of indexes of the chosen candidates.
+    """
+    num = min(num, feature.shape[0])
+    if predictions.shape[1] == 1:
+        return np.argsort(-predictions[:, 0], kind='stable')[:num].tolist()
+    label, std = predictions.T.astype(np.float64)
+    acquisition = expected_improvement_values(predictions, best_score)
+    acquisition = acquisition - acquisition.min() + 1e-12
+    low, high = feature.min(axis=0), feature.max(axis=0)
+    scale = np.where(high > low, high - low, 1.)
+    normalized = (feature - low) / scale
+    lipschitz = lipschitz_constant(normalized, label)
+    max_label = np.max(label) if best_score is None else max(best_score, np.max(label))
+    indexes = []
+    for _ in range(num):
+        index = int(np.argmax(acquisition))
+        indexes.append(index)
+        dist = np.sqrt(((normalized - normalized[index]) ** 2).sum(axis=1))
+        sigma = max(std[index], 1e-12)
+        acquisition = acquisition * norm.cdf((lipschitz * dist - max_label + label[index]) / sigma)
+        acquisition[index] = -np.inf
+    return indexes
 
 
 def thompson_sampling(feature, predictions):
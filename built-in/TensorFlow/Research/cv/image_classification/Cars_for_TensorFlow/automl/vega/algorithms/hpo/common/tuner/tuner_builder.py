@@ -13,7 +13,8 @@ import numpy as np
 import logging
 from vega.core.hyperparameter_space import hp2json
 from .tuner_model import TunerModel
-from .acquire_function import expected_improvement, thompson_sampling
+from .acquire_function import expected_improvement, expected_improvement_values, thompson_sampling, \
+    local_penalization
 
 LOG = logging.getLogger("vega.hpo")
 
@@ -21,16 +22,19 @@ LOG = logging.getLogger("vega.hpo")
 class TunerBuilder(object):
     """A Base class for Tuner."""
 
-    def __init__(self, hyperparameter_space, gridding=False, tuner='GPEI'):
+    def __init__(self, hyperparameter_space, gridding=False, tuner='GPEI', batch_mode='local_penalization'):
         """Init TunerBuilder.
 
         :param hyperparameter_space: [HyperparameterSpace]
         :param gridding:
+        :param batch_mode: how to propose more than one hps of EI tuners, `local_penalization`,
+            `kriging_believer`, or None to repeat the single proposal.
         """
         self.min_count_score = 1
         self.hyperparameter_space = hyperparameter_space
         self.hyperparameter_list = hyperparameter_space.get_hyperparameters()
         self.tuner = tuner
+        self.batch_mode = batch_mode
         self._init_model(tuner)
         self._best_score = -1 * float('inf')
         self._best_hyperparams = None
@@ -155,6 +159,16 @@ class TunerBuilder(object):
                     params_list.append(param)
             LOG.info('Finish to griding hyper-parameters, number=%s',
                      len(params_list))
+        elif num > 1 and self.batch_mode and self._ei_best_score() is not False:
+            parameters = self.hyperparameter_space.get_sample_space(
+                gridding=self.grid, n=max(1000, 100 * num))
+            if parameters is None:
+                LOG.error(
+                    'Sample space of HyperparameterSpace acquire failed, ds=%s',
+                    self.hyperparameter_space.get_hyperparameter_names())
+                return None
+            for index in self._batch_acquire(parameters, num):
+                params_list.append(self.hyperparameter_space.inverse_transform(parameters[index, :]))
         else:
             for _ in range(num):
                 parameters = self.hyperparameter_space.get_sample_space(
@@ -179,6 +193,55 @@ class TunerBuilder(object):
         """
         return self.model.predict(feature)
 
+    def _ei_best_score(self):
+        """Get the best score used by expected improvement, None means the max prediction.
+
+        :return: False if the tuner doesn't use expected improvement.
+        """
+        if 'GPEI' in self.tuner:
+            return None
+        elif ('EI' in self.tuner) | ('SMAC' == self.tuner) | ('TPE' in self.tuner):
+            return self._best_score
+        return False
+
+    def _batch_acquire(self, parameters, num):
+        """Choose `num` diverse candidates from one sample space in a batch.
+
+        :param parameters: [np.array] sample space with shape (n, d)
+        :param num: int, number of candidates to choose.
+        :return: list of indexes of parameters
+        """
+        best_score = self._ei_best_score()
+        predictions = self.predict(parameters)
+        if self.batch_mode == 'local_penalization':
+            return local_penalization(parameters, predictions, best_score, num)
+        elif self.batch_mode == 'kriging_believer':
+            return self._kriging_believer(parameters, predictions, best_score, num)
+        raise ValueError("Batch mode not exist, name={}".format(self.batch_mode))
+
+    def _kriging_believer(self, parameters, predictions, best_score, num):
+        """Choose candidates one by one, refit model with the predicted label of chosen candidates as fake labels.
+
+        The model is refit with the real labels at the end.
+        """
+        if predictions.shape[1] == 1 or self.feature.size == 0:
+            return local_penalization(parameters, predictions, best_score, num)
+        indexes = []
+        feature, label = self.feature, self.label
+        try:
+            for _ in range(min(num, parameters.shape[0])):
+                e_i = expected_improvement_values(predictions, best_score)
+                e_i[indexes] = -np.inf
+                index = int(np.argmax(e_i))
+                indexes.append(index)
+                feature = np.vstack((feature, parameters[index:index + 1]))
+                label = np.append(label, predictions[index, 0])
+                self.model.fit(feature, label)
+                predictions = self.predict(parameters)
+        finally:
+            self.model.fit(self.feature, self.label)
+        return indexes
+
     def acquire_function(self, predictions):
         """Acquire_function.
 
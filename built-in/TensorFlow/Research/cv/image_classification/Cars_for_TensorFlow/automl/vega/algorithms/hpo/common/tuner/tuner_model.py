@@ -91,13 +91,13 @@ class TunerModel(object):
             return np.random.rand(feature.shape[0], 1)
         elif 'GP' in self.model_name:
             label, std = self.model.predict(feature, return_std=True)
-            return np.array(list(zip(label, std)))
+            return np.column_stack((label, std))
         elif 'SMAC' in self.model_name:
             label, std = self.model.predict(feature)
-            return np.array(list(zip(label, std)))
+            return np.column_stack((label, std))
         elif 'TPE' in self.model_name:
             label, std = self.model.predict(feature)
-            return np.array(list(zip(label, std)))
+            return np.column_stack((label, std))
         elif 'RandSearch' in self.model_name:
             return np.random.rand(feature.shape[0], 1)
         else:
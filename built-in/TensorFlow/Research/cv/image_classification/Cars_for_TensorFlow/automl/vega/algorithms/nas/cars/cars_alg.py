@@ -20,13 +20,14 @@ from vega.core.common import Config
 from vega.algorithms.nas.darts_cnn import DartsNetworkTemplateConfig
 from vega.core.common.class_factory import ClassFactory, ClassType
 from vega.search_space.search_algs import SearchAlgorithm
+from vega.core.metrics import CostModel
 from vega.core.report.nsga_iii import SortAndSelectPopulation
 from .nsga3 import CARS_NSGA
-from .utils import eval_model_parameters
 
 if vega.is_torch_backend():
     import torch
     from vega.core.metrics.pytorch import Metrics
+    from .population_evaluator import PopulationEvaluator, subset_loader
 elif vega.is_tf_backend():
     import tensorflow as tf
     from vega.core.metrics.tensorflow import Metrics
@@ -56,6 +57,8 @@ class CARSAlgorithm(SearchAlgorithm):
         self.completed = False
         self.trainer = None
         self.alg_policy = None
+        self.valid_subset_loader = None
+        self.cost_model = None
 
     def set_model(self, model):
         """Set model."""
@@ -151,8 +154,12 @@ class CARSAlgorithm(SearchAlgorithm):
                 offsprings = self.gen_offspring(alphas)
                 alphas = np.concatenate((alphas, offsprings), axis=0)
                 # calculate fitness (accuracy) and #parameters
+                if vega.is_torch_backend():
+                    pfms = self.search_infer_population(alphas)
+                else:
+                    pfms = [self.search_infer_step(alpha) for alpha in alphas]
                 for i in range(int(alg_policy.num_individual * (1 + alg_policy.expand))):
-                    pfm = self.search_infer_step(alphas[i])
+                    pfm = pfms[i]
                     fitness[i] = pfm.get(self.config.objective_keys)
                     model_sizes[i] = pfm.get('kparams')
                     genotypes.append(self.genotype_namedtuple(alphas[i]))
@@ -194,6 +201,8 @@ class CARSAlgorithm(SearchAlgorithm):
                 self.save_genotypes(genotype_keep, np.array(fitness_keep), np.array(size_keep),
                                     'genotype_keep_{}.txt'.format(ga_epoch))
                 alphas = alphas[keep].copy()
+                if self.cost_model is not None:
+                    self.cost_model.save()
                 self._broadcast(selected_genotypes, selected_acc)
                 logging.info('############## End update alpha ############')
         return alphas
@@ -227,13 +236,37 @@ class CARSAlgorithm(SearchAlgorithm):
             eval_results = self.trainer.estimator.evaluate(input_fn=self.trainer.valid_loader.input_fn,
                                                            steps=len(self.trainer.valid_loader))
             metrics.update(eval_results)
+        return self._performance(metrics, self.eval_model_sizes(alpha))
+
+    def search_infer_population(self, alphas):
+        """Infer all the individuals in search stage, each validation batch is loaded once.
+
+        :param alphas: encoding of the models
+        :type alphas: array
+        :return: performance of each individual
+        :rtype: list
+        """
+        policy = self.alg_policy if self.alg_policy is not None else self.config.policy
+        loader = self.trainer.valid_loader
+        if policy.eval_subset:
+            if self.valid_subset_loader is None:
+                self.valid_subset_loader = subset_loader(loader, policy.eval_subset)
+            loader = self.valid_subset_loader
+        model_sizes = [self.eval_model_sizes(alpha) for alpha in alphas]
+        evaluator = PopulationEvaluator(self.trainer.model, loader, Metrics, keep=policy.num_individual,
+                                        prune_confidence=policy.prune_confidence,
+                                        min_samples=policy.prune_min_samples, nsga_method=policy.nsga_method)
+        metrics, _ = evaluator.evaluate(alphas, model_sizes)
+        return [self._performance(m, size) for m, size in zip(metrics, model_sizes)]
+
+    def _performance(self, metrics, model_size):
         performance = metrics.results
         objectives = metrics.objectives
         # support min
         for key, mode in objectives.items():
             if mode == 'MIN':
                 performance[key] = -1 * performance[key]
-        performance.update({'kparams': self.eval_model_sizes(alpha)})
+        performance.update({'kparams': model_size})
         return performance
 
     def select_first_pareto_front(self, fitness, obj, genotypes):
@@ -454,10 +487,6 @@ class CARSAlgorithm(SearchAlgorithm):
         :return: The number of parameters
         :rtype: Float
         """
-        if vega.is_torch_backend():
-            from vega.search_space.networks.pytorch import CARSDartsNetwork
-        elif vega.is_tf_backend():
-            from vega.search_space.networks.tensorflow import CARSDartsNetwork
         normal = alpha[:self.len_alpha]
         reduce = alpha[self.len_alpha:]
         child_desc = self.codec.calc_genotype([normal, reduce])
@@ -465,9 +494,12 @@ class CARSAlgorithm(SearchAlgorithm):
         child_cfg.search = False
         child_cfg.normal.genotype = child_desc[0]
         child_cfg.reduce.genotype = child_desc[1]
-        net = CARSDartsNetwork(child_cfg)
-        model_size = eval_model_parameters(net)
-        return model_size
+        # the size is computed from the desc on both backends, the auxiliary head is not counted
+        if self.cost_model is None:
+            self.cost_model = CostModel(os.path.join(self.local_output_path, 'cost_table.json'))
+        child_cfg.auxiliary = False
+        _, params = self.cost_model.estimate(child_cfg)
+        return params / 1e6
 
     def genotype_namedtuple(self, alpha):
         """Obtain genotype.
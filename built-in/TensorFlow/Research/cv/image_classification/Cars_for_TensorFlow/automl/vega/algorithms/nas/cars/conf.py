@@ -27,6 +27,11 @@ class CARSPolicyConfig(EAConfig):
     pareto_model_num = 4
     arch_optim = dict(type='Adam', lr=3.0e-4, betas=[0.5, 0.999], weight_decay=1.0e-3)
     criterion = dict(type='CrossEntropyLoss')
+    # validation samples of the population, a fixed subset stratified by label, 0 for the whole valid set
+    eval_subset = 0
+    # z of the accuracy confidence interval to stop evaluating dominated individuals, 0 disables
+    prune_confidence = 0.
+    prune_min_samples = 1000
 
 
 class CARSConfig(object):
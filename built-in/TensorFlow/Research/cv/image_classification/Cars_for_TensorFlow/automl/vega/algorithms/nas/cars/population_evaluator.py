@@ -0,0 +1,157 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""Evaluate a population of the super network on shared validation batches."""
+import logging
+import numpy as np
+import torch
+import torch.utils.data as torch_data
+
+
+def stratified_indices(labels, size, seed=0):
+    """Indices of `size` samples with the label proportions of `labels`.
+
+    :param labels: label of each sample
+    :type labels: list or np.ndarray
+    :param size: number of the samples to select
+    :type size: int
+    :param seed: seed of the selection in each label
+    :type seed: int
+    :return: sorted indices in `labels`
+    :rtype: np.ndarray
+    """
+    labels = np.asarray(labels)
+    if size >= len(labels):
+        return np.arange(len(labels))
+    rng = np.random.RandomState(seed)
+    classes, counts = np.unique(labels, return_counts=True)
+    quotas = counts * size / len(labels)
+    sizes = np.floor(quotas).astype(int)
+    # the remaining samples go to the labels with the largest fractions
+    for index in np.argsort(sizes - quotas)[:size - sizes.sum()]:
+        sizes[index] += 1
+    indices = [rng.permutation(np.where(labels == label)[0])[:n] for label, n in zip(classes, sizes)]
+    return np.sort(np.concatenate(indices))
+
+
+def subset_loader(loader, size, seed=0):
+    """Loader of a fixed subset of the samples of `loader`, stratified by label.
+
+    The samples are those of the sampler of `loader` if it has indices, and the
+    labels are read from `dataset.targets`, or from the dataset items once.
+    """
+    dataset = loader.dataset
+    candidates = np.asarray(getattr(loader.sampler, 'indices', range(len(dataset))))
+    targets = getattr(dataset, 'targets', None)
+    if targets is not None:
+        labels = np.asarray(targets)[candidates]
+    else:
+        labels = np.array([int(dataset[index][1]) for index in candidates])
+    indices = candidates[stratified_indices(labels, size, seed)]
+    return torch_data.DataLoader(torch_data.Subset(dataset, indices.tolist()), batch_size=loader.batch_size,
+                                 shuffle=False, num_workers=loader.num_workers, pin_memory=loader.pin_memory)
+
+
+def wilson_interval(correct, total, z):
+    """Lower and upper bounds of the Wilson score interval of an accuracy."""
+    p = correct / total
+    denominator = 1 + z ** 2 / total
+    center = (p + z ** 2 / (2 * total)) / denominator
+    half = z * np.sqrt(p * (1 - p) / total + z ** 2 / (4 * total ** 2)) / denominator
+    return center - half, center + half
+
+
+class PopulationEvaluator(object):
+    """Evaluate every individual of a population on each validation batch.
+
+    The batches are loaded and moved to the device once per generation instead
+    of once per individual. With `prune_confidence`, an individual stops being
+    evaluated once `keep` others have a top-1 accuracy larger with confidence
+    and a model size no larger, so it can not be selected among the best `keep`.
+    CARS-NSGA also sorts on the accuracy and the inverse model size, so with
+    `nsga_method` 'cars_nsga' the `keep` others are also needed with a model
+    size no smaller.
+
+    :param model: super network called as `model(input, alpha)`
+    :type model: nn.Module
+    :param loader: validation loader
+    :type loader: DataLoader
+    :param metrics_fn: function which returns new metrics called as `metrics(logits, target)`
+    :type metrics_fn: callable
+    :param keep: number of the individuals which are selected
+    :type keep: int
+    :param prune_confidence: z of the confidence interval of the accuracy, 0 evaluates all on all batches
+    :type prune_confidence: float
+    :param min_samples: samples evaluated before any individual is pruned
+    :type min_samples: int
+    :param nsga_method: selection of the individuals, 'nsga3' or 'cars_nsga'
+    :type nsga_method: str
+    """
+
+    def __init__(self, model, loader, metrics_fn, keep=1, prune_confidence=0., min_samples=1000,
+                 nsga_method='cars_nsga'):
+        self.model = model
+        self.loader = loader
+        self.metrics_fn = metrics_fn
+        self.keep = keep
+        self.prune_confidence = prune_confidence
+        self.min_samples = min_samples
+        self.nsga_method = nsga_method
+
+    def evaluate(self, alphas, sizes=None):
+        """Evaluate the individuals.
+
+        :param alphas: encoding of each individual
+        :type alphas: np.ndarray
+        :param sizes: model size of each individual, used by the pruning
+        :type sizes: list or np.ndarray
+        :return: metrics of each individual, and the number of the samples it is evaluated on
+        :rtype: list, np.ndarray
+        """
+        device = next(self.model.parameters()).device
+        alpha_tensors = [torch.from_numpy(alpha).to(device) for alpha in alphas]
+        sizes = np.zeros(len(alphas)) if sizes is None else np.asarray(sizes)
+        metrics = [self.metrics_fn() for _ in alphas]
+        correct = np.zeros(len(alphas))
+        samples = np.zeros(len(alphas), dtype=int)
+        active = np.ones(len(alphas), dtype=bool)
+        self.model.eval()
+        with torch.no_grad():
+            for input, target in self.loader:
+                input = input.to(device, non_blocking=True)
+                target = target.to(device, non_blocking=True)
+                for i in np.where(active)[0]:
+                    logits = self.model(input, alpha_tensors[i])
+                    metrics[i](logits, target)
+                    if self.prune_confidence:
+                        output = logits[0] if isinstance(logits, (tuple, list)) else logits
+                        correct[i] += (output.argmax(dim=1) == target).sum().item()
+                samples[active] += target.size(0)
+                if self.prune_confidence and samples.max() >= self.min_samples:
+                    active &= ~self._dominated(correct, samples, sizes, active)
+        pruned = np.where(~active)[0]
+        if len(pruned):
+            logging.info("Pruned %d of %d individuals after %s samples", len(pruned), len(alphas),
+                         samples[pruned].tolist())
+        return metrics, samples
+
+    def _dominated(self, correct, samples, sizes, active):
+        """Active individuals which `keep` others dominate with confidence."""
+        total = max(samples.max(), 1)
+        lower, upper = wilson_interval(correct[active], total, self.prune_confidence)
+        active_sizes = sizes[active]
+        larger = lower[None, :] > upper[:, None]
+        dominators = (larger & (active_sizes[None, :] <= active_sizes[:, None])).sum(axis=1)
+        if self.nsga_method == 'cars_nsga':
+            inverse_dominators = (larger & (active_sizes[None, :] >= active_sizes[:, None])).sum(axis=1)
+            dominators = np.minimum(dominators, inverse_dominators)
+        dominated = np.zeros(len(active), dtype=bool)
+        dominated[np.where(active)[0]] = dominators >= self.keep
+        return dominated
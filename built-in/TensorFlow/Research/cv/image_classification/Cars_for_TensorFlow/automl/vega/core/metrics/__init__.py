@@ -1 +1,2 @@
 from .flops_and_params import calc_model_flops_params
+from .cost_model import CostModel
@@ -0,0 +1,404 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""Analytic FLOPs and parameters of the networks of the search spaces.
+
+The cost of a network desc is computed from the layer shapes alone, without
+instantiating any module, with the counting rules of thop which are used by
+`calc_model_flops_params`: a batch of 1, the MACs of conv, linear, norm, avg
+pooling and upsample layers, and none for activations, max pooling and the
+element-wise operations. The cost of each block is memoized by its type and
+shapes in a table, kept in a json file when a path is given.
+"""
+import json
+import logging
+import os
+import tempfile
+
+_NETWORKS = {}
+
+
+def register_network(*names):
+    """Register the cost function of the networks `names`.
+
+    The function is called as `fn(cost_model, counter, module_desc, input_shape)`
+    and returns the output shape.
+    """
+    def wrapper(fn):
+        for name in names:
+            _NETWORKS[name] = fn
+        return fn
+    return wrapper
+
+
+def _pair(value):
+    return tuple(value) if isinstance(value, (list, tuple)) else (value, value)
+
+
+def conv_out_size(size, kernel, stride=1, padding=0, dilation=1):
+    """Output size of a conv or pooling along one dim."""
+    return (size + 2 * padding - dilation * (kernel - 1) - 1) // stride + 1
+
+
+class LayerCounter(object):
+    """Sum of the thop MACs and the parameters of layers, for a batch of 1.
+
+    The shapes are (channels, height, width) and each layer returns its output shape.
+    """
+
+    def __init__(self):
+        self.flops = 0
+        self.params = 0
+
+    def conv(self, shape, out_channels, kernel, stride=1, padding=0, dilation=1, groups=1, bias=False):
+        """Conv2d."""
+        channels, height, width = shape
+        kernel, stride, padding, dilation = _pair(kernel), _pair(stride), _pair(padding), _pair(dilation)
+        out_shape = (out_channels,
+                     conv_out_size(height, kernel[0], stride[0], padding[0], dilation[0]),
+                     conv_out_size(width, kernel[1], stride[1], padding[1], dilation[1]))
+        weights = (channels // groups) * kernel[0] * kernel[1]
+        self.flops += out_channels * out_shape[1] * out_shape[2] * weights
+        self.params += out_channels * weights + (out_channels if bias else 0)
+        return out_shape
+
+    def batch_norm(self, shape, affine=True):
+        """BatchNorm2d."""
+        self.flops += shape[0] * shape[1] * shape[2] * (4 if affine else 2)
+        self.params += 2 * shape[0] if affine else 0
+        return shape
+
+    def avg_pool(self, shape, kernel, stride, padding=0):
+        """AvgPool2d."""
+        out_shape = (shape[0], conv_out_size(shape[1], kernel, stride, padding),
+                     conv_out_size(shape[2], kernel, stride, padding))
+        self.flops += out_shape[0] * out_shape[1] * out_shape[2]
+        return out_shape
+
+    def max_pool(self, shape, kernel, stride, padding=0):
+        """MaxPool2d."""
+        return (shape[0], conv_out_size(shape[1], kernel, stride, padding),
+                conv_out_size(shape[2], kernel, stride, padding))
+
+    def global_avg_pool(self, shape):
+        """AdaptiveAvgPool2d to 1x1."""
+        self.flops += (shape[1] * shape[2] + 1) * shape[0]
+        return (shape[0], 1, 1)
+
+    def linear(self, in_features, out_features):
+        """Linear of a flattened input."""
+        self.flops += in_features * out_features
+        self.params += in_features * out_features + out_features
+        return (out_features,)
+
+    def upsample(self, shape, scale):
+        """Bilinear Upsample."""
+        out_shape = (shape[0], shape[1] * scale, shape[2] * scale)
+        self.flops += 11 * out_shape[0] * out_shape[1] * out_shape[2]
+        return out_shape
+
+
+class CostModel(object):
+    """FLOPs and parameters of network descs, with the cost of the blocks memoized.
+
+    :param table_file: json file of the memo table, shared by the searches which use the same file.
+    :type table_file: str or None
+    """
+
+    def __init__(self, table_file=None):
+        self.table_file = table_file
+        self.table = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def estimate(self, desc, input_shape=None):
+        """FLOPs and parameters of a network desc in the units of `calc_model_flops_params`.
+
+        :param desc: network desc with `modules`, or the desc of one module
+        :type desc: dict
+        :param input_shape: (channels, height, width) of the input, default of the network if None
+        :type input_shape: tuple or None
+        :return: flops and params
+        :rtype: float, int
+        """
+        counter = LayerCounter()
+        shape = tuple(input_shape) if input_shape is not None else None
+        module_descs = [desc[name] for name in desc['modules']] if 'modules' in desc else [desc]
+        for module_desc in module_descs:
+            name = module_desc.get('name', module_desc.get('type'))
+            if name not in _NETWORKS:
+                raise KeyError('no cost model of network {}'.format(name))
+            shape = _NETWORKS[name](self, counter, module_desc, shape)
+        return counter.flops * 0.5, counter.params
+
+    def block(self, counter, key, build):
+        """Add the cost of a block to `counter`, memoized by `key`.
+
+        :param key: json serializable type and shapes of the block
+        :param build: function which adds the layers of the block to a counter and returns the output shape
+        :return: output shape of the block
+        """
+        key = json.dumps(key, separators=(',', ':'))
+        record = self.table.get(key)
+        if record is None:
+            self.misses += 1
+            block_counter = LayerCounter()
+            shape = build(block_counter)
+            record = [block_counter.flops, block_counter.params, list(shape)]
+            self.table[key] = record
+        else:
+            self.hits += 1
+        counter.flops += record[0]
+        counter.params += record[1]
+        return tuple(record[2])
+
+    def save(self):
+        """Merge the memo table into the table file."""
+        if not self.table_file:
+            return
+        table = self._load()
+        table.update(self.table)
+        folder = os.path.dirname(os.path.abspath(self.table_file))
+        fd, tmp_file = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(table, f)
+        os.replace(tmp_file, self.table_file)
+        self.table = table
+
+    def _load(self):
+        if not self.table_file or not os.path.isfile(self.table_file):
+            return {}
+        try:
+            with open(self.table_file) as f:
+                return json.load(f)
+        except ValueError:
+            logging.warning("Ignore the broken cost table %s", self.table_file)
+            return {}
+
+
+def _relu_conv_bn(counter, shape, out_channels, affine):
+    shape = counter.conv(shape, out_channels, 1)
+    return counter.batch_norm(shape, affine)
+
+
+def _factorized_reduce(counter, shape, out_channels, affine):
+    out_shape = counter.conv(shape, out_channels // 2, 1, stride=2)
+    counter.conv((shape[0], shape[1] - 1, shape[2] - 1), out_channels // 2, 1, stride=2)
+    return counter.batch_norm((out_channels,) + out_shape[1:], affine)
+
+
+def _none(counter, shape, stride, affine):
+    return (shape[0], (shape[1] - 1) // stride + 1, (shape[2] - 1) // stride + 1)
+
+
+def _skip_connect(counter, shape, stride, affine):
+    return shape if stride == 1 else _factorized_reduce(counter, shape, shape[0], affine)
+
+
+def _avg_pool_3x3(counter, shape, stride, affine):
+    return counter.avg_pool(shape, 3, stride, 1)
+
+
+def _max_pool_3x3(counter, shape, stride, affine):
+    return counter.max_pool(shape, 3, stride, 1)
+
+
+def _sep_conv(kernel):
+    def sep_conv(counter, shape, stride, affine):
+        channels = shape[0]
+        shape = counter.conv(shape, channels, kernel, stride, kernel // 2, groups=channels)
+        shape = counter.conv(shape, channels, 1)
+        shape = counter.batch_norm(shape, affine)
+        shape = counter.conv(shape, channels, kernel, 1, kernel // 2, groups=channels)
+        shape = counter.conv(shape, channels, 1)
+        return counter.batch_norm(shape, affine)
+    return sep_conv
+
+
+def _dil_conv(kernel):
+    def dil_conv(counter, shape, stride, affine):
+        channels = shape[0]
+        shape = counter.conv(shape, channels, kernel, stride, kernel - 1, dilation=2, groups=channels)
+        shape = counter.conv(shape, channels, 1)
+        return counter.batch_norm(shape, affine)
+    return dil_conv
+
+
+def _conv_7x1_1x7(counter, shape, stride, affine):
+    shape = counter.conv(shape, shape[0], (1, 7), (1, stride), (0, 3))
+    shape = counter.conv(shape, shape[0], (7, 1), (stride, 1), (3, 0))
+    return counter.batch_norm(shape, affine)
+
+
+DARTS_OPS = {
+    'none': _none,
+    'avg_pool_3x3': _avg_pool_3x3,
+    'max_pool_3x3': _max_pool_3x3,
+    'skip_connect': _skip_connect,
+    'sep_conv_3x3': _sep_conv(3),
+    'sep_conv_5x5': _sep_conv(5),
+    'sep_conv_7x7': _sep_conv(7),
+    'dil_conv_3x3': _dil_conv(3),
+    'dil_conv_5x5': _dil_conv(5),
+    'conv_7x1_1x7': _conv_7x1_1x7,
+}
+
+
+def _darts_op(cost_model, counter, name, shape, stride, search):
+    def build(block_counter):
+        out_shape = DARTS_OPS[name](block_counter, shape, stride, not search)
+        if search and 'pool' in name:
+            block_counter.batch_norm(out_shape, False)
+        return out_shape
+    return cost_model.block(counter, ['darts_op', name, shape, stride, search], build)
+
+
+def _darts_cell(cost_model, counter, cell_desc, shape0, shape1, channels, reduction, reduction_prev):
+    genotype = [list(gene) for gene in cell_desc['genotype']]
+    concat = list(cell_desc['concat'])
+    search = isinstance(genotype[0][0], list)
+
+    def build(block_counter):
+        if reduction_prev:
+            state0 = _factorized_reduce(block_counter, shape0, channels, not search)
+        else:
+            state0 = _relu_conv_bn(block_counter, shape0, channels, not search)
+        states = {0: state0, 1: _relu_conv_bn(block_counter, shape1, channels, not search)}
+        for op_names, index_out, index_in in genotype:
+            stride = 2 if reduction and index_in < 2 else 1
+            for name in (op_names if search else [op_names]):
+                states[index_out] = _darts_op(cost_model, block_counter, name, states[index_in], stride, search)
+        return (channels * len(concat),) + states[concat[0]][1:]
+
+    key = ['darts_cell', genotype, concat, shape0, shape1, channels, reduction, reduction_prev]
+    return cost_model.block(counter, key, build)
+
+
+def _darts_stem(counter, stem, channels, shape):
+    if stem == 'PreOneStem':
+        shape = counter.batch_norm(counter.conv(shape, 3 * channels, 3, 1, 1))
+        return shape, shape
+    elif stem == 'PreTwoStem':
+        shape = counter.batch_norm(counter.conv(shape, channels // 2, 3, 2, 1))
+        shape0 = counter.batch_norm(counter.conv(shape, channels, 3, 2, 1))
+        shape1 = counter.batch_norm(counter.conv(shape0, channels, 3, 2, 1))
+        return shape0, shape1
+    raise KeyError('no cost model of stem {}'.format(stem))
+
+
+def _darts_auxiliary_head(counter, shape, num_classes, input_size):
+    shape = counter.avg_pool(shape, 5, input_size - 5)
+    shape = counter.batch_norm(counter.conv(shape, 128, 1))
+    counter.batch_norm(counter.conv(shape, 768, 2))
+    counter.linear(768, num_classes)
+
+
+@register_network('DartsNetwork', 'CARSDartsNetwork')
+def _darts_network(cost_model, counter, desc, shape):
+    network = desc['network']
+    channels = desc['init_channels']
+    search = desc.get('search', False)
+    auxiliary = desc.get('auxiliary', False) and not search
+    shape = shape or (3, desc['input_size'], desc['input_size'])
+    # the stem block keeps the shapes of its two outputs in one
+    stem_shapes = cost_model.block(
+        counter, ['darts_stem', network[0], channels, shape],
+        lambda block_counter: sum(_darts_stem(block_counter, network[0], channels, shape), ()))
+    shape0, shape1 = stem_shapes[:3], stem_shapes[3:]
+    reduction_prev = channels == shape1[0]
+    aux_shape = None
+    for index, name in enumerate(network[1:]):
+        reduction = name == 'reduce'
+        if reduction:
+            channels *= 2
+        shape0, shape1 = shape1, _darts_cell(cost_model, counter, desc[name], shape0, shape1, channels,
+                                             reduction, reduction_prev)
+        reduction_prev = reduction
+        if auxiliary and index == desc['auxiliary_layer']:
+            aux_shape = shape1
+    if aux_shape is not None:
+        _darts_auxiliary_head(counter, aux_shape, desc['num_classes'], desc['aux_size'])
+    shape = counter.global_avg_pool(shape1)
+    return counter.linear(shape[0], desc['num_classes'])
+
+
+def _basic_block(counter, shape, out_channels, stride):
+    out_shape = counter.batch_norm(counter.conv(shape, out_channels, 3, stride, 1))
+    out_shape = counter.batch_norm(counter.conv(out_shape, out_channels, 3, 1, 1))
+    if stride != 1 or shape[0] != out_channels:
+        counter.batch_norm(counter.conv(shape, out_channels, 1, stride))
+    return out_shape
+
+
+def _bottleneck_block(counter, shape, out_channels, stride):
+    out_shape = counter.batch_norm(counter.conv(shape, out_channels, 1))
+    out_shape = counter.batch_norm(counter.conv(out_shape, out_channels, 3, stride, 1))
+    out_shape = counter.batch_norm(counter.conv(out_shape, out_channels * 4, 1))
+    if stride != 1 or shape[0] != out_channels * 4:
+        counter.batch_norm(counter.conv(shape, out_channels * 4, 1, stride))
+    return out_shape
+
+
+RESNET_BLOCKS = {18: ('basic', 1), 34: ('basic', 1), 50: ('bottleneck', 4), 101: ('bottleneck', 4)}
+
+
+@register_network('ResNetVariant')
+def _resnet_variant(cost_model, counter, desc, shape):
+    block_name, expansion = RESNET_BLOCKS[int(desc['base_depth'])]
+    build_block = _basic_block if block_name == 'basic' else _bottleneck_block
+    channels = int(desc['base_channel'])
+    shape = shape or (3, 32, 32)
+    shape = cost_model.block(
+        counter, ['resnet_init', channels, shape],
+        lambda block_counter: block_counter.batch_norm(block_counter.conv(shape, channels, 3, 1, 1)))
+    for double, downsample in zip(desc['doublechannel'], desc['downsample']):
+        channels = channels * 2 if double else channels
+        stride = 2 if downsample else 1
+        shape = cost_model.block(
+            counter, ['resnet_' + block_name, shape, channels, stride],
+            lambda block_counter: build_block(block_counter, shape, channels, stride))
+    return shape
+
+
+@register_network('LinearClassificationHead')
+def _linear_classification_head(cost_model, counter, desc, shape):
+    if shape is not None:
+        counter.global_avg_pool(shape)
+    return counter.linear(desc['base_channel'], desc['num_classes'])
+
+
+def _residual_block(counter, shape, kernel):
+    out_shape = counter.conv(shape, shape[0], kernel, 1, kernel // 2, bias=True)
+    return counter.conv(out_shape, shape[0], kernel, 1, (kernel - 1) // 2, bias=True)
+
+
+SR_BLOCKS = {'res2': 2, 'res3': 3}
+
+
+@register_network('MtMSR')
+def _mtm_sr(cost_model, counter, desc, shape):
+    if shape is None:
+        raise ValueError('the input shape of MtMSR is required')
+    upscale = desc['upscale']
+    image_shape = counter.conv(shape, 3, 1, bias=True)
+    shape = (desc['in_channel'],) + image_shape[1:]
+    for block in desc['blocks']:
+        names = block if isinstance(block, list) else [block]
+        for name in names:
+            shape = cost_model.block(counter, ['sr_' + name, shape],
+                                     lambda block_counter: _residual_block(block_counter, shape, SR_BLOCKS[name]))
+        shape = (shape[0] * len(names),) + shape[1:]
+    channels = desc['out_channel'] * upscale ** 2
+    shape = cost_model.block(
+        counter, ['sr_tail', shape, channels],
+        lambda block_counter: block_counter.conv(shape, channels, 3, 1, 1, bias=True))
+    shape = (desc['out_channel'], shape[1] * upscale, shape[2] * upscale)
+    counter.upsample(image_shape, upscale)
+    return counter.conv(shape, 3, 1, bias=True)
@@ -13,6 +13,7 @@ import torch
 import numpy as np
 import cv2
 import math
+import torch.nn.functional as F
 from vega.core.metrics.pytorch.metrics import MetricBase
 from vega.core.common.class_factory import ClassFactory, ClassType
 
@@ -200,6 +201,101 @@ def preprocess(tensor, to_y=True, crop_border=0):
     return tensor
 
 
+def crop_tensor_border(tensor, crop_border):
+    """Remove the border of the images of a 4D or 5D tensor, with the border size of crop_border.
+
+    :param tensor: tensor of BCHW or BCHWT
+    :type tensor: torch.Tensor
+    :param crop_border: the size of border to be removed
+    :type crop_border: int
+    :return: croped tensor
+    :rtype: torch.Tensor
+    """
+    if crop_border == 0:
+        return tensor
+    return tensor[:, :, crop_border:-crop_border, crop_border:-crop_border]
+
+
+def tensor_bgr_to_y(tensor):
+    """Convert bgr images of a 4D or 5D tensor to grayscale, the same coefficients as bgr_to_y.
+
+    :param tensor: tensor of BCHW or BCHWT, and channels are in bgr
+    :type tensor: torch.Tensor
+    :return: tensor of B1HW or B1HWT
+    :rtype: torch.Tensor
+    """
+    coef = torch.tensor([25.064, 129.057, 65.738], dtype=tensor.dtype, device=tensor.device) / 256.0
+    coef = coef.view([1, 3] + [1] * (tensor.dim() - 2))
+    return torch.sum(tensor * coef, dim=1, keepdim=True)
+
+
+def gaussian_window(window_size=11, sigma=1.5, dtype=torch.float32, device=None):
+    """1D gaussian kernel, the same as cv2.getGaussianKernel(window_size, sigma).
+
+    :return: kernel of window_size
+    :rtype: torch.Tensor
+    """
+    coords = np.arange(window_size, dtype=np.float64) - (window_size - 1) / 2.
+    kernel = np.exp(-coords ** 2 / (2 * sigma ** 2))
+    return torch.tensor(kernel / kernel.sum(), dtype=dtype, device=device)
+
+
+def calculate_ssim_batch(img1, img2, window_size=11, sigma=1.5):
+    """Calculate the ssim of each image of img1 (4D) in respect to img2 (4D), in range 0~255.
+
+    The same as calculate_ssim of each image, the gaussian filter of the valid region is a separable
+    depthwise conv2d of x, y, x^2, y^2 and xy at once, and the ssim is the mean of all channels.
+
+    :param img1: predicted images of BCHW
+    :type img1: torch.Tensor
+    :param img2: images of ground truth of BCHW
+    :type img2: torch.Tensor
+    :return: ssim of each image
+    :rtype: torch.Tensor of B
+    """
+    C1 = (0.01 * 255) ** 2
+    C2 = (0.03 * 255) ** 2
+    channels = img1.size(1)
+    # center on the mid gray to keep the precision of the variance in float32
+    img1 = img1 - 127.5
+    img2 = img2 - 127.5
+    window = gaussian_window(window_size, sigma, img1.dtype, img1.device)
+    groups = 5 * channels
+    window_h = window.view(1, 1, -1, 1).expand(groups, 1, window_size, 1)
+    window_w = window.view(1, 1, 1, -1).expand(groups, 1, 1, window_size)
+    maps = torch.cat([img1, img2, img1 * img1, img2 * img2, img1 * img2], dim=1)
+    # the depthwise conv is much faster in channels last
+    maps = maps.contiguous(memory_format=torch.channels_last)
+    maps = F.conv2d(F.conv2d(maps, window_h, groups=groups), window_w, groups=groups)
+    mu1, mu2, mu1_sq_mean, mu2_sq_mean, mu12_mean = torch.split(maps, channels, dim=1)
+
+    sigma1_sq = mu1_sq_mean - mu1 * mu1
+    sigma2_sq = mu2_sq_mean - mu2 * mu2
+    sigma12 = mu12_mean - mu1 * mu2
+    mu1 = mu1 + 127.5
+    mu2 = mu2 + 127.5
+    mu1_mu2 = mu1 * mu2
+    ssim_map = ((2 * mu1_mu2 + C1) * (2 * sigma12 + C2)) / \
+               ((mu1 * mu1 + mu2 * mu2 + C1) * (sigma1_sq + sigma2_sq + C2))
+    return ssim_map.mean(dim=(1, 2, 3))
+
+
+def calculate_psnr_batch(sr, hr):
+    """Caculate the psnr of sr (4D or 5D) in respect to hr, in range 0~1.
+
+    The mse is the mean of the whole batch, a 5D tensor has a psnr of each frame of the last dim.
+
+    :param sr: the predictied tensor of BCHW or BCHWT
+    :type sr: torch.Tensor
+    :param hr: the high resolution tensor of BCHW or BCHWT
+    :type hr: torch.Tensor
+    :return: psnr, or psnr of each frame
+    :rtype: torch.Tensor
+    """
+    mse = (sr - hr).pow(2).mean(dim=(0, 1, 2, 3))
+    return -10 * torch.log10(mse)
+
+
 def compute_metric(img_sr, img_hr, method='psnr', to_y=True, scale=2, max_rgb=1):
     """Compute super solution metric according metric type.
 
@@ -221,18 +317,25 @@ def compute_metric(img_sr, img_hr, method='psnr', to_y=True, scale=2, max_rgb=1)
         img_sr = img_sr * 255.0
         img_hr = img_hr * 255.0
     if method == 'psnr':
-        sr, hr = preprocess(img_sr, to_y, scale), preprocess(img_hr, to_y, scale)
-        return calculate_psnr(sr, hr)
+        if img_hr.nelement() == 1:
+            return 0
+        sr, hr = crop_tensor_border(img_sr, scale) / 255.0, crop_tensor_border(img_hr, scale) / 255.0
+        if to_y:
+            sr, hr = tensor_bgr_to_y(sr), tensor_bgr_to_y(hr)
+        return calculate_psnr_batch(sr, hr).mean().item()
     elif method == 'ssim':
-        img_sr_np = crop_np_border(tensor_to_np_images(img_sr), scale)
-        img_hr_np = crop_np_border(tensor_to_np_images(img_hr), scale)
+        if img_sr.dim() == 5:
+            # frames of the last dim as images
+            img_sr = img_sr.permute(0, 4, 1, 2, 3).flatten(0, 1)
+            img_hr = img_hr.permute(0, 4, 1, 2, 3).flatten(0, 1)
+        # quantize as the uint8 images
+        sr = crop_tensor_border(img_sr, scale).clamp(0, 255).round()
+        hr = crop_tensor_border(img_hr, scale).clamp(0, 255).round()
+        if not sr.is_floating_point() or sr.dtype == torch.float16:
+            sr, hr = sr.float(), hr.float()
         if to_y:
-            img_sr_np = bgr_to_y(img_sr_np)
-            img_hr_np = bgr_to_y(img_hr_np)
-        result = 0.
-        for batch_idx in range(img_hr_np.shape[0]):
-            result += calculate_ssim(img_sr_np[batch_idx], img_hr_np[batch_idx])
-        return result / img_hr_np.shape[0]
+            sr, hr = tensor_bgr_to_y(sr), tensor_bgr_to_y(hr)
+        return calculate_ssim_batch(sr, hr).mean().item()
     else:
         raise Exception('Wrong segmetation metric type, should be psnr or ssim')
 
@@ -253,18 +356,7 @@ def compute_sr_metric(img_sr, img_hr, method='psnr', to_y=True, scale=2, max_rgb
     :return: Average PSNR of the batch
     :rtype: float
     """
-    if len(img_sr.size()) == 5:
-        result = 0.
-        for ind in range(img_sr.size(4)):
-            result += compute_metric(img_sr[:, :, :, :, ind],
-                                     img_hr[:, :, :, :, ind],
-                                     method=method,
-                                     to_y=to_y,
-                                     scale=scale,
-                                     max_rgb=max_rgb)
-        return result / img_sr.size(4)
-    else:
-        return compute_metric(img_sr, img_hr, method=method, to_y=to_y, scale=scale, max_rgb=max_rgb)
+    return compute_metric(img_sr, img_hr, method=method, to_y=to_y, scale=scale, max_rgb=max_rgb)
 
 
 @ClassFactory.register(ClassType.METRIC, alias='SRMetric')
@@ -9,6 +9,7 @@
 # MIT License for more details.
 
 """Generator for NasPipeStep."""
+import copy
 import logging
 from vega.search_space.search_algs import SearchAlgorithm
 from vega.search_space.search_space import SearchSpace
@@ -43,26 +44,29 @@ class Generator(object):
             return None
         if not isinstance(res, list):
             res = [res]
-        out = []
+        records = []
         for sample in res:
             if isinstance(sample, tuple):
                 sample = dict(worker_id=sample[0], desc=sample[1])
-            record = self.record.load_dict(sample)
+            # load_dict updates and returns self.record, each record of the batch is a copy
+            record = copy.deepcopy(self.record.load_dict(sample))
             logging.debug("Broadcast Record=%s", str(record))
-            Report().broadcast(record)
-            desc = self._decode_hps(record.desc)
-            out.append((record.worker_id, desc))
-        return out
+            records.append(record)
+        # the records of a population are put into share memory in one batch
+        Report().broadcast(records)
+        return [(record.worker_id, self._decode_hps(record.desc)) for record in records]
 
-    def update(self, step_name, worker_id):
+    def update(self, step_name, worker_id, record=None):
         """Update search algorithm accord to the worker path.
 
         :param step_name: step name
         :param worker_id: current worker id
+        :param record: record of the worker, received from share memory if it's None
         :return:
         """
         report = Report()
-        record = report.receive(step_name, worker_id)
+        if record is None:
+            record = report.receive(step_name, worker_id)
         logging.debug("Get Record=%s", str(record))
         self.search_alg.update(record.serialize())
         report.dump_report(record.step_name, record)
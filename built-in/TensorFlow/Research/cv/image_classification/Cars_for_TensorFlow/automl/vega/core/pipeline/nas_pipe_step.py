@@ -9,8 +9,8 @@
 # MIT License for more details.
 
 """Nas Pipe Step defined in Pipeline."""
+import os
 import logging
-import time
 import traceback
 from .pipe_step import PipeStep
 from .generator import Generator
@@ -21,6 +21,8 @@ from vega.search_space.networks.network_desc import NetworkDesc
 from ..pipeline.conf import PipeStepConfig
 from vega.core.report import Report
 from vega.core.common.general import General
+from vega.core.common.file_ops import FileOps
+from vega.core.trainer.trial_cache import TrialCache, TRIAL_CACHE_FILE
 
 
 @ClassFactory.register(ClassType.PIPE_STEP)
@@ -42,10 +44,15 @@ class NasPipeStep(PipeStep):
             if res:
                 self._dispatch_trainer(res)
             else:
-                time.sleep(0.5)
+                self.master.wait_for_finished(timeout=0.5)
             self._after_train(wait_until_finish=False)
         self.master.join()
         self._after_train(wait_until_finish=True)
+        logging.info("Scheduling latency of finished workers: %s", self.master.scheduling_latency_summary())
+        logging.info("Share memory of report: %s", Report.share_memory_summary())
+        trial_cache_file = FileOps.join_path(self.task.local_output_path, TRIAL_CACHE_FILE)
+        if os.path.isfile(trial_cache_file):
+            logging.info("Trial cache stats: %s", TrialCache(trial_cache_file).stats())
         logging.debug("Pareto_front values: %s", Report().pareto_front(General.step_name))
         Report().output_pareto_front(General.step_name)
         self.master.close_client()
@@ -109,12 +116,18 @@ class NasPipeStep(PipeStep):
             return
         if not isinstance(worker_info, list):
             worker_info = [worker_info]
-        for one_info in worker_info:
+        try:
+            records = Report.receive_many(worker_info)
+        except Exception:
+            logging.warning("Failed to receive records in batch, receive them one by one.")
+            logging.warning(traceback.format_exc())
+            records = [None] * len(worker_info)
+        for one_info, record in zip(worker_info, records):
             step_name = one_info["step_name"]
             worker_id = one_info["worker_id"]
             logging.info("update generator, step name: {}, worker id: {}".format(step_name, worker_id))
             try:
-                generator.update(step_name, worker_id)
+                generator.update(step_name, worker_id, record)
             except Exception:
                 logging.error("Failed to upgrade generator, step_name={}, worker_id={}.".format(step_name, worker_id))
                 logging.error(traceback.format_exc())
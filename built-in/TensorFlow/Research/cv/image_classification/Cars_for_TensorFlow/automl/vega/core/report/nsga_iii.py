@@ -14,6 +14,9 @@ from scipy.linalg import solve
 import matplotlib.pyplot as plt
 import random
 
+# max elements of a (rows, cols) dominance block, bounds memory of broadcasting
+_BLOCK_SIZE = 1 << 22
+
 
 def UpdateIdealPoint(pop):
     """Update ideal point.
@@ -43,9 +46,7 @@ def PerformScalarizing(pop):
     smin = np.ones(nobj) * np.inf
     for j in range(nobj):
         w = GetScalarizingVector(nobj, j)
-        s = np.zeros((npop))
-        for i in range(npop):
-            s[i] = max(pop[:, i] / w)
+        s = (pop / w.reshape(-1, 1)).max(0)
         smin[j] = min(s)
         zmax[:, j] = pop[:, np.argmin(s)]
     return smin, zmax
@@ -67,14 +68,12 @@ def NormalizePopulation(pop):
             a = target
         return a
 
-    _, npop = pop.shape
     pop_norm = pop.copy()
     zmin = UpdateIdealPoint(pop_norm)
     pop_norm = pop_norm - zmin
     _, zmax = PerformScalarizing(pop_norm)
     a = FindHyperplaneIntercepts(zmax)
-    for i in range(npop):
-        pop_norm[:, i] = pop_norm[:, i] / a
+    pop_norm = pop_norm / a.reshape(-1, 1)
     return pop_norm
 
 
@@ -89,44 +88,63 @@ def Dominates(x, y):
     return np.all(x <= y) & np.any(x < y)
 
 
+def DominatesMatrix(x, y):
+    """Check if each sample of x dominates each sample of y.
+
+    :param x: samples, nobj * nx matrix
+    :type x: array
+    :param y: samples, nobj * ny matrix
+    :type y: array
+    :return: nx * ny bool matrix, [i, j] is True if x[:, i] dominates y[:, j]
+    :rtype: array
+    """
+    not_worse = np.ones((x.shape[1], y.shape[1]), dtype=bool)
+    better = np.zeros((x.shape[1], y.shape[1]), dtype=bool)
+    for k in range(x.shape[0]):
+        xk = x[k][:, np.newaxis]
+        yk = y[k][np.newaxis, :]
+        not_worse &= xk <= yk
+        better |= xk < yk
+    return not_worse & better
+
+
 def NonDominatedSorting(pop):
     """Perform non-dominated sorting.
 
+    Dominance is computed by broadcasting over blocks of samples. A front is
+    peeled off by subtracting how many samples of the previous front dominate
+    each remaining one, so the fronts and their order are the same as the
+    pairwise loop version.
+
     :param pop: the current population
     :type pop: array
     """
     _, npop = pop.shape
-    rank = np.zeros(npop)
-    dominatedCount = np.zeros(npop)
-    dominatedSet = [[] for i in range(npop)]
-    F = [[]]
-    for i in range(npop):
-        for j in range(i + 1, npop):
-            p = pop[:, i]
-            q = pop[:, j]
-            if Dominates(p, q):
-                dominatedSet[i].append(j)
-                dominatedCount[j] += 1
-            if Dominates(q, p):
-                dominatedSet[j].append(i)
-                dominatedCount[i] += 1
-        if dominatedCount[i] == 0:
-            rank[i] = 1
-            F[0].append(i)
-    k = 0
-    while (True):
-        Q = []
-        for i in F[k]:
-            p = pop[:, i]
-            for j in dominatedSet[i]:
-                dominatedCount[j] -= 1
-                if dominatedCount[j] == 0:
-                    Q.append(j)
-                    rank[j] = k + 1
-        if len(Q) == 0:
+    block = max(1, _BLOCK_SIZE // max(npop, 1))
+    dominatedCount = np.zeros(npop, dtype=np.int64)
+    for start in range(0, npop, block):
+        dominatedCount += DominatesMatrix(pop[:, start:start + block], pop).sum(0)
+    front = np.flatnonzero(dominatedCount == 0)
+    F = [front.tolist()]
+    remaining = dominatedCount > 0
+    while remaining.any():
+        candidates = np.flatnonzero(remaining)
+        # position in the previous front of the last sample dominating each candidate
+        last = np.full(len(candidates), -1, dtype=np.int64)
+        block = max(1, _BLOCK_SIZE // len(candidates))
+        for start in range(0, len(front), block):
+            dominated = DominatesMatrix(pop[:, front[start:start + block]], pop[:, candidates])
+            dominatedCount[candidates] -= dominated.sum(0)
+            hit = dominated.any(0)
+            last_pos = dominated.shape[0] - 1 - np.argmax(dominated[::-1], axis=0)
+            last[hit] = start + last_pos[hit]
+        is_new = dominatedCount[candidates] == 0
+        if not is_new.any():
             break
-        F.append(Q)
-        k += 1
+        new_front = candidates[is_new]
+        front = new_front[np.lexsort((new_front, last[is_new]))]
+        F.append(front.tolist())
+        remaining[front] = False
     return F
 
 
@@ -161,22 +179,17 @@ def AssociateToReferencePoint(pop_norm):
     :type pop_norm: array
     """
     nZr = 10
-    _, npop = pop_norm.shape
     Zr = GenerateReferencePoint(pop_norm.shape[0], nZr)
-    rho = np.zeros((nZr))
-    d = np.zeros((npop, nZr))
-    pop_ref = np.zeros(npop)
-    pop_dis = np.zeros(npop)
-    for i in range(npop):
-        for j in range(nZr):
-            w = Zr[:, j] / np.linalg.norm(Zr[:, j]).reshape(-1, 1)
-            z = pop_norm[:, i].reshape(-1, 1)
-            d[i, j] = np.linalg.norm(z - w.transpose() * z * w)
-        dmin = np.min(d[i])
-        jmin = np.argmin(d[i])
-        pop_ref[i] = jmin
-        pop_dis[i] = dmin
-        rho[jmin] += 1
+    # w[j] is the unit direction of reference point j, and the distance of z to it
+    # is the norm of matrix z_k - w_k * z_k * w_l, which expands to
+    # sum_k z_k^2 * sum_l (1 - w_k * w_l)^2
+    w = (Zr[:, :nZr] / np.linalg.norm(Zr[:, :nZr], axis=0)).T
+    coef = ((1 - w[:, :, np.newaxis] * w[:, np.newaxis, :]) ** 2).sum(2)
+    d = np.sqrt(np.maximum(np.dot(pop_norm.T ** 2, coef.T), 0))
+    jmin = np.argmin(d, axis=1)
+    pop_ref = jmin.astype(np.float64)
+    pop_dis = d[np.arange(d.shape[0]), jmin]
+    rho = np.bincount(jmin, minlength=nZr).astype(np.float64)
     return rho, pop_ref, pop_dis
 
 
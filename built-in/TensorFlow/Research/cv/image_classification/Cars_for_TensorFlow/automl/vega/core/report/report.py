@@ -13,6 +13,7 @@ import json
 import logging
 import os
 import glob
+import heapq
 import traceback
 from copy import deepcopy
 import numpy as np
@@ -22,33 +23,110 @@ from collections import OrderedDict
 from vega.core.common import FileOps, TaskOps
 from vega.core.common.general import General
 from vega.core.common.utils import singleton, copy_search_file
-from vega.core.report.share_memory import ShareMemory
+from vega.core.report.share_memory import ShareMemory, share_memory_stats
 from .nsga_iii import SortAndSelectPopulation
 from .record import ReportRecord
 
 
+class ParetoFrontCache(object):
+    """Epsilon-nondominated archive of the rewards of one step, same as `pareto.eps_sort` over all its records.
+
+    Records with performance are sorted into the archive one by one when they are added into report,
+    or when their performance is reported after they are added without it.
+    """
+
+    def __init__(self):
+        """Init an empty archive."""
+        self.archive = None
+        self.nobj = None
+        self.count = 0
+
+    def sort_into(self, record, tag):
+        """Sort the rewards of one record into archive, the row is tagged with `tag`."""
+        rewards = record.rewards if isinstance(record.rewards, list) else [record.rewards]
+        objectives = [float(x) for x in rewards]
+        if self.archive is None:
+            self.nobj = len(objectives)
+            self.archive = pareto.Archive([1e-9] * self.nobj)
+        if len(objectives) != self.nobj:
+            raise ValueError("Rewards count {} is not equal to {}.".format(len(objectives), self.nobj))
+        self.archive.sortinto([-x for x in objectives], objectives + [0, tag])
+        self.count += 1
+
+    @property
+    def front(self):
+        """Get rows of the pareto front, each row is rewards plus [0, tag]."""
+        return self.archive.tagalongs if self.archive is not None else []
+
+
 @singleton
 class Report(object):
-    """Report class to save all records and broadcast records to share memory."""
+    """Report class to save all records and broadcast records to share memory.
+
+    Records are saved as snapshots copied in `add`, and indexed by step name.
+    Getters return the saved snapshots without copying, copy them before modifying.
+    """
 
     _hist_records = OrderedDict()
+    _step_records = {}
+    _record_seq = {}
+    _pareto_fronts = {}
     REPORT_FILE_NAME = 'reports'
     BEST_FILE_NAME = 'best'
 
     def add(self, record):
         """Add one record into set."""
-        self._hist_records[record.uid] = record
+        record = deepcopy(record)
+        uid = record.uid
+        previous = self._hist_records.get(uid)
+        if previous is None:
+            self._record_seq[uid] = len(self._record_seq)
+        self._hist_records[uid] = record
+        self._step_records.setdefault(record.step_name, OrderedDict())[uid] = record
+        if previous is not None and previous.performance is not None:
+            # the rewards in the archive can not be replaced
+            if previous.rewards != record.rewards:
+                self._pareto_fronts.pop(record.step_name, None)
+        elif record.performance is not None and self._pareto_fronts.get(record.step_name) is not None:
+            try:
+                self._pareto_fronts[record.step_name].sort_into(record, self._record_seq[uid])
+            except Exception:
+                self._pareto_fronts.pop(record.step_name)
 
     @property
     def all_records(self):
         """Get all records."""
-        return deepcopy(list(self._hist_records.values()))
+        return list(self._hist_records.values())
+
+    def _get_records(self, step_names):
+        """Get records of steps from index, in the order they are added."""
+        if len(step_names) == 1:
+            return list(self._step_records.get(step_names[0], {}).values())
+        step_records = [self._step_records.get(step_name, {}).values() for step_name in set(step_names)]
+        return list(heapq.merge(*step_records, key=lambda x: self._record_seq[x.uid]))
+
+    def _get_pareto_front_cache(self, step_name):
+        """Get the pareto front cache of a step, build it from step records if it's not built yet."""
+        if step_name not in self._pareto_fronts:
+            cache = ParetoFrontCache()
+            for record in self._step_records.get(step_name, {}).values():
+                if record.performance is not None:
+                    cache.sort_into(record, self._record_seq[record.uid])
+            self._pareto_fronts[step_name] = cache
+        return self._pareto_fronts[step_name]
 
     def pareto_front(self, step_name=None, nums=None, records=None):
         """Get parent front. pareto."""
         if records is None:
-            records = self.all_records
-            records = list(filter(lambda x: x.step_name == step_name and x.performance is not None, records))
+            try:
+                cache = self._get_pareto_front_cache(step_name)
+            except Exception:
+                cache = None
+            records = [record for record in self._get_records([step_name]) if record.performance is not None]
+            if cache is not None and cache.count and (cache.nobj == 1 or nums is None or cache.count <= nums):
+                outs = np.array(cache.front)
+                index = {self._record_seq[record.uid]: idx for idx, record in enumerate(records)}
+                return outs[:, :-2].tolist(), [index[tag] for tag in outs[:, -1].astype(np.int32).tolist()]
         in_pareto = [record.rewards if isinstance(record.rewards, list) else [record.rewards] for record in records]
         if not in_pareto:
             return None, None
@@ -69,19 +147,20 @@ class Report(object):
         """Get step records."""
         if not step_name:
             step_name = General.step_name
-        records = self.all_records
         filter_steps = [step_name] if not isinstance(step_name, list) else step_name
-        records = list(filter(lambda x: x.step_name in filter_steps, records))
-        return records
+        return self._get_records(filter_steps)
 
     def get_pareto_front_records(self, step_name=None, nums=None):
         """Get Pareto Front Records."""
         if not step_name:
             step_name = General.step_name
-        records = self.all_records
         filter_steps = [step_name] if not isinstance(step_name, list) else step_name
-        records = list(filter(lambda x: x.step_name in filter_steps and x.performance is not None, records))
-        outs, selected = self.pareto_front(step_name, nums, records=records)
+        if len(filter_steps) == 1:
+            records = [record for record in self._get_records(filter_steps) if record.performance is not None]
+            outs, selected = self.pareto_front(filter_steps[0], nums)
+        else:
+            records = list(filter(lambda x: x.performance is not None, self._get_records(filter_steps)))
+            outs, selected = self.pareto_front(step_name, nums, records=records)
         if not outs:
             return []
         else:
@@ -115,9 +194,8 @@ class Report(object):
 
     def output_step_all_records(self, step_name, desc=True, weights_file=False, performance=False):
         """Output step all records."""
-        records = self.all_records
         logging.debug("All records in report, records={}".format(self.all_records))
-        records = list(filter(lambda x: x.step_name == step_name, records))
+        records = self._get_records([step_name])
         logging.debug("Filter step records, records={}".format(records))
         if not records:
             logging.warning("Failed to dump records, report is emplty.")
@@ -166,15 +244,41 @@ class Report(object):
         cls().add(record)
         return record
 
+    @classmethod
+    def receive_many(cls, worker_info):
+        """Get records of many workers from Shared Memory in one batch.
+
+        :param worker_info: list of dict include `step_name` and `worker_id`.
+        :type worker_info: list of dict
+        :return: records in the same order of `worker_info`, None if the worker has no record in Shared Memory.
+        :rtype: list of ReportRecord
+
+        """
+        names = ["{}.{}".format(info["step_name"], info["worker_id"]) for info in worker_info]
+        records = []
+        for value in ShareMemory.get_many(names):
+            record = ReportRecord().from_dict(value) if value else None
+            if record is not None:
+                cls().add(record)
+            records.append(record)
+        return records
+
+    @classmethod
+    def share_memory_summary(cls):
+        """Get counters of share memory messages and records of this process."""
+        return share_memory_stats.summary()
+
     @classmethod
     def broadcast(cls, record):
-        """Broadcast one record to Shared Memory."""
-        if not record:
+        """Broadcast one record, or a list of records in one batch, to Shared Memory."""
+        records = [one for one in (record if isinstance(record, list) else [record]) if one]
+        if not records:
             logging.warning("Broadcast Record is None.")
             return
-        ShareMemory("{}.{}".format(record.step_name, record.worker_id)).put(record.serialize())
-        cls().add(record)
-        cls._save_worker_record(record.serialize())
+        ShareMemory.put_many({"{}.{}".format(one.step_name, one.worker_id): one.serialize() for one in records})
+        for one in records:
+            cls().add(one)
+            cls._save_worker_record(one.serialize())
 
     @classmethod
     def _save_worker_record(cls, record):
@@ -232,12 +336,18 @@ class Report(object):
             return
         if not isinstance(worker_info, list):
             worker_info = [worker_info]
-        for one_info in worker_info:
+        try:
+            results = ShareMemory.get_many(["{}.{}".format(one_info["step_name"], one_info["worker_id"])
+                                            for one_info in worker_info])
+        except Exception:
+            logging.error("Failed to get records from share memory.")
+            logging.error(traceback.format_exc())
+            return
+        for one_info, result in zip(worker_info, results):
             step_name = one_info["step_name"]
             worker_id = one_info["worker_id"]
             logging.info("update report, step name: {}, worker id: {}".format(step_name, worker_id))
             try:
-                result = ShareMemory("{}.{}".format(step_name, worker_id)).get()
                 record = ReportRecord().from_dict(result)
                 self.add(record)
                 self.dump_report(step_name, record)
@@ -16,22 +16,103 @@ Class. Distributor Classes are used in Master to init and maintain the cluster.
 """
 import ast
 import logging
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from vega.core.common.consts import ClusterMode
 from vega.core.common.general import General
 from vega.core.common.utils import singleton
 
 
+def dumps(value):
+    """Serialize value to bytes with the highest pickle protocol."""
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data):
+    """Deserialize value, str is parsed by `ast.literal_eval` for values put by old workers."""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return ast.literal_eval(data)
+    return pickle.loads(data)
+
+
+class ShareMemoryStats(object):
+    """Counters of share memory put and get, shared by all share memories in one process."""
+
+    def __init__(self):
+        """Init counters."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset counters."""
+        with self._lock:
+            self._counters = {'put': [0, 0, 0, 0.], 'get': [0, 0, 0, 0.]}
+
+    def add(self, op, records, size, seconds):
+        """Add one message.
+
+        :param str op: `put` or `get`.
+        :param int records: records count in the message.
+        :param int size: bytes of the message, 0 if not serialized.
+        :param float seconds: time cost of the message.
+        """
+        with self._lock:
+            counter = self._counters[op]
+            counter[0] += 1
+            counter[1] += records
+            counter[2] += size
+            counter[3] += seconds
+
+    def summary(self):
+        """Get messages, records, bytes, mean latency (ms) of messages and records per second of put and get."""
+        with self._lock:
+            out = {}
+            for op, (messages, records, size, seconds) in self._counters.items():
+                out[op] = {'messages': messages, 'records': records, 'bytes': size,
+                           'mean_latency_ms': 1000 * seconds / messages if messages else 0.,
+                           'records_per_second': records / seconds if seconds else 0.}
+            return out
+
+
+share_memory_stats = ShareMemoryStats()
+
+
 class ShareMemory(object):
     """Share Memory base class."""
 
     def __new__(cls, name):
         """Construct method."""
+        return super(ShareMemory, cls).__new__(cls._get_cls())
+
+    @staticmethod
+    def _get_cls():
         if General.cluster_mode == ClusterMode.Single and General.worker.devices_per_job == -1:
-            t_cls = LocalShareMemory
+            return LocalShareMemory
         else:
-            t_cls = ClusterShareMemory
-        return super(ShareMemory, cls).__new__(t_cls)
+            return ClusterShareMemory
+
+    @staticmethod
+    def put_many(values):
+        """Put values into shared data in one batch.
+
+        :param dict values: dict of name and value.
+        """
+        ShareMemory._get_cls().put_many(values)
+
+    @staticmethod
+    def get_many(names):
+        """Get values of names from shared data in one batch.
+
+        :param list names: names of shared data.
+        :return: values in the same order of names, None if name has no data.
+        :rtype: list
+        """
+        return ShareMemory._get_cls().get_many(names)
 
 
 @singleton
@@ -66,18 +147,71 @@ class ShareMemoryClient():
 class ClusterShareMemory(ShareMemory):
     """Share Memory for dask cluster."""
 
+    timeout = 2
+    # threads of the dask client calls of put_many and get_many
+    max_workers = 16
+
     def __init__(self, name):
         from dask.distributed import Variable
         self.var = Variable(name, client=ShareMemoryClient().client)
 
     def put(self, value):
         """Put value into shared data."""
-        self.var.set(str(value))
+        start = time.time()
+        data = dumps(value)
+        self.var.set(data)
+        share_memory_stats.add('put', 1, len(data), time.time() - start)
 
     def get(self):
         """Get value from shared data."""
         # TODO: block issue when var no data.
-        return ast.literal_eval(self.var.get(timeout=2))
+        start = time.time()
+        data = self.var.get(timeout=self.timeout)
+        value = loads(data)
+        share_memory_stats.add('get', 1, len(data), time.time() - start)
+        return value
+
+    @classmethod
+    def put_many(cls, values):
+        """Put values into shared data, the variables are set concurrently by the public dask API."""
+        if not values:
+            return
+        from dask.distributed import Variable
+        start = time.time()
+        client = ShareMemoryClient().client
+        datas = {name: dumps(value) for name, value in values.items()}
+        variables = [(Variable(name, client=client), data) for name, data in datas.items()]
+        with ThreadPoolExecutor(max_workers=min(len(variables), cls.max_workers)) as executor:
+            list(executor.map(lambda item: item[0].set(item[1]), variables))
+        share_memory_stats.add('put', len(datas), sum(len(data) for data in datas.values()), time.time() - start)
+
+    @classmethod
+    def get_many(cls, names):
+        """Get values of names from shared data, the variables are got concurrently by the public dask API."""
+        if not names:
+            return []
+        from dask.distributed import Variable
+        start = time.time()
+        client = ShareMemoryClient().client
+        variables = [Variable(name, client=client) for name in names]
+
+        def _get(var):
+            try:
+                return var.get(timeout=cls.timeout)
+            except Exception as ex:
+                return ex
+
+        with ThreadPoolExecutor(max_workers=min(len(variables), cls.max_workers)) as executor:
+            datas = list(executor.map(_get, variables))
+        values = []
+        for name, data in zip(names, datas):
+            if isinstance(data, Exception):
+                logging.warning("Failed to get share memory, name=%s, ex=%s", name, data)
+                data = None
+            values.append(loads(data))
+        size = sum(len(data) for data in datas if isinstance(data, (bytes, str)))
+        share_memory_stats.add('get', len(names), size, time.time() - start)
+        return values
 
     def delete(self):
         """Delete data according to name."""
@@ -99,11 +233,25 @@ class LocalShareMemory(ShareMemory):
     def put(self, value):
         """Put value into shared data."""
         self.__shared_data__[self.name] = value
+        share_memory_stats.add('put', 1, 0, 0.)
 
     def get(self):
         """Get value from shared data."""
+        share_memory_stats.add('get', 1, 0, 0.)
         return self.__shared_data__.get(self.name)
 
+    @classmethod
+    def put_many(cls, values):
+        """Put values into shared data."""
+        cls.__shared_data__.update(values)
+        share_memory_stats.add('put', len(values), 0, 0.)
+
+    @classmethod
+    def get_many(cls, names):
+        """Get values of names from shared data."""
+        share_memory_stats.add('get', len(names), 0, 0.)
+        return [cls.__shared_data__.get(name) for name in names]
+
     def delete(self):
         """Delete data according to name."""
         del self.__shared_data__[self.name]
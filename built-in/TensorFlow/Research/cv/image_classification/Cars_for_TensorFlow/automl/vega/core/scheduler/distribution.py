@@ -16,7 +16,64 @@ Distributor Base Class, Dask Distributor Class and local Evaluator Distributor
 Class. Distributor Classes are used in Master to init and maintain the cluster.
 """
 import time
+import threading
 import multiprocessing
+from functools import partial
+
+
+class TaskDoneEvent(object):
+    """A condition variable signalled by distributors whenever a task finishes.
+
+    The master and the pipe steps wait on it instead of sleep polling, so they
+    are woken up as soon as a trainer or an evaluator is done. The done time of
+    every task is kept until it is popped, to measure the scheduling latency.
+    """
+
+    def __init__(self):
+        """Init the condition, the finished counter and the done time table."""
+        self._cond = threading.Condition()
+        self._finished = 0
+        self._done_time = {}
+
+    def notify(self, pid):
+        """Record the done time of task `pid` and wake up all waiters.
+
+        :param pid: unique `pid` of the finished task.
+        :type pid: str or int
+
+        """
+        with self._cond:
+            self._finished += 1
+            self._done_time[pid] = time.time()
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait until a task finishes, return immediately if one finished since the last call.
+
+        :param timeout: max seconds to wait, None means wait forever.
+        :type timeout: float or None
+        :return: True if any task finished, False if timeout.
+        :rtype: bool
+
+        """
+        with self._cond:
+            if self._finished == 0:
+                self._cond.wait(timeout)
+            finished = self._finished > 0
+            self._finished = 0
+            return finished
+
+    def pop_done_time(self, pid):
+        """Pop the done time of task `pid`.
+
+        :param pid: unique `pid` of the finished task.
+        :type pid: str or int
+        :return: the done timestamp, None if unknown.
+        :rtype: float or None
+
+        """
+        with self._cond:
+            return self._done_time.pop(pid, None)
 
 
 class DistributorBaseClass:
@@ -54,17 +111,21 @@ class ClusterDaskDistributor(DistributorBaseClass):
 
     :param str address: The `address` of dask-scheduler.
         eg. `tcp://127.0.0.1:8786`.
+    :param TaskDoneEvent task_done: event signalled when a task finishes.
 
     """
 
-    def __init__(self, address):
+    def __init__(self, address, task_done=None):
         """Set up a distributor that connects to a dask-scheduler to distribute the calculaton.
 
         :param address: the ip address and port number of the dask-scheduler.
         :type address: str
+        :param task_done: event signalled when a task finishes.
+        :type task_done: TaskDoneEvent or None
         """
         self.address = address
         self.future_set = set()
+        self.task_done = task_done or TaskDoneEvent()
 
     def get_client(self):
         """Initialize a Client by pointing it to the address of a dask-scheduler.
@@ -174,6 +235,19 @@ class ClusterDaskDistributor(DistributorBaseClass):
         f = (pid, future)
         self.future_set.add(f)
         self.process_queue.put(pid)
+        # dask calls it in a separate thread, whether the task succeeds or fails
+        future.add_done_callback(lambda _: self.task_done.notify(pid))
+
+    def wait(self, timeout=None):
+        """Block until a submitted task finishes or timeout.
+
+        :param timeout: max seconds to wait, None means wait forever.
+        :type timeout: float or None
+        :return: True if any task finished, False if timeout.
+        :rtype: bool
+
+        """
+        return self.task_done.wait(timeout)
 
     def close(self, client):
         """Close the connection to the local Dask Scheduler.
@@ -186,7 +260,7 @@ class ClusterDaskDistributor(DistributorBaseClass):
     def join(self):
         """Wait all process in process_queue to finish."""
         while not self.process_queue_empty():
-            time.sleep(0.1)
+            self.wait(timeout=1)
         return
 
 
@@ -197,10 +271,11 @@ class LocalDistributor(DistributorBaseClass):
     process in pool.
 
     :param int n_workers: The size of process pool.
+    :param TaskDoneEvent task_done: event signalled when a task finishes.
 
     """
 
-    def __init__(self, n_workers):
+    def __init__(self, n_workers, task_done=None):
         """Init the EvaluatorDistributor set n_worker.
 
         and init a process pool with size equal to n_worker.
@@ -209,6 +284,7 @@ class LocalDistributor(DistributorBaseClass):
         self.n_workers = n_workers
         self.process_pool = multiprocessing.Pool(processes=n_workers)
         self.process_list = []
+        self.task_done = task_done or TaskDoneEvent()
 
     def distribute(self, pid, func, kwargs):
         """Submit a calculation task to a localprocess pool.
@@ -226,9 +302,14 @@ class LocalDistributor(DistributorBaseClass):
         :param dict kwargs: Parameter of `func`.
 
         """
-        res = self.process_pool.apply_async(func, **kwargs)
+        notify = partial(self._notify, pid)
+        res = self.process_pool.apply_async(func, callback=notify, error_callback=notify, **kwargs)
         self.process_list.append((pid, res))
 
+    def _notify(self, pid, _result):
+        """Signal the task done event, called in the result handler thread of pool."""
+        self.task_done.notify(pid)
+
     def process_result_get(self):
         """Update current process pool status.
 
@@ -10,6 +10,7 @@
 
 """The LocalMaster's method is same as Master, and the class is used on single node."""
 import os
+import time
 from ..trainer.utils import WorkerTypes
 from vega.core.common.general import General
 
@@ -49,6 +50,28 @@ class LocalMaster(object):
         """Return immediately."""
         return
 
+    def wait_for_finished(self, timeout=None):
+        """Sleep `timeout` seconds, workers run synchronously so none is pending.
+
+        :param timeout: seconds to sleep, None means return immediately.
+        :type timeout: float or None
+        :return: always False.
+        :rtype: bool
+
+        """
+        if timeout:
+            time.sleep(timeout)
+        return False
+
+    def scheduling_latency_summary(self):
+        """Return an empty summary, workers are popped as soon as they finish.
+
+        :return: count, mean and max of the latency in seconds.
+        :rtype: dict
+
+        """
+        return {"count": 0, "mean": 0.0, "max": 0.0}
+
     def pop_finished_worker(self, train_worker=True):
         """Pop saved worker id and step name.
 
@@ -20,7 +20,7 @@ import time
 import traceback
 from queue import Queue
 from ..trainer import utils
-from .distribution import ClusterDaskDistributor, LocalDistributor
+from .distribution import ClusterDaskDistributor, LocalDistributor, TaskDoneEvent
 from vega.core.common import TaskOps
 from vega.core.common.consts import ClusterMode
 from vega.core.common.general import General
@@ -61,6 +61,9 @@ class Master(object):
         status = self.dask_env.start()
         if not status or not self.dask_env.is_master:
             sys.exit(0)
+        self.task_done = TaskDoneEvent()
+        # seconds between a worker finished and the master popped it, key is "step_name::worker_id"
+        self.scheduling_latency = {}
         self._start_cluster()
         self._start_evaluator_multiprocess()
         self.t_queue = Queue()
@@ -70,7 +73,7 @@ class Master(object):
 
     def _start_cluster(self):
         """Set and start dask distributed cluster."""
-        self.md = ClusterDaskDistributor(self.dask_env.master_address)
+        self.md = ClusterDaskDistributor(self.dask_env.master_address, self.task_done)
         self.client = self.md.get_client()
         local_host = None
         if "BATCH_CURRENT_HOST" in os.environ:
@@ -87,7 +90,7 @@ class Master(object):
 
     def _start_evaluator_multiprocess(self):
         """Set and start local multiprocess pool."""
-        self.dmd = LocalDistributor(self.eval_count)
+        self.dmd = LocalDistributor(self.eval_count, self.task_done)
         return
 
     @property
@@ -128,22 +131,51 @@ class Master(object):
             self.dmd.distribute(pid=p_id, func=worker, kwargs={})
             return p_id
         else:
-            finished = False
-            while not finished:
-                if not self.md.process_queue_full():
-                    p_id = self.task_count
-                    if worker.step_name is not None and worker.worker_id is not None:
-                        p_id = "{0}::{1}::{2}".format(worker.worker_type.name,
-                                                      worker.step_name,
-                                                      worker.worker_id)
-                    self.md.distribute(client=self.client, pid=p_id,
-                                       func=worker, kwargs={})
-                    self.task_count = self.task_count + 1
-                    return p_id
-                else:
-                    time.sleep(0.1)
+            while self.md.process_queue_full():
+                self.wait_for_finished(timeout=1)
+            p_id = self.task_count
+            if worker.step_name is not None and worker.worker_id is not None:
+                p_id = "{0}::{1}::{2}".format(worker.worker_type.name,
+                                              worker.step_name,
+                                              worker.worker_id)
+            self.md.distribute(client=self.client, pid=p_id,
+                               func=worker, kwargs={})
+            self.task_count = self.task_count + 1
+            return p_id
         return
 
+    def wait_for_finished(self, timeout=None):
+        """Block until a trainer or an evaluator finishes.
+
+        :param timeout: max seconds to wait, None means wait forever.
+        :type timeout: float or None
+        :return: True if any worker finished, False if timeout.
+        :rtype: bool
+
+        """
+        return self.task_done.wait(timeout)
+
+    def _record_latency(self, t_pid, pid):
+        """Save the scheduling latency of a popped worker."""
+        done_time = self.task_done.pop_done_time(t_pid)
+        if done_time is None:
+            return
+        latency = time.time() - done_time
+        self.scheduling_latency[pid] = latency
+        logging.debug("scheduling latency of {}: {:.6f}s".format(pid, latency))
+
+    def scheduling_latency_summary(self):
+        """Summarize the scheduling latency of all popped workers.
+
+        :return: count, mean and max of the latency in seconds.
+        :rtype: dict
+
+        """
+        latency = list(self.scheduling_latency.values())
+        if not latency:
+            return {"count": 0, "mean": 0.0, "max": 0.0}
+        return {"count": len(latency), "mean": sum(latency) / len(latency), "max": max(latency)}
+
     def join(self):
         """Wait all workers to finished."""
         self.md.join()
@@ -158,6 +190,7 @@ class Master(object):
             if len(pid_splited) >= 3:
                 (_type, step_name, worker_id) = pid_splited
                 pid = "{0}::{1}".format(step_name, worker_id)
+                self._record_latency(t_pid, pid)
                 if _type == utils.WorkerTypes.TRAINER.name:
                     self.t_queue.put(pid)
                 else:
@@ -168,6 +201,7 @@ class Master(object):
             if len(pid_splited) >= 3:
                 type = pid_splited[0]
                 pid = "{0}::{1}".format(pid_splited[1], pid_splited[2])
+                self._record_latency(dloop_pid, pid)
             self.e_queue.put(item=pid, type=type)
         return
 
@@ -6,6 +6,7 @@ from .perforamnce_saver import PerformanceSaver
 from .lr_scheduler import LearningRateScheduler
 from .model_statistics import ModelStatistics
 from .model_checkpoint import ModelCheckpoint
+from .trial_cache_callback import TrialCacheCallback
 from .report_callback import ReportCallback
 from .detection_progress_logger import DetectionProgressLogger
 from .detection_metrics_evaluator import DetectionMetricsEvaluator
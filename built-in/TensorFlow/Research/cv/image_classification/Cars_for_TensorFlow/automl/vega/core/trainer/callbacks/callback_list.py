@@ -70,8 +70,8 @@ class CallbackList(object):
     def _get_callbacks(self, customs, disables):
         defaults = []
         if vega.is_torch_backend():
-            defaults = ["ModelStatistics", "MetricsEvaluator", "ModelCheckpoint", "PerformanceSaver",
-                        "LearningRateScheduler", "ProgressLogger", "ReportCallback"]
+            defaults = ["ModelStatistics", "MetricsEvaluator", "ModelCheckpoint", "TrialCacheCallback",
+                        "PerformanceSaver", "LearningRateScheduler", "ProgressLogger", "ReportCallback"]
         elif vega.is_tf_backend():
             # defaults = ["ModelStatistics", "MetricsEvaluator", "PerformanceSaver",
             #             "ProgressLogger", "ReportCallback"]
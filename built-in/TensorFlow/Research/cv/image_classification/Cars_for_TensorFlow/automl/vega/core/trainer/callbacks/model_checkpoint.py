@@ -15,6 +15,7 @@ import vega
 from .callback import Callback
 from vega.core.common.file_ops import FileOps
 from vega.core.common.class_factory import ClassFactory, ClassType
+from vega.core.trainer.checkpoint_engine import CheckpointEngine
 
 if vega.is_torch_backend():
     import torch
@@ -28,10 +29,14 @@ class ModelCheckpoint(Callback):
         """Initialize ModelCheckpoint callback."""
         super(Callback, self).__init__()
         self.priority = 240
+        self.engine = None
+        self._pickled_arch = None
 
     def before_train(self, logs=None):
         """Be called before the training process."""
         self.is_chief = self.params['is_chief']
+        self.engine = CheckpointEngine(async_write=self.trainer.config.async_checkpoint,
+                                       keep=self.trainer.config.keep_checkpoints)
 
     def after_epoch(self, epoch, logs=None):
         """Be called after each epoch."""
@@ -46,20 +51,28 @@ class ModelCheckpoint(Callback):
         logging.debug("Start Save Model, model_file=%s", self.trainer.model_pickle_file_name)
         model_pickle_file = FileOps.join_path(
             self.trainer.get_local_worker_path(), self.trainer.model_pickle_file_name)
-        # pickle model
-        with open(model_pickle_file, 'wb') as handle:
-            pickle.dump(self.trainer.model, handle, protocol=pickle.HIGHEST_PROTOCOL)
-        # save checkpoint
+        # save checkpoint, the state is snapshotted before the training goes on
         ckpt = {
             'epoch': epoch,
             'weight': self.trainer.model.state_dict(),
             'optimizer': self.trainer.optimizer.state_dict(),
             'lr_scheduler': self.trainer.lr_scheduler.state_dict(),
         }
-        torch.save(ckpt, checkpoint_file)
+        # the weights of the model pickle are replaced by the checkpoint when it is loaded,
+        # so the model is pickled again only when the architecture changes
+        arch = (id(self.trainer.model), model_pickle_file,
+                [(name, tuple(value.shape)) for name, value in ckpt['weight'].items()])
+        blobs = {}
+        if arch != self._pickled_arch:
+            blobs[model_pickle_file] = pickle.dumps(self.trainer.model, protocol=pickle.HIGHEST_PROTOCOL)
+            self._pickled_arch = arch
+        self.engine.save(ckpt, checkpoint_file, tag=epoch, blobs=blobs)
         self.trainer.checkpoint_file = checkpoint_file
         self.trainer.model_path = model_pickle_file
 
     def after_train(self, logs=None):
         """Be called after the training process."""
+        # the checkpoint files are complete before they are reported
+        self.engine.close()
+        logging.debug("Checkpoint stats: %s", self.engine.stats)
         torch.save(self.trainer.model.state_dict(), self.trainer.weights_file)
@@ -0,0 +1,111 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""TrialCache callback defination."""
+import os
+import time
+import pickle
+import logging
+import vega
+from .callback import Callback
+from vega.core.common.file_ops import FileOps
+from vega.core.common.config import obj2config
+from vega.core.common.class_factory import ClassFactory, ClassType
+from vega.core.trainer.trial_cache import TrialCache, TRIAL_CACHE_FILE, config_md5, copy_matching_weights
+from vega.search_space.networks import NetworkDesc
+
+if vega.is_torch_backend():
+    import torch
+
+
+@ClassFactory.register(ClassType.CALLBACK)
+class TrialCacheCallback(Callback):
+    """Callback that skips the training of a cached trial and warm starts the others.
+
+    An exact hit of the desc md5 and the config md5 loads the cached weights
+    and performance, writes the checkpoint and the model pickle of the trial,
+    and the training runs 0 epochs. The weights file is still written by
+    ModelCheckpoint after the training. A miss copies the weights of the
+    closest cached desc with the same names and shapes.
+    """
+
+    def __init__(self):
+        """Initialize TrialCacheCallback callback."""
+        super(Callback, self).__init__()
+        self.priority = 245
+        self.cache = None
+
+    def before_train(self, logs=None):
+        """Be called before the training process."""
+        self.is_chief = self.params['is_chief']
+        self.cache = None
+        desc = self.trainer.model_desc or self.trainer.hps
+        if not self.trainer.config.trial_cache or not desc or 'modules' not in desc:
+            return
+        self.cache = TrialCache(FileOps.join_path(self.trainer.local_output_path, TRIAL_CACHE_FILE))
+        self.desc = desc
+        self.desc_md5 = NetworkDesc.get_md5(desc)
+        self.config_md5 = config_md5(dict(obj2config(self.trainer.config), hps=self.trainer.hps))
+        record = self.cache.get(self.desc_md5, self.config_md5)
+        self.hit = record is not None and record['weights_file'] is not None and \
+            os.path.isfile(record['weights_file'])
+        if self.hit:
+            self.trainer.model.load_state_dict(torch.load(record['weights_file'], map_location='cpu'))
+            self.trainer.performance = record['performance']
+            self.trainer.epochs = 0
+            if self.is_chief:
+                self._save_checkpoint()
+            self.cache.count('hits')
+            self.cache.count('saved_gpu_seconds', record['train_seconds'])
+            logging.info("Trial cache hit, desc md5=%s, performance=%s", self.desc_md5, record['performance'])
+            return
+        self.cache.count('misses')
+        if self.trainer.config.trial_cache_warm_start:
+            self._warm_start()
+        self.start_time = time.time()
+
+    def _save_checkpoint(self):
+        """Save the checkpoint and the model pickle of a hit, no epoch runs to save them."""
+        checkpoint_file = FileOps.join_path(
+            self.trainer.get_local_worker_path(), self.trainer.checkpoint_file_name)
+        model_pickle_file = FileOps.join_path(
+            self.trainer.get_local_worker_path(), self.trainer.model_pickle_file_name)
+        with open(model_pickle_file, 'wb') as f:
+            pickle.dump(self.trainer.model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        ckpt = {
+            'epoch': -1,
+            'weight': self.trainer.model.state_dict(),
+            'optimizer': self.trainer.optimizer.state_dict() if self.trainer.optimizer else None,
+            'lr_scheduler': self.trainer.lr_scheduler.state_dict() if self.trainer.lr_scheduler else None,
+        }
+        torch.save(ckpt, checkpoint_file)
+        self.trainer.checkpoint_file = checkpoint_file
+        self.trainer.model_path = model_pickle_file
+
+    def _warm_start(self):
+        record = self.cache.closest(self.desc)
+        if record is None:
+            return
+        state_dict = torch.load(record['weights_file'], map_location='cpu')
+        copied = copy_matching_weights(self.trainer.model, state_dict)
+        if copied:
+            self.cache.count('warm_starts')
+        logging.info("Warm start from desc md5=%s, similarity=%.3f, copied %d of %d tensors",
+                     record['desc_md5'], record['similarity'], copied, len(state_dict))
+
+    def after_train(self, logs=None):
+        """Be called after the training process."""
+        if self.cache is None:
+            return
+        if not self.hit and self.is_chief and self.trainer.performance:
+            # the weights file was written by ModelCheckpoint
+            self.cache.put(self.desc_md5, self.config_md5, self.desc, self.trainer.performance,
+                           self.trainer.weights_file, time.time() - self.start_time)
+        logging.info("Trial cache stats: %s", self.cache.stats())
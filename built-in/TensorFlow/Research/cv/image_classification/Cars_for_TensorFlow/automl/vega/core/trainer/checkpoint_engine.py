@@ -0,0 +1,231 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""Checkpoint engine which writes checkpoints in the background.
+
+A checkpoint is snapshotted into one of two reusable CPU buffers (pinned
+memory on a GPU host) on the training thread, then serialized, fsynced and
+renamed into place by a writer thread, while the training goes on with the
+other buffer. A file is either the previous or the new complete checkpoint.
+"""
+import copy
+import logging
+import os
+import pickle
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import vega
+
+if vega.is_torch_backend():
+    import torch
+
+
+def _is_tensor(obj):
+    return vega.is_torch_backend() and torch.is_tensor(obj)
+
+
+def snapshot(obj, buffer=None):
+    """Copy the tensors and arrays of a nested state into `buffer`, the previous snapshot of the same state.
+
+    A tensor or array is copied into its buffer when shape and dtype match, otherwise into a new
+    CPU buffer. Other values are deep copied.
+    """
+    if _is_tensor(obj):
+        obj = obj.detach()
+        if not (_is_tensor(buffer) and buffer.shape == obj.shape and buffer.dtype == obj.dtype):
+            buffer = torch.empty(obj.shape, dtype=obj.dtype, device='cpu',
+                                 pin_memory=obj.is_cuda and torch.cuda.is_available())
+        return buffer.copy_(obj, non_blocking=obj.is_cuda)
+    if isinstance(obj, np.ndarray):
+        if not (isinstance(buffer, np.ndarray) and buffer.shape == obj.shape and buffer.dtype == obj.dtype):
+            return obj.copy()
+        np.copyto(buffer, obj)
+        return buffer
+    if isinstance(obj, dict):
+        buffer = buffer if isinstance(buffer, dict) else {}
+        out = OrderedDict() if isinstance(obj, OrderedDict) else {}
+        for key, value in obj.items():
+            out[key] = snapshot(value, buffer.get(key))
+        if hasattr(obj, '_metadata'):
+            # torch state_dict versions
+            out._metadata = copy.deepcopy(obj._metadata)
+        return out
+    if isinstance(obj, (list, tuple)):
+        buffer = buffer if isinstance(buffer, (list, tuple)) and len(buffer) == len(obj) else [None] * len(obj)
+        return type(obj)(snapshot(value, old) for value, old in zip(obj, buffer))
+    return copy.deepcopy(obj)
+
+
+def default_save_fn(obj, f):
+    """torch.save with the torch backend, otherwise pickle."""
+    if vega.is_torch_backend():
+        torch.save(obj, f)
+    else:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def atomic_write(path, write_fn):
+    """Write `path` through a temp file which is fsynced and renamed, `write_fn(f)` writes the content."""
+    tmp_path = '{}.tmp.{}'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _fsync_dir(os.path.dirname(path) or '.')
+
+
+def _fsync_dir(path):
+    # make the rename durable, not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def history_path(path, tag):
+    """Path of the checkpoint `tag` kept beside the latest `path`, e.g. checkpoint_3.pth."""
+    root, ext = os.path.splitext(path)
+    return '{}_{}{}'.format(root, tag, ext)
+
+
+class CheckpointEngine(object):
+    """Save checkpoints synchronously or in the background with double buffering.
+
+    :param async_write: write on a background thread, otherwise on the caller.
+    :param keep: checkpoints `<name>_<tag><ext>` to keep beside the latest one, 0 keeps only the latest.
+    :param save_fn: `save_fn(obj, f)` serializes a checkpoint into the file object `f`.
+    :param num_buffers: snapshot buffers, `save` waits when all of them are being written.
+    """
+
+    def __init__(self, async_write=True, keep=0, save_fn=None, num_buffers=2):
+        self.async_write = async_write
+        self.keep = keep
+        self.save_fn = save_fn or default_save_fn
+        self._buffers = [None] * num_buffers
+        self._free = queue.Queue()
+        for index in range(num_buffers):
+            self._free.put(index)
+        self._jobs = queue.Queue()
+        self._history = {}
+        self._error = None
+        self._thread = None
+        # blocked_time is the time the caller spent in `save`
+        self.stats = {'saves': 0, 'blocked_time': 0., 'write_time': 0.}
+
+    def save(self, state, path, tag=None, blobs=None):
+        """Save the nested `state` to `path`.
+
+        :param tag: also keep the checkpoint as `history_path(path, tag)` when `keep` > 0.
+        :param blobs: dict of path to bytes, written before the checkpoint, e.g. a pickled model.
+        """
+        self._raise_error()
+        start = time.time()
+        index = self._free.get()
+        self._buffers[index] = snapshot(state, self._buffers[index])
+        event = None
+        if vega.is_torch_backend() and torch.cuda.is_available():
+            # the copies from the device are non blocking
+            event = torch.cuda.Event()
+            event.record()
+        self.stats['saves'] += 1
+        job = (index, event, path, tag, blobs or {})
+        if not self.async_write:
+            self._write(job)
+            self.stats['blocked_time'] += time.time() - start
+            self._raise_error()
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='CheckpointWriter')
+            self._thread.daemon = True
+            self._thread.start()
+        self._jobs.put(job)
+        self.stats['blocked_time'] += time.time() - start
+
+    def wait(self):
+        """Wait until the pending checkpoints are written, raise the error of a failed write."""
+        if self._thread is not None:
+            self._jobs.join()
+        self._raise_error()
+
+    def close(self):
+        """Wait for the pending checkpoints and stop the writer thread."""
+        try:
+            self.wait()
+        finally:
+            if self._thread is not None:
+                self._jobs.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                self._write(job)
+            finally:
+                self._jobs.task_done()
+
+    def _write(self, job):
+        index, event, path, tag, blobs = job
+        start = time.time()
+        try:
+            if event is not None:
+                event.synchronize()
+            for blob_path, data in blobs.items():
+                atomic_write(blob_path, lambda f: f.write(data))
+            atomic_write(path, lambda f: self.save_fn(self._buffers[index], f))
+            if self.keep > 0 and tag is not None:
+                self._keep_history(path, tag)
+        except Exception as e:
+            logging.error("Failed to save checkpoint %s, %s", path, e)
+            self._error = e
+        finally:
+            self._free.put(index)
+            self.stats['write_time'] += time.time() - start
+
+    def _keep_history(self, path, tag):
+        tagged = history_path(path, tag)
+        tmp_path = '{}.tmp.{}'.format(tagged, os.getpid())
+        try:
+            os.link(path, tmp_path)
+        except OSError:
+            shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, tagged)
+        history = self._history.setdefault(path, [])
+        if tagged in history:
+            history.remove(tagged)
+        history.append(tagged)
+        while len(history) > self.keep:
+            old = history.pop(0)
+            if os.path.exists(old):
+                os.remove(old)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -102,3 +102,9 @@ class TrainerConfig(object):
     checkpoint_file = None
     weights_file = None
     train_in_once = False
+    # write checkpoints in the background, keep the checkpoints of the last n epochs beside the latest
+    async_checkpoint = True
+    keep_checkpoints = 0
+    # reuse the performance and weights of the trials with the same desc and config, warm start the others
+    trial_cache = False
+    trial_cache_warm_start = True
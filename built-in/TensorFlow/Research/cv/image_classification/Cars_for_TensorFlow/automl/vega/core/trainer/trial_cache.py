@@ -0,0 +1,164 @@
+# -*- coding:utf-8 -*-
+
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# MIT License for more details.
+
+"""Content addressed cache of the trials of a task.
+
+A trial is keyed by the md5 of its network description and the md5 of its
+trainer config, and stores the performance, the weights file and the train
+time. The cache is a SQLite file in the task output dir, shared by the
+worker processes of the task.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+TRIAL_CACHE_FILE = 'trial_cache.db'
+
+_EXCLUDE_CONFIG_KEYS = ['kwargs', 'model_path', 'checkpoint_file', 'weights_file']
+
+
+def config_md5(config, exclude_keys=None):
+    """md5 of a config dict, without the keys which differ between the workers of the same trial."""
+    exclude_keys = _EXCLUDE_CONFIG_KEYS if exclude_keys is None else exclude_keys
+    config = {key: value for key, value in dict(config).items() if key not in exclude_keys}
+    return hashlib.md5(json.dumps(config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def flatten_desc(desc, prefix=''):
+    """Dict of the dotted path to each leaf value of a network description."""
+    items = {}
+    if isinstance(desc, dict):
+        for key, value in desc.items():
+            items.update(flatten_desc(value, '{}{}.'.format(prefix, key)))
+    elif isinstance(desc, (list, tuple)):
+        for index, value in enumerate(desc):
+            items.update(flatten_desc(value, '{}{}.'.format(prefix, index)))
+    else:
+        items[prefix[:-1]] = json.dumps(desc, default=str)
+    return items
+
+
+def desc_similarity(items, other_items):
+    """Jaccard similarity of the leaf items of two flattened descriptions."""
+    union = len(set(items) | set(other_items))
+    if not union:
+        return 0.
+    same = sum(1 for key, value in items.items() if other_items.get(key) == value)
+    return same / union
+
+
+def copy_matching_weights(model, state_dict):
+    """Copy the tensors of `state_dict` to the parameters of `model` with the same name and shape.
+
+    :return: number of the copied tensors
+    :rtype: int
+    """
+    own_state = model.state_dict()
+    matched = {name: value for name, value in state_dict.items()
+               if name in own_state and tuple(own_state[name].shape) == tuple(value.shape)}
+    if matched:
+        own_state.update(matched)
+        model.load_state_dict(own_state)
+    return len(matched)
+
+
+class TrialCache(object):
+    """Trials keyed by desc md5 and config md5, and the hit counters, in a SQLite file.
+
+    :param path: path of the SQLite file.
+    :param timeout: seconds to wait for the lock of another worker.
+    """
+
+    def __init__(self, path, timeout=60):
+        self.path = path
+        self.timeout = timeout
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS trials (desc_md5 TEXT, config_md5 TEXT, desc TEXT, "
+                         "performance TEXT, weights_file TEXT, train_seconds REAL, created REAL, "
+                         "PRIMARY KEY (desc_md5, config_md5))")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL)")
+
+    @contextmanager
+    def _transaction(self):
+        """Connection committed when the block exits, rolled back on error, and closed."""
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, desc_md5, config_md5):
+        """Record of an exact hit, or None."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT desc_md5, config_md5, desc, performance, weights_file, train_seconds "
+                               "FROM trials WHERE desc_md5 = ? AND config_md5 = ?",
+                               (desc_md5, config_md5)).fetchone()
+        return self._record(row) if row else None
+
+    def put(self, desc_md5, config_md5, desc, performance, weights_file=None, train_seconds=0.):
+        """Add or replace the record of a trained trial."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (desc_md5, config_md5, json.dumps(desc, sort_keys=True, default=str),
+                          json.dumps(performance, default=float), weights_file, train_seconds, time.time()))
+
+    def closest(self, desc, min_similarity=0.):
+        """Record with weights of the most similar description, or None.
+
+        The similarity of the flattened descriptions is in the record as `similarity`.
+        """
+        items = flatten_desc(desc)
+        best, best_similarity = None, min_similarity
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT desc_md5, config_md5, desc, performance, weights_file, train_seconds "
+                                "FROM trials WHERE weights_file IS NOT NULL ORDER BY created DESC").fetchall()
+        for row in rows:
+            record = self._record(row)
+            if not os.path.isfile(record['weights_file']):
+                continue
+            similarity = desc_similarity(items, flatten_desc(record['desc']))
+            if similarity > best_similarity:
+                best, best_similarity = record, similarity
+        if best is not None:
+            best['similarity'] = best_similarity
+        return best
+
+    def count(self, name, value=1.):
+        """Add `value` to the counter `name`."""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO counters VALUES (?, 0)", (name,))
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (value, name))
+
+    def stats(self):
+        """Counters of all the workers, with hit rate and the GPU hours saved by the hits."""
+        with self._transaction() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            trials = conn.execute("SELECT COUNT(*) FROM trials").fetchone()[0]
+        hits = int(counters.get('hits', 0))
+        misses = int(counters.get('misses', 0))
+        return {
+            'trials': trials,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.,
+            'warm_starts': int(counters.get('warm_starts', 0)),
+            'saved_gpu_hours': counters.get('saved_gpu_seconds', 0.) / 3600.,
+        }
+
+    @staticmethod
+    def _record(row):
+        desc_md5, config_md5, desc, performance, weights_file, train_seconds = row
+        return {'desc_md5': desc_md5, 'config_md5': config_md5, 'desc': json.loads(desc),
+                'performance': json.loads(performance), 'weights_file': weights_file,
+                'train_seconds': train_seconds}
@@ -0,0 +1,55 @@
+"""
+test numpy segment tree and prioritized replay buffer
+"""
+import unittest
+
+import numpy as np
+
+from xt.algorithm.segment_tree import SumSegmentTree, MinSegmentTree
+from xt.algorithm.prioritized_replay_buffer import PrioritizedReplayBuffer
+
+
+class TestSegmentTree(unittest.TestCase):
+    def test_batch_set(self):
+        values = np.random.rand(50)
+        batch_sum, batch_min = SumSegmentTree(64), MinSegmentTree(64)
+        one_sum, one_min = SumSegmentTree(64), MinSegmentTree(64)
+        batch_sum[np.arange(50)] = values
+        batch_min[np.arange(50)] = values
+        for idx, value in enumerate(values):
+            one_sum[idx] = value
+            one_min[idx] = value
+        np.testing.assert_allclose(batch_sum._value, one_sum._value)
+        np.testing.assert_allclose(batch_min._value, one_min._value)
+        self.assertAlmostEqual(batch_sum.sum(), values.sum())
+        self.assertAlmostEqual(batch_sum.sum(3, 20), values[3:20].sum())
+        self.assertEqual(batch_min.min(), values.min())
+        self.assertEqual(batch_min.min(10, 30), values[10:30].min())
+
+    def test_batch_find_prefixsum_idx(self):
+        tree = SumSegmentTree(16)
+        tree[np.arange(16)] = np.random.rand(16)
+        tree[5] = 0.0
+        prefixsums = np.random.rand(200) * tree.sum()
+        idxes = tree.find_prefixsum_idx(prefixsums)
+        self.assertEqual(idxes.tolist(), [tree.find_prefixsum_idx(prefixsum) for prefixsum in prefixsums])
+        self.assertNotIn(5, idxes.tolist())
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    def test_sample_and_update(self):
+        buff = PrioritizedReplayBuffer(100, alpha=1.0)
+        for i in range(100):
+            buff.add(np.full(2, i), i % 4, float(i), np.full(2, i + 1), False)
+        buff.update_priorities(np.arange(100), np.full(100, 1e-6))
+        buff.update_priorities([7, 42], [10.0, 10.0])
+        obs, actions, rewards, _, _, weights, idxes = buff.sample(64, 0.4)
+        self.assertGreater(np.mean(np.isin(idxes, [7, 42])), 0.9)
+        np.testing.assert_array_equal(obs[:, 0], idxes)
+        np.testing.assert_array_equal(rewards, idxes)
+        self.assertEqual(weights.shape, (64, ))
+        self.assertLessEqual(weights.max(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -46,10 +46,10 @@ class ReplayBufferBase(object):
         for i in idxes:
             data = self._storage[i]
             obs_t, action, reward, obs_tp1, done = data
-            obses_t.append(np.array(obs_t, copy=False))
-            actions.append(np.array(action, copy=False))
+            obses_t.append(np.asarray(obs_t))
+            actions.append(np.asarray(action))
             rewards.append(reward)
-            obses_tp1.append(np.array(obs_tp1, copy=False))
+            obses_tp1.append(np.asarray(obs_tp1))
             dones.append(done)
         return np.array(obses_t), np.array(actions), np.array(rewards), np.array(obses_tp1), np.array(dones)
 
@@ -117,15 +117,11 @@ class PrioritizedReplayBuffer(ReplayBufferBase):
         self._it_min[idx] = self._max_priority**self._alpha
 
     def _sample_proportional(self, batch_size):
-        """to be filled"""
-        res = []
+        """sample one index from each of batch_size equal ranges of the prefix sum, in a batch"""
         p_total = self._it_sum.sum(0, len(self._storage) - 1)
         every_range_len = p_total / batch_size
-        for i in range(batch_size):
-            mass = random.random() * every_range_len + i * every_range_len
-            idx = self._it_sum.find_prefixsum_idx(mass)
-            res.append(idx)
-        return res
+        mass = (np.random.random(batch_size) + np.arange(batch_size)) * every_range_len
+        return self._it_sum.find_prefixsum_idx(mass)
 
     def sample(self, batch_size, beta):
         """Sample a batch of experiences.
@@ -167,15 +163,11 @@ class PrioritizedReplayBuffer(ReplayBufferBase):
 
         idxes = self._sample_proportional(batch_size)
 
-        weights = []
         p_min = self._it_min.min() / self._it_sum.sum()
         max_weight = (p_min * len(self._storage))**(-beta)
 
-        for idx in idxes:
-            p_sample = self._it_sum[idx] / self._it_sum.sum()
-            weight = (p_sample * len(self._storage))**(-beta)
-            weights.append(weight / max_weight)
-        weights = np.array(weights)
+        p_sample = self._it_sum[idxes] / self._it_sum.sum()
+        weights = (p_sample * len(self._storage))**(-beta) / max_weight
         encoded_sample = self._encode_sample(idxes)
         return tuple(list(encoded_sample) + [weights, idxes])
 
@@ -195,10 +187,13 @@ class PrioritizedReplayBuffer(ReplayBufferBase):
             variable `idxes`.
         """
         assert len(idxes) == len(priorities)
-        for idx, priority in zip(idxes, priorities):
-            assert priority > 0
-            assert 0 <= idx < len(self._storage)
-            self._it_sum[idx] = priority**self._alpha
-            self._it_min[idx] = priority**self._alpha
-
-            self._max_priority = max(self._max_priority, priority)
+        if not len(idxes):
+            return
+        idxes = np.asarray(idxes, dtype=np.int64)
+        priorities = np.asarray(priorities, dtype=np.float64).reshape(-1)
+        assert np.all(priorities > 0)
+        assert np.all((0 <= idxes) & (idxes < len(self._storage)))
+        self._it_sum[idxes] = priorities**self._alpha
+        self._it_min[idxes] = priorities**self._alpha
+
+        self._max_priority = max(self._max_priority, np.max(priorities))
@@ -4,10 +4,12 @@
 """
 import operator
 
+import numpy as np
+
 
 class SegmentTree(object):
     """Build a Segment Tree data structure."""
-    def __init__(self, capacity, operation, neutral_element):
+    def __init__(self, capacity, operation, neutral_element, ufunc=None):
         """Build a Segment Tree data structure.
 
         https://en.wikipedia.org/wiki/Segment_tree
@@ -32,12 +34,16 @@ class SegmentTree(object):
         neutral_element: obj
             neutral element for the operation above. eg. float('-inf')
             for max and 0 for sum.
+        ufunc: np.ufunc
+            numpy version of operation, used to update many items in a batch.
+            items are updated one by one if it's None.
         """
         assert capacity > 0 and capacity & (capacity - 1) == 0, \
             "capacity must be positive and a power of 2."
         self._capacity = capacity
-        self._value = [neutral_element for _ in range(2 * capacity)]
+        self._value = np.full(2 * capacity, neutral_element, dtype=np.float64)
         self._operation = operation
+        self._ufunc = ufunc
 
     def _reduce_helper(self, start, end, node, node_start, node_end):
         """to be filled"""
@@ -80,15 +86,39 @@ class SegmentTree(object):
         return self._reduce_helper(start, end, 1, 0, self._capacity - 1)
 
     def __setitem__(self, idx, val):
+        if np.ndim(idx) > 0:
+            self._set_many(np.asarray(idx, dtype=np.int64), val)
+            return
+        value, operation = self._value, self._operation
         # index of the leaf
         idx += self._capacity
-        self._value[idx] = val
+        value[idx] = val
         idx //= 2
         while idx >= 1:
-            self._value[idx] = self._operation(self._value[2 * idx], self._value[2 * idx + 1])
+            value[idx] = operation(value[2 * idx], value[2 * idx + 1])
             idx //= 2
 
+    def _set_many(self, idxes, vals):
+        """set leaves in a batch, then update their ancestors level by level"""
+        if self._ufunc is None:
+            for idx, val in zip(idxes, np.broadcast_to(vals, idxes.shape)):
+                self[int(idx)] = val
+            return
+        if not idxes.size:
+            return
+        idxes = idxes + self._capacity
+        self._value[idxes] = vals
+        # all nodes are in the same level, duplicated parents get the same value
+        idxes //= 2
+        while idxes[0] >= 1:
+            self._value[idxes] = self._ufunc(self._value[2 * idxes], self._value[2 * idxes + 1])
+            idxes //= 2
+
     def __getitem__(self, idx):
+        if np.ndim(idx) > 0:
+            idx = np.asarray(idx)
+            assert np.all((0 <= idx) & (idx < self._capacity))
+            return self._value[self._capacity + idx]
         assert 0 <= idx < self._capacity
         return self._value[self._capacity + idx]
 
@@ -97,10 +127,12 @@ class SumSegmentTree(SegmentTree):
     """SumSegmentTree"""
     def __init__(self, capacity):
         super(SumSegmentTree, self).__init__(capacity=capacity,
-                                             operation=operator.add, neutral_element=0.0)
+                                             operation=operator.add, neutral_element=0.0, ufunc=np.add)
 
     def sum(self, start=0, end=None):
         """Returns arr[start] + ... + arr[end]"""
+        if start == 0 and end is None:
+            return self._value[1]
         return super(SumSegmentTree, self).reduce(start, end)
 
     def find_prefixsum_idx(self, prefixsum):
@@ -113,14 +145,17 @@ class SumSegmentTree(SegmentTree):
 
         Parameters
         ----------
-        perfixsum: float
-            upperbound on the sum of array prefix
+        perfixsum: float or np.array
+            upperbound on the sum of array prefix,
+            all prefixsums of an array go down the tree together.
 
         Returns
         -------
-        idx: int
+        idx: int or np.array
             highest index satisfying the prefixsum constraint
         """
+        if np.ndim(prefixsum) > 0:
+            return self._find_prefixsum_idxes(np.array(prefixsum, dtype=np.float64))
         assert 0 <= prefixsum <= self.sum() + 1e-5
         idx = 1
         while idx < self._capacity:  # while non-leaf
@@ -131,14 +166,26 @@ class SumSegmentTree(SegmentTree):
                 idx = 2 * idx + 1
         return idx - self._capacity
 
+    def _find_prefixsum_idxes(self, prefixsums):
+        """vectorized `find_prefixsum_idx` of an array of prefixsums"""
+        assert np.all(prefixsums >= 0) and np.all(prefixsums <= self.sum() + 1e-5)
+        idxes = np.ones(len(prefixsums), dtype=np.int64)
+        while idxes[0] < self._capacity:  # all nodes are in the same level
+            left = self._value[2 * idxes]
+            go_right = left <= prefixsums
+            prefixsums -= np.where(go_right, left, 0.0)
+            idxes = 2 * idxes + go_right
+        return idxes - self._capacity
+
 
 class MinSegmentTree(SegmentTree):
     """MinSegmentTree"""
     def __init__(self, capacity):
         super(MinSegmentTree, self).__init__(capacity=capacity, operation=min,
-                                             neutral_element=float('inf'))
+                                             neutral_element=float('inf'), ufunc=np.minimum)
 
     def min(self, start=0, end=None):
         """Returns min(arr[start], ...,  arr[end])"""
-
+        if start == 0 and end is None:
+            return self._value[1]
         return super(MinSegmentTree, self).reduce(start, end)
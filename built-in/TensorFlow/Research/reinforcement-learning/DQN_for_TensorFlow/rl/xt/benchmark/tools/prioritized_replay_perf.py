@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""micro benchmark of the prioritized replay buffer
+    compare the numpy segment tree with the list based one,
+    which samples and updates priorities one index by one index.
+
+    usage:
+    `python xt/benchmark/tools/prioritized_replay_perf.py -s 1000000 -b 512`
+"""
+
+import argparse
+import operator
+import random
+from time import time
+
+import numpy as np
+
+from xt.algorithm.prioritized_replay_buffer import PrioritizedReplayBuffer
+
+
+class ListSegmentTree(object):
+    """list based segment tree, the implementation before numpy"""
+    def __init__(self, capacity, operation, neutral_element):
+        self._capacity = capacity
+        self._value = [neutral_element for _ in range(2 * capacity)]
+        self._operation = operation
+
+    def __setitem__(self, idx, val):
+        idx += self._capacity
+        self._value[idx] = val
+        idx //= 2
+        while idx >= 1:
+            self._value[idx] = self._operation(self._value[2 * idx], self._value[2 * idx + 1])
+            idx //= 2
+
+    def __getitem__(self, idx):
+        return self._value[self._capacity + idx]
+
+    def find_prefixsum_idx(self, prefixsum):
+        """find one index by walking down the tree"""
+        idx = 1
+        while idx < self._capacity:
+            if self._value[2 * idx] > prefixsum:
+                idx = 2 * idx
+            else:
+                prefixsum -= self._value[2 * idx]
+                idx = 2 * idx + 1
+        return idx - self._capacity
+
+
+class ListPrioritizedReplayBuffer(PrioritizedReplayBuffer):
+    """sample and update priorities one index by one index, the implementation before numpy"""
+    def __init__(self, size, alpha):
+        super(ListPrioritizedReplayBuffer, self).__init__(size, alpha)
+        capacity = self._it_sum._capacity
+        self._it_sum = ListSegmentTree(capacity, operator.add, 0.0)
+        self._it_min = ListSegmentTree(capacity, min, float("inf"))
+
+    def sample(self, batch_size, beta):
+        """sample with a loop of tree walks, root is used as the total sum"""
+        idxes = []
+        every_range_len = self._it_sum._value[1] / batch_size
+        for i in range(batch_size):
+            mass = random.random() * every_range_len + i * every_range_len
+            idxes.append(self._it_sum.find_prefixsum_idx(mass))
+        weights = []
+        p_min = self._it_min._value[1] / self._it_sum._value[1]
+        max_weight = (p_min * len(self._storage))**(-beta)
+        for idx in idxes:
+            p_sample = self._it_sum[idx] / self._it_sum._value[1]
+            weight = (p_sample * len(self._storage))**(-beta)
+            weights.append(weight / max_weight)
+        weights = np.array(weights)
+        encoded_sample = self._encode_sample(idxes)
+        return tuple(list(encoded_sample) + [weights, idxes])
+
+    def update_priorities(self, idxes, priorities):
+        """update priorities one by one"""
+        for idx, priority in zip(idxes, priorities):
+            self._it_sum[idx] = priority**self._alpha
+            self._it_min[idx] = priority**self._alpha
+            self._max_priority = max(self._max_priority, priority)
+
+
+def bench(buff_cls, size, batch_size, steps):
+    """sample and update priorities with buff_cls, return seconds per step"""
+    buff = buff_cls(size, alpha=0.6)
+    for _ in range(size):
+        buff.add(0, 0, 0.0, 0, False)
+    start = time()
+    for _ in range(steps):
+        idxes = buff.sample(batch_size, 0.4)[-1]
+        buff.update_priorities(idxes, np.random.random(batch_size) + 1e-6)
+    return (time() - start) / steps
+
+
+def main():
+    """run benchmark"""
+    parser = argparse.ArgumentParser(description="prioritized replay micro benchmark.")
+    parser.add_argument("-s", "--size", type=int, default=1000000, help="transitions in buffer")
+    parser.add_argument("-b", "--batch_size", type=int, default=512, help="batch size")
+    parser.add_argument("-n", "--steps", type=int, default=100, help="sample and update steps")
+    args = parser.parse_args()
+
+    list_cost = bench(ListPrioritizedReplayBuffer, args.size, args.batch_size, args.steps)
+    numpy_cost = bench(PrioritizedReplayBuffer, args.size, args.batch_size, args.steps)
+    print("size: {}, batch size: {}".format(args.size, args.batch_size))
+    print("list tree: {:.3f} ms/step".format(list_cost * 1000))
+    print("numpy tree: {:.3f} ms/step".format(numpy_cost * 1000))
+
+
+if __name__ == "__main__":
+    main()
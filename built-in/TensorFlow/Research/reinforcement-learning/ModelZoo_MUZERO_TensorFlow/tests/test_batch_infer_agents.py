@@ -0,0 +1,174 @@
+"""
+test batched inference of the agents within an agent group
+"""
+import unittest
+
+import numpy as np
+
+from xt.agent.muzero.muzero import Muzero
+from xt.agent.ppo.catchpigs_ppo import CatchPigsPpo
+from xt.algorithm.ppo.ppo import PPO
+from xt.framework.agent_group import AgentGroup
+from xt.util.profile_stats import AgentGroupStats
+from tests.test_batch_mcts import FakeNetwork
+
+ACTION_DIM = 4
+STATE_SHAPE = (3, 3, 2)
+
+
+class FakeActor(object):
+    """ linear policy and value, records the batch size of each predict """
+    def __init__(self):
+        rand = np.random.RandomState(0)
+        self.pol = rand.randn(np.prod(STATE_SHAPE), ACTION_DIM)
+        self.val = rand.randn(np.prod(STATE_SHAPE), 1)
+        self.batch_sizes = []
+
+    def predict(self, states):
+        self.batch_sizes.append(len(states))
+        flat = states.reshape(len(states), -1)
+        logits = flat.dot(self.pol)
+        probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return [probs / probs.sum(axis=-1, keepdims=True), flat.dot(self.val)]
+
+
+class FakePPO(PPO):
+    def __init__(self, actor):  # pylint: disable=W0231
+        self.actor = actor
+        self.action_dim = ACTION_DIM
+        self.weights_map = {"0": {"prefix": "actor"}, "1": {"prefix": "actor"}}
+
+
+class FakeMuzeroAlg(object):
+    """ muzero algorithm without weights map, all agents share the network """
+    def __init__(self, network):
+        self.actor = network
+        self.action_dim = network.pol.shape[1]
+        self.weights_map = {}
+
+
+class FakeEnv(object):
+    def __init__(self, state_shape=STATE_SHAPE):
+        self.rand = np.random.RandomState(1)
+        self.state_shape = state_shape
+
+    def step(self, action_package):
+        ids = list(action_package.keys())
+        next_states = {_id: self.rand.rand(*self.state_shape) for _id in ids}
+        return (next_states, {_id: 1.0 for _id in ids},
+                {_id: False for _id in ids}, {_id: {} for _id in ids})
+
+
+def _agents(actor, agent_num=2):
+    return [CatchPigsPpo(FakeEnv(), FakePPO(actor), {"agent_id": str(i)},
+                         recv_explorer=None, send_explorer=None)
+            for i in range(agent_num)]
+
+
+def _muzero_agents(network, agent_num=2, num_simulations=10):
+    agents = [Muzero(FakeEnv(), FakeMuzeroAlg(network), {"agent_id": str(i)},
+                     recv_explorer=None, send_explorer=None)
+              for i in range(agent_num)]
+    for agent in agents:
+        agent.num_simulations = num_simulations
+    return agents
+
+
+def _group(agents, batch_infer, state_shape=STATE_SHAPE):
+    group = AgentGroup.__new__(AgentGroup)
+    group.agents = agents
+    group.env = FakeEnv(state_shape)
+    group.alg_weights_map = agents[0].alg.weights_map
+    group.batch_infer = batch_infer and group._share_weights()
+    group.ag_stats = AgentGroupStats(len(agents), "unified")
+    group.bot = None
+    return group
+
+
+class TestBatchInferAgents(unittest.TestCase):
+    def setUp(self):
+        rand = np.random.RandomState(2)
+        self.states = {str(i): rand.rand(*STATE_SHAPE) for i in range(2)}
+
+    def test_predict_batch(self):
+        alg = FakePPO(FakeActor())
+        states = list(self.states.values())
+        for single, batch in zip([alg.predict(state) for state in states],
+                                 alg.predict_batch(states)):
+            np.testing.assert_allclose(single[0], batch[0])
+            np.testing.assert_allclose(single[1], batch[1])
+            self.assertEqual(batch[0].shape, (1, ACTION_DIM))
+
+    def test_same_as_agent_by_agent(self):
+        seq_agents, batch_agents = _agents(FakeActor()), _agents(FakeActor())
+        states = list(self.states.values())
+
+        np.random.seed(3)
+        seq_actions = [agent.infer_action(state, True) for agent, state in zip(seq_agents, states)]
+        np.random.seed(3)
+        batch_actions = CatchPigsPpo.group_infer_actions(batch_agents, states, True)
+        self.assertEqual(seq_actions, batch_actions)
+
+        next_states = [state + 1.0 for state in states]
+        for agent, state in zip(seq_agents, next_states):
+            agent.handle_env_feedback(state, 1.0, False, {}, True)
+        CatchPigsPpo.group_handle_env_feedbacks(
+            batch_agents, [(state, 1.0, False, {}, True) for state in next_states])
+        for seq_agent, batch_agent in zip(seq_agents, batch_agents):
+            np.testing.assert_allclose(seq_agent.next_action, batch_agent.next_action)
+            np.testing.assert_allclose(seq_agent.transition_data["next_value"],
+                                       batch_agent.transition_data["next_value"])
+
+    def test_group_interaction(self):
+        actor = FakeActor()
+        group = _group(_agents(actor), batch_infer=True)
+        states = self.states
+        for _ in range(3):
+            for agent in group.agents:
+                agent.clear_transition()
+            states, transitions = group._do_one_unified_interaction(states, group.agents, True)
+            for agent, trans in zip(group.agents, transitions):
+                self.assertIs(states[agent.id], trans["next_state"])
+
+        # first infer, then one feedback batch per step
+        self.assertEqual(actor.batch_sizes, [2] * 4)
+        stats = group.ag_stats.get()
+        self.assertEqual(stats["iters"], 3)
+        for key in ("mean_inference_time_ms", "mean_env_step_time_ms", "mean_feedback_time_ms"):
+            self.assertGreaterEqual(stats[key], 0.0)
+
+    def test_group_interaction_muzero(self):
+        network = FakeNetwork()
+        group = _group(_muzero_agents(network), batch_infer=True, state_shape=(3, ))
+        self.assertTrue(group.batch_infer)
+        rand = np.random.RandomState(4)
+        states = {str(i): rand.randn(3) for i in range(2)}
+        for _ in range(2):
+            for agent in group.agents:
+                agent.clear_transition()
+            _, transitions = group._do_one_unified_interaction(states, group.agents, True)
+            for trans in transitions:
+                self.assertIn(trans["action"], range(network.pol.shape[1]))
+                self.assertAlmostEqual(sum(trans["child_visits"]), 1.0)
+                self.assertIn("eval_reward", trans["info"])
+            states = {str(i): rand.randn(3) for i in range(2)}
+
+        # the trees of both agents are searched with one recurrent inference per simulation
+        self.assertEqual(network.recurrent_batch_sizes, [2] * 10 * 2)
+
+    def test_muzero_single_agent(self):
+        network = FakeNetwork()
+        agents = _muzero_agents(network, agent_num=1)
+        actions = Muzero.group_infer_actions(agents, [np.ones(3)], False)
+        self.assertEqual(network.recurrent_batch_sizes, [1] * 10)
+        self.assertEqual(agents[0].transition_data["action"], actions[0])
+
+    def test_disable_without_shared_weights(self):
+        agents = _agents(FakeActor())
+        for agent in agents:
+            agent.alg.weights_map = {"0": {"prefix": "actor_0"}, "1": {"prefix": "actor_1"}}
+        self.assertFalse(_group(agents, batch_infer=True).batch_infer)
+
+
+if __name__ == "__main__":
+    unittest.main()
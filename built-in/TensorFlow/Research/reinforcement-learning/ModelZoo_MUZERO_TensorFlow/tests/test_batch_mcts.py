@@ -0,0 +1,104 @@
+"""
+test array backed batch mcts against the node based mcts
+"""
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from xt.agent.muzero.mcts import BatchMcts, Mcts
+from xt.model.muzero.muzero_model import NetworkOutput, stack_outputs
+
+ACTION_DIM = 4
+HIDDEN_DIM = 8
+
+
+class FakeNetwork(object):
+    """ small deterministic dynamics, with single and batch inference """
+    def __init__(self, seed=0):
+        rand = np.random.RandomState(seed)
+        self.rep = rand.randn(3, HIDDEN_DIM)
+        self.dyn = rand.randn(HIDDEN_DIM + ACTION_DIM, HIDDEN_DIM) * 0.5
+        self.pol = rand.randn(HIDDEN_DIM, ACTION_DIM)
+        self.val = rand.randn(HIDDEN_DIM)
+        self.recurrent_batch_sizes = []
+
+    def _predict(self, hidden):
+        logits = hidden.dot(self.pol)
+        policy = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        policy /= policy.sum(axis=-1, keepdims=True)
+        return policy, hidden.dot(self.val)
+
+    def initial_inference_batch(self, states):
+        hidden = np.tanh(states.dot(self.rep))
+        policy, value = self._predict(hidden)
+        return NetworkOutput(value, np.zeros(len(value)), policy, hidden)
+
+    def recurrent_inference_batch(self, hidden_state, action):
+        self.recurrent_batch_sizes.append(len(action))
+        conditioned = np.concatenate((hidden_state, np.eye(ACTION_DIM)[action]), axis=-1)
+        hidden = np.tanh(conditioned.dot(self.dyn))
+        policy, value = self._predict(hidden)
+        return NetworkOutput(value, hidden.sum(axis=-1) * 0.1, policy, hidden)
+
+    def initial_inference(self, state):
+        output = self.initial_inference_batch(state)
+        return NetworkOutput(output.value[0], 0, output.policy[0], output.hidden_state[0])
+
+    def recurrent_inference(self, hidden_state, action):
+        output = self.recurrent_inference_batch(hidden_state[None], np.array([action]))
+        return NetworkOutput(output.value[0], output.reward[0], output.policy[0], output.hidden_state[0])
+
+
+def _agent(network, num_simulations=30):
+    alg = SimpleNamespace(actor=network, action_dim=ACTION_DIM)
+    return SimpleNamespace(alg=alg, num_simulations=num_simulations)
+
+
+class TestBatchMcts(unittest.TestCase):
+    def setUp(self):
+        self.states = np.random.RandomState(1).randn(5, 3)
+
+    def test_same_as_node_mcts(self):
+        agent = _agent(FakeNetwork())
+        batch_mcts = BatchMcts(agent, self.states)
+        batch_mcts.run_mcts()
+        batch_info = batch_mcts.get_info()
+        batch_action = batch_mcts.select_action(mode='max')
+
+        for i, state in enumerate(self.states):
+            mcts = Mcts(agent, state)
+            mcts.run_mcts()
+            info = mcts.get_info()
+            np.testing.assert_allclose(batch_info[i]["child_visits"], info["child_visits"])
+            self.assertAlmostEqual(batch_info[i]["root_value"], info["root_value"])
+            self.assertEqual(batch_action[i], mcts.select_action(mode='max'))
+
+    def test_recurrent_inference_batched(self):
+        network = FakeNetwork()
+        mcts = BatchMcts(_agent(network, num_simulations=20), self.states)
+        mcts.run_mcts()
+        self.assertEqual(network.recurrent_batch_sizes, [5] * 20)
+        self.assertTrue(np.all(mcts.visit_count[mcts.root_keys] == 20))
+        np.testing.assert_array_equal(mcts.next_keys, mcts.root_keys + 21)
+
+    def test_exploration_noise(self):
+        mcts = BatchMcts(_agent(FakeNetwork()), self.states)
+        mcts.add_exploration_noise()
+        np.testing.assert_allclose(mcts.prior[mcts.root_keys].sum(axis=1), 1.0)
+        mcts.run_mcts()
+        actions = mcts.select_action()
+        self.assertEqual(actions.shape, (5, ))
+        self.assertTrue(np.all((actions >= 0) & (actions < ACTION_DIM)))
+
+    def test_stack_outputs(self):
+        network = FakeNetwork()
+        outputs = [network.initial_inference(state[None]) for state in self.states]
+        stacked = stack_outputs(outputs)
+        expected = network.initial_inference_batch(self.states)
+        np.testing.assert_allclose(stacked.value, expected.value)
+        np.testing.assert_allclose(stacked.hidden_state, expected.hidden_state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+test batching predict thread of learner
+"""
+import queue
+import threading
+import unittest
+
+import numpy as np
+
+from xt.framework.comm.message import message, get_msg_data, get_msg_info
+from xt.framework.learner import PredictThread
+from xt.util.profile_stats import PredictStats
+
+
+class FakeQueue(object):
+    def __init__(self):
+        self.q = queue.Queue()
+
+    def send(self, data, name=None, block=True):
+        self.q.put(data)
+
+    def recv(self, name=None, block=True):
+        return self.q.get(block=block)
+
+
+class FakeAlg(object):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, state):
+        self.batch_sizes.append(1)
+        return int(np.sum(state))
+
+    def predict_batch(self, states):
+        self.batch_sizes.append(len(states))
+        return [int(v) for v in np.sum(np.stack(states), axis=1)]
+
+
+class TestPredictThread(unittest.TestCase):
+    def test_batch_and_scatter(self):
+        request_q, reply_q, stats_q = FakeQueue(), FakeQueue(), FakeQueue()
+        alg = FakeAlg()
+        predictor = PredictThread(0, alg, request_q, reply_q, stats_q, threading.Lock(),
+                                  max_batch=8, max_wait_us=200000)
+        for i in range(20):
+            request_q.send(message(np.full(3, i), cmd="predict", explorer_id=i % 4, agent_id=i))
+        thread = threading.Thread(target=predictor.predict)
+        thread.setDaemon(True)
+        thread.start()
+
+        replies = [reply_q.recv() for _ in range(20)]
+        self.assertEqual(alg.batch_sizes, [8, 8, 4])
+        for reply in replies:
+            agent_id = get_msg_info(reply, "agent_id")
+            self.assertEqual(get_msg_info(reply, "explorer_id"), agent_id % 4)
+            self.assertEqual(get_msg_info(reply, "cmd"), "predict_reply")
+            self.assertEqual(get_msg_data(reply), agent_id * 3)
+
+
+class TestPredictStats(unittest.TestCase):
+    def test_histograms(self):
+        stats = PredictStats()
+        stats.add_batch(1, [0.00001])
+        stats.add_batch(30, [0.003] * 30)
+        hists = stats.histograms()
+        self.assertEqual(hists["predictor_batch_size"][1].sum(), 2)
+        self.assertEqual(hists["predictor_queue_ms"][1].sum(), 31)
+        ret = stats.get()
+        self.assertAlmostEqual(ret["mean_predictor_batch_size"], 15.5)
+        self.assertEqual(ret["p99_predictor_batch_size"], 32)
+        self.assertEqual(ret["p99_predictor_queue_ms"], 5)
+        self.assertEqual(stats.batches, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+test ring replay buffers
+"""
+import unittest
+
+import numpy as np
+
+from xt.algorithm.replay_buffer import ReplayBuffer, NumpyReplayBuffer
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def test_ring(self):
+        buff = ReplayBuffer(4)
+        for i in range(6):
+            buff.add({"id": i})
+        self.assertEqual(buff.count(), 4)
+        self.assertEqual(sorted(e["id"] for e in buff.get_batch(10)), [2, 3, 4, 5])
+
+    def test_numpy_ring(self):
+        buff = NumpyReplayBuffer(4, compress_fields=(0, ))
+        for i in range(6):
+            state = np.full((2, 3), i, dtype=np.uint8)
+            buff.add((state, i % 2, 1 if i < 3 else 0.5, state + 1, i == 5))
+        self.assertEqual(buff.count(), 4)
+        states, actions, rewards, new_states, dones = buff.get_batch(10)
+        self.assertEqual(states.shape, (4, 2, 3))
+        self.assertEqual(states.dtype, np.uint8)
+        self.assertEqual(sorted(states[:, 0, 0].tolist()), [2, 3, 4, 5])
+        np.testing.assert_array_equal(new_states, states + 1)
+        np.testing.assert_array_equal(actions, states[:, 0, 0] % 2)
+        np.testing.assert_array_equal(rewards, np.where(states[:, 0, 0] < 3, 1., 0.5))
+        np.testing.assert_array_equal(dones, states[:, 0, 0] == 5)
+
+    def test_numpy_dict(self):
+        buff = NumpyReplayBuffer(8)
+        with self.assertRaises(ValueError):
+            buff.get_batch(2)
+        for i in range(3):
+            buff.add({"obs": [i, i], "reward": float(i)})
+        batch = buff.get_batch(2)
+        self.assertEqual(batch["obs"].shape, (2, 2))
+        np.testing.assert_array_equal(batch["obs"][:, 0], batch["reward"])
+        buff.erase()
+        with self.assertRaises(ValueError):
+            buff.get_batch(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
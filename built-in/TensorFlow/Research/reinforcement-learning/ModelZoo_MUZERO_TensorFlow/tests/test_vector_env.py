@@ -0,0 +1,146 @@
+"""
+test the muzero pong config, which steps copies of the atari env in lockstep
+and searches their trees with the batched mcts
+"""
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import yaml
+
+from xt.environment.environment import Environment
+from xt.environment.vector.vector_env import VectorEnv
+from xt.framework.agent_group import AgentGroup
+from xt.framework.register import Registers
+from tests.test_batch_mcts import FakeNetwork, HIDDEN_DIM
+
+CONFIG = os.path.join(os.path.dirname(__file__), "../examples/default_cases/muzero_pong_new.yaml")
+EPISODE_STEPS = 6
+
+
+@Registers.env.register
+class FakeAtariEnv(Environment):
+    """ atari env with the pong state, the episode of the i-th copy is done after 3 + i steps """
+    copies = 0
+
+    def init_env(self, env_info):
+        self.state_dim = tuple(env_info["state_dim"])
+        self.episode_len = 3 + FakeAtariEnv.copies
+        FakeAtariEnv.copies += 1
+        self.rand = np.random.RandomState(self.episode_len)
+        self.steps = 0
+        self.actions = []
+        return None
+
+    def reset(self):
+        self.steps = 0
+        self.init_state = self.rand.randint(0, 255, self.state_dim).astype(np.uint8)
+        return self.init_state
+
+    def step(self, action, agent_index=0):
+        self.steps += 1
+        self.actions.append(action)
+        state = self.rand.randint(0, 255, self.state_dim).astype(np.uint8)
+        return state, 1.0, self.steps >= self.episode_len, {}
+
+    def close(self):
+        pass
+
+
+class PongNetwork(FakeNetwork):
+    """ fake network with the pong state and action dim """
+    def __init__(self, state_dim, action_dim):
+        super(PongNetwork, self).__init__()
+        rand = np.random.RandomState(1)
+        self.rep = rand.randn(int(np.prod(state_dim)), HIDDEN_DIM) * 1e-3
+        self.dyn = rand.randn(HIDDEN_DIM + action_dim, HIDDEN_DIM) * 0.5
+        self.pol = rand.randn(HIDDEN_DIM, action_dim)
+        self.action_dim = action_dim
+
+    def initial_inference_batch(self, states):
+        return super(PongNetwork, self).initial_inference_batch(states.reshape(len(states), -1) / 255.)
+
+    def recurrent_inference_batch(self, hidden_state, action):
+        with mock.patch("tests.test_batch_mcts.ACTION_DIM", self.action_dim):
+            return super(PongNetwork, self).recurrent_inference_batch(hidden_state, action)
+
+
+class FakeAlg(object):
+    """ muzero algorithm without weights map, the agents share the network """
+    def __init__(self, network):
+        self.actor = network
+        self.action_dim = network.action_dim
+        self.weights_map = {}
+        self.async_flag = False
+
+
+class FakeRecv(object):
+    def recv(self, name=None, block=True):
+        raise RuntimeError("no model")
+
+
+class FakeSend(object):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+class TestVectorEnv(unittest.TestCase):
+    def setUp(self):
+        FakeAtariEnv.copies = 0
+        with open(CONFIG) as conf_file:
+            self.config = yaml.safe_load(conf_file)
+        actor = self.config["model_para"]["actor"]
+        self.network = PongNetwork(actor["state_dim"], actor["action_dim"])
+
+    def _group(self, send):
+        env_para, agent_para = self.config["env_para"], self.config["agent_para"]
+        env_para["env_info"].update({"env_name": "FakeAtariEnv",
+                                     "state_dim": self.config["model_para"]["actor"]["state_dim"]})
+        agent_para["agent_config"]["max_steps"] = EPISODE_STEPS
+        alg = FakeAlg(self.network)
+        with mock.patch("xt.framework.agent_group.alg_builder", lambda **kwargs: alg):
+            group = AgentGroup(env_para, self.config["alg_para"], agent_para, FakeRecv(), send)
+        for agent in group.agents:
+            agent.num_simulations = 5
+        return group
+
+    def test_config(self):
+        self.assertEqual(self.config["env_para"]["env_name"], "VectorEnv")
+        self.assertGreater(self.config["agent_para"]["agent_num"], 1)
+        self.assertTrue(self.config["agent_para"]["batch_infer"])
+
+    def test_explore_batched(self):
+        send = FakeSend()
+        group = self._group(send)
+        agent_num = self.config["agent_para"]["agent_num"]
+        self.assertIsInstance(group.env, VectorEnv)
+        self.assertEqual(group.env_info["api_type"], "unified")
+        self.assertEqual(group.env_info["agent_ids"], list(range(agent_num)))
+        self.assertTrue(group.batch_infer)
+
+        group.explore(1)
+
+        # a copy stops when it's done, the others go on until max steps
+        episode_lens = [min(3 + i, EPISODE_STEPS) for i in range(agent_num)]
+        trajectories = send.sent[:-1]
+        self.assertEqual(len(trajectories), agent_num)
+        for trajectory, env, episode_len in zip(trajectories, group.env.envs, episode_lens):
+            self.assertEqual(len(trajectory["data"]["action"]), episode_len)
+            self.assertEqual(trajectory["data"]["action"], env.actions)
+            self.assertEqual(trajectory["data"]["done"][-1], episode_len == env.episode_len)
+            self.assertEqual(trajectory["data"]["cur_state"][0].shape, (84, 84, 4))
+        self.assertEqual(send.sent[-1]["ctr_info"]["cmd"], "stats_msg")
+
+        # one recurrent inference per simulation for the copies not done yet
+        alive = [sum(1 for episode_len in episode_lens if episode_len > step)
+                 for step in range(EPISODE_STEPS)]
+        expected = [num for num in alive for _ in range(5) if num > 1]
+        self.assertEqual([size for size in self.network.recurrent_batch_sizes if size > 1], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+test versioned in memory weights publish
+"""
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from xt.framework.weight_channel import WeightPublisher, WeightSubscriber, is_weights_packet
+
+
+def _weights(seed):
+    rand = np.random.RandomState(seed)
+    return [rand.randn(16, 8).astype(np.float32),
+            rand.randn(8).astype(np.float32),
+            np.array([seed], dtype=np.int64)]
+
+
+class TestWeightChannel(unittest.TestCase):
+    def test_full_packet(self):
+        publisher = WeightPublisher()
+        subscriber = WeightSubscriber()
+        weights = _weights(0)
+        packet = publisher.publish(weights)
+        self.assertTrue(is_weights_packet(packet))
+        self.assertFalse(is_weights_packet(["actor_00001.h5"]))
+
+        restored = subscriber.apply(packet)
+        self.assertEqual(subscriber.version, 1)
+        for value, expected in zip(restored, weights):
+            np.testing.assert_array_equal(value, expected)
+            self.assertEqual(value.dtype, expected.dtype)
+
+    def test_skip_same_version(self):
+        publisher = WeightPublisher()
+        subscriber = WeightSubscriber()
+        packet = publisher.publish(_weights(0))
+        self.assertIsNotNone(subscriber.apply(packet))
+        self.assertIsNone(subscriber.apply(packet))
+        self.assertEqual(subscriber.skipped, 1)
+
+    def test_float16(self):
+        publisher = WeightPublisher(dtype="float16")
+        subscriber = WeightSubscriber()
+        weights = _weights(0)
+        packet = publisher.publish(weights)
+        self.assertEqual(packet["data"][0].dtype, np.float16)
+        self.assertEqual(packet["data"][2].dtype, np.int64)
+
+        restored = subscriber.apply(packet)
+        self.assertEqual(restored[0].dtype, np.float32)
+        np.testing.assert_allclose(restored[0], weights[0], atol=1e-2)
+
+    def test_delta_to_keyframe(self):
+        publisher = WeightPublisher(dtype="float16", keyframe_interval=4)
+        subscriber = WeightSubscriber()
+        weights = _weights(0)
+        for version in range(1, 10):
+            weights = [weights[0] + 0.01 * version, weights[1] - 0.02, weights[2] + 1]
+            packet = publisher.publish(weights)
+            self.assertEqual(packet["base_version"] is None, version in (1, 5, 9))
+            restored = subscriber.apply(packet)
+            self.assertEqual(subscriber.version, version)
+            # float16 error of the delta only, doesn't grow with versions
+            np.testing.assert_allclose(restored[0], weights[0], atol=1e-3)
+            np.testing.assert_allclose(restored[1], weights[1], atol=1e-3)
+            np.testing.assert_array_equal(restored[2], weights[2])
+
+    def test_delta_without_keyframe(self):
+        publisher = WeightPublisher(keyframe_interval=3)
+        packets = [publisher.publish(_weights(i)) for i in range(4)]
+
+        # joined after the first key frame, wait for the next one
+        subscriber = WeightSubscriber()
+        self.assertIsNone(subscriber.apply(packets[1]))
+        self.assertIsNone(subscriber.apply(packets[2]))
+        restored = subscriber.apply(packets[3])
+        np.testing.assert_array_equal(restored[0], _weights(3)[0])
+
+        # the latest delta only needs its key frame
+        subscriber = WeightSubscriber()
+        subscriber.apply(packets[0])
+        restored = subscriber.apply(packets[2])
+        np.testing.assert_allclose(restored[0], _weights(2)[0], atol=1e-6)
+
+    def test_dict_weights(self):
+        publisher = WeightPublisher(keyframe_interval=2)
+        subscriber = WeightSubscriber()
+        for seed in range(3):
+            weights = OrderedDict([("fc.weight", _weights(seed)[0]), ("fc.bias", _weights(seed)[1])])
+            restored = subscriber.apply(publisher.publish(weights))
+            self.assertEqual(list(restored.keys()), ["fc.weight", "fc.bias"])
+            np.testing.assert_allclose(restored["fc.bias"], weights["fc.bias"], atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
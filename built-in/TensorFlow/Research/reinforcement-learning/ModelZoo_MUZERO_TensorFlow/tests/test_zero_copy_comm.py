@@ -0,0 +1,177 @@
+"""
+test frame codec, ring allocator and zero-copy comms
+"""
+import socket
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from xt.framework.comm import serialize
+from xt.framework.comm.message import message
+from xt.framework.comm.serialize import (
+    FLAG_ARRAYS,
+    FLAG_LZ4,
+    FLAG_RAW,
+    dumps_frames,
+    frames_nbytes,
+    loads_frames,
+    split_frames,
+    unpack_header,
+)
+from xt.framework.comm.share_by_ring import RingAllocator, ShareByRing
+
+
+def _trajectory(size=1000):
+    return message({
+        "cur_state": np.random.rand(size, 4).astype(np.float32),
+        "action": np.arange(size),
+        "reward": [1.0] * 3,
+        "frames": np.zeros((size, 84), dtype=np.uint8),
+    }, cmd="train", explorer_id=2)
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class TestSerialize(unittest.TestCase):
+    def assert_same(self, data, other):
+        self.assertEqual(data["ctr_info"], other["ctr_info"])
+        self.assertEqual(data["data"].keys(), other["data"].keys())
+        for key, value in data["data"].items():
+            np.testing.assert_array_equal(value, other["data"][key])
+
+    def test_arrays_out_of_band(self):
+        data = _trajectory()
+        frames = dumps_frames(data, compress_threshold=None)
+        flags, lengths = unpack_header(frames[0])
+        # body, cur_state, action and frames
+        self.assertEqual(len(frames), 5)
+        self.assertEqual(flags, (FLAG_RAW,) * 4)
+        self.assertEqual(lengths[1], data["data"]["cur_state"].nbytes)
+        self.assertLess(lengths[0], 1000)
+        self.assert_same(data, loads_frames(frames))
+
+    def test_compress_above_threshold(self):
+        data = _trajectory(size=10000)
+        frames = dumps_frames(data, compress_threshold=64 * 1024)
+        flags, _ = unpack_header(frames[0])
+        # random floats are kept raw, zeros are compressed, small ones untouched
+        self.assertEqual(flags, (FLAG_RAW, FLAG_RAW, FLAG_LZ4, FLAG_LZ4))
+        self.assertLess(frames_nbytes(frames), 10000 * 16 + 10000 * 84)
+        self.assert_same(data, loads_frames(frames))
+
+    def test_split_frames(self):
+        data = _trajectory()
+        frames = dumps_frames(data)
+        buffer = b"".join(bytes(frame) for frame in frames)
+        self.assert_same(data, loads_frames(split_frames(buffer)))
+
+    def test_non_contiguous(self):
+        data = {"x": np.arange(20).reshape(4, 5)[:, ::2]}
+        np.testing.assert_array_equal(loads_frames(dumps_frames(data))["x"], data["x"])
+
+    @mock.patch.object(serialize, "PICKLE_PROTOCOL", 4)
+    def test_protocol_4_arrays_out_of_band(self):
+        # python 3.7 without the pickle5 backport
+        data = _trajectory(size=10000)
+        data["data"]["scalar"] = np.float32(1.5)
+        data["data"]["empty"] = np.zeros((0, 3))
+        data["data"]["strided"] = np.arange(20).reshape(4, 5)[:, ::2]
+        frames = dumps_frames(data, compress_threshold=64 * 1024)
+        flags, lengths = unpack_header(frames[0])
+        # the scalar, the empty and the strided arrays are in the body
+        self.assertEqual(flags, (FLAG_ARRAYS, FLAG_RAW, FLAG_LZ4, FLAG_LZ4))
+        self.assertEqual(lengths[1], data["data"]["cur_state"].nbytes)
+        self.assertLess(lengths[0], 1000)
+        recv = loads_frames(split_frames(b"".join(bytes(frame) for frame in frames)))
+        self.assert_same(data, recv)
+        self.assertEqual(recv["data"]["cur_state"].dtype, np.float32)
+        self.assertFalse(recv["data"]["cur_state"].flags.writeable)
+
+
+class TestRingAllocator(unittest.TestCase):
+    def test_wrap_and_release_out_of_order(self):
+        ring = RingAllocator(100)
+        block_a, offset_a = ring.alloc(40)
+        block_b, offset_b = ring.alloc(40)
+        self.assertEqual((offset_a, offset_b), (0, 40))
+
+        ring.release(block_b)
+        self.assertEqual(ring.used(), 80)
+        ring.release(block_a)
+        self.assertEqual(ring.used(), 0)
+
+        # 20 bytes left before the end, so the block starts over at 0
+        block_c, offset_c = ring.alloc(30)
+        self.assertEqual(offset_c, 0)
+        ring.release(block_c)
+        self.assertEqual(ring.used(), 0)
+
+    def test_empty_ring_restart(self):
+        ring = RingAllocator(100)
+        ring.release(ring.alloc(60)[0])
+        block, offset = ring.alloc(90)
+        self.assertEqual(offset, 0)
+        self.assertEqual(ring.used(), 90)
+
+    def test_too_large(self):
+        ring = RingAllocator(100)
+        with self.assertRaises(ValueError):
+            ring.alloc(101)
+
+
+class TestShareByRing(unittest.TestCase):
+    def test_send_recv(self):
+        comm = ShareByRing({"size": 1 << 20})
+        sent = [_trajectory(size=100 * (i + 1)) for i in range(5)]
+        for data in sent:
+            comm.send(data)
+        for data in sent:
+            recv = comm.recv()
+            np.testing.assert_array_equal(recv["data"]["cur_state"], data["data"]["cur_state"])
+        self.assertEqual(comm.ring.used(), 0)
+
+    def test_recv_multipart_views(self):
+        comm = ShareByRing({"size": 1 << 20})
+        data = _trajectory()
+        comm.send(data)
+        frames, object_id = comm.recv_multipart()
+        recv = loads_frames(frames)
+        np.testing.assert_array_equal(recv["data"]["action"], data["data"]["action"])
+        del recv
+        comm.delete(object_id)
+        self.assertEqual(comm.ring.used(), 0)
+
+
+class TestCommByZmqZeroCopy(unittest.TestCase):
+    def test_push_pull(self):
+        try:
+            from xt.framework.comm.comm_by_zmq import CommByZmqZeroCopy
+        except ImportError:
+            self.skipTest("pyzmq is not installed")
+
+        port = _free_port()
+        recv_q = CommByZmqZeroCopy({"type": "PULL", "port": port})
+        send_q = CommByZmqZeroCopy({"type": "PUSH", "addr": "127.0.0.1", "port": port})
+        data = _trajectory()
+        send_q.send(data)
+        recv = recv_q.recv()
+        np.testing.assert_array_equal(recv["data"]["frames"], data["data"]["frames"])
+        self.assertEqual(recv["ctr_info"], data["ctr_info"])
+
+        # forward encoded frames without decoding
+        send_q.send_multipart(dumps_frames(data), copy=True)
+        recv = loads_frames(recv_q.recv_multipart())
+        np.testing.assert_array_equal(recv["data"]["cur_state"], data["data"]["cur_state"])
+        send_q.close()
+        recv_q.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
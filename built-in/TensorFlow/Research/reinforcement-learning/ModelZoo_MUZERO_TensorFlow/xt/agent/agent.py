@@ -173,6 +173,31 @@ class Agent(object):
         """
         return 0.0
 
+    @staticmethod
+    def group_infer_actions(agents, states, use_explore):
+        """
+        Infer the actions of all agents within the agent group in one call,
+        used by the batched unified api, agents share the same weights.
+        User could overwrite it to predict all the states with one forward pass.
+        :param agents:
+        :param states: state of each agent
+        :param use_explore:
+        :return: action of each agent
+        """
+        return [agent.infer_action(state, use_explore)
+                for agent, state in zip(agents, states)]
+
+    @staticmethod
+    def group_handle_env_feedbacks(agents, feedbacks):
+        """
+        Handle the env feedback of all agents within the agent group in one call.
+        :param agents:
+        :param feedbacks: (next_raw_state, reward, done, info, use_explore) of each agent
+        :return: transition data of each agent
+        """
+        return [agent.handle_env_feedback(*feedback)
+                for agent, feedback in zip(agents, feedbacks)]
+
     def reset(self):
         """
         Do nothing in the base Agent.
@@ -154,3 +154,178 @@ class Mcts(object):
 
         _, action, child = max((self.ucb_score(node, child), action, child) for action, child in node.children.items())
         return action, child
+
+
+class BatchMcts(object):
+    """
+    MCTS over a batch of root states, run in lockstep.
+    The trees are kept in flat arrays indexed by node key, node `i` of root
+    `b` has key `b * max_nodes + i`, node 0 is the root, and each simulation
+    adds one node to every tree. The last key is a sentinel that stands for
+    all children not visited yet. All the leaves of one simulation are
+    expanded by one batched recurrent inference.
+    """
+    def __init__(self, agent, root_states):
+        self.network = agent.alg.actor
+        self.action_dim = agent.alg.action_dim
+        self.num_simulations = agent.num_simulations
+        self.discount = GAMMA
+        self.pb_c_base = PB_C_BASE
+        self.pb_c_init = PB_C_INIT
+        self.root_dirichlet_alpha = ROOT_DIRICHLET_ALPHA
+        self.root_exploration_fraction = ROOT_EXPLORATION_FRACTION
+
+        self.batch_size = len(root_states)
+        self.max_nodes = self.num_simulations + 1
+        self.root_keys = np.arange(self.batch_size) * self.max_nodes
+        self.sentinel = self.batch_size * self.max_nodes
+
+        num_keys = self.sentinel + 1
+        self.visit_count = np.zeros(num_keys, dtype=np.int64)
+        self.value_sum = np.zeros(num_keys)
+        self.reward = np.zeros(num_keys)
+        self.expanded = np.zeros(num_keys, dtype=np.bool_)
+        # priors and keys of the children of each node
+        self.prior = np.zeros((num_keys, self.action_dim))
+        self.children = np.full((num_keys, self.action_dim), self.sentinel, dtype=np.int64)
+        self.hidden_state = None
+        self.next_keys = self.root_keys + 1
+
+        self.minimum = np.full(self.batch_size, np.inf)
+        self.maximum = np.full(self.batch_size, -np.inf)
+        # values are min-max normalized once a tree has seen two different values
+        self.value_low = np.zeros(self.batch_size)
+        self.value_scale = np.ones(self.batch_size)
+
+        network_output = self.network.initial_inference_batch(np.asarray(root_states))
+        self.init_nodes(self.root_keys, network_output)
+
+    def init_nodes(self, keys, network_output):
+        """ expand one node of every tree """
+        hidden_state = np.asarray(network_output.hidden_state)
+        if self.hidden_state is None:
+            self.hidden_state = np.zeros((len(self.expanded), ) + hidden_state.shape[1:],
+                                         dtype=hidden_state.dtype)
+        self.hidden_state[keys] = hidden_state
+        self.reward[keys] = network_output.reward
+        self.expanded[keys] = True
+
+        policy = np.asarray(network_output.policy, dtype=np.float64)
+        self.prior[keys] = policy / policy.sum(axis=1, keepdims=True)
+
+    def ucb_scores(self, roots, keys):
+        """
+        The scores of all children of the nodes, based on their value plus an
+        exploration bonus based on the prior.
+        """
+        parent_visit = self.visit_count[keys]
+        children = self.children[keys]
+        child_visit = self.visit_count[children]
+
+        pb_c = np.log((parent_visit + self.pb_c_base + 1) / self.pb_c_base) + self.pb_c_init
+        pb_c *= np.sqrt(parent_visit)
+        prior_score = pb_c[:, None] / (child_visit + 1) * self.prior[keys]
+
+        child_value = self.value_sum[children] / np.maximum(child_visit, 1)
+        value_score = (child_value - self.value_low[roots, None]) * self.value_scale[roots, None]
+        return prior_score + np.where(child_visit > 0, value_score, 0)
+
+    def select_children(self, roots, keys):
+        """
+        Select the child with the highest UCB score for each node,
+        ties go to the largest action.
+        """
+        scores = self.ucb_scores(roots, keys)
+        actions = self.action_dim - 1 - np.argmax(scores[:, ::-1], axis=1)
+
+        children = self.children[keys, actions]
+        new = children == self.sentinel
+        if np.any(new):
+            new_roots = roots[new]
+            children[new] = self.next_keys[new_roots]
+            self.next_keys[new_roots] += 1
+            self.children[keys[new], actions[new]] = children[new]
+        return actions, children
+
+    def backpropagate(self, search_path, value):
+        """
+        At the end of a simulation, we propagate the evaluation all the way up the
+        tree to the root, for all trees at once.
+        search_path holds the (roots, keys) of each depth.
+        """
+        value = np.array(value, dtype=np.float64)
+        for roots, keys in search_path[::-1]:
+            self.value_sum[keys] += value[roots]
+            self.visit_count[keys] += 1
+            node_value = self.value_sum[keys] / self.visit_count[keys]
+            self.minimum[roots] = np.minimum(self.minimum[roots], node_value)
+            self.maximum[roots] = np.maximum(self.maximum[roots], node_value)
+
+            value[roots] = self.reward[keys] + self.discount * value[roots]
+
+        known = self.maximum > self.minimum
+        self.value_low = np.where(known, self.minimum, 0)
+        self.value_scale = 1 / np.where(known, self.maximum - self.minimum, 1)
+
+    def run_mcts(self):
+        """
+        Run simulations on all trees in lockstep, each traverses its tree
+        according to the UCB formula until it reaches a leaf node.
+        """
+        all_roots = np.arange(self.batch_size)
+        for _ in range(self.num_simulations):
+            parents = self.root_keys.copy()
+            leaves = self.root_keys.copy()
+            last_actions = np.zeros(self.batch_size, dtype=np.int64)
+            search_path = [(all_roots, self.root_keys)]
+
+            roots, keys = all_roots, self.root_keys
+            while len(roots):
+                actions, children = self.select_children(roots, keys)
+                parents[roots] = keys
+                last_actions[roots] = actions
+                leaves[roots] = children
+                search_path.append((roots, children))
+
+                active = self.expanded[children]
+                roots, keys = roots[active], children[active]
+
+            # Inside the search tree we use the dynamics function to obtain the next
+            # hidden state given an action and the previous hidden state.
+            network_output = self.network.recurrent_inference_batch(
+                self.hidden_state[parents], last_actions)
+            self.init_nodes(leaves, network_output)
+
+            self.backpropagate(search_path, network_output.value)
+
+    def child_visits(self):
+        """ visit counts of root children, shape (batch_size, action_dim) """
+        return self.visit_count[self.children[self.root_keys]]
+
+    def select_action(self, mode='softmax'):
+        """
+        After running simulations inside in MCTS, we select an action for each root
+        based on its children visit counts.
+        During training we use a softmax sample for exploration.
+        During evaluation we select the most visited child.
+        """
+        visit_counts = self.child_visits()
+        if mode == 'max':
+            return np.argmax(visit_counts, axis=1)
+        actions = range(self.action_dim)
+        return np.array([soft_max_sample(counts, actions, 1) for counts in visit_counts])
+
+    def add_exploration_noise(self):
+        """ add dirichlet noise to the root priors """
+        noise = np.random.dirichlet([self.root_dirichlet_alpha] * self.action_dim,
+                                    size=self.batch_size)
+        frac = self.root_exploration_fraction
+        self.prior[self.root_keys] = self.prior[self.root_keys] * (1 - frac) + noise * frac
+
+    def get_info(self):
+        """ get train info of each root """
+        child_visits = self.child_visits()
+        child_visits = child_visits / child_visits.sum(axis=1, keepdims=True)
+        root_value = self.value_sum[self.root_keys] / self.visit_count[self.root_keys]
+        return [{"child_visits": list(_visits), "root_value": _value}
+                for _visits, _value in zip(child_visits, root_value)]
@@ -22,7 +22,7 @@ import numpy as np
 
 from xt.agent.agent import Agent
 from xt.agent.muzero.default_config import NUM_SIMULATIONS
-from xt.agent.muzero.mcts import Mcts
+from xt.agent.muzero.mcts import BatchMcts, Mcts
 from xt.framework.register import Registers
 from xt.util.common import import_config
 
@@ -39,7 +39,7 @@ class Muzero(Agent):
         We then run a Monte Carlo Tree Search using only action sequences and the
         model learned by the networks.
         """
-        # state = state.astype('int8')
+        state = self.prepare_state(state)
         mcts = Mcts(self, state)
         if use_explore:
             mcts.add_exploration_noise(mcts.root)
@@ -48,11 +48,41 @@ class Muzero(Agent):
         action = mcts.select_action()
         # print("action", action)
 
-        self.transition_data.update({"cur_state": state, "action": action})
-        self.transition_data.update(mcts.get_info())
+        self.update_transition(state, action, mcts.get_info())
 
         return action
 
+    def prepare_state(self, state):
+        """ state as the input of the mcts """
+        return state
+
+    def update_transition(self, state, action, mcts_info):
+        """ record the searched action and the train info of the mcts """
+        self.transition_data.update({"cur_state": state, "action": action})
+        self.transition_data.update(mcts_info)
+
+    @staticmethod
+    def group_infer_actions(agents, states, use_explore):
+        """
+        Run MCTS for the states of all agents in lockstep, so that each
+        recurrent inference is batched across them.
+        A single agent keeps the node based MCTS, which is faster for one state.
+        """
+        if len(agents) < 2:
+            return Agent.group_infer_actions(agents, states, use_explore)
+
+        states = [agent.prepare_state(state) for agent, state in zip(agents, states)]
+        mcts = BatchMcts(agents[0], states)
+        if use_explore:
+            mcts.add_exploration_noise()
+
+        mcts.run_mcts()
+        actions = [int(action) for action in mcts.select_action()]
+        for agent, state, action, info in zip(agents, states, actions, mcts.get_info()):
+            agent.update_transition(state, action, info)
+
+        return actions
+
     def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore):
         info.update({'eval_reward': reward})
         # done = info.get('real_done', done)
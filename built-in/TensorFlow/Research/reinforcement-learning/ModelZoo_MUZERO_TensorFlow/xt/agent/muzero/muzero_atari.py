@@ -19,7 +19,6 @@
 # THE SOFTWARE.
 import numpy as np
 from xt.agent.muzero.muzero import Muzero
-from xt.agent.muzero.mcts import Mcts
 from xt.agent.muzero.default_config import NUM_SIMULATIONS
 from xt.framework.register import Registers
 
@@ -31,31 +30,19 @@ class MuzeroAtari(Muzero):
         self.num_simulations = NUM_SIMULATIONS
         self.history_acton = np.zeros((96, 96, 32)).astype('uint8')
 
-    def infer_action(self, state, use_explore):
-        """
-        We then run a Monte Carlo Tree Search using only action sequences and the
-        model learned by the networks.
-        """
+    def prepare_state(self, state):
+        """ state with the planes of the history actions, as the input of the mcts """
         state = state.astype('uint8')
         action_plane = np.asarray(self.history_acton).astype('uint8')
         # print("all shape", state.shape, action_plane.shape)
-        state = np.concatenate((state, action_plane), axis=-1)
-
-        mcts = Mcts(self, state)
-        if use_explore:
-            mcts.add_exploration_noise(mcts.root)
-
-        mcts.run_mcts()
-        action = mcts.select_action()
+        return np.concatenate((state, action_plane), axis=-1)
 
+    def update_transition(self, state, action, mcts_info):
         action_plane = np.full((96, 96, 1), action*14, dtype='uint8')
         self.history_acton = np.roll(self.history_acton, shift=-1, axis=-1)
         self.history_acton[..., -action_plane.shape[-1]:] = action_plane
 
-        self.transition_data.update({"cur_state": state, "action": action})
-        self.transition_data.update(mcts.get_info())
-
-        return action
+        super().update_transition(state, action, mcts_info)
 
     def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore):
         if done:
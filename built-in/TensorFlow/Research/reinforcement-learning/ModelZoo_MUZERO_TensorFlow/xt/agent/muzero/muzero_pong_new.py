@@ -19,7 +19,6 @@
 # THE SOFTWARE.
 import numpy as np
 from xt.agent.muzero.muzero import Muzero
-from xt.agent.muzero.mcts import Mcts
 from xt.agent.muzero.default_config import NUM_SIMULATIONS, GAMMA, TD_STEP
 from xt.framework.register import Registers
 
@@ -31,23 +30,9 @@ class MuzeroPongNew(Muzero):
         self.num_simulations = NUM_SIMULATIONS
         self.explore_count = 0
 
-    def infer_action(self, state, use_explore):
-        """
-        We then run a Monte Carlo Tree Search using only action sequences and the
-        model learned by the networks.
-        """
-        state = state.astype('uint8')
-        mcts = Mcts(self, state)
-        if use_explore:
-            mcts.add_exploration_noise(mcts.root)
-
-        mcts.run_mcts()
-        action = mcts.select_action()
-
-        self.transition_data.update({"cur_state": state, "action": action})
-        self.transition_data.update(mcts.get_info())
-
-        return action
+    def prepare_state(self, state):
+        """ state as the input of the mcts """
+        return state.astype('uint8')
 
     def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore):
 
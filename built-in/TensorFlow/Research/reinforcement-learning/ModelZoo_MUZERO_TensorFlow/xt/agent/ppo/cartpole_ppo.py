@@ -33,17 +33,19 @@ class CartpolePpo(Agent):
         self.next_action = None
         self.next_value = None
 
-    def infer_action(self, state, use_explore):
+    def infer_action(self, state, use_explore, predict_val=None):
         """
         Infer an action with the `state`
         :param state:
         :param use_explore:
+        :param predict_val: prediction of the `state`, predicted within a batch
         :return: action value
         """
         if self.next_state is None:
             # print("multi preidict")
             s_t = state
-            predict_val = self.alg.predict(s_t)
+            if predict_val is None:
+                predict_val = self.alg.predict(s_t)
             action = predict_val[0][0]
             value = predict_val[1][0]
         else:
@@ -63,8 +65,10 @@ class CartpolePpo(Agent):
 
         return real_action
 
-    def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore):
-        predict_val = self.alg.predict(next_raw_state)
+    def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore,
+                            predict_val=None):
+        if predict_val is None:
+            predict_val = self.alg.predict(next_raw_state)
         self.next_action = predict_val[0][0]
         self.next_value = predict_val[1][0]
         self.next_state = next_raw_state
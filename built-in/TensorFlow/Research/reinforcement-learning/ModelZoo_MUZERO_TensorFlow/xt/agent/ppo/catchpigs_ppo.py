@@ -30,7 +30,8 @@ from xt.framework.register import Registers
 @Registers.agent.register
 class CatchPigsPpo(CartpolePpo):
     """catch pigs agent for ppo share weights"""
-    def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore):
+    def handle_env_feedback(self, next_raw_state, reward, done, info, use_explore,
+                            predict_val=None):
         """
         handle env feedback with current agent.id
         :param next_raw_state:
@@ -38,12 +39,40 @@ class CatchPigsPpo(CartpolePpo):
         :param done:
         :param info:
         :param use_explore:
+        :param predict_val: prediction of the `next_raw_state`, predicted within a batch
         :return:
         """
 
-        super().handle_env_feedback(next_raw_state, reward, done, info, use_explore)
+        super().handle_env_feedback(next_raw_state, reward, done, info, use_explore,
+                                    predict_val)
         # add next state for unified api within multi-agents
         self.transition_data.update({
             "next_state": next_raw_state})
 
         return self.transition_data
+
+    @staticmethod
+    def group_infer_actions(agents, states, use_explore):
+        """
+        Infer the actions of all agents, the states without the prediction
+        from last feedback are predicted with one forward pass.
+        """
+        predict_vals = [None] * len(agents)
+        to_predict = [i for i, agent in enumerate(agents) if agent.next_state is None]
+        if to_predict:
+            batch_vals = agents[0].alg.predict_batch([states[i] for i in to_predict])
+            for i, predict_val in zip(to_predict, batch_vals):
+                predict_vals[i] = predict_val
+
+        return [agent.infer_action(state, use_explore, predict_val)
+                for agent, state, predict_val in zip(agents, states, predict_vals)]
+
+    @staticmethod
+    def group_handle_env_feedbacks(agents, feedbacks):
+        """
+        Handle the env feedback of all agents,
+        predict all the next states with one forward pass.
+        """
+        predict_vals = agents[0].alg.predict_batch([feedback[0] for feedback in feedbacks])
+        return [agent.handle_env_feedback(*feedback, predict_val=predict_val)
+                for agent, feedback, predict_val in zip(agents, feedbacks, predict_vals)]
@@ -113,6 +113,17 @@ class Algorithm(object):
 
         return np.argmax(out)
 
+    def predict_batch(self, states):
+        """Predict the states from different explorers with one forward pass,
+        return one result for each state.
+        Algorithm with a special `predict` is predicted state by state,
+        overwrite this function to batch it."""
+        if type(self).predict is not Algorithm.predict:
+            return [self.predict(state) for state in states]
+
+        out = self.actor.predict(np.stack(states))
+        return list(np.argmax(out, axis=1))
+
     def train_ready(self, total_count, **kwargs):
         """
         Support custom train logic.
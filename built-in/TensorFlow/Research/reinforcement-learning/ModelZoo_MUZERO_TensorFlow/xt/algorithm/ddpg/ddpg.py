@@ -9,7 +9,7 @@ import numpy as np
 
 from xt.algorithm import Algorithm
 from xt.algorithm.ddpg.default_config import BATCH_SIZE, BUFFER_SIZE, TARGET_UPDATE_FREQ
-from xt.algorithm.replay_buffer import ReplayBuffer
+from xt.algorithm.replay_buffer import NumpyReplayBuffer
 from xt.framework.register import Registers
 from xt.model import model_builder
 from xt.util.common import import_config
@@ -30,7 +30,7 @@ class DDPG(Algorithm):
         )
 
         self.target_actor = model_builder(model_info["actor"])
-        self.buff = ReplayBuffer(BUFFER_SIZE)
+        self.buff = NumpyReplayBuffer(BUFFER_SIZE)
         self.critic = model_builder(model_info["critic"])
         self.critic_target = model_builder(model_info["critic"])
         self.train_step = 0
@@ -41,17 +41,13 @@ class DDPG(Algorithm):
         self.train_step += 1
 
         batch = self.buff.get_batch(BATCH_SIZE)
-        states = np.asarray([e[0] for e in batch])
-        actions = np.asarray([e[1] for e in batch])
-        rewards = np.asarray([e[2] for e in batch])
-        new_states = np.asarray([e[3] for e in batch])
-        dones = np.asarray([e[4] for e in batch])
-        y_t = np.asarray([e[2] for e in batch])
+        states, actions, rewards, new_states, dones = batch
+        y_t = np.array(rewards)
 
         target_q_values = self.critic_target.predict(
             [new_states, self.target_actor.predict(new_states)]
         )
-        for k in range(len(batch)):
+        for k in range(len(dones)):
             if dones[k]:
                 y_t[k] = rewards[k]
             else:
@@ -79,6 +75,10 @@ class DDPG(Algorithm):
 
     def restore(self, model_name, model_weights=None):
         """refer to alg"""
+        if model_weights is not None:
+            self.actor.set_weights(model_weights)
+            self.target_actor.set_weights(model_weights)
+            return
         self.actor.load_model(model_name)
         self.target_actor.load_model(model_name)
 
@@ -48,14 +48,11 @@ class DDQN(DQN):
     def train(self, **kwargs):
         """DDQN training"""
         # sample mini-batch
-        batch = self.buff.get_batch(self.batch_size)
-        s_batch = np.asarray([data[0] for data in batch])
-        r_batch = np.asarray([data[2] for data in batch])
-        s1_batch = np.asarray([data[3] for data in batch])
+        s_batch, _, r_batch, s1_batch, _ = self.buff.get_batch(self.batch_size)
         a_q = self.actor.predict(s1_batch)
         a_pred = np.argmax(a_q, axis=1)
-        a1_batch = np.zeros((len(batch), self.action_dim))
-        for i in range(len(batch)):
+        a1_batch = np.zeros((len(r_batch), self.action_dim))
+        for i in range(len(r_batch)):
             a1_batch[i][a_pred[i]] = 1.0
 
         a_tq = self.target_actor.predict(s1_batch)
@@ -64,7 +61,7 @@ class DDQN(DQN):
         target_q_batch = r_batch + self.gamma * q1_batch
         # print("reward =", np.sum(r_batch))
         # update main network
-        for i in range(len(batch)):
+        for i in range(len(r_batch)):
             a1_batch[i][a_pred[i]] = target_q_batch[i]
 
         s_batch = np.reshape(s_batch, (-1, s_batch.shape[-1]))
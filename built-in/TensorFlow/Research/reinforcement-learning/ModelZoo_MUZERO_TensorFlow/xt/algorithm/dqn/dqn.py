@@ -26,7 +26,7 @@ import numpy as np
 
 from xt.algorithm import Algorithm
 from xt.algorithm.dqn.default_config import BUFFER_SIZE, GAMMA, TARGET_UPDATE_FREQ
-from xt.algorithm.replay_buffer import ReplayBuffer
+from xt.algorithm.replay_buffer import NumpyReplayBuffer
 from xt.framework.register import Registers
 from xt.model import model_builder
 from xt.util.common import import_config
@@ -55,7 +55,7 @@ class DQN(Algorithm):
         )
 
         self.target_actor = model_builder(model_info)
-        self.buff = ReplayBuffer(BUFFER_SIZE)
+        self.buff = NumpyReplayBuffer(BUFFER_SIZE)
 
     def train(self, **kwargs):
         """
@@ -69,15 +69,11 @@ class DQN(Algorithm):
         batch_size = 32
 
         batch = self.buff.get_batch(batch_size)
-        states = np.asarray([e[0] for e in batch])
-        actions = np.asarray([e[1] for e in batch])
-        rewards = np.asarray([e[2] for e in batch])
-        new_states = np.asarray([e[3] for e in batch])
-        dones = np.asarray([e[4] for e in batch])
+        states, actions, rewards, new_states, dones = batch
         y_t = self.actor.predict(states)
         target_q_values = self.target_actor.predict(new_states)
         max_q_val = np.max(target_q_values, 1)
-        for k in range(len(batch)):
+        for k in range(len(dones)):
             if dones[k]:
                 q_value = rewards[k]
             else:
@@ -100,6 +96,10 @@ class DQN(Algorithm):
         :return:
         """
         # model_name = model_name[0]
+        if model_weights is not None:
+            self.actor.set_weights(model_weights)
+            self.target_actor.set_weights(model_weights)
+            return
         self.actor.load_model(model_name)
         self.target_actor.load_model(model_name)
 
@@ -89,3 +89,9 @@ class PPO(Algorithm):
         pred = self.actor.predict(state)
 
         return pred
+
+    def predict_batch(self, states):
+        """predict the states with one forward pass, return the same
+        output as `predict` for each state"""
+        action, value = self.actor.predict(np.stack(states))
+        return [[action[i:i + 1], value[i:i + 1]] for i in range(len(states))]
@@ -5,36 +5,37 @@
 from __future__ import division, print_function
 
 import random
-from collections import deque
+import zlib
+
+import numpy as np
 
 
 class ReplayBuffer(object):
-    """ReplayBuffer class"""
+    """ReplayBuffer class, a ring of python objects with O(1) random access"""
     def __init__(self, buffer_size):
         self.buffer_size = buffer_size
         self.num_experiences = 0
-        self.buffer = deque()
+        self.buffer = []
+        self.next_index = 0
 
     def get_batch(self, batch_size):
         """Randomly sample batch_size examples"""
-        if self.num_experiences < batch_size:
-            return random.sample(self.buffer, self.num_experiences)
-
-        return random.sample(self.buffer, int(batch_size))
+        batch_size = min(self.num_experiences, int(batch_size))
+        indexes = random.sample(range(self.num_experiences), batch_size)
+        return [self.buffer[index] for index in indexes]
 
     def size(self):
         """get buffer size"""
         return self.buffer_size
 
     def add(self, train_data):
-        """put data to buffer"""
-        experience = train_data
+        """put data to buffer, the oldest one is overwritten if buffer is full"""
         if self.num_experiences < self.buffer_size:
-            self.buffer.append(experience)
+            self.buffer.append(train_data)
             self.num_experiences += 1
         else:
-            self.buffer.popleft()
-            self.buffer.append(experience)
+            self.buffer[self.next_index] = train_data
+        self.next_index = (self.next_index + 1) % self.buffer_size
 
     def count(self):
         """
@@ -45,5 +46,105 @@ class ReplayBuffer(object):
 
     def erase(self):
         """remove data from buffer"""
-        self.buffer = deque()
+        self.buffer = []
+        self.num_experiences = 0
+        self.next_index = 0
+
+
+class NumpyReplayBuffer(object):
+    """
+    Preallocated ring buffer with one numpy array per field of experience.
+    Experience is a tuple or a dict of fields with fixed shape, such as
+    (state, action, reward, next_state, done). `get_batch` returns the
+    stacked arrays of the fields in the same structure.
+    Fields in `compress_fields` (index of tuple or key of dict) are saved
+    as zlib compressed bytes, it's useful for large image observations.
+    """
+    def __init__(self, buffer_size, compress_fields=()):
+        self.buffer_size = buffer_size
+        self.compress_fields = set(compress_fields)
+        self.num_experiences = 0
+        self.next_index = 0
+        self.keys = None
+        self.is_dict = False
+        self.arrays = None
+        self.shapes = None
+
+    def _allocate(self, experience):
+        """allocate arrays with the shape and dtype of the first experience"""
+        self.is_dict = isinstance(experience, dict)
+        if self.is_dict:
+            self.keys = list(experience.keys())
+        else:
+            self.keys = list(range(len(experience)))
+        self.arrays = {}
+        self.shapes = {}
+        for key in self.keys:
+            value = np.asarray(experience[key])
+            if key in self.compress_fields:
+                self.arrays[key] = np.empty(self.buffer_size, dtype=object)
+                self.shapes[key] = (value.shape, value.dtype)
+            else:
+                self.arrays[key] = np.zeros((self.buffer_size, ) + value.shape, dtype=value.dtype)
+
+    def add(self, train_data):
+        """put one experience to buffer, the oldest one is overwritten if buffer is full"""
+        if self.arrays is None:
+            self._allocate(train_data)
+        index = self.next_index
+        for key in self.keys:
+            value = np.asarray(train_data[key])
+            array = self.arrays[key]
+            if key in self.compress_fields:
+                shape, dtype = self.shapes[key]
+                array[index] = zlib.compress(np.ascontiguousarray(value, dtype=dtype).tobytes(), 1)
+                continue
+            if not np.can_cast(value.dtype, array.dtype, casting="same_kind"):
+                # e.g. the first reward is int but the later one is float
+                array = array.astype(np.result_type(array.dtype, value.dtype))
+                self.arrays[key] = array
+            array[index] = value
+        self.next_index = (index + 1) % self.buffer_size
+        self.num_experiences = min(self.num_experiences + 1, self.buffer_size)
+
+    def get_batch(self, batch_size):
+        """
+        Randomly sample batch_size examples without replacement, return stacked arrays.
+        Raise ValueError if the buffer is empty, there are no fields to stack.
+        """
+        if not self.num_experiences:
+            raise ValueError("get batch from an empty replay buffer, add experiences before training")
+        batch_size = min(self.num_experiences, int(batch_size))
+        indexes = np.array(random.sample(range(self.num_experiences), batch_size))
+        return self.get_by_indexes(indexes)
+
+    def get_by_indexes(self, indexes):
+        """get stacked arrays of experiences in indexes"""
+        batch = []
+        for key in self.keys:
+            array = self.arrays[key]
+            if key in self.compress_fields:
+                shape, dtype = self.shapes[key]
+                batch.append(np.stack([np.frombuffer(zlib.decompress(array[index]), dtype=dtype).reshape(shape)
+                                       for index in indexes]))
+            else:
+                batch.append(array[indexes])
+        if self.is_dict:
+            return dict(zip(self.keys, batch))
+        return tuple(batch)
+
+    def size(self):
+        """get buffer size"""
+        return self.buffer_size
+
+    def count(self):
+        """
+        if buffer is full, return buffer size
+        otherwise, return experience counter
+        """
+        return self.num_experiences
+
+    def erase(self):
+        """remove data from buffer, keep the allocated arrays"""
         self.num_experiences = 0
+        self.next_index = 0
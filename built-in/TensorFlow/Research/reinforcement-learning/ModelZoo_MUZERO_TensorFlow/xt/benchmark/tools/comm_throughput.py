@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""comm throughput benchmark
+    usage:
+
+    `python xt/benchmark/tools/comm_throughput.py -e 4 -n 200 -s 1000`
+
+    each explorer process sends `-n` trajectories of `-s` steps to one
+    receiver, which decodes them all. MB/s per explorer is printed for
+    every transport:
+
+    zmq_pickle       CommByZmq, pickle per message
+    zmq_zero_copy    CommByZmqZeroCopy, arrays as zero-copy frames
+    queue_pickle_lz4 pickle + lz4 through a Queue, as the explorer did before
+    raw_array        ShareByRawArray, needs pyarrow.serialize
+    ring             ShareByRing, shared memory ring allocator
+"""
+
+import argparse
+import pickle
+import socket
+import time
+from multiprocessing import Process, Queue
+
+import lz4.frame
+import numpy as np
+
+from xt.framework.comm.message import message
+from xt.framework.comm.serialize import dumps_frames, frames_nbytes
+
+
+def make_trajectory(steps):
+    """ atari like trajectory """
+    return message({
+        "cur_state": np.random.randint(0, 255, (steps, 84, 84, 4), dtype=np.uint8),
+        "action": np.random.randint(0, 6, steps),
+        "reward": np.random.rand(steps).astype(np.float32),
+        "done": np.zeros(steps, dtype=np.bool_),
+        "info": [{"real_done": False}] * 4,
+    }, cmd="train")
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class _QueuePickleLz4(object):
+    def __init__(self):
+        self.control_q = Queue()
+
+    def send(self, data):
+        self.control_q.put(lz4.frame.compress(pickle.dumps(data)))
+
+    def recv(self):
+        return pickle.loads(lz4.frame.decompress(self.control_q.get()))
+
+
+def _zmq_pair(name):
+    from xt.framework.comm.comm_by_zmq import CommByZmq, CommByZmqZeroCopy
+    comm_cls = CommByZmqZeroCopy if name == "zmq_zero_copy" else CommByZmq
+    port = _free_port()
+    recv_q = comm_cls({"type": "PULL", "port": port})
+
+    def make_sender():
+        return comm_cls({"type": "PUSH", "addr": "127.0.0.1", "port": port})
+
+    return recv_q, make_sender
+
+
+def _shared_pair(name, explorer_num):
+    if name == "raw_array":
+        from xt.framework.comm.share_by_raw_array import ShareByRawArray
+        import pyarrow
+        pyarrow.serialize  # pylint: disable=W0104
+        comm = ShareByRawArray({"size": int(4e8), "agent_num": explorer_num})
+    elif name == "ring":
+        from xt.framework.comm.share_by_ring import ShareByRing
+        comm = ShareByRing({"size": int(4e8)})
+    else:
+        comm = _QueuePickleLz4()
+    return comm, lambda: comm
+
+
+def _explore(make_sender, explorer_id, data, num, raw_array):
+    sender = make_sender()
+    for _ in range(num):
+        sender.send((explorer_id, data) if raw_array else data)
+    time.sleep(0.5)
+
+
+def run(name, explorer_num, msg_num, steps):
+    """ return MB/s per explorer of one transport """
+    if name.startswith("zmq"):
+        recv_q, make_sender = _zmq_pair(name)
+    else:
+        recv_q, make_sender = _shared_pair(name, explorer_num)
+
+    data = make_trajectory(steps)
+    nbytes = frames_nbytes(dumps_frames(data, compress_threshold=None))
+    if name == "raw_array":
+        # raw array sends one message per explorer slot at a time
+        msg_num = 1
+
+    start = time.time()
+    processes = [
+        Process(target=_explore,
+                args=(make_sender, i, data, msg_num, name == "raw_array"))
+        for i in range(explorer_num)
+    ]
+    for proc in processes:
+        proc.start()
+    for _ in range(explorer_num * msg_num):
+        recv_q.recv()
+    cost = time.time() - start
+    for proc in processes:
+        proc.join()
+
+    return nbytes * msg_num / cost / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="comm throughput benchmark.")
+    parser.add_argument("-e", "--explorer_num", type=int, default=4)
+    parser.add_argument("-n", "--msg_num", type=int, default=100)
+    parser.add_argument("-s", "--steps", type=int, default=200)
+    parser.add_argument("-t", "--transports", nargs="+", default=[
+        "zmq_pickle", "zmq_zero_copy", "queue_pickle_lz4", "raw_array", "ring"])
+    args = parser.parse_args()
+
+    for name in args.transports:
+        try:
+            speed = run(name, args.explorer_num, args.msg_num, args.steps)
+        except (ImportError, AttributeError) as err:
+            print("{:<18} skipped: {}".format(name, err))
+            continue
+        print("{:<18} {:>10.1f} MB/s per explorer".format(name, speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Copyright (C) 2020. Huawei Technologies Co., Ltd. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+vector environment for simulation, copies of a standalone single-agent environment which are
+stepped in lockstep with the unified api, one agent per copy.
+The agents within the group could infer their actions in one batch, e.g. the
+MuZero agents search the trees of all copies with the batched MCTS.
+"""
+from xt.environment import env_builder
+from xt.environment.environment import Environment
+from xt.framework.register import Registers
+
+
+@Registers.env.register
+class VectorEnv(Environment):
+    """
+    `env_info` holds the `env_name` of the copies, the others are the env_info
+    of each copy. The number of copies is the agent number of the group.
+    A copy is only stepped with the actions of its agent, so the agent of a done
+    copy stops interacting until the next episode.
+    """
+    def init_env(self, env_info):
+        """
+        create the copies of the environment
+
+        :param: the config information of environment.
+        :return: None, the copies are in `self.envs`
+        """
+        env_info = dict(env_info)
+        env_name = env_info.pop("env_name")
+        self.n_agents = env_info.pop("agent_num", 1)
+        self.api_type = "unified"
+        self.envs = [env_builder(env_name, dict(env_info)) for _ in range(self.n_agents)]
+        self.init_state = None
+
+        return None
+
+    def reset(self):
+        """
+        reset all the copies
+
+        :return: the observation of each copy, keyed by the agent index
+        """
+        self.init_state = {index: env.reset() for index, env in enumerate(self.envs)}
+        return self.init_state
+
+    def step(self, action, agent_index=0):
+        """
+        step the copies with the actions of their agents.
+
+        :param action: action of each agent, keyed by the agent index
+        :param agent_index: unused, the agent index is the key of action
+        :return: state, reward, done, info of the stepped copies
+        """
+        states, rewards, dones, infos = dict(), dict(), dict(), dict()
+        for index, agent_action in action.items():
+            state, reward, done, info = self.envs[index].step(agent_action)
+            states[index] = state
+            rewards[index] = reward
+            dones[index] = done
+            infos[index] = info
+
+        return states, rewards, dones, infos
+
+    def get_init_state(self, agent_index=None):
+        """
+        get reset observation of one agent, or of all agents if agent_index is None.
+
+        :param agent_index: the index of agent
+        :return: the reset observation
+        """
+        if agent_index is None:
+            return self.init_state
+        return self.init_state[agent_index]
+
+    def close(self):
+        """
+        close all the copies
+        """
+        for env in self.envs:
+            env.close()
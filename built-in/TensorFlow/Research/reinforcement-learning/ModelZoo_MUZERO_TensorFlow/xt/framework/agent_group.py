@@ -33,6 +33,7 @@ from xt.agent import agent_builder
 from xt.algorithm import alg_builder
 from xt.environment import env_builder
 from xt.util.profile_stats import AgentGroupStats
+from xt.framework.weight_channel import WeightSubscriber, is_weights_packet
 
 logging.set_verbosity(logging.DEBUG)
 
@@ -169,6 +170,13 @@ class AgentGroup(object):
         self.bot = WorkerPool(parallel_num=self.agent_num)
         self.eval_data = EvaluateData(self.env_info["agent_ids"])
         self.ag_stats = AgentGroupStats(self.agent_num, self.env_info["api_type"])
+        self.weight_subscriber = WeightSubscriber()
+
+        # unified api, agents sharing weights could infer within one batch
+        self.batch_infer = agent_para.get("batch_infer", False)
+        if self.batch_infer and not self._share_weights():
+            logging.warning("agents don't share weights, disable batch infer.")
+            self.batch_infer = False
 
     @staticmethod
     def __para_template(agent_para, alg_para, env, recv_explorer, send_explorer):
@@ -202,6 +210,13 @@ class AgentGroup(object):
                 paras[i]["agent_config"]["agent_id"] = _id
         return paras
 
+    def _share_weights(self):
+        """all the agents restore the same weights"""
+        if not self.alg_weights_map:
+            return True
+        targets = [self.alg_weights_map[_ag.id] for _ag in self.agents]
+        return all(target == targets[0] for target in targets)
+
     def _infer_actions(self, inputs):
         job_list = [agent.infer_action for agent in self.agents]
         action_list = self.bot.do_multi_job(job_list, inputs)
@@ -251,6 +266,21 @@ class AgentGroup(object):
             )
             _ag.alg.restore(model_name)
 
+    def restore_weights(self, packet):
+        """restore the weights packet published by learner for all the agents,
+        all agents share the weights. Skip it if its version is not newer.
+        :param packet:
+        :return:
+        """
+        weights = self.weight_subscriber.apply(packet)
+        if weights is None:
+            logging.debug("skip weights version: {}, current: {}".format(
+                packet["weights_version"], self.weight_subscriber.version))
+            return
+
+        for _ag in self.agents:
+            _ag.alg.restore(None, model_weights=weights)
+
     def clear_trajectories(self):
         self.trajectories = list()
 
@@ -267,25 +297,25 @@ class AgentGroup(object):
 
         self.env.reset()
         states = self.env.get_init_state()
+        # the agents done within the episode stop interacting, the others go on
+        agents = self.agents
         for _step in range(self.step_per_episode):
-            for _ag in self.agents:
+            for _ag in agents:
                 _ag.clear_transition()
 
-            transitions = self._do_one_unified_interaction(
-                states, self.agents, use_explore
+            states, transitions = self._do_one_unified_interaction(
+                states, agents, use_explore
             )
             # print("transitions: {}".format(transitions))
             # sys.stdout.flush()
 
-            states = {
-                _ag.id: _transit["next_state"]
-                for _ag, _transit in zip(self.agents, transitions)
-            }
             if collect:
-                for _ag in self.agents:
+                for _ag in agents:
                     _ag.add_to_trajectory(_ag.transition_data)
 
-            if all([t["done"] for t in transitions]):
+            agents = [_ag for _ag, _transit in zip(agents, transitions)
+                      if not _transit["done"]]
+            if not agents:
                 logging.debug("end interaction on step-{}".format(_step))
                 break
         else:
@@ -295,25 +325,33 @@ class AgentGroup(object):
 
         return [ag.get_trajectory() for ag in self.agents]
 
-    def _decode_group_data(self, data):
-        return [data[_ag.id] for _ag in self.agents]
+    @staticmethod
+    def _decode_group_data(data, agents):
+        return [data[_ag.id] for _ag in agents]
 
     def _do_one_unified_interaction(self, states, agents, use_explore):
+        """
+        do one interaction of the agents with the environment.
+        :return: next states of the environment, transition data of each agent
+        """
         infer_funcs = [agent.infer_action for agent in agents]
         # agent share weight, inference with anyOne states
-        if not self.alg_weights_map:
+        if not self.alg_weights_map and len(states) == len(agents):
             inputs = [sta for sta in states.values()]
         else:  # TODO: check with dynamic agent id
             # print("--> states \n\n", states)
             # sys.stdout.flush()
             inputs = [states[_agent.id] for _agent in agents]
         _start0 = time()
-        inputs = [(val, use_explore) for val in inputs]
-        batch_action = self.bot.do_multi_job(infer_funcs, inputs)
-        self.ag_stats.inference_time = +time() - _start0
+        if self.batch_infer:
+            batch_action = agents[0].group_infer_actions(agents, inputs, use_explore)
+        else:
+            inputs = [(val, use_explore) for val in inputs]
+            batch_action = self.bot.do_multi_job(infer_funcs, inputs)
+        self.ag_stats.inference_time += time() - _start0
 
         # agent.id keep pace with the id within the environment.
-        action_package = {_ag.id: v for _ag, v in zip(self.agents, batch_action)}
+        action_package = {_ag.id: v for _ag, v in zip(agents, batch_action)}
 
         _start1 = time()
         next_states, rewards, done, info = self.env.step(action_package)
@@ -331,16 +369,21 @@ class AgentGroup(object):
             (s, r, d, i, use_explore)
             for s, r, d, i in zip(
                 # map(self._decode_group_data, [next_states, rewards, done, info])
-                self._decode_group_data(next_states),
-                self._decode_group_data(rewards),
-                self._decode_group_data(done),
-                self._decode_group_data(info),
+                self._decode_group_data(next_states, agents),
+                self._decode_group_data(rewards, agents),
+                self._decode_group_data(done, agents),
+                self._decode_group_data(info, agents),
             )
         ]
-        feed_funcs = [agent.handle_env_feedback for agent in agents]
-        transition_data_list = self.bot.do_multi_job(feed_funcs, feed_inputs)
+        _start2 = time()
+        if self.batch_infer:
+            transition_data_list = agents[0].group_handle_env_feedbacks(agents, feed_inputs)
+        else:
+            feed_funcs = [agent.handle_env_feedback for agent in agents]
+            transition_data_list = self.bot.do_multi_job(feed_funcs, feed_inputs)
+        self.ag_stats.feedback_time += time() - _start2
 
-        return transition_data_list
+        return next_states, transition_data_list
 
     def explore(self, episode_count):
         """
@@ -356,10 +399,15 @@ class AgentGroup(object):
         model_name = self.agents[0].sync_model()  # fixme: async alg dummy
         self.ag_stats.wait_model_time = time() - _start0
 
-        logging.debug("get sync model: {}".format(model_name))
         # print("agent group receive model:", model_name)
         # sys.stdout.flush()
-        if "none" not in model_name:
+        if is_weights_packet(model_name):
+            logging.debug("get sync weights: {}".format(model_name["weights_version"]))
+            _start1 = time()
+            self.restore_weights(model_name)
+            self.ag_stats.restore_model_time = time() - _start1
+        elif "none" not in model_name:
+            logging.debug("get sync model: {}".format(model_name))
             _start1 = time()
             self.restore(model_name)
             self.ag_stats.restore_model_time = time() - _start1
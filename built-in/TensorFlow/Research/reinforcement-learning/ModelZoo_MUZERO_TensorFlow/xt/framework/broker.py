@@ -23,9 +23,6 @@ import time
 from multiprocessing import Queue, Process
 
 import psutil
-import lz4.frame
-
-import pickle
 
 # from pyarrow import deserialize
 from absl import logging
@@ -51,9 +48,9 @@ class BrokerMaster(object):
         self.comm_conf = comm_conf
 
         recv_port, send_port = get_port(start_port)
-        self.recv_slave = UniComm("CommByZmq", type="PULL", port=recv_port)
+        self.recv_slave = UniComm("CommByZmqZeroCopy", type="PULL", port=recv_port)
         self.send_slave = [
-            UniComm("CommByZmq", type="PUSH", port=send_port + i)
+            UniComm("CommByZmqZeroCopy", type="PUSH", port=send_port + i)
             for i in range(self.node_num)
         ]
 
@@ -79,8 +76,7 @@ class BrokerMaster(object):
     def recv_broker_slave(self):
         """ recv remote train data in sync mode"""
         while True:
-            recv_data = self.recv_slave.recv_bytes()
-            recv_data = pickle.loads(lz4.frame.decompress(recv_data))
+            recv_data = self.recv_slave.recv()
 
             cmd = get_msg_info(recv_data, "cmd")
             if cmd in []:
@@ -187,14 +183,14 @@ class BrokerSlave(object):
         train_port, predict_port = get_port(start_port)
 
         self.send_master_q = UniComm(
-            "CommByZmq", type="PUSH", addr=ip_addr, port=train_port
+            "CommByZmqZeroCopy", type="PUSH", addr=ip_addr, port=train_port
         )
 
         self.recv_master_q = UniComm(
-            "CommByZmq", type="PULL", addr=ip_addr, port=predict_port + broker_id
+            "CommByZmqZeroCopy", type="PULL", addr=ip_addr, port=predict_port + broker_id
         )
 
-        self.recv_explorer_q = UniComm("ShareByPlasma")
+        self.recv_explorer_q = UniComm("ShareByRing")
         self.send_explorer_q = dict()
         self.explore_process = dict()
         self.processes_suspend = 0
@@ -243,8 +239,9 @@ class BrokerSlave(object):
     def recv_explorer(self):
         """ recv explorer cmd """
         while True:
-            data, object_id = self.recv_explorer_q.recv_bytes()
-            self.send_master_q.send_bytes(data)
+            frames, object_id = self.recv_explorer_q.recv_multipart()
+            # frames are views of the ring, copy them before release
+            self.send_master_q.send_multipart(frames, copy=True)
             self.recv_explorer_q.delete(object_id)
 
     def create_explorer(self, config_info):
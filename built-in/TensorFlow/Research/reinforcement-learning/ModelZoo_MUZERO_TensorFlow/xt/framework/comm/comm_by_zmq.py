@@ -2,6 +2,7 @@
 import pickle
 import zmq
 from xt.framework.register import Registers
+from xt.framework.comm.serialize import COMPRESS_THRESHOLD, dumps_frames, loads_frames
 
 
 @Registers.comm.register
@@ -53,3 +54,31 @@ class CommByZmq(object):
     def close(self):
         if self.socket:
             self.socket.close()
+
+
+@Registers.comm.register
+class CommByZmqZeroCopy(CommByZmq):
+    """
+    zmq comm sending messages as multipart frames, see serialize.py.
+    numpy arrays go as their own frames without being copied,
+    so don't modify them in place after send.
+    """
+
+    def __init__(self, comm_info):
+        super(CommByZmqZeroCopy, self).__init__(comm_info)
+        self.compress_threshold = comm_info.get("compress_threshold", COMPRESS_THRESHOLD)
+
+    def send(self, data, name=None, block=True):
+        frames = dumps_frames(data, self.compress_threshold)
+        self.socket.send_multipart(frames, copy=False)
+
+    def recv(self, name=None, block=True):
+        return loads_frames(self.recv_multipart())
+
+    def send_multipart(self, data, copy=False):
+        """ send encoded frames, copy them if the buffers will be reused soon """
+        self.socket.send_multipart(data, copy=copy)
+
+    def recv_multipart(self):
+        frames = self.socket.recv_multipart(copy=False)
+        return [frame.buffer for frame in frames]
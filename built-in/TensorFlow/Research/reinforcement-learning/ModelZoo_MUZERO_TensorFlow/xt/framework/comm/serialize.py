@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+frame codec for the zero-copy comms.
+
+A message is encoded as a list of frames:
+    [header, pickle body, buffer 1, ..., buffer n]
+the body is pickled with protocol 5, so contiguous numpy arrays are left out
+of it as out-of-band buffers, which are sent as-is without any copy.
+Python 3.7 has no protocol 5, it uses the `pickle5` backport if installed,
+otherwise the body is pickled with protocol 4 and the contiguous numpy arrays
+are left out of it by persistent ids, flagged by FLAG_ARRAYS on the body.
+The header holds the frame count, a flag byte and the length of each frame.
+Frames larger than `compress_threshold` are lz4 compressed, and kept
+compressed only if that saves enough bytes.
+
+Arrays decoded from received frames are read-only views of those frames.
+"""
+import io
+import pickle
+import struct
+
+import lz4.frame
+import numpy as np
+
+if pickle.HIGHEST_PROTOCOL < 5:
+    try:
+        import pickle5 as pickle
+    except ImportError:
+        pass
+
+MAGIC = b"XF"
+VERSION = 1
+COMPRESS_THRESHOLD = 64 * 1024
+MIN_COMPRESS_RATIO = 0.9
+
+FLAG_RAW = 0
+FLAG_LZ4 = 1
+FLAG_ARRAYS = 2
+
+PICKLE_PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+
+_HEAD = struct.Struct("<2sBH")
+
+
+def _maybe_compress(frame, compress_threshold):
+    """ return (flag, frame), compress the frame if it is large and compressible """
+    nbytes = memoryview(frame).nbytes
+    if compress_threshold is None or nbytes < compress_threshold:
+        return FLAG_RAW, frame
+    compressed = lz4.frame.compress(frame)
+    if len(compressed) > nbytes * MIN_COMPRESS_RATIO:
+        return FLAG_RAW, frame
+    return FLAG_LZ4, compressed
+
+
+def pack_header(flags, lengths):
+    """ pack the frame flags and lengths into the header frame """
+    num = len(flags)
+    return (_HEAD.pack(MAGIC, VERSION, num)
+            + struct.pack("<{}B{}Q".format(num, num), *flags, *lengths))
+
+
+def unpack_header(header):
+    """ unpack the header frame into (flags, lengths) """
+    magic, version, num = _HEAD.unpack_from(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("unknown frame header: {}-{}".format(magic, version))
+    values = struct.unpack_from("<{}B{}Q".format(num, num), header, _HEAD.size)
+    return values[:num], values[num:]
+
+
+def header_size(header):
+    """ return the byte size of a header frame """
+    num = _HEAD.unpack_from(header)[2]
+    return _HEAD.size + 9 * num
+
+
+class _ArrayPickler(pickle.Pickler):
+    """ protocol 4 pickler, which leaves contiguous numpy arrays out of band """
+    def __init__(self, file, buffers):
+        super(_ArrayPickler, self).__init__(file, protocol=4)
+        self.buffers = buffers
+
+    def persistent_id(self, obj):
+        if (type(obj) is not np.ndarray or obj.dtype.hasobject
+                or not obj.ndim or not obj.size or not obj.flags.c_contiguous):
+            return None
+        self.buffers.append(obj.data.cast("B"))
+        return len(self.buffers) - 1, obj.dtype, obj.shape
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """ unpickler of `_ArrayPickler`, arrays are read-only views of the buffers """
+    def __init__(self, file, buffers):
+        super(_ArrayUnpickler, self).__init__(file)
+        self.buffers = buffers
+
+    def persistent_load(self, pid):
+        index, dtype, shape = pid
+        return np.frombuffer(self.buffers[index], dtype=dtype).reshape(shape)
+
+
+def _dumps(data):
+    """ return (body flag, body, buffers) """
+    buffers = []
+    if PICKLE_PROTOCOL >= 5:
+        body = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+        return FLAG_RAW, body, [buf.raw() for buf in buffers]
+
+    body = io.BytesIO()
+    _ArrayPickler(body, buffers).dump(data)
+    return FLAG_ARRAYS, body.getvalue(), buffers
+
+
+def dumps_frames(data, compress_threshold=COMPRESS_THRESHOLD):
+    """ encode data into [header, body, *buffers] frames, arrays are not copied """
+    body_flag, body, buffers = _dumps(data)
+
+    flags = []
+    frames = []
+    for frame in [body] + buffers:
+        flag, frame = _maybe_compress(frame, compress_threshold)
+        flags.append(flag)
+        frames.append(frame)
+    flags[0] |= body_flag
+
+    lengths = [memoryview(frame).nbytes for frame in frames]
+    return [pack_header(flags, lengths)] + frames
+
+
+def loads_frames(frames):
+    """ decode [header, body, *buffers] frames, as made by `dumps_frames` """
+    flags, _ = unpack_header(frames[0])
+    payload = [
+        lz4.frame.decompress(frame) if flag & FLAG_LZ4 else frame
+        for flag, frame in zip(flags, frames[1:])
+    ]
+    if flags[0] & FLAG_ARRAYS:
+        return _ArrayUnpickler(io.BytesIO(payload[0]), payload[1:]).load()
+    return pickle.loads(payload[0], buffers=payload[1:])
+
+
+def frames_nbytes(frames):
+    """ total byte size of frames """
+    return sum(memoryview(frame).nbytes for frame in frames)
+
+
+def split_frames(buffer):
+    """ split one contiguous buffer, holding header and frames in order, into frames """
+    buffer = memoryview(buffer)
+    size = header_size(buffer)
+    frames = [buffer[:size]]
+    _, lengths = unpack_header(buffer)
+    offset = size
+    for length in lengths:
+        frames.append(buffer[offset:offset + length])
+        offset += length
+    return frames
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+share memory comm with a ring allocator.
+
+All senders share one RawArray, each message takes a block of exactly its
+encoded size from the ring instead of a fixed slot per agent, and senders
+wait when the ring is full. Blocks are released by the receiver, possibly
+out of order; the tail only moves over released blocks.
+"""
+from ctypes import c_ubyte
+from multiprocessing import Condition, Queue, RawArray, RawValue
+
+import numpy as np
+
+from xt.framework.register import Registers
+from xt.framework.comm.serialize import (
+    COMPRESS_THRESHOLD,
+    dumps_frames,
+    frames_nbytes,
+    loads_frames,
+)
+
+
+class RingAllocator(object):
+    """
+    allocate contiguous blocks from a shared ring buffer.
+    `head` and `tail` are byte counters that only grow, a block that doesn't
+    fit before the end of the ring is placed at its start and the skipped
+    bytes are counted into the block.
+    """
+
+    def __init__(self, size):
+        self.size = int(size)
+        self.mem = RawArray(c_ubyte, self.size)
+        self.buffer = np.frombuffer(self.mem, dtype=np.uint8)
+        self.head = RawValue("q", 0)
+        self.tail = RawValue("q", 0)
+        self.cond = Condition()
+        self.released = dict()
+
+    def alloc(self, nbytes):
+        """ return (block, offset), block is the (start, end) counter range to release """
+        if nbytes > self.size:
+            raise ValueError(
+                "message of {} bytes exceeds ring size {}".format(nbytes, self.size))
+
+        with self.cond:
+            while True:
+                head = self.head.value
+                offset = head % self.size
+                skip = self.size - offset if offset + nbytes > self.size else 0
+                if skip + nbytes <= self.size - (head - self.tail.value):
+                    break
+                if head == self.tail.value:
+                    # empty ring, restart from its beginning
+                    self.head.value = self.tail.value = head + skip
+                    continue
+                self.cond.wait()
+            self.head.value = head + skip + nbytes
+
+        return (head, head + skip + nbytes), (offset + skip) % self.size
+
+    def release(self, block):
+        """ release a block, called by the single receiver """
+        start, end = block
+        with self.cond:
+            self.released[start] = end
+            tail = self.tail.value
+            while tail in self.released:
+                tail = self.released.pop(tail)
+            if tail != self.tail.value:
+                self.tail.value = tail
+                self.cond.notify_all()
+
+    def used(self):
+        """ bytes in use, include the skipped bytes """
+        return self.head.value - self.tail.value
+
+    def view(self, offset, nbytes):
+        return memoryview(self.buffer[offset:offset + nbytes])
+
+    def write(self, offset, frames):
+        """ copy frames into ring one after another, return their lengths """
+        lengths = []
+        for frame in frames:
+            frame = np.frombuffer(frame, dtype=np.uint8)
+            self.buffer[offset:offset + frame.size] = frame
+            offset += frame.size
+            lengths.append(frame.size)
+        return lengths
+
+
+@Registers.comm.register
+class ShareByRing(object):
+    def __init__(self, comm_info):
+        """ init share memory ring """
+        super(ShareByRing, self).__init__()
+
+        self.size_shared_mem = comm_info.get("size", 100000000)
+        self.compress_threshold = comm_info.get("compress_threshold", COMPRESS_THRESHOLD)
+
+        self.control_q = Queue()
+        self.ring = RingAllocator(self.size_shared_mem)
+
+    def send(self, data, name=None, block=True):
+        """ encode data into frames and put them in share memory """
+        self.send_multipart(dumps_frames(data, self.compress_threshold))
+
+    def recv(self, name=None, block=True):
+        """ get data from share memory, the data is copied out of the ring """
+        frames, object_id = self.recv_multipart()
+        try:
+            data = loads_frames([bytes(frame) for frame in frames])
+        finally:
+            self.delete(object_id)
+        return data
+
+    def send_bytes(self, data):
+        """ put one buffer in share memory """
+        self.send_multipart([data])
+
+    def recv_bytes(self):
+        """ get one buffer view and its id, release it with `delete` """
+        frames, object_id = self.recv_multipart()
+        return frames[0], object_id
+
+    def send_multipart(self, data):
+        """ put frames in share memory as one block """
+        block, offset = self.ring.alloc(frames_nbytes(data))
+        lengths = self.ring.write(offset, data)
+        self.control_q.put((block, offset, lengths))
+
+    def recv_multipart(self):
+        """ get frame views and their id, release them with `delete` """
+        block, offset, lengths = self.control_q.get()
+        frames = []
+        for length in lengths:
+            frames.append(self.ring.view(offset, length))
+            offset += length
+        return frames, block
+
+    def delete(self, object_id):
+        """ release the block of a received message """
+        self.ring.release(object_id)
+
+    def close(self):
+        """ close """
+        pass
@@ -25,9 +25,9 @@ class UniComm(object):
         """ common recv_bytes interface """
         return self.comm.recv_bytes()
 
-    def send_multipart(self, data):
+    def send_multipart(self, data, **kwargs):
         """ common send_multipart interface """
-        return self.comm.send_multipart(data)
+        return self.comm.send_multipart(data, **kwargs)
 
     def recv_multipart(self):
         """ common recv_multipart interface """
@@ -21,8 +21,9 @@
 Learner module cover the training process within the RL problems.
 """
 import os
+import queue
 import threading
-from time import time
+from time import time, sleep
 from copy import deepcopy
 import numpy as np
 from absl import logging
@@ -31,6 +32,7 @@ from collections import deque
 from xt.util.logger import Logger, StatsRecorder
 from xt.util.profile_stats import PredictStats
 from xt.framework.trainer import build_alg_with_trainer
+from xt.framework.weight_channel import WeightPublisher
 from xt.benchmark.tools.evaluate_xt import (
     make_workspace_if_not_exist,
     parse_benchmark_args,
@@ -103,6 +105,8 @@ class Learner(object):
                 self.send_broker,
                 self.stats_deliver,
                 self.train_lock,
+                max_batch=self.alg_para.get("predict_batch_size", 32),
+                max_wait_us=self.alg_para.get("predict_wait_us", 0),
             )
             for i in range(2)
         ]
@@ -193,11 +197,28 @@ class TrainWorker(object):
 
         self.logger = Logger(os.path.dirname(model_path))
 
+        # publish weights in memory instead of model files, if configured
+        alg_config = alg.alg_config or dict()
+        self.weight_publisher = None
+        if alg_config.get("dist_weights", False):
+            self.weight_publisher = WeightPublisher(
+                dtype=alg_config.get("weights_dtype"),
+                keyframe_interval=alg_config.get("weights_keyframe_interval", 1),
+            )
+
     def _dist_model(self, dist_model_name=("none", "none"), **kwargs):
         """dist model tool"""
         to_send_data = message(dist_model_name, cmd="dist_model", **kwargs)
         self.model_q.send(to_send_data)
 
+    def _dist_weights(self, **kwargs):
+        """publish the newest weights with a new version"""
+        with self.lock:
+            weights = self.alg.get_weights()
+        packet = self.weight_publisher.publish(weights)
+        logging.debug("put weights version: {}".format(packet["weights_version"]))
+        self.model_q.send(message(packet, cmd="dist_weights", **kwargs))
+
     def train(self):
         """ train model """
         total_count = 0  # if on the off policy, total count > train count
@@ -247,7 +268,10 @@ class TrainWorker(object):
 
                 logging.debug("put full_model_name: {}".format(full_model_name))
                 if not self.alg.async_flag:
-                    self._dist_model(dist_model_name=full_model_name)
+                    if self.weight_publisher:
+                        self._dist_weights()
+                    else:
+                        self._dist_model(dist_model_name=full_model_name)
                     self.latest_model_name = full_model_name
 
                 # For Cloud
@@ -339,38 +363,71 @@ class TrainWorker(object):
 
 
 class PredictThread(object):
-    def __init__(self, thread_id, alg, request_q, reply_q, stats_deliver, lock):
+    """
+    Predict the requests from explorers in batches.
+    A batch is sent to inference when it has `max_batch` requests,
+    or `max_wait_us` microseconds passed since its first request.
+    With `max_wait_us` 0, the requests already queued are batched, so a
+    single explorer gets no extra latency.
+    The replies keep the ctr_info of requests, so the broker could
+    route them to their explorer and agent.
+    """
+    def __init__(self, thread_id, alg, request_q, reply_q, stats_deliver, lock,
+                 max_batch=1, max_wait_us=0):
         self.alg = alg
         self.thread_id = thread_id
         self.request_q = request_q
         self.reply_q = reply_q
         self.lock = lock
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_us / 1e6
 
         self.stats_deliver = stats_deliver
         self._report_period = 200
 
         self._stats = PredictStats()
 
+    def gather(self):
+        """ block for the first request, then gather more until the batch is full or timeout """
+        batch = [self.request_q.recv()]
+        recv_times = [time()]
+        deadline = recv_times[0] + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.request_q.recv(block=False))
+                recv_times.append(time())
+            except queue.Empty:
+                remaining = deadline - time()
+                if remaining <= 0:
+                    break
+                sleep(min(remaining, 5e-5))
+        return batch, recv_times
+
     def predict(self):
         """ predict action """
         while True:
 
             start_t0 = time()
-            data = self.request_q.recv()
-            state = get_msg_data(data)
-            self._stats.obs_wait_time += time() - start_t0
+            batch, recv_times = self.gather()
+            states = [get_msg_data(data) for data in batch]
+            self._stats.obs_wait_time += recv_times[0] - start_t0
 
             start_t1 = time()
             with self.lock:
-                action = self.alg.predict(state)
+                if len(batch) == 1:
+                    actions = [self.alg.predict(states[0])]
+                else:
+                    actions = self.alg.predict_batch(states)
             self._stats.inference_time += time() - start_t1
+            self._stats.add_batch(len(batch), [start_t1 - t for t in recv_times])
 
-            set_msg_info(data, cmd="predict_reply")
-            set_msg_data(data, action)
-            self.reply_q.send(data)
+            for data, action in zip(batch, actions):
+                set_msg_info(data, cmd="predict_reply")
+                set_msg_data(data, action)
+                self.reply_q.send(data)
 
-            self._stats.iters += 1
             if self._stats.iters > self._report_period:
+                logging.debug("predictor histograms: {}".format(self._stats.histograms()))
                 _report = self._stats.get()
                 self.stats_deliver.send(_report, block=True)
 
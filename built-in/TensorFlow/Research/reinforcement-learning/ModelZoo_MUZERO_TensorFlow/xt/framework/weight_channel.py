@@ -0,0 +1,119 @@
+"""
+publish model weights to explorers in memory, with a version number.
+
+The learner publishes `alg.get_weights()` as a packet, which goes to the
+explorers over the comm layer as a `dist_weights` message, and the explorers
+restore it with `model_weights` instead of loading a checkpoint file.
+
+The weights could be sent as float16, and as the delta to the last key
+frame, which is a full packet sent every `keyframe_interval` versions.
+Deltas are based on the key frame rather than the previous version, so an
+explorer only needs the latest key frame, and dropping stale packets is safe.
+The publisher keeps the key frame as the explorers decode it, so the float16
+error doesn't accumulate.
+"""
+import numpy as np
+
+WEIGHTS_PACKET_KEY = "weights_version"
+
+
+def is_weights_packet(data):
+    """ check if the data received by agent is a weights packet """
+    return isinstance(data, dict) and WEIGHTS_PACKET_KEY in data
+
+
+def _flatten(weights):
+    """ return (keys, arrays), keys is None for a list of weights """
+    if isinstance(weights, dict):
+        keys = list(weights.keys())
+        return keys, [np.asarray(weights[key]) for key in keys]
+    return None, [np.asarray(value) for value in weights]
+
+
+def _unflatten(keys, arrays):
+    if keys is None:
+        return arrays
+    return dict(zip(keys, arrays))
+
+
+class WeightPublisher(object):
+    """
+    encode weights into versioned packets.
+    :param dtype: dtype to send floating weights as, e.g. "float16", None keeps them.
+    :param keyframe_interval: send a full packet every `keyframe_interval` versions,
+        deltas to it in between. 1 means always full.
+    """
+    def __init__(self, dtype=None, keyframe_interval=1):
+        self.dtype = np.dtype(dtype) if dtype else None
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.version = 0
+        self._keyframe = None
+        self._keyframe_version = 0
+
+    def _encode(self, array):
+        if self.dtype is not None and np.issubdtype(array.dtype, np.floating):
+            return array.astype(self.dtype)
+        return array
+
+    def publish(self, weights):
+        """ return the packet of next version """
+        keys, arrays = _flatten(weights)
+        self.version += 1
+        is_keyframe = self._keyframe is None or \
+            (self.version - self._keyframe_version) >= self.keyframe_interval
+
+        if is_keyframe:
+            data = [self._encode(array) for array in arrays]
+            # what explorers will restore
+            self._keyframe = [encoded.astype(array.dtype) for encoded, array in zip(data, arrays)]
+            self._keyframe_version = self.version
+        else:
+            data = [self._encode(array - base) if np.issubdtype(array.dtype, np.floating)
+                    else array for array, base in zip(arrays, self._keyframe)]
+
+        return {
+            WEIGHTS_PACKET_KEY: self.version,
+            "base_version": None if is_keyframe else self._keyframe_version,
+            "keys": keys,
+            "dtypes": [array.dtype.str for array in arrays],
+            "data": data,
+        }
+
+
+class WeightSubscriber(object):
+    """ decode the packets from WeightPublisher, keep the latest weights """
+    def __init__(self):
+        self.version = 0
+        self.weights = None
+        self._keyframe = None
+        self._keyframe_version = 0
+        self.skipped = 0
+
+    def apply(self, packet):
+        """
+        return the decoded weights, or None if the packet is not newer than
+        the current version, or is a delta without its key frame.
+        """
+        version = packet[WEIGHTS_PACKET_KEY]
+        if version <= self.version:
+            self.skipped += 1
+            return None
+
+        dtypes = [np.dtype(dtype) for dtype in packet["dtypes"]]
+        base_version = packet["base_version"]
+        if base_version is None:
+            arrays = [np.asarray(data).astype(dtype, copy=False)
+                      for data, dtype in zip(packet["data"], dtypes)]
+            self._keyframe = arrays
+            self._keyframe_version = version
+        elif base_version == self._keyframe_version:
+            arrays = [base + np.asarray(data).astype(dtype, copy=False)
+                      if np.issubdtype(dtype, np.floating) else np.asarray(data)
+                      for data, base, dtype in zip(packet["data"], self._keyframe, dtypes)]
+        else:
+            self.skipped += 1
+            return None
+
+        self.version = version
+        self.weights = _unflatten(packet["keys"], arrays)
+        return self.weights
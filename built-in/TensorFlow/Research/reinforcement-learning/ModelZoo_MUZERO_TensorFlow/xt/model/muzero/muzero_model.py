@@ -111,6 +111,19 @@ class MuzeroModel(XTModel):
 
         return NetworkOutput(value, reward[0], policy[0], hidden[0])
 
+    def initial_inference_batch(self, input_data):
+        """
+        initial inference for a batch of states, returns a NetworkOutput of arrays.
+        It infers one state at a time, models override it to run the whole batch.
+        """
+        return stack_outputs([self.initial_inference(np.expand_dims(state, 0))
+                              for state in input_data])
+
+    def recurrent_inference_batch(self, hidden_state, action):
+        """ recurrent inference for a batch of hidden states and actions """
+        return stack_outputs([self.recurrent_inference(_hidden, _action)
+                              for _hidden, _action in zip(hidden_state, action)])
+
     def build_graph(self):
         self.image = tf.placeholder(tf.float32, name="obs",
                                     shape=(None, ) + tuple(self.state_dim))
@@ -237,6 +250,13 @@ class NetworkOutput(typing.NamedTuple):
     policy: List[int]
     hidden_state: List[float]
 
+def stack_outputs(outputs):
+    """ stack a list of NetworkOutput into one NetworkOutput of arrays """
+    return NetworkOutput(np.array([output.value for output in outputs]),
+                         np.array([output.reward for output in outputs]),
+                         np.stack([output.policy for output in outputs]),
+                         np.stack([output.hidden_state for output in outputs]))
+
 class MuzeroBase(Model):
     """Model that combine the representation and prediction (value+policy) network."""
     def __init__(self, representation_network: Model, dynamic_network: Model, policy_network: Model):
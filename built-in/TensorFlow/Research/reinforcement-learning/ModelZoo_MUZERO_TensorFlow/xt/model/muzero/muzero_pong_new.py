@@ -81,6 +81,16 @@ class MuzeroPongNew(MuzeroPongTest):
             # print("value", value, "reward", reward, np.sum(hidden), policy[0])
         return NetworkOutput(value, reward, policy[0], hidden[0])
 
+    def initial_inference_batch(self, input_data):
+        with self.graph.as_default():
+            K.set_session(self.sess)
+
+            feed_dict = {self.image: input_data}
+            policy, value, hidden = self.sess.run([self.infer_p, self.infer_v, self.infer_hidden], feed_dict)
+            value = self._value_transform_batch(value, self.value_support_size)
+
+        return NetworkOutput(value, np.zeros_like(value), policy, hidden)
+
     def value_inference(self, input_data):
         with self.graph.as_default():
             K.set_session(self.sess)
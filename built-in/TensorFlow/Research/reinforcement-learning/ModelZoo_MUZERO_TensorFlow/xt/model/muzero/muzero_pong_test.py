@@ -122,6 +122,33 @@ class MuzeroPongTest(MuzeroAtari):
             # print("value", value, "reward", reward, np.sum(hidden), policy[0])
         return NetworkOutput(value, reward, policy[0], hidden[0])
 
+    def initial_inference_batch(self, input_data):
+        with self.graph.as_default():
+            K.set_session(self.sess)
+
+            feed_dict = {self.obs: input_data}
+            hidden = self.sess.run(self.out_rep, feed_dict)
+
+            feed_dict = {self.hidden: hidden}
+            policy, value = self.sess.run([self.out_p, self.out_v], feed_dict)
+            value = self._value_transform_batch(value, self.value_support_size)
+
+        return NetworkOutput(value, np.zeros_like(value), policy, hidden)
+
+    def recurrent_inference_batch(self, hidden_state, action):
+        with self.graph.as_default():
+            K.set_session(self.sess)
+            action = np.eye(self.action_dim)[action]
+            conditioned_hidden = np.concatenate((hidden_state, action), axis=-1)
+            feed_dict = {self.conditioned_hidden: conditioned_hidden}
+            hidden, reward = self.sess.run([self.out_h, self.out_r], feed_dict)
+            reward = self._value_transform_batch(reward, self.reward_support_size)
+            feed_dict = {self.hidden: hidden}
+            policy, value = self.sess.run([self.out_p, self.out_v], feed_dict)
+            value = self._value_transform_batch(value, self.value_support_size)
+
+        return NetworkOutput(value, reward, policy, hidden)
+
     def value_inference(self, input_data):
         with self.graph.as_default():
             K.set_session(self.sess)
@@ -265,6 +292,12 @@ class MuzeroPongTest(MuzeroAtari):
         #     print("nan vlaue", value_support, probs, value)
         return np.asscalar(value_clip)
 
+    @staticmethod
+    def _value_transform_batch(value_support, support_size):
+        """ _value_transform on every row of value_support """
+        value = np.dot(value_support, np.arange(-support_size, support_size + 2))
+        return np.clip(value, -support_size, support_size)
+
 def hidden_normlize(hidden):
     hidden_max = tf.reduce_max(hidden, axis=-1, keepdims=True)
     hidden_min = tf.reduce_min(hidden, axis=-1, keepdims=True)
@@ -62,6 +62,10 @@ BOARD_GROUP_MAP = {
     "mean_wait_model_ms": "explorer",
     "mean_predictor_wait_ms": "predictor",
     "mean_predictor_infer_ms": "predictor",
+    "mean_predictor_batch_size": "predictor",
+    "p99_predictor_batch_size": "predictor",
+    "mean_predictor_queue_ms": "predictor",
+    "p99_predictor_queue_ms": "predictor",
     # "bm_rewards": "benchmark",
     # "eval_criteria": "benchmark",
 }
@@ -63,21 +63,60 @@ class SingleTracker(object):
         return np.nanmean(self.with_time_list) * 1000
 
 
+def _hist_percentile(hist, edges, q):
+    """upper edge of the bucket which contains the q-th percentile"""
+    total = np.sum(hist)
+    if not total:
+        return np.nan
+    return edges[int(np.searchsorted(np.cumsum(hist), total * q / 100.0))]
+
+
 class PredictStats(object):
     """predictor status records
-    handle the wait and inference time of predictor"""
+    handle the wait and inference time of predictor,
+    with histograms of batch size and queueing latency of requests"""
+
+    # upper edges of buckets, the last bucket holds the larger ones
+    batch_size_edges = np.array([1, 2, 4, 8, 16, 32, 64, 128, 256, np.inf])
+    queue_ms_edges = np.array([0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, np.inf])
 
     def __init__(self):
         """init with default value"""
-        self.obs_wait_time = 0.0
-        self.inference_time = 0.0
-        self.iters = 0.0
+        self.reset()
+
+    def add_batch(self, batch_size, queue_times):
+        """record one batched inference
+        :param batch_size: requests in the batch
+        :param queue_times: seconds of each request waited before inference
+        """
+        self.iters += batch_size
+        self.batches += 1
+        self.batch_size_hist[np.searchsorted(self.batch_size_edges, batch_size)] += 1
+        queue_ms = np.asarray(queue_times) * 1000
+        np.add.at(self.queue_ms_hist, np.searchsorted(self.queue_ms_edges, queue_ms), 1)
+        self.queue_time += float(np.sum(queue_times))
+
+    def histograms(self):
+        """bucket upper edges and counts of batch size and queueing latency"""
+        return {
+            "predictor_batch_size": (self.batch_size_edges, self.batch_size_hist.copy()),
+            "predictor_queue_ms": (self.queue_ms_edges, self.queue_ms_hist.copy()),
+        }
 
     def get(self):
         ret = {
             "mean_predictor_wait_ms": self.obs_wait_time * 1000 / self.iters,
             "mean_predictor_infer_ms": self.inference_time * 1000 / self.iters,
         }
+        if self.batches:
+            ret.update({
+                "mean_predictor_batch_size": self.iters / self.batches,
+                "p99_predictor_batch_size": _hist_percentile(
+                    self.batch_size_hist, self.batch_size_edges, 99),
+                "mean_predictor_queue_ms": self.queue_time * 1000 / self.iters,
+                "p99_predictor_queue_ms": _hist_percentile(
+                    self.queue_ms_hist, self.queue_ms_edges, 99),
+            })
         self.reset()
         return ret
 
@@ -85,6 +124,10 @@ class PredictStats(object):
         self.obs_wait_time = 0.0
         self.inference_time = 0.0
         self.iters = 0.0
+        self.batches = 0
+        self.queue_time = 0.0
+        self.batch_size_hist = np.zeros(len(self.batch_size_edges), dtype=np.int64)
+        self.queue_ms_hist = np.zeros(len(self.queue_ms_edges), dtype=np.int64)
 
 
 class AgentStats(object):
@@ -125,6 +168,7 @@ class AgentGroupStats(object):
         """init with default value"""
         self.env_step_time = 0.0
         self.inference_time = 0.0
+        self.feedback_time = 0.0
         self.iters = 0
         self.explore_time_in_epi = 0.0
         self.wait_model_time = 0.0
@@ -162,6 +206,7 @@ class AgentGroupStats(object):
                 {
                     "mean_env_step_time_ms": self.env_step_time * 1000 / self.iters,
                     "mean_inference_time_ms": self.inference_time * 1000 / self.iters,
+                    "mean_feedback_time_ms": self.feedback_time * 1000 / self.iters,
                     "iters": self.iters,
                 }
             )
@@ -173,6 +218,7 @@ class AgentGroupStats(object):
         """reset buffer."""
         self.env_step_time = 0.0
         self.inference_time = 0.0
+        self.feedback_time = 0.0
         self.iters = 0
         self.explore_time_in_epi = 0.0
         self.wait_model_time = 0.0
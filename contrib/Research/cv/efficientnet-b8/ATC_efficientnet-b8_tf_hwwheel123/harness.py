@@ -0,0 +1,152 @@
+"""
+batched and pipelined inference harness
+
+val_map.txt is streamed once, the images are preprocessed in a worker pool
+into a bounded queue and assembled into batches, so the preprocessing of the
+next batches overlaps with the predict of the current one.
+"""
+import os
+import re
+import threading
+import time
+from multiprocessing import Pool
+from queue import Queue, Full
+
+import cv2
+import numpy as np
+
+_END = None
+_worker = {}
+
+
+def add_harness_args(parser):
+    parser.add_argument("--batch_size", default=1, type=int,
+                        help="images of each predict, the batch size of the om model")
+    parser.add_argument("--num_workers", default=4, type=int,
+                        help="processes to preprocess the images, 0 to preprocess in a thread of the main process")
+    parser.add_argument("--queue_size", default=8, type=int, help="preprocessed batches buffered for predict")
+
+
+def read_val_map(dataset_path, count, offset=0):
+    """yield (image_name, label) of the first `count` lines of val_map.txt, all lines if `count` is 0"""
+    with open(os.path.join(dataset_path, 'val_map.txt'), 'r') as f:
+        idx = 0
+        for s in f:
+            if count and idx >= count:
+                break
+            if not s.strip():
+                continue
+            image_name, label = re.split(r"\s+", s.strip())
+            idx += 1
+            yield image_name, int(label) + offset
+
+
+def _init_worker(preprocess, dataset_path, dims, precision):
+    # the pool is already parallel
+    cv2.setNumThreads(1)
+    _worker.update(preprocess=preprocess, dataset_path=dataset_path, dims=dims, precision=precision)
+
+
+def _load(item):
+    image_name, label = item
+    img_org = cv2.imread(os.path.join(_worker['dataset_path'], image_name))
+    processed_img = _worker['preprocess'](img_org, dims=_worker['dims'], precision=_worker['precision'])
+    return image_name, label, processed_img
+
+
+def _put(queue, item, stop):
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def iter_batches(args, preprocess, offset=0):
+    """
+    yield (image_names, labels, feed) of each batch. The last batch is padded
+    with its last image to `args.batch_size`, the names and labels are not.
+    """
+    queue = Queue(maxsize=args.queue_size)
+    stop = threading.Event()
+    worker_args = (preprocess, args.dataset_path, args.image_size, args.precision)
+    if args.num_workers > 0:
+        pool = Pool(args.num_workers, _init_worker, worker_args)
+    else:
+        pool = None
+        _init_worker(*worker_args)
+
+    def _producer():
+        try:
+            names, labels, imgs = [], [], []
+            items = read_val_map(args.dataset_path, args.count, offset)
+            loaded = pool.imap(_load, items, chunksize=4) if pool is not None else map(_load, items)
+            for image_name, label, img in loaded:
+                names.append(image_name)
+                labels.append(label)
+                imgs.append(img)
+                if len(imgs) == args.batch_size:
+                    if not _put(queue, (names, labels, np.stack(imgs)), stop):
+                        return
+                    names, labels, imgs = [], [], []
+            if imgs:
+                imgs += [imgs[-1]] * (args.batch_size - len(imgs))
+                _put(queue, (names, labels, np.stack(imgs)), stop)
+        except Exception as e:  # pylint: disable=broad-except
+            _put(queue, e, stop)
+        finally:
+            _put(queue, _END, stop)
+
+    thread = threading.Thread(target=_producer)
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+        if pool is not None:
+            pool.terminate()
+
+
+def top1(predictions, batch_size):
+    """class of each image, from the logits or the argmax output of the backend"""
+    output = np.asarray(predictions[0]).reshape(batch_size, -1)
+    if output.shape[1] == 1:
+        return output[:, 0]
+    return np.argmax(output, 1)
+
+
+def run(args, backend, preprocess, offset=0, verbose=True):
+    """predict the first `args.count` images, print accuracy, throughput and latency"""
+    good = 0
+    total = 0
+    latency = []
+    start = time.time()
+    for names, labels, feed in iter_batches(args, preprocess, offset):
+        predict_start = time.time()
+        predictions = backend.predict(feed)
+        latency.append(time.time() - predict_start)
+        for image_name, label, prediction in zip(names, labels, top1(predictions, args.batch_size)):
+            if verbose:
+                print('img_orig:', image_name, 'label:', label, 'predictions:', prediction, '\n')
+            if label == prediction:
+                good += 1
+            total += 1
+    end = time.time()
+
+    latency = np.array(latency or [0.]) * 1000
+    print('[Accuracy] Predict total jpeg:', total, ' Accuracy: ', good / max(total, 1))
+    print('[Perf] Predict total jpeg:', total, ' Cost all time(s): ', end - start,
+          ' Throughput(jpeg/s): ', total / (end - start),
+          ' Batch latency p50(ms): ', np.percentile(latency, 50),
+          ' p99(ms): ', np.percentile(latency, 99))
+    return good, total
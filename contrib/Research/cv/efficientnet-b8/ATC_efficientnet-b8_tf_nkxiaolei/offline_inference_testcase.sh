@@ -15,7 +15,7 @@ python3.7.5 img_preprocess.py --src_path=$originnal_pic --dst_path=$input --pic_
 #start inference
 ./msame --model $model --input $input --output $output 2>&1 |tee inference.log
 #top1 accuarcy
-python3.7.5 accuarcy_top1.py $output $label 2>&1 |tee top1.log
+python3.7.5 postprocess.py $output $label 2>&1 |tee top1.log
 
 #结果判断，功能检查输出ckpt/日志关键字、精度检查loss值/accucy关键字、性能检查耗时打点/ThroughOutput等关键字
 avg_time=`grep "Inference average time without first time:" inference.log | awk '{print $7}'`
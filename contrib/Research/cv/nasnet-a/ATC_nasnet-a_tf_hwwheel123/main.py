@@ -2,7 +2,6 @@ import argparse
 import array
 import collections
 import json
-import os
 import sys
 import threading
 import time
@@ -10,9 +9,10 @@ from queue import Queue
 #import env
 import cv2
 import numpy as np
-import re
 import pdb
 
+from harness import add_harness_args, run
+
 # import converter.converter as converter
 #from backend.backend_acl import AclBackend
 
@@ -26,20 +26,21 @@ def get_args():
     """Parse commandline."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--dataset_path", default="./datasets/imagenet_10", help="path to the dataset")
-    parser.add_argument("--backend", default="acl", help="runtime to use")
+    parser.add_argument("--backend", default="acl", help="runtime to use, acl or numpy (a stand-in of acl without an NPU)")
     parser.add_argument("--model", required=True, help="model file path")
     parser.add_argument("--image_size",default='224,224,3',help="model inputs imagesize")
     parser.add_argument("--inputs", help="model inputs nodes eg: data1:0 ")
     parser.add_argument("--outputs", help="model outputs nodes list eg:fc1:0,fc2:0,fc3:0 ")
 
     # below will override DNMetis rules compliant settings - don't use for official submission
-    parser.add_argument("--count", default=1000, type=int, help="dataset items to infer")
+    parser.add_argument("--count", default=0, type=int, help="dataset items to infer, 0 for all")
     parser.add_argument("--precision", default="fp32", choices=["fp32", "fp16", "int8", "uint8"],
                          help="precision mode, one of " + str(["fp32", "fp16", "int8", "uint8"]))
     parser.add_argument("--feed", default=[], help="feed")
     parser.add_argument("--image_list", default=[], help="image_list")
     parser.add_argument("--label_list", default=[], help="label_list")
     parser.add_argument("--cfg_path",default="./backend_cfg/built-in_config.txt")
+    add_harness_args(parser)
     args = parser.parse_args()
 
     # don't use defaults in argparser. Instead we default to a dict, override that with a profile
@@ -62,6 +63,9 @@ def get_backend(backend):
     if backend == "acl":
         from backend.backend_acl import AclBackend
         backend = AclBackend()
+    elif backend == "numpy":
+        from backend.backend_numpy import NumpyBackend
+        backend = NumpyBackend()
     return backend
 
 def resize_with_aspectratio(img, out_height, out_width, scale=87.5, inter_pol=cv2.INTER_LINEAR):
@@ -104,21 +108,7 @@ def pre_process_nasnet(img, dims=None, precision="fp32"):
 
     return img
 
-def preprocess_dataset(args,offset=0):
-    with open(args.dataset_path + '/val_map.txt', 'r') as f:
-        for s in f:
-            image_name, label = re.split(r"\s+", s.strip())
-            src = os.path.join(args.dataset_path, image_name)
-            img_org = cv2.imread(src)
-            processed_img = pre_process_nasnet(img_org, dims=args.image_size, precision = args.precision)
-            args.feed.append(processed_img)
-            args.image_list.append(image_name)
-            args.label_list.append(int(label)+offset)
-
-
 def main():
-    good = 0
-    total = 0
     #args
     args = get_args()
 
@@ -127,19 +117,10 @@ def main():
 
     # load model to backend
     model = backend.load(args)
-    #
-    # preprocess_dataset
-    preprocess_dataset(args,offset=1)
-
-    #start inference:
-    for i in range(len(args.feed)):
-        predictions = backend.predict(args.feed[i])
-        print('img_orig:',args.image_list[i],'label:',args.label_list[i],'predictions:',np.argmax(predictions),'\n')
-        if args.label_list[i] == np.argmax(predictions):
-            good +=1
-        total +=1
-    print('Predict total jpeg:',len(args.image_list),' Accuracy: ',good / total)
-    
+
+    # preprocess in the worker pool, overlapped with the batched predict
+    run(args, backend, pre_process_nasnet, offset=1, verbose=True)
+
     backend.unload()
 
 if __name__ == "__main__":
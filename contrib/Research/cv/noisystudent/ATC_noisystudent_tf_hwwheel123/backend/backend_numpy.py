@@ -0,0 +1,54 @@
+"""
+numpy backend, runs the harness without an NPU
+"""
+
+
+import numpy as np
+import backend.backend as backend
+
+
+class NumpyBackend(backend.Backend):
+    """
+    A .onnx model is run with onnxruntime, any other model is a fixed random
+    linear classifier of the mean color of the image, only for func&perf.
+    """
+    def __init__(self, num_classes=1001, seed=0):
+        super(NumpyBackend, self).__init__()
+        self.num_classes = num_classes
+        self.seed = seed
+        self.model_path = ""
+        self.session = None
+        self.weights = None
+
+    def version(self):
+        return "1.0"
+
+    def name(self):
+        return "NumpyBackend"
+
+    def image_format(self):
+        return "NHWC"
+
+    def load(self, args):
+        self.model_path = args.model
+        if self.model_path.endswith(".onnx"):
+            import onnxruntime
+            self.session = onnxruntime.InferenceSession(self.model_path)
+            # onnx node names have no ':0' suffix of the tf nodes
+            self.inputs = [node.name for node in self.session.get_inputs()]
+            self.outputs = [node.name for node in self.session.get_outputs()]
+        else:
+            rand = np.random.RandomState(self.seed)
+            self.weights = rand.randn(args.image_size[-1], self.num_classes).astype(np.float32)
+        return self
+
+    def predict(self, feed):
+        feed = np.asarray(feed, dtype=np.float32)
+        if feed.ndim == 3:
+            feed = feed[np.newaxis]
+        if self.session is not None:
+            return self.session.run(self.outputs, {self.inputs[0]: feed})
+        return [feed.reshape(len(feed), -1, feed.shape[-1]).mean(1).dot(self.weights)]
+
+    def unload(self):
+        self.session = None
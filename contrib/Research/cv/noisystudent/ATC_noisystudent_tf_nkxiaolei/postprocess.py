@@ -0,0 +1,143 @@
+"""
+top-1/top-5 accuracy of the msame output bins, in one vectorized pass
+
+All the output bins are read into one 2-D array, one row per picture, instead
+of converting each bin to a text file and reading each bin again. A single
+concatenated output file is memory-mapped. Only a compact json summary is
+written.
+
+usage: python3.7.5 postprocess.py output/ ground_truth/val_map.txt [--offset -1]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+DTYPES = {"fp32": np.float32, "fp16": np.float16, "int32": np.int32, "int8": np.int8}
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output_path", help="dir of the output bins, or one concatenated output file")
+    parser.add_argument("label_path", help="*.txt of 'pic_name label' lines, or *.bin of int64 labels")
+    parser.add_argument("--offset", type=int, default=0, help="added to the predicted class")
+    parser.add_argument("--dtype", default="fp32", choices=sorted(DTYPES), help="dtype of the output bins")
+    parser.add_argument("--num_classes", type=int, default=0,
+                        help="outputs of each picture, required by a concatenated output file")
+    parser.add_argument("--topk", type=int, default=5)
+    parser.add_argument("--summary", default="accuracy_summary.json", help="path of the json summary")
+    return parser.parse_args()
+
+
+def pic_name_of(file):
+    """msame names the output of 'xxx.JPEG.bin' as 'xxx.JPEG_output_0.bin'"""
+    pic_name = file.split("_output")[0]
+    if ".JPEG" in pic_name:
+        pic_name = pic_name.split(".JPEG")[0] + ".JPEG"
+    return pic_name
+
+
+def read_label(label_path):
+    """dict of pic_name: label of a *.txt, or the array of labels of a *.bin indexed by int(pic_name)"""
+    if label_path.endswith(".bin"):
+        return np.fromfile(label_path, dtype=np.int64)
+    labels = {}
+    with open(label_path) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 2:
+                labels[fields[0]] = int(fields[1])
+    return labels
+
+
+def load_outputs(output_path, dtype, num_classes=0):
+    """
+    (pic names, 2-D array of the outputs). A dir of bins is read into one array,
+    a single file is memory-mapped, its pic names are None.
+    """
+    if os.path.isfile(output_path):
+        data = np.memmap(output_path, dtype=dtype, mode="r")
+        if not num_classes:
+            raise ValueError("--num_classes is required by a concatenated output file")
+        return None, data.reshape(-1, num_classes)
+
+    files = sorted(file for file in os.listdir(output_path) if file.endswith(".bin"))
+    if not files:
+        raise ValueError("no output bin in %s" % output_path)
+    nbytes = os.path.getsize(os.path.join(output_path, files[0]))
+    itemsize = np.dtype(dtype).itemsize
+    data = np.empty((len(files), nbytes // itemsize), dtype=dtype)
+    for i, file in enumerate(files):
+        with open(os.path.join(output_path, file), "rb") as f:
+            if f.readinto(data[i]) != nbytes or f.read(1):
+                raise ValueError("%s is not %d bytes as the other outputs" % (file, nbytes))
+    return [pic_name_of(file) for file in files], data
+
+
+def gather_labels(pic_names, label_dict, count):
+    """labels of the pictures, -1 if not in the label file"""
+    if pic_names is None:
+        if isinstance(label_dict, dict):
+            # the rows are in the order of the label file
+            labels = np.fromiter(label_dict.values(), dtype=np.int64)
+        else:
+            labels = np.asarray(label_dict)
+        if len(labels) < count:
+            labels = np.concatenate([labels, np.full(count - len(labels), -1)])
+        return labels[:count]
+    if isinstance(label_dict, dict):
+        return np.array([label_dict.get(pic_name, -1) for pic_name in pic_names], dtype=np.int64)
+    index = np.array([int(pic_name) for pic_name in pic_names], dtype=np.int64)
+    labels = np.full(len(index), -1, dtype=np.int64)
+    valid = (index >= 0) & (index < len(label_dict))
+    labels[valid] = label_dict[index[valid]]
+    return labels
+
+
+def topk_accuracy(data, labels, offset=0, topk=5):
+    """
+    (top-1 hits, top-k hits) of each row. One output per row is a binary
+    classifier thresholded at 0.5, for which top-k is top-1.
+    """
+    if data.shape[1] == 1:
+        top1 = (np.asarray(data[:, 0], dtype=np.float32) > 0.5).astype(np.int64) == labels
+        return top1, top1
+    k = min(topk, data.shape[1])
+    scores = np.asarray(data, dtype=np.float32)
+    top1 = np.argmax(scores, axis=1) + offset == labels
+    # unordered top-k of each row, enough to check if the label is in it
+    topk_index = np.argpartition(-scores, k - 1, axis=1)[:, :k] + offset
+    return top1, (topk_index == labels[:, None]).any(axis=1)
+
+
+def main():
+    args = get_args()
+    start = time.time()
+    pic_names, data = load_outputs(args.output_path, DTYPES[args.dtype], args.num_classes)
+    labels = gather_labels(pic_names, read_label(args.label_path), len(data))
+    top1, topk = topk_accuracy(data, labels, args.offset, args.topk)
+
+    output_num = len(data)
+    missing = int((labels < 0).sum())
+    summary = {
+        "total": output_num,
+        "missing_label": missing,
+        "top1_num": int(top1.sum()),
+        "top%d_num" % args.topk: int(topk.sum()),
+        "top1_accuarcy": float(top1.sum()) / output_num,
+        "top%d_accuarcy" % args.topk: float(topk.sum()) / output_num,
+        "cost_time(s)": time.time() - start,
+    }
+    with open(args.summary, "w") as f:
+        json.dump(summary, f, indent=2)
+    if missing:
+        print("Can't find %d pics in the label file: %s" % (missing, args.label_path))
+    # same line as accuarcy_top1.py, grepped by the testcases
+    print("Totol pic num: %d, Top1 accuarcy: %.4f" % (output_num, summary["top1_accuarcy"]))
+    print("Totol pic num: %d, Top%d accuarcy: %.4f" % (output_num, args.topk, summary["top%d_accuarcy" % args.topk]))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,4 +9,4 @@ rm -rf $output/*
 ./msame --model $model --input $input --output $output
 
 #top1 accuarcy
-python3.7.5 accuarcy_top1.py $output $label
\ No newline at end of file
+python3.7.5 postprocess.py $output $label
\ No newline at end of file
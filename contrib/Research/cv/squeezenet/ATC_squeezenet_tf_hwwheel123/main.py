@@ -2,17 +2,16 @@ import argparse
 import array
 import collections
 import json
-import os
 import sys
 import threading
-import time
 from queue import Queue
 #import env
 import cv2
 import numpy as np
-import re
 import pdb
 
+from harness import add_harness_args, run
+
 # import converter.converter as converter
 #from backend.backend_acl import AclBackend
 
@@ -26,7 +25,7 @@ def get_args():
     """Parse commandline."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--dataset_path", default="./datasets/imagenet_10", help="path to the dataset")
-    parser.add_argument("--backend", default="acl", help="runtime to use")
+    parser.add_argument("--backend", default="acl", help="runtime to use, acl or numpy (a stand-in of acl without an NPU)")
     parser.add_argument("--model", required=True, help="model file path")
     parser.add_argument("--image_size",default='224,224,3',help="model inputs imagesize")
     parser.add_argument("--inputs", help="model inputs nodes eg: data1:0 ")
@@ -41,6 +40,7 @@ def get_args():
     parser.add_argument("--label_list", default=[], help="label_list")
     parser.add_argument("--accuracy", action="store_true", help="enable accuracy pass")
     parser.add_argument("--cfg_path",default="./backend_cfg/built-in_config.txt")
+    add_harness_args(parser)
     args = parser.parse_args()
 
     # don't use defaults in argparser. Instead we default to a dict, override that with a profile
@@ -63,6 +63,9 @@ def get_backend(backend):
     if backend == "acl":
         from backend.backend_acl import AclBackend
         backend = AclBackend()
+    elif backend == "numpy":
+        from backend.backend_numpy import NumpyBackend
+        backend = NumpyBackend()
     return backend
 
 def resize_with_aspectratio(img, out_height, out_width, scale=87.5, inter_pol=cv2.INTER_LINEAR):
@@ -105,44 +108,7 @@ def pre_process_mobilenet(img, dims=None, precision="fp32"):
     img -= mean
     return img
 
-def preprocess_dataset(args,offset=0):
-    count = 0
-    with open(args.dataset_path + '/val_map.txt', 'r') as f:
-        for s in f:
-            if count > args.count:
-                break
-            count +=1
-            image_name, label = re.split(r"\s+", s.strip())
-            src = os.path.join(args.dataset_path, image_name)
-            img_org = cv2.imread(src)
-            processed_img = pre_process_mobilenet(img_org, dims=args.image_size, precision = args.precision)
-            args.feed.append(processed_img)
-            args.image_list.append(image_name)
-            args.label_list.append(int(label)+offset)
-
-def preprocess_dataset_idx(args,idx,offset=0):
-    args.feed = []
-    args.image_list = []
-    args.label_list = []
-    count = 0
-    line = ""
-    with open(args.dataset_path + '/val_map.txt', 'r') as f:
-        for s in f:
-            if idx == count:
-                line = s
-                break
-            count +=1
-        image_name, label = re.split(r"\s+", line.strip())
-        src = os.path.join(args.dataset_path, image_name)
-        img_org = cv2.imread(src)
-        processed_img = pre_process_mobilenet(img_org, dims=args.image_size, precision = args.precision)
-        args.feed.append(processed_img)
-        args.image_list.append(image_name)
-        args.label_list.append(int(label)+offset)
-
 def main():
-    good = 0
-    total = 0
     #args
     args = get_args()
 
@@ -151,30 +117,9 @@ def main():
 
     # load model to backend
     model = backend.load(args)
-    #pdb.set_trace()
-    if args.accuracy:
-        # inference accuracy:
-        for i in range(args.count):
-            #1.preprocess_single_image
-            preprocess_dataset_idx(args,i,offset=0)
-            #2.predict one image
-            predictions = backend.predict(args.feed[0])
-            print('img_orig:',args.image_list[0],'label:',args.label_list[0],'predictions:',np.argmax(predictions),'\n')
-            if args.label_list[0] == np.argmax(predictions):
-                good +=1
-            total +=1
-        print('[Accuracy] Predict total jpeg:',args.count,' Accuracy: ',good / total)
-    else:
-        # inference func&perf
-        #1.preprocess_dataset first
-        preprocess_dataset(args,offset=0)
-        #2.start inference:
-        start=time.time()
-        for i in range(args.count):
-            predictions = backend.predict(args.feed[i])
-        end=time.time()
-        print('[Perf] Predict total jpeg:',args.count,' Cost all time(s): ',end - start)
-   
+
+    # preprocess in the worker pool, overlapped with the batched predict
+    run(args, backend, pre_process_mobilenet, offset=0, verbose=args.accuracy)
 
     backend.unload()
 
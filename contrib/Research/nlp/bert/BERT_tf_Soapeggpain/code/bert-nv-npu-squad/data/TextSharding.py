@@ -11,13 +11,38 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
 from itertools import islice
 
+import mmap
 import multiprocessing
 import os
 import statistics
 
+
+_segmenter = None
+
+
+def _init_segment_worker(segmenter):
+    global _segmenter
+    _segmenter = segmenter
+
+
+def _segment_chunk(articles):
+    return [_segmenter.segment_string(article) for article in articles]
+
+
+def _bounded_imap(pool, func, iterable, max_in_flight):
+    # Pool.imap reads the whole iterable ahead, keep only a few chunks in flight instead
+    in_flight = deque()
+    for item in iterable:
+        in_flight.append(pool.apply_async(func, (item,)))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().get()
+    while in_flight:
+        yield in_flight.popleft().get()
+
 class Sharding:
     def __init__(self, input_files, output_name_prefix, n_training_shards, n_test_shards, fraction_test_set):
         assert len(input_files) > 0, 'The input file list must contain at least one file.'
@@ -35,8 +60,12 @@ class Sharding:
         self.output_test_identifier = '_test'
         self.output_file_extension = '.txt'
 
-        self.articles = {}    # key: integer identifier, value: list of articles
-        self.sentences = {}    # key: integer identifier, value: list of sentences
+        self.articles = {}    # key: integer identifier, value: list of articles, only filled by load_articles
+        self.n_articles = 0
+        # The sentences are spilled to a file as '\n' separated blocks, one block per article
+        self.sentences_file = output_name_prefix + '_sentences.tmp'
+        self.sentence_counts = array('q')    # index: integer identifier, value: number of sentences
+        self.sentence_offsets = array('q', [0])    # article i is bytes [offsets[i], offsets[i + 1]) of sentences_file
         self.output_training_files = {}    # key: filename, value: list of articles to go into file
         self.output_test_files = {}  # key: filename, value: list of articles to go into file
 
@@ -44,78 +73,63 @@ class Sharding:
 
 
     # Remember, the input files contain one article per line (the whitespace check is to skip extraneous blank lines)
-    def load_articles(self):
-        print('Start: Loading Articles')
-
-        global_article_count = 0
+    def iter_articles(self):
         for input_file in self.input_files:
             print('input file:', input_file)
             with open(input_file, mode='r', newline='\n') as f:
-                for i, line in enumerate(f):
+                for line in f:
                     if line.strip():
-                        self.articles[global_article_count] = line.rstrip()
-                        global_article_count += 1
+                        yield line.rstrip()
 
-        print('End: Loading Articles: There are', len(self.articles), 'articles.')
 
+    # Optional, segment_articles_into_sentences streams the articles from the input files if they are not loaded
+    def load_articles(self):
+        print('Start: Loading Articles')
 
-    def segment_articles_into_sentences(self, segmenter):
-        print('Start: Sentence Segmentation')
-        if len(self.articles) is 0:
-            self.load_articles()
-
-        assert len(self.articles) is not 0, 'Please check that input files are present and contain data.'
-
-        # TODO: WIP: multiprocessing (create independent ranges and spawn processes)
-        use_multiprocessing = 'serial'
-
-        def chunks(data, size=len(self.articles)):
-            it = iter(data)
-            for i in range(0, len(data), size):
-                yield {k: data[k] for k in islice(it, size)}
-
-        if use_multiprocessing == 'manager':
-            manager = multiprocessing.Manager()
-            return_dict = manager.dict()
-            jobs = []
-            n_processes = 7    # in addition to the main process, total = n_proc+1
-
-            def work(articles, return_dict):
-                sentences = {}
-                for i, article in enumerate(articles):
-                    sentences[i] = segmenter.segment_string(articles[article])
-
-                    if i % 5000 == 0:
-                        print('Segmenting article', i)
-
-                return_dict.update(sentences)
-
-            for item in chunks(self.articles, len(self.articles)):
-                p = multiprocessing.Process(target=work, args=(item, return_dict))
-
-                # Busy wait
-                while len(jobs) >= n_processes:
-                    pass
-
-                jobs.append(p)
-                p.start()
+        for global_article_count, article in enumerate(self.iter_articles()):
+            self.articles[global_article_count] = article
 
-            for proc in jobs:
-                proc.join()
+        print('End: Loading Articles: There are', len(self.articles), 'articles.')
 
-        elif use_multiprocessing == 'queue':
-            work_queue = multiprocessing.Queue()
-            jobs = []
 
-            for item in chunks(self.articles, len(self.articles)):
-                pass
+    def segment_articles_into_sentences(self, segmenter, n_processes=1, chunk_size=256):
+        print('Start: Sentence Segmentation')
+        articles = self.articles.values() if len(self.articles) != 0 else self.iter_articles()
 
+        def chunks(data, size):
+            it = iter(data)
+            chunk = list(islice(it, size))
+            while chunk:
+                yield chunk
+                chunk = list(islice(it, size))
+
+        if n_processes > 1:
+            pool = multiprocessing.Pool(n_processes, _init_segment_worker, (segmenter,))
+            segmented_chunks = _bounded_imap(pool, _segment_chunk, chunks(articles, chunk_size), 2 * n_processes)
         else:    # serial option
-            for i, article in enumerate(self.articles):
-                self.sentences[i] = segmenter.segment_string(self.articles[article])
-
-                if i % 5000 == 0:
-                    print('Segmenting article', i)
+            pool = None
+            _init_segment_worker(segmenter)
+            segmented_chunks = map(_segment_chunk, chunks(articles, chunk_size))
+
+        self.sentence_counts = array('q')
+        self.sentence_offsets = array('q', [0])
+        with open(self.sentences_file, mode='wb') as f:
+            for segmented_chunk in segmented_chunks:
+                for sentences in segmented_chunk:
+                    if len(self.sentence_counts) % 5000 == 0:
+                        print('Segmenting article', len(self.sentence_counts))
+
+                    block = ''.join(line + '\n' for line in sentences).encode('utf-8')
+                    f.write(block)
+                    self.sentence_counts.append(len(sentences))
+                    self.sentence_offsets.append(self.sentence_offsets[-1] + len(block))
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+        self.n_articles = len(self.sentence_counts)
+        assert self.n_articles != 0, 'Please check that input files are present and contain data.'
 
         print('End: Sentence Segmentation')
 
@@ -139,14 +153,14 @@ class Sharding:
     def get_sentences_per_shard(self, shard):
         result = 0
         for article_id in shard:
-            result += len(self.sentences[article_id])
+            result += self.sentence_counts[article_id]
 
         return result
 
 
     def distribute_articles_over_shards(self):
         print('Start: Distribute Articles Over Shards')
-        assert len(self.articles) >= self.n_training_shards + self.n_test_shards, 'There are fewer articles than shards. Please add more data or reduce the number of shards requested.'
+        assert self.n_articles >= self.n_training_shards + self.n_test_shards, 'There are fewer articles than shards. Please add more data or reduce the number of shards requested.'
 
         # Create dictionary with - key: sentence count per article, value: article id number
         sentence_counts = defaultdict(lambda: [])
@@ -154,8 +168,7 @@ class Sharding:
         max_sentences = 0
         total_sentences = 0
 
-        for article_id in self.sentences:
-            current_length = len(self.sentences[article_id])
+        for article_id, current_length in enumerate(self.sentence_counts):
             sentence_counts[current_length].append(article_id)
             max_sentences = max(max_sentences, current_length)
             total_sentences += current_length
@@ -165,7 +178,7 @@ class Sharding:
         nominal_sentences_per_test_shard = (total_sentences - n_sentences_assigned_to_training) // self.n_test_shards
 
         consumed_article_set = set({})
-        unused_article_set = set(self.articles.keys())
+        unused_article_set = set(range(self.n_articles))
 
         # Make first pass and add one article worth of lines per file
         for file in self.output_training_files:
@@ -179,8 +192,8 @@ class Sharding:
             while len(sentence_counts[max_sentences]) == 0 and max_sentences > 0:
                 max_sentences -= 1
 
-            if len(self.sentences[current_article_id]) > nominal_sentences_per_training_shard:
-                nominal_sentences_per_training_shard = len(self.sentences[current_article_id])
+            if self.sentence_counts[current_article_id] > nominal_sentences_per_training_shard:
+                nominal_sentences_per_training_shard = self.sentence_counts[current_article_id]
                 print('Warning: A single article contains more than the nominal number of sentences per training shard.')
 
         for file in self.output_test_files:
@@ -194,8 +207,8 @@ class Sharding:
             while len(sentence_counts[max_sentences]) == 0 and max_sentences > 0:
                 max_sentences -= 1
 
-            if len(self.sentences[current_article_id]) > nominal_sentences_per_test_shard:
-                nominal_sentences_per_test_shard = len(self.sentences[current_article_id])
+            if self.sentence_counts[current_article_id] > nominal_sentences_per_test_shard:
+                nominal_sentences_per_test_shard = self.sentence_counts[current_article_id]
                 print('Warning: A single article contains more than the nominal number of sentences per test shard.')
 
         training_counts = []
@@ -214,7 +227,7 @@ class Sharding:
         history_remaining = []
         n_history_remaining = 4
 
-        while len(consumed_article_set) < len(self.articles):
+        while len(consumed_article_set) < self.n_articles:
             for fidx, file in enumerate(self.output_training_files):
                 nominal_next_article_size = min(nominal_sentences_per_training_shard - training_counts[fidx], max_sentences)
 
@@ -297,25 +310,31 @@ class Sharding:
 
     def write_shards_to_disk(self):
         print('Start: Write Shards to Disk')
-        for shard in self.output_training_files:
-            self.write_single_shard(shard, self.output_training_files[shard], 'training')
+        # The spilled sentences are paged in by the os instead of being held in memory
+        with open(self.sentences_file, mode='rb') as f:
+            sentences = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.sentence_offsets[-1] else b''
+            for shard in self.output_training_files:
+                self.write_single_shard(shard, self.output_training_files[shard], 'training', sentences)
 
-        for shard in self.output_test_files:
-            self.write_single_shard(shard, self.output_test_files[shard], 'test')
+            for shard in self.output_test_files:
+                self.write_single_shard(shard, self.output_test_files[shard], 'test', sentences)
+
+            if isinstance(sentences, mmap.mmap):
+                sentences.close()
+        os.remove(self.sentences_file)
 
         print('End: Write Shards to Disk')
 
 
-    def write_single_shard(self, shard_name, shard, split):
+    def write_single_shard(self, shard_name, shard, split, sentences):
         shard_split = os.path.split(shard_name)
         shard_name = shard_split[0] + '/' + split + '/' + shard_split[1]
         
-        with open(shard_name, mode='w', newline='\n') as f:
+        with open(shard_name, mode='wb') as f:
             for article_id in shard:
-                for line in self.sentences[article_id]:
-                    f.write(line + '\n')
+                f.write(sentences[self.sentence_offsets[article_id]:self.sentence_offsets[article_id + 1]])
 
-                f.write('\n')  # Line break between articles
+                f.write(b'\n')  # Line break between articles
 
 
 import nltk
@@ -145,8 +145,8 @@ def main(args):
             segmenter = TextSharding.NLTKSegmenter()
             sharding = TextSharding.Sharding(args.input_files, output_file_prefix, args.n_training_shards, args.n_test_shards, args.fraction_test_set)
 
-            sharding.load_articles()
-            sharding.segment_articles_into_sentences(segmenter)
+            # The articles are streamed from the input files and segmented by a pool of n_processes
+            sharding.segment_articles_into_sentences(segmenter, args.n_processes)
             sharding.distribute_articles_over_shards()
             sharding.write_shards_to_disk()
 
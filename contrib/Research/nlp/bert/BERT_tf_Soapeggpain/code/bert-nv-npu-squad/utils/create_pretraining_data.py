@@ -20,8 +20,10 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import argparse
 import logging
+import multiprocessing
 import os
 import random
+import time
 from io import open
 import h5py
 import tensorflow as tf
@@ -164,6 +166,7 @@ def write_instance_to_example_files(instances, tokenizer, max_seq_length,
     f.close()
 
   tf.compat.v1.logging.info("Wrote %d total instances", total_written)
+  return total_written
 
 
 def create_int_feature(values):
@@ -221,6 +224,99 @@ def create_training_instances(input_files, tokenizer, max_seq_length,
     return instances
 
 
+def read_documents(input_file, tokenizer):
+    """Reads the documents of one input file, see `create_training_instances`."""
+    all_documents = [[]]
+    with open(input_file, "r") as reader:
+        while True:
+            line = tokenization.convert_to_unicode(reader.readline())
+            if not line:
+                break
+            line = line.strip()
+
+            # Empty lines are used as document delimiters
+            if not line:
+                all_documents.append([])
+            tokens = tokenizer.tokenize(line)
+            if tokens:
+                all_documents[-1].append(tokens)
+
+    # Remove empty documents
+    return [x for x in all_documents if x]
+
+
+def shuffle_instances(instances, buffer_size, rng):
+    """Shuffles a stream of instances within a buffer of `buffer_size`."""
+    buffer = []
+    for instance in instances:
+        if len(buffer) < buffer_size:
+            buffer.append(instance)
+            continue
+        index = rng.randint(0, buffer_size - 1)
+        yield buffer[index]
+        buffer[index] = instance
+    rng.shuffle(buffer)
+    for instance in buffer:
+        yield instance
+
+
+_shard_config = {}
+
+
+def _init_shard_worker(config):
+    _shard_config.update(config)
+    _shard_config["tokenizer"] = BertTokenizer(config["vocab_file"], do_lower_case=config["do_lower_case"])
+
+
+def create_shard(shard):
+    """Writes the `TrainingInstance`s of one input file to its tfrecord output file."""
+    shard_index, input_file, output_file = shard
+    config = _shard_config
+    tokenizer = config["tokenizer"]
+    start = time.time()
+
+    rng = random.Random(config["random_seed"] + shard_index)
+    all_documents = read_documents(input_file, tokenizer)
+    rng.shuffle(all_documents)
+
+    vocab_words = list(tokenizer.vocab.keys())
+
+    def _instances():
+        for _ in range(config["dupe_factor"]):
+            for document_index in range(len(all_documents)):
+                for instance in create_instances_from_document(
+                        all_documents, document_index, config["max_seq_length"], config["short_seq_prob"],
+                        config["masked_lm_prob"], config["max_predictions_per_seq"], vocab_words, rng):
+                    yield instance
+
+    instances = shuffle_instances(_instances(), config["shuffle_buffer_size"], rng)
+    total_written = write_instance_to_example_files(instances, tokenizer, config["max_seq_length"],
+                                                    config["max_predictions_per_seq"], [output_file])
+    return output_file, total_written, time.time() - start
+
+
+def create_shards(input_files, output_prefix, num_workers, config):
+    """Streaming mode, one output file per input file by a pool of workers."""
+    input_files = sorted(input_files)
+    num_shards = len(input_files)
+    shards = [(shard_index, input_file, "%s-%05d-of-%05d" % (output_prefix, shard_index, num_shards))
+              for shard_index, input_file in enumerate(input_files)]
+
+    start = time.time()
+    total_written = 0
+    pool = multiprocessing.Pool(num_workers, _init_shard_worker, (config,))
+    for output_file, num_written, seconds in pool.imap_unordered(create_shard, shards):
+        total_written += num_written
+        print("Wrote {} instances to {} in {:.1f}s, {:.1f} instances/s".format(
+            num_written, output_file, seconds, num_written / max(seconds, 1e-6)))
+    pool.close()
+    pool.join()
+
+    seconds = time.time() - start
+    print("Wrote {} total instances of {} shards in {:.1f}s, {:.1f} instances/s".format(
+        total_written, num_shards, seconds, total_written / max(seconds, 1e-6)))
+
+
 def create_instances_from_document(
         all_documents, document_index, max_seq_length, short_seq_prob,
         masked_lm_prob, max_predictions_per_seq, vocab_words, rng):
@@ -471,6 +567,16 @@ def main():
                         type=int,
                         default=12345,
                         help="random seed for initialization")
+    parser.add_argument("--num_workers",
+                        type=int,
+                        default=0,
+                        help="If > 0, streaming mode: each input file is a shard, processed by one of `num_workers` "
+                             "processes into its own tfrecord file `output_file-<shard>-of-<shards>`, with the random "
+                             "seed `random_seed + shard`. Random next sentences are taken from the same shard.")
+    parser.add_argument("--shuffle_buffer_size",
+                        type=int,
+                        default=10000,
+                        help="Streaming mode shuffles the instances of a shard within a buffer of this size.")
 
     args = parser.parse_args()
 
@@ -485,6 +591,21 @@ def main():
     else:
         raise ValueError("{} is not a valid path".format(args.input_file))
 
+    if args.num_workers > 0:
+        config = {
+            "vocab_file": args.vocab_file,
+            "do_lower_case": args.do_lower_case,
+            "max_seq_length": args.max_seq_length,
+            "dupe_factor": args.dupe_factor,
+            "short_seq_prob": args.short_seq_prob,
+            "masked_lm_prob": args.masked_lm_prob,
+            "max_predictions_per_seq": args.max_predictions_per_seq,
+            "random_seed": args.random_seed,
+            "shuffle_buffer_size": args.shuffle_buffer_size,
+        }
+        create_shards(input_files, args.output_file.split(",")[0], args.num_workers, config)
+        return
+
     rng = random.Random(args.random_seed)
     instances = create_training_instances(
         input_files, tokenizer, args.max_seq_length, args.dupe_factor,
@@ -1,7 +1,7 @@
 import os
 import numpy as np
 import sys
-from multiprocessing import Process
+from multiprocessing import Pool
 import time
 import subprocess
 
@@ -24,13 +24,12 @@ def bin2float(file,dtype):
 
 def bintofloat(filename,dtype):
     if os.path.isdir(filename):
-        process= []
-        i=0
-        for file in os.listdir(filename):
-            if(file != "." and file !=".."):
-                process.append(Process(target=bin2float, args=(filename+file,dtype,)))
-                process[i].start()
-                i +=1
+        files = [filename+file for file in os.listdir(filename) if(file != "." and file !="..")]
+        # one process per cpu instead of one per file
+        pool = Pool()
+        pool.starmap(bin2float, [(file, dtype) for file in files])
+        pool.close()
+        pool.join()
     else:
         bin2float(filename,dtype)
 